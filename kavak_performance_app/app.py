@@ -29,7 +29,15 @@ from utils.components import (
 )
 
 # Import custom modules
-from utils.data_generator import generate_sample_data
+from utils.data_store import (
+    advance_shared_data,
+    advance_shared_data_if_due,
+    attach_session_data,
+    check_shared_data,
+    refresh_shared_data,
+    shared_data_checks_enabled,
+)
+from utils.filter_cache import get_filter_cache_stats
 from views.ceo_dashboard import render_ceo_dashboard
 from views.city_manager_dashboard import render_city_manager_dashboard
 from views.customer_profile import render_customer_profile
@@ -50,9 +58,10 @@ apply_custom_styles()
 # Initialize authentication state
 init_session_state()
 
-# Initialize session state for data
-if "data" not in st.session_state:
-    st.session_state.data = generate_sample_data()
+# Attach the shared dataset (built once per server process, not per session);
+# in wall display mode (KAVAK_TICK_SECONDS) it advances one day per interval
+advance_shared_data_if_due()
+attach_session_data(st.session_state)
 
 # Check authentication
 if not is_authenticated():
@@ -65,6 +74,21 @@ else:
     # Render user info in sidebar
     render_user_info_sidebar()
 
+    # Explicit refresh hook for the shared dataset (admins only)
+    if "admin" in user_info.get("permissions", []):
+        with st.sidebar:
+            if st.button("♻️ Regenerar datos", use_container_width=True):
+                refresh_shared_data()
+                st.rerun()
+            if st.button("⏭️ Avanzar un día", use_container_width=True):
+                advance_shared_data()
+                st.rerun()
+            stats = get_filter_cache_stats()
+            st.caption(
+                f"Caché de filtros: {stats['hits']:,} aciertos / "
+                f"{stats['misses']:,} fallos ({stats['hit_rate']:.0%})"
+            )
+
     # Render global filters (shared across management views)
     render_global_filters()
 
@@ -157,3 +181,8 @@ else:
         # ═══════════════════════════════════════════════════════════════════
         st.markdown("---")
         render_celeste_copilot(position="floating")
+
+# Views read the shared frames without defensive copies: when debugging, warn
+# if one of them changed the shared dataset in place (KAVAK_CHECK_SHARED_DATA=1)
+if shared_data_checks_enabled():
+    check_shared_data(st.session_state.data)
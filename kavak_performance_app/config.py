@@ -327,8 +327,172 @@ THRESHOLDS = {
     "aging_warning": 45,
     "noshow_warning": 0.20,
     "noshow_critical": 0.30,
+    "nps_critical": 40,
+    "utilization_warning": 0.60,
+    "stock_attractiveness_critical": 60,
+    "backlog_warning": 20,
+    "available_slots_low": 5,
+    "aprovechamiento_warning": 15,
+    "lead_match_info": 60,
+    "aged_units_warning": 20,
+    "aged_units_critical": 30,
+    "inventory_days_warning": 15,
+    "cancellation_warning": 0.15,
+    "cancellation_critical": 0.20,
 }
 
+# Operational alert rules (City Manager), evaluated in order by
+# utils/alert_rules.py. Thresholds are numbers or THRESHOLDS keys.
+#   metric: Alert metric key
+#   source: Dataset frame the rule reads
+#   where: Row filters on source, all of them must hold (column, "<"/">", threshold)
+#   value: ("count",), (aggregation, column) or (aggregation, column, frame)
+#          with aggregation "sum"/"mean" over the filtered rows, or
+#          ("ratio", value, value[, default]) with default (NaN if not given)
+#          the value when the denominator is not positive
+#   window: Only the last N rows of each scope (None = every row)
+#   comparison, bands: The alert fires with the first (severity, threshold)
+#          band the value passes, most severe first
+#   details: Extra values for the texts, as value
+#   names: Column listing the first three rows that pass the filters
+#   title, description: str.format templates over value, names, details
+#          and THRESHOLDS
+OPERATIONAL_ALERT_RULES = [
+    {
+        "metric": "agent_utilization",
+        "source": "agent_performance",
+        "where": [("utilization", "<", "utilization_warning")],
+        "value": ("count",),
+        "comparison": ">",
+        "bands": [("warning", 0)],
+        "details": {"slots": ("sum", "available_slots")},
+        "names": "agent_name",
+        "title": "{value:.0f} agente(s) subutilizado(s)",
+        "description": "{slots:.0f} slots disponibles sin usar. Agentes: {names}. Asignar más leads.",
+    },
+    {
+        "metric": "stock_quality",
+        "source": "agent_performance",
+        "where": [("stock_attractiveness", "<", "stock_attractiveness_critical")],
+        "value": ("count",),
+        "comparison": ">",
+        "bands": [("critical", 0)],
+        "details": {"avg_age": ("mean", "stock_avg_age")},
+        "names": "agent_name",
+        "title": "{value:.0f} agente(s) con stock poco atractivo",
+        "description": "Stock envejecido (promedio: {avg_age:.0f} días) afecta conversión. Agentes: {names}. Renovar inventario asignado.",
+    },
+    {
+        "metric": "backlog_capacity",
+        "source": "agent_performance",
+        "where": [
+            ("backlog_cartera", ">", "backlog_warning"),
+            ("available_slots", "<", "available_slots_low"),
+        ],
+        "value": ("count",),
+        "comparison": ">",
+        "bands": [("warning", 0)],
+        "names": "agent_name",
+        "title": "{value:.0f} agente(s) con alto backlog y poca capacidad",
+        "description": "Agentes: {names}. Redistribuir cartera o aumentar capacidad.",
+    },
+    {
+        "metric": "aprovechamiento",
+        "source": "agent_performance",
+        "where": [("aprovechamiento_pct", "<", "aprovechamiento_warning")],
+        "value": ("count",),
+        "comparison": ">",
+        "bands": [("warning", 0)],
+        "names": "agent_name",
+        "title": "{value:.0f} agente(s) con bajo aprovechamiento",
+        "description": "< {aprovechamiento_warning}% de oportunidades convertidas. Agentes: {names}. Revisar calidad de leads o capacitación.",
+    },
+    {
+        "metric": "lead_match",
+        "source": "agent_performance",
+        "where": [("lead_match_score", "<", "lead_match_info")],
+        "value": ("count",),
+        "comparison": ">",
+        "bands": [("info", 0)],
+        "names": "agent_name",
+        "title": "{value:.0f} agente(s) con bajo match stock-leads",
+        "description": "El inventario asignado no coincide con lo que buscan los leads. Agentes: {names}. Reasignar stock.",
+    },
+    {
+        "metric": "agent_conversion",
+        "source": "agent_performance",
+        "where": [("conversion", "<", "conversion_warning")],
+        "value": ("count",),
+        "comparison": ">",
+        "bands": [("warning", 0)],
+        "names": "agent_name",
+        "title": "{value:.0f} agente(s) con baja conversión",
+        "description": "Agentes: {names}. Conversión < {conversion_warning:.0%}",
+    },
+    {
+        "metric": "inventory_aging",
+        "source": "inventory",
+        "value": ("sum", "aging_60_plus"),
+        "comparison": ">",
+        "bands": [
+            ("critical", "aged_units_critical"),
+            ("warning", "aged_units_warning"),
+        ],
+        "details": {
+            "aged_share": (
+                "ratio",
+                ("sum", "aging_60_plus"),
+                ("sum", "total_inventory"),
+                0.0,
+            )
+        },
+        "title": "Inventario envejecido: {value:.0f} vehículos",
+        "description": "{aged_share:.0%} del inventario con más de 60 días. Considerar ajuste de precios o promociones.",
+    },
+    {
+        "metric": "noshow_rate",
+        "source": "agent_performance",
+        "where": [("noshow", ">", "noshow_warning")],
+        "value": ("count",),
+        "comparison": ">",
+        "bands": [("warning", 0)],
+        "names": "agent_name",
+        "title": "{value:.0f} agente(s) con alta tasa de no-show",
+        "description": "Agentes: {names}. Revisar proceso de confirmación de citas.",
+    },
+    {
+        "metric": "nps",
+        "source": "daily_metrics",
+        "value": ("mean", "nps"),
+        "window": 7,
+        "comparison": "<",
+        "bands": [("critical", "nps_critical"), ("warning", "nps_warning")],
+        "title": "NPS por debajo del umbral",
+        "description": "NPS promedio últimos 7 días: {value:.0f} (umbral: {nps_warning}). Revisar experiencia de cliente.",
+    },
+    {
+        "metric": "inventory_low",
+        "source": "inventory",
+        "value": ("ratio", ("sum", "available"), ("mean", "sales", "daily_metrics")),
+        "comparison": "<",
+        "bands": [("warning", "inventory_days_warning")],
+        "title": "Inventario bajo",
+        "description": "Solo {value:.0f} días de inventario disponible. Considerar reabastecimiento.",
+    },
+    {
+        "metric": "cancellation_rate",
+        "source": "daily_metrics",
+        "value": ("ratio", ("sum", "cancellations"), ("sum", "reservations")),
+        "comparison": ">",
+        "bands": [
+            ("critical", "cancellation_critical"),
+            ("warning", "cancellation_warning"),
+        ],
+        "title": "Alta tasa de cancelaciones",
+        "description": "{value:.0%} de las reservas son canceladas. Revisar proceso de cierre.",
+    },
+]
+
 # Incentive goals
 INCENTIVE_GOALS = [
     {
@@ -0,0 +1,19 @@
+"""
+Test setup: import the app modules as app.py does (from the app directory)
+and keep the alert store out of the app's data directory
+"""
+
+import os
+import sys
+
+import pytest
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+
+@pytest.fixture(autouse=True)
+def alert_store(tmp_path, monkeypatch):
+    """Alert store in a temporary file, automatic ticks off"""
+    monkeypatch.setenv("KAVAK_ALERT_STORE", str(tmp_path / "alerts.db"))
+    monkeypatch.delenv("KAVAK_TICK_SECONDS", raising=False)
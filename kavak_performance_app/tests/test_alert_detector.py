@@ -0,0 +1,48 @@
+"""
+Alert detector tests
+Strategic alert periods are whole days of the dataset clock
+"""
+
+import pandas as pd
+import pytest
+from utils import alert_detector
+from utils.alert_detector import detect_conversion_volatility, detect_strategic_alerts
+from utils.data_store import get_shared_data
+
+
+@pytest.fixture
+def starts(monkeypatch):
+    """Window starts the detectors pass to rollup"""
+    seen = []
+
+    def recorded(df, *args, start=None, **kwargs):
+        seen.append(start)
+        return rollup(df, *args, start=start, **kwargs)
+
+    rollup = alert_detector.rollup
+    monkeypatch.setattr(alert_detector, "rollup", recorded)
+    return seen
+
+
+def days_from(daily, start):
+    return daily.loc[daily["date"] >= start, "date"].dt.normalize().nunique()
+
+
+@pytest.mark.parametrize("period_days", [7, 30])
+def test_volatility_window_has_whole_days(starts, period_days):
+    daily = get_shared_data()["daily_metrics"]
+    detect_conversion_volatility(daily, period_days)
+    assert starts == [
+        daily["date"].max().normalize() - pd.Timedelta(days=period_days - 1)
+    ]
+    assert days_from(daily, starts[0]) == period_days
+
+
+def test_strategic_periods_follow_the_dataset_clock(starts):
+    data = get_shared_data()
+    daily = data["daily_metrics"]
+    detect_strategic_alerts(data, 30)
+    current, previous, volatility = starts
+    assert current == volatility
+    assert days_from(daily, current) == 30
+    assert current - previous == pd.Timedelta(days=30)
@@ -0,0 +1,370 @@
+"""
+Alert rules tests
+OPERATIONAL_ALERT_RULES evaluated in one batch give the alerts of the
+per-alert pandas code they replaced, texts included
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+from config import OPERATIONAL_ALERT_RULES, PERIOD_OPTIONS, THRESHOLDS
+from pandas.testing import assert_frame_equal
+from utils.alert_detector import alerts_frame, detect_operational_alerts
+from utils.alert_rules import compile_rules, evaluate_rules
+from utils.data_store import get_data_period_start, get_shared_data
+from utils.filter_engine import filter_frame
+
+FRAMES = ("agent_performance", "inventory", "daily_metrics")
+
+
+def baseline_operational_alerts(filtered_data, hub_label=None):
+    """
+    detect_operational_alerts as it was before OPERATIONAL_ALERT_RULES: one
+    pandas pass per alert, kept verbatim as the reference of the rules
+
+    Args:
+        filtered_data: Pre-filtered data dictionary
+        hub_label: Optional hub/region label (not currently used in logic)
+
+    Returns:
+        Alerts DataFrame (see alerts_frame)
+    """
+    alerts = []
+
+    agents_df = filtered_data.get("agent_performance", pd.DataFrame())
+    inventory_df = filtered_data.get("inventory", pd.DataFrame())
+    daily_df = filtered_data.get("daily_metrics", pd.DataFrame())
+
+    # === NEW DEALERSHIP ALERTS ===
+
+    # 1. AGENTES SUBUTILIZADOS (Capacidad disponible)
+    if len(agents_df) > 0:
+        underutilized = agents_df[agents_df["utilization"] < 0.60]
+        if len(underutilized) > 0:
+            total_available_slots = underutilized["available_slots"].sum()
+            agent_names = ", ".join(underutilized["agent_name"].head(3).tolist())
+            more_text = (
+                f" y {len(underutilized) - 3} más" if len(underutilized) > 3 else ""
+            )
+
+            alerts.append(
+                {
+                    "type": "warning",
+                    "title": f"{len(underutilized)} agente(s) subutilizado(s)",
+                    "description": f"{total_available_slots:.0f} slots disponibles sin usar. Agentes: {agent_names}{more_text}. Asignar más leads.",
+                    "timestamp": datetime.now(),
+                    "metric": "agent_utilization",
+                }
+            )
+
+    # 2. STOCK DE BAJA CALIDAD ASIGNADO
+    if len(agents_df) > 0:
+        low_quality_stock = agents_df[agents_df["stock_attractiveness"] < 60]
+        if len(low_quality_stock) > 0:
+            agent_names = ", ".join(low_quality_stock["agent_name"].head(3).tolist())
+            more_text = (
+                f" y {len(low_quality_stock) - 3} más"
+                if len(low_quality_stock) > 3
+                else ""
+            )
+            avg_age = low_quality_stock["stock_avg_age"].mean()
+
+            alerts.append(
+                {
+                    "type": "critical",
+                    "title": f"{len(low_quality_stock)} agente(s) con stock poco atractivo",
+                    "description": f"Stock envejecido (promedio: {avg_age:.0f} días) afecta conversión. Agentes: {agent_names}{more_text}. Renovar inventario asignado.",
+                    "timestamp": datetime.now(),
+                    "metric": "stock_quality",
+                }
+            )
+
+    # 3. ALTO BACKLOG SIN CAPACIDAD
+    if len(agents_df) > 0:
+        high_backlog_low_capacity = agents_df[
+            (agents_df["backlog_cartera"] > 20) & (agents_df["available_slots"] < 5)
+        ]
+        if len(high_backlog_low_capacity) > 0:
+            agent_names = ", ".join(
+                high_backlog_low_capacity["agent_name"].head(3).tolist()
+            )
+            more_text = (
+                f" y {len(high_backlog_low_capacity) - 3} más"
+                if len(high_backlog_low_capacity) > 3
+                else ""
+            )
+
+            alerts.append(
+                {
+                    "type": "warning",
+                    "title": f"{len(high_backlog_low_capacity)} agente(s) con alto backlog y poca capacidad",
+                    "description": f"Agentes: {agent_names}{more_text}. Redistribuir cartera o aumentar capacidad.",
+                    "timestamp": datetime.now(),
+                    "metric": "backlog_capacity",
+                }
+            )
+
+    # 4. BAJO APROVECHAMIENTO DE OPORTUNIDADES
+    if len(agents_df) > 0:
+        low_aprovechamiento = agents_df[agents_df["aprovechamiento_pct"] < 15]
+        if len(low_aprovechamiento) > 0:
+            agent_names = ", ".join(low_aprovechamiento["agent_name"].head(3).tolist())
+            more_text = (
+                f" y {len(low_aprovechamiento) - 3} más"
+                if len(low_aprovechamiento) > 3
+                else ""
+            )
+
+            alerts.append(
+                {
+                    "type": "warning",
+                    "title": f"{len(low_aprovechamiento)} agente(s) con bajo aprovechamiento",
+                    "description": f"< 15% de oportunidades convertidas. Agentes: {agent_names}{more_text}. Revisar calidad de leads o capacitación.",
+                    "timestamp": datetime.now(),
+                    "metric": "aprovechamiento",
+                }
+            )
+
+    # 5. MISMATCH ENTRE STOCK Y LEADS
+    if len(agents_df) > 0:
+        low_match = agents_df[agents_df["lead_match_score"] < 60]
+        if len(low_match) > 0:
+            agent_names = ", ".join(low_match["agent_name"].head(3).tolist())
+            more_text = f" y {len(low_match) - 3} más" if len(low_match) > 3 else ""
+
+            alerts.append(
+                {
+                    "type": "info",
+                    "title": f"{len(low_match)} agente(s) con bajo match stock-leads",
+                    "description": f"El inventario asignado no coincide con lo que buscan los leads. Agentes: {agent_names}{more_text}. Reasignar stock.",
+                    "timestamp": datetime.now(),
+                    "metric": "lead_match",
+                }
+            )
+
+    # === TRADITIONAL ALERTS ===
+
+    # 6. AGENTS WITH LOW CONVERSION (traditional)
+    if len(agents_df) > 0:
+        low_conv_agents = agents_df[
+            agents_df["conversion"] < THRESHOLDS["conversion_warning"]
+        ]
+        if len(low_conv_agents) > 0:
+            agent_names = ", ".join(low_conv_agents["agent_name"].head(3).tolist())
+            more_text = (
+                f" y {len(low_conv_agents) - 3} más" if len(low_conv_agents) > 3 else ""
+            )
+
+            alerts.append(
+                {
+                    "type": "warning",
+                    "title": f"{len(low_conv_agents)} agente(s) con baja conversión",
+                    "description": f'Agentes: {agent_names}{more_text}. Conversión < {THRESHOLDS["conversion_warning"]*100:.0f}%',
+                    "timestamp": datetime.now(),
+                    "metric": "agent_conversion",
+                }
+            )
+
+    # 7. AGED INVENTORY
+    if len(inventory_df) > 0:
+        total_aged = inventory_df["aging_60_plus"].sum()
+        total_inventory = inventory_df["total_inventory"].sum()
+
+        if total_aged > 20:
+            aging_pct = (
+                (total_aged / total_inventory * 100) if total_inventory > 0 else 0
+            )
+            alert_type = "critical" if total_aged > 30 else "warning"
+
+            alerts.append(
+                {
+                    "type": alert_type,
+                    "title": f"Inventario envejecido: {total_aged} vehículos",
+                    "description": f"{aging_pct:.0f}% del inventario con más de 60 días. Considerar ajuste de precios o promociones.",
+                    "timestamp": datetime.now(),
+                    "metric": "inventory_aging",
+                }
+            )
+
+    # 8. HIGH NO-SHOW RATE
+    if len(agents_df) > 0:
+        high_noshow = agents_df[agents_df["noshow"] > THRESHOLDS["noshow_warning"]]
+        if len(high_noshow) > 0:
+            agent_names = ", ".join(high_noshow["agent_name"].head(3).tolist())
+            more_text = f" y {len(high_noshow) - 3} más" if len(high_noshow) > 3 else ""
+
+            alerts.append(
+                {
+                    "type": "warning",
+                    "title": f"{len(high_noshow)} agente(s) con alta tasa de no-show",
+                    "description": f"Agentes: {agent_names}{more_text}. Revisar proceso de confirmación de citas.",
+                    "timestamp": datetime.now(),
+                    "metric": "noshow_rate",
+                }
+            )
+
+    # 9. NPS DROP (recent days)
+    if len(daily_df) > 0:
+        recent_nps = daily_df.tail(7)["nps"].mean()  # Last 7 days
+
+        if recent_nps < THRESHOLDS["nps_warning"]:
+            alert_type = (
+                "critical" if recent_nps < THRESHOLDS["nps_warning"] - 10 else "warning"
+            )
+            alerts.append(
+                {
+                    "type": alert_type,
+                    "title": "NPS por debajo del umbral",
+                    "description": f'NPS promedio últimos 7 días: {recent_nps:.0f} (umbral: {THRESHOLDS["nps_warning"]}). Revisar experiencia de cliente.',
+                    "timestamp": datetime.now(),
+                    "metric": "nps",
+                }
+            )
+
+    # 10. LOW INVENTORY
+    if len(inventory_df) > 0 and len(daily_df) > 0:
+        total_available = inventory_df["available"].sum()
+        avg_sales_per_day = (
+            daily_df["sales"].sum() / len(daily_df) if len(daily_df) > 0 else 0
+        )
+
+        if avg_sales_per_day > 0:
+            days_of_inventory = total_available / avg_sales_per_day
+
+            if days_of_inventory < 15:
+                alerts.append(
+                    {
+                        "type": "warning",
+                        "title": "Inventario bajo",
+                        "description": f"Solo {days_of_inventory:.0f} días de inventario disponible. Considerar reabastecimiento.",
+                        "timestamp": datetime.now(),
+                        "metric": "inventory_low",
+                    }
+                )
+
+    # 11. HIGH CANCELLATION RATE
+    if len(daily_df) > 0:
+        total_reservations = daily_df["reservations"].sum()
+        total_cancellations = daily_df["cancellations"].sum()
+
+        if total_reservations > 0:
+            cancellation_rate = total_cancellations / total_reservations
+
+            if cancellation_rate > 0.15:  # 15% cancellation rate
+                alert_type = "critical" if cancellation_rate > 0.20 else "warning"
+                alerts.append(
+                    {
+                        "type": alert_type,
+                        "title": "Alta tasa de cancelaciones",
+                        "description": f"{cancellation_rate:.0%} de las reservas son canceladas. Revisar proceso de cierre.",
+                        "timestamp": datetime.now(),
+                        "metric": "cancellation_rate",
+                    }
+                )
+
+    return alerts_frame(alerts)
+
+
+def compare(alerts, expected):
+    """Same alerts as the baseline (which had no hub or value)"""
+    columns = ["type", "title", "description", "metric"]
+    assert_frame_equal(
+        alerts[columns].reset_index(drop=True),
+        expected[columns].reset_index(drop=True),
+        check_dtype=False,
+    )
+
+
+def scoped(data, start=None, **filters):
+    return {name: filter_frame(data[name], start=start, **filters) for name in FRAMES}
+
+
+def scopes():
+    """Every country, region and hub of the dataset, plus all of them"""
+    daily = get_shared_data()["daily_metrics"]
+    levels = ["country", "region", "hub"]
+    nodes = [{}]
+    for depth in range(1, len(levels) + 1):
+        nodes += daily[levels[:depth]].drop_duplicates().to_dict("records")
+    return nodes
+
+
+@pytest.mark.parametrize("days", [7, PERIOD_OPTIONS["Últimos 30 días"]])
+def test_rules_match_baseline_on_every_scope(days):
+    data = get_shared_data()
+    start = get_data_period_start(days)
+    fired = 0
+    for filters in scopes():
+        filtered = scoped(data, start, **filters)
+        expected = baseline_operational_alerts(filtered)
+        compare(detect_operational_alerts(filtered), expected)
+        fired += len(expected)
+    assert fired > 0
+
+
+def test_rules_by_hub_match_per_hub_runs():
+    data = get_shared_data()
+    filtered = scoped(data, get_data_period_start(30), country="México")
+    batched = alerts_frame(evaluate_rules(filtered, OPERATIONAL_ALERT_RULES, by="hub"))
+    # Hubs of every frame (inventory names hubs by city)
+    hubs = set().union(*(df["hub"].dropna().unique() for df in filtered.values()))
+    assert len(batched) > 0 and set(batched["hub"]) <= hubs
+    for hub in hubs:
+        expected = baseline_operational_alerts(
+            {name: df[df["hub"] == hub] for name, df in filtered.items()}
+        )
+        compare(batched[batched["hub"] == hub], expected)
+
+
+def test_compiled_rules_are_reusable():
+    data = get_shared_data()
+    plan = compile_rules(OPERATIONAL_ALERT_RULES)
+    for filters in scopes()[:5]:
+        filtered = scoped(data, **filters)
+        compare(
+            alerts_frame(evaluate_rules(filtered, plan)),
+            baseline_operational_alerts(filtered),
+        )
+
+
+def test_empty_frames():
+    data = get_shared_data()
+    empty = {name: data[name].iloc[:0] for name in FRAMES}
+    assert len(detect_operational_alerts(empty)) == 0
+    assert len(detect_operational_alerts({})) == 0
+
+    # Alerts of the frames that have rows still fire
+    partial = dict(empty, inventory=data["inventory"])
+    compare(detect_operational_alerts(partial), baseline_operational_alerts(partial))
+
+
+def test_zero_denominators():
+    inventory = pd.DataFrame(
+        {
+            "hub": ["A", "B"],
+            "total_inventory": [0, 0],
+            "available": [5, 0],
+            "aging_60_plus": [25, 40],
+        }
+    )
+    daily = pd.DataFrame(
+        {
+            "hub": ["A", "B"],
+            "date": pd.to_datetime(["2024-01-01", "2024-01-01"]),
+            "sales": [0, 0],
+            "reservations": [0, 0],
+            "cancellations": [3, 0],
+            "nps": [80.0, 80.0],
+        }
+    )
+    data = {"inventory": inventory, "daily_metrics": daily}
+    alerts = detect_operational_alerts(data)
+    compare(alerts, baseline_operational_alerts(data))
+    assert alerts["description"].str.startswith("0% del inventario").all()
+
+    by_hub = alerts_frame(evaluate_rules(data, OPERATIONAL_ALERT_RULES, by="hub"))
+    assert list(by_hub["hub"]) == ["A", "B"]
+    assert list(by_hub["type"]) == ["warning", "critical"]
+    assert by_hub["description"].str.startswith("0% del inventario").all()
@@ -0,0 +1,72 @@
+"""
+Alert service tests
+A failed background evaluation is logged and reported with the last result
+"""
+
+import logging
+import time
+
+import pytest
+from streamlit.testing.v1 import AppTest
+from utils import alert_service
+from utils.alert_detector import alerts_frame
+from utils.data_store import get_shared_data
+
+
+@pytest.fixture(autouse=True)
+def clean_service():
+    alert_service.clear_alert_service()
+    yield
+    alert_service.clear_alert_service()
+
+
+def wait_refreshed(key, timeout=30):
+    """Wait until the worker has no pending evaluation of a key"""
+    deadline = time.monotonic() + timeout
+    while key in alert_service._state["pending"]:
+        assert time.monotonic() < deadline, "alert worker did not finish"
+        time.sleep(0.05)
+
+
+def test_background_failure_is_logged_and_reported(caplog, monkeypatch):
+    get_shared_data()
+    key = ("test", "failure")
+    calls = []
+
+    def evaluate(data, version):
+        calls.append(version)
+        if len(calls) > 1:
+            raise ValueError("missing column")
+        return alerts_frame([])
+
+    first = alert_service.get_alerts(key, evaluate)
+    assert first["error"] is None
+
+    # Past ALERT_MAX_AGE the worker re-evaluates the key, and fails
+    monkeypatch.setattr(alert_service, "ALERT_MAX_AGE", -1)
+    with caplog.at_level(logging.ERROR, logger=alert_service.__name__):
+        alert_service.get_alerts(key, evaluate)
+        wait_refreshed(key)
+
+    result = alert_service.get_alerts(key, evaluate)
+    assert result["error"] == "ValueError: missing column"
+    assert result["evaluated_at"] == first["evaluated_at"]
+    assert any(
+        record.exc_info and record.exc_info[0] is ValueError
+        for record in caplog.records
+    )
+
+
+def test_freshness_caption_shows_the_error():
+    def script():
+        from datetime import datetime
+
+        from utils.components import render_freshness_caption
+
+        render_freshness_caption(datetime.now(), error="ValueError: missing column")
+
+    app = AppTest.from_function(script)
+    app.run()
+    assert not app.exception
+    assert "ValueError: missing column" in app.warning[0].value
+    assert app.caption[0].value.startswith("🕒 Evaluadas hace")
@@ -0,0 +1,125 @@
+"""
+Alert store tests
+Alerts fire on state transitions only, with suppression and history pruning
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from utils.alert_detector import alerts_frame
+from utils.alert_store import (
+    ALERT_HISTORY_DAYS,
+    ALERT_SUPPRESSION_TTL,
+    active_alerts,
+    alert_history,
+    record_alerts,
+)
+
+SCOPE = "test-scope"
+T0 = datetime(2024, 3, 1, 9, 0)
+
+
+def alerts(*specs):
+    """Alerts frame from (metric, severity[, hub]) tuples"""
+    return alerts_frame(
+        [
+            {
+                "type": severity,
+                "title": f"{metric} {severity}",
+                "description": f"{metric} fuera de umbral",
+                "timestamp": T0,
+                "metric": metric,
+                "hub": hub[0] if hub else None,
+                "value": 1.0,
+            }
+            for metric, severity, *hub in specs
+        ]
+    )
+
+
+def at(**delta):
+    return T0 + timedelta(**delta)
+
+
+def test_first_evaluation_fires_every_alert():
+    assert (
+        record_alerts(SCOPE, alerts(("nps", "warning"), ("noshow", "critical")), T0)
+        == 2
+    )
+    active = active_alerts(SCOPE)
+    assert list(active["metric"]) == ["nps", "noshow"]
+    assert active["new"].all()
+    assert (active["timestamp"] == T0).all()
+
+
+def test_alert_that_stays_active_does_not_fire_again():
+    record_alerts(SCOPE, alerts(("nps", "warning")), T0)
+    assert record_alerts(SCOPE, alerts(("nps", "warning")), at(minutes=5)) == 0
+    active = active_alerts(SCOPE)
+    assert not active["new"].any()
+    assert active["timestamp"].iloc[0] == T0
+    assert active["first_seen"].iloc[0] == T0
+    assert active["last_seen"].iloc[0] == at(minutes=5)
+
+
+def test_missing_alert_is_resolved():
+    record_alerts(SCOPE, alerts(("nps", "warning"), ("noshow", "warning")), T0)
+    record_alerts(SCOPE, alerts(("noshow", "warning")), at(minutes=5))
+    assert list(active_alerts(SCOPE)["metric"]) == ["noshow"]
+    history = alert_history(SCOPE).set_index("metric")
+    assert history.loc["nps", "active"] == 0
+    assert history.loc["nps", "resolved_at"] == at(minutes=5).isoformat()
+
+
+def test_alert_back_within_ttl_resumes_its_episode():
+    record_alerts(SCOPE, alerts(("nps", "warning")), T0)
+    record_alerts(SCOPE, alerts(), at(minutes=5))
+    back = at(minutes=5, seconds=ALERT_SUPPRESSION_TTL - 60)
+    assert record_alerts(SCOPE, alerts(("nps", "warning")), back) == 0
+    active = active_alerts(SCOPE)
+    assert active["timestamp"].iloc[0] == T0
+    assert not active["new"].iloc[0]
+
+
+def test_alert_back_after_ttl_fires_again():
+    record_alerts(SCOPE, alerts(("nps", "warning")), T0)
+    record_alerts(SCOPE, alerts(), at(minutes=5))
+    back = at(minutes=5, seconds=ALERT_SUPPRESSION_TTL + 60)
+    assert record_alerts(SCOPE, alerts(("nps", "warning")), back) == 1
+    active = active_alerts(SCOPE)
+    assert active["timestamp"].iloc[0] == back
+    assert active["first_seen"].iloc[0] == T0
+    assert alert_history(SCOPE)["fired"].iloc[0] == 2
+
+
+@pytest.mark.parametrize("resolved", [False, True])
+def test_severity_change_fires_again(resolved):
+    record_alerts(SCOPE, alerts(("nps", "warning")), T0)
+    if resolved:
+        record_alerts(SCOPE, alerts(), at(minutes=5))
+    assert record_alerts(SCOPE, alerts(("nps", "critical")), at(minutes=10)) == 1
+    active = active_alerts(SCOPE)
+    assert active["type"].iloc[0] == "critical"
+    assert active["timestamp"].iloc[0] == at(minutes=10)
+
+
+def test_rules_are_per_hub_and_scope():
+    record_alerts(SCOPE, alerts(("nps", "warning", "A")), T0)
+    assert record_alerts(SCOPE, alerts(("nps", "warning", "B")), at(minutes=5)) == 1
+    assert record_alerts("other", alerts(("nps", "warning", "B")), at(minutes=5)) == 1
+    assert list(active_alerts(SCOPE)["hub"]) == ["B"]
+    assert list(active_alerts("other")["hub"]) == ["B"]
+
+
+def test_resolved_alerts_are_pruned_after_history_days():
+    record_alerts(SCOPE, alerts(("nps", "warning"), ("noshow", "warning")), T0)
+    record_alerts(SCOPE, alerts(("noshow", "warning")), at(hours=1))
+    assert len(alert_history(SCOPE)) == 2
+
+    # Active alerts are kept however old they are
+    record_alerts(SCOPE, alerts(("noshow", "warning")), at(days=ALERT_HISTORY_DAYS))
+    assert len(alert_history(SCOPE)) == 2
+    record_alerts(
+        SCOPE, alerts(("noshow", "warning")), at(days=ALERT_HISTORY_DAYS, hours=2)
+    )
+    assert list(alert_history(SCOPE)["metric"]) == ["noshow"]
@@ -0,0 +1,146 @@
+"""
+Anomaly detector tests
+Ticked days fed to the kept state give the alerts of a full replay, and
+every detector flags a spike
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+from utils import anomaly_detector
+from utils.anomaly_detector import (
+    ANOMALY_METRICS,
+    DETECTORS,
+    get_anomaly_alerts,
+    new_anomaly_state,
+    update_anomaly_state,
+)
+from utils.data_store import get_shared_data
+from utils.data_tick import advance_dataset
+from utils.filter_engine import sort_dataset
+
+
+@pytest.fixture
+def updates(monkeypatch):
+    """Fresh detector state; counts the days fed to update_anomaly_state"""
+    monkeypatch.setitem(anomaly_detector._state, "detector", None)
+    days = []
+
+    def counted(state, day, values):
+        days.append(day)
+        return update_anomaly_state(state, day, values)
+
+    monkeypatch.setattr(anomaly_detector, "update_anomaly_state", counted)
+    return days
+
+
+def n_days(daily_metrics):
+    return daily_metrics["date"].dt.normalize().nunique()
+
+
+def test_ticked_days_match_full_replay(updates):
+    data = get_shared_data()
+    get_anomaly_alerts(data["daily_metrics"])
+    assert len(updates) == n_days(data["daily_metrics"])
+    kept = anomaly_detector._state["detector"]
+
+    ticked = data
+    for _ in range(3):
+        ticked = sort_dataset(advance_dataset(ticked))
+        incremental = get_anomaly_alerts(ticked["daily_metrics"])
+    # Only the new days were fed, to the same state
+    assert len(updates) == n_days(data["daily_metrics"]) + 3
+    assert anomaly_detector._state["detector"] is kept
+
+    anomaly_detector._state["detector"] = None
+    replayed = get_anomaly_alerts(ticked["daily_metrics"])
+    assert_frame_equal(incremental, replayed)
+    # Ticks roll the oldest days out, so the replay starts later: the EWMA
+    # only keeps a vanishing trace (1 - EWMA_LAMBDA) ** days of those days
+    replay = anomaly_detector._state["detector"]
+    np.testing.assert_array_equal(kept["count"], replay["count"])
+    for key in ("sum", "sumsq", "ewma", "cusum"):
+        np.testing.assert_allclose(kept[key], replay[key], rtol=1e-6)
+
+
+def test_regenerated_dataset_resets_state(updates):
+    daily = get_shared_data()["daily_metrics"]
+    get_anomaly_alerts(daily)
+    kept = anomaly_detector._state["detector"]
+
+    # Same days, different values on the last day seen: not a continuation
+    regenerated = daily.copy()
+    last = regenerated["date"] >= regenerated["date"].max().normalize()
+    regenerated.loc[last, "sales"] = regenerated.loc[last, "sales"] + 1
+    get_anomaly_alerts(regenerated)
+    assert anomaly_detector._state["detector"] is not kept
+    assert len(updates) == 2 * n_days(daily)
+
+    # Other hubs: not a continuation either
+    get_anomaly_alerts(daily[daily["country"] == "México"])
+    assert len(updates) == 3 * n_days(daily)
+
+
+def spike_metrics(days=40, spike=None):
+    """Two hubs with steady noisy ratios; spike = (hub, column, factor) on the last day"""
+    rng = np.random.default_rng(7)
+    dates = pd.date_range("2024-01-01", periods=days, freq="D")
+    frame = pd.DataFrame(
+        {
+            "date": np.repeat(dates, 2),
+            "hub": np.tile(["A", "B"], days),
+            "leads": 1000,
+            "sales": rng.normal(200, 5, 2 * days).round(),
+            "nps": rng.normal(70, 1, 2 * days),
+            "appointments": 500,
+            "noshow": rng.normal(50, 3, 2 * days).round(),
+            "reservations": 300,
+            "cancellations": rng.normal(30, 2, 2 * days).round(),
+        }
+    )
+    if spike is not None:
+        hub, column, factor = spike
+        row = frame.index[-2 if hub == "A" else -1]
+        frame.loc[row, column] *= factor
+    return frame
+
+
+@pytest.mark.parametrize(
+    "metric, column, factor",
+    [
+        ("conversion", "sales", 0.5),
+        ("nps", "nps", 0.7),
+        ("noshow", "noshow", 2.0),
+        ("cancellations", "cancellations", 2.0),
+    ],
+)
+def test_every_detector_flags_a_spike(updates, metric, column, factor):
+    quiet = get_anomaly_alerts(spike_metrics())
+    assert len(quiet) == 0
+
+    anomaly_detector._state["detector"] = None
+    alerts = get_anomaly_alerts(spike_metrics(spike=("A", column, factor)))
+    step = anomaly_detector._state["detector"]["step"]
+    m = list(ANOMALY_METRICS).index(metric)
+    for detector in DETECTORS:
+        assert step["flags"][detector][m, 0], detector
+        assert not step["flags"][detector][m, 1], detector
+
+    assert list(alerts["metric"]) == [metric]
+    assert list(alerts["hub"]) == ["A"]
+    assert alerts["type"].iloc[0] == "critical"
+    assert "z-score, EWMA, CUSUM" in alerts["description"].iloc[0]
+
+
+def test_good_direction_does_not_alert():
+    state = new_anomaly_state(pd.Index(["A"]))
+    values = np.full((len(ANOMALY_METRICS), 1), 0.2)
+    rng = np.random.default_rng(1)
+    for day in range(30):
+        update_anomaly_state(state, day, values + rng.normal(0, 0.01, values.shape))
+    # Conversion and NPS up, no-show and cancellations down
+    direction = np.array([m["direction"] for m in ANOMALY_METRICS.values()])
+    step = update_anomaly_state(state, 30, values - 0.5 * direction[:, None])
+    for flags in step["flags"].values():
+        assert not flags.any()
@@ -0,0 +1,23 @@
+"""
+Customer tables tests
+Customer records follow the dataset clock
+"""
+
+import pandas as pd
+from utils.customer_tables import get_customer_record
+from utils.data_store import get_data_now, get_shared_data
+
+
+def test_celeste_is_anchored_to_the_dataset_day():
+    data = get_shared_data()
+    customer_id = data["customers"]["customer_id"].iloc[0]
+    for now in (get_data_now(), pd.Timestamp("2031-01-05 10:00")):
+        record = get_customer_record(data, customer_id, now)
+        anchor = pd.Timestamp(now).normalize()
+        last = pd.Timestamp(record["celeste_last_interaction"])
+        assert anchor - pd.Timedelta(hours=72) <= last < anchor
+        assert record == get_customer_record(data, customer_id, now)
+
+
+def test_unknown_customer():
+    assert get_customer_record(get_shared_data(), "CL-999999", get_data_now()) is None
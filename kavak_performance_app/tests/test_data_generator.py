@@ -0,0 +1,57 @@
+"""
+Data generator tests
+Datasets are reproducible whatever the number of workers, and every
+random stream follows the root seed
+"""
+
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+from utils.celeste_data import get_celeste_data
+from utils.customer_tables import normalize_customers
+from utils.data_generator import generate_customer_data, generate_sample_data
+from utils.random_streams import get_dataset_rng
+
+NOW = datetime(2024, 6, 14, 18, 30)
+
+
+@pytest.fixture(scope="module")
+def serial():
+    return generate_sample_data(scale=1, workers=1, now=NOW)
+
+
+@pytest.mark.parametrize("workers", [2, 4])
+def test_same_data_for_any_worker_count(serial, workers):
+    parallel = generate_sample_data(scale=1, workers=workers, now=NOW)
+    assert list(parallel) == list(serial)
+    for name, df in serial.items():
+        assert_frame_equal(parallel[name], df, obj=name)
+
+
+def test_every_dataset_follows_the_seed(serial):
+    other = generate_sample_data(scale=1, workers=1, now=NOW, seed=7)
+    # alerts are fixed sample alerts, not drawn from a stream
+    for name in set(serial) - {"alerts"}:
+        assert not serial[name].equals(other[name]), name
+
+
+def test_interactions_do_not_depend_on_chunking():
+    customers = generate_customer_data(rng=get_dataset_rng("customers"), now=NOW)
+    whole = normalize_customers(customers, NOW)["customer_interactions"]
+    half = len(customers) // 2
+    parts = pd.concat(
+        [
+            normalize_customers(customers.iloc[:half], NOW)["customer_interactions"],
+            normalize_customers(customers.iloc[half:], NOW)["customer_interactions"],
+        ],
+        ignore_index=True,
+    )
+    assert_frame_equal(parts, whole)
+
+
+def test_celeste_follows_the_seed():
+    args = (1042, "SUV, Sedán", 80, "Activo", NOW)
+    assert get_celeste_data(*args) == get_celeste_data(*args)
+    assert get_celeste_data(*args) != get_celeste_data(*args, seed=7)
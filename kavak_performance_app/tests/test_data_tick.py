@@ -0,0 +1,77 @@
+"""
+Data tick tests
+A tick rolls every window one day forward, keeps the compact dtypes and
+replays deterministically
+"""
+
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+from utils.data_generator import generate_sample_data
+from utils.data_tick import advance_dataset, get_dataset_day
+from utils.filter_engine import sort_dataset
+
+NOW = datetime(2024, 6, 14, 18, 30)
+
+
+@pytest.fixture(scope="module")
+def data():
+    return sort_dataset(generate_sample_data(scale=1, now=NOW))
+
+
+def days(dates):
+    return pd.Series(dates.dt.normalize().unique()).sort_values().reset_index(drop=True)
+
+
+def test_tick_keeps_dtypes(data):
+    ticked = advance_dataset(data)
+    assert list(ticked) == list(data)
+    for name, df in data.items():
+        assert list(ticked[name].columns) == list(df.columns), name
+        assert ticked[name].dtypes.to_dict() == df.dtypes.to_dict(), name
+
+
+def test_tick_rolls_the_windows_by_one_day(data):
+    ticked = advance_dataset(data, days=2)
+    assert get_dataset_day(ticked) == get_dataset_day(data) + pd.Timedelta(days=2)
+
+    before, after = days(data["daily_metrics"]["date"]), days(
+        ticked["daily_metrics"]["date"]
+    )
+    assert len(after) == len(before)
+    assert_frame_equal(
+        after.iloc[:-2].to_frame(), before.iloc[2:].reset_index(drop=True).to_frame()
+    )
+    # Each new day has the rows of a generated day
+    dates = data["daily_metrics"]["date"]
+    new_rows = ticked["daily_metrics"]["date"] > dates.max()
+    assert new_rows.sum() == 2 * (dates == dates.max()).sum()
+
+    # The agenda drops its oldest day and books the next business days
+    agenda, new_agenda = days(data["appointments"]["datetime"]), days(
+        ticked["appointments"]["datetime"]
+    )
+    assert new_agenda.iloc[0] > agenda.iloc[0]
+    assert new_agenda.iloc[-1] > agenda.iloc[-1]
+    today = get_dataset_day(ticked).date()
+    appointments = ticked["appointments"]
+    assert (appointments["is_today"] == (appointments["date"] == today)).all()
+
+
+def test_tick_replays_deterministically(data):
+    first = advance_dataset(data, days=3)
+    again = advance_dataset(advance_dataset(data, days=1), days=2)
+    for name, df in first.items():
+        assert_frame_equal(again[name], df, obj=name)
+
+    other = advance_dataset(data, days=3, seed=7)
+    assert not other["daily_metrics"].equals(first["daily_metrics"])
+
+
+def test_tick_leaves_the_input_unchanged(data):
+    copies = {name: df.copy() for name, df in data.items()}
+    advance_dataset(data)
+    for name, df in data.items():
+        assert_frame_equal(df, copies[name], obj=name)
@@ -0,0 +1,53 @@
+"""
+Filter cache tests
+Sessions sharing a cached result cannot change it for each other, and a new
+dataset version drops the results of the old one
+"""
+
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+from utils.filter_cache import cached_filter, clear_filter_cache, get_filter_cache_stats
+
+KEY = ("ceo", ("Todos", "Todos"), "México", None, None, pd.Timestamp("2024-06-01"))
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_filter_cache()
+    yield
+    clear_filter_cache()
+
+
+def compute():
+    return {
+        "daily_metrics": pd.DataFrame({"hub": ["A", "B"], "sales": [3, 4]}),
+        "filters": {"country": "México", "start": pd.Timestamp("2024-06-01")},
+        "operation_type": "Todos",
+    }
+
+
+def test_callers_cannot_change_the_cached_result():
+    first = cached_filter(1, KEY, compute)
+    first["daily_metrics"]["sales"] = 0
+    first["daily_metrics"].loc[0, "hub"] = "Z"
+    first["filters"]["country"] = "Brasil"
+    first["filters"]["hub"] = "Kavak Nuevo Sur"
+    first["operation_type"] = "Compra"
+
+    second = cached_filter(1, KEY, compute)
+    expected = compute()
+    assert_frame_equal(second["daily_metrics"], expected["daily_metrics"])
+    assert second["filters"] == expected["filters"]
+    assert second["operation_type"] == expected["operation_type"]
+    assert get_filter_cache_stats()["hits"] == 1
+
+
+def test_new_version_drops_old_results():
+    cached_filter(1, KEY, compute)
+    cached_filter(2, KEY, compute)
+    cached_filter(1, KEY, compute)
+
+    stats = get_filter_cache_stats()
+    assert stats["misses"] == 3
+    assert stats["size"] == 1
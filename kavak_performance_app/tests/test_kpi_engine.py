@@ -0,0 +1,126 @@
+"""
+KPI engine tests
+compute_kpis over the metric cube gives the KPIs and previous-period
+comparison of plain pandas over the filtered rows
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from utils.data_generator import generate_sample_data
+from utils.data_tick import period_start
+from utils.filter_engine import sort_dataset
+from utils.kpi_engine import KPIS, compute_kpis
+from utils.metric_cube import build_metric_cube
+
+NOW = datetime(2024, 6, 14, 18, 30)
+FILTERS = (
+    {},
+    {"country": "Brasil"},
+    {"hub": "Kavak Santiago - Las Condes"},
+)
+
+
+@pytest.fixture(scope="module")
+def daily_metrics():
+    return sort_dataset(generate_sample_data(scale=1, now=NOW))["daily_metrics"]
+
+
+@pytest.fixture(scope="module", params=["sorted", "unsorted"])
+def frame(request, daily_metrics):
+    """Rows in cube cell order, and shuffled (see test_metric_cube.py)"""
+    if request.param == "sorted":
+        return daily_metrics
+    return daily_metrics.sample(frac=1, random_state=0)
+
+
+def pandas_kpis(rows):
+    """The registry KPIs written out in pandas"""
+
+    def total(column):
+        return rows[column].astype("float64").sum()
+
+    def mean(column):
+        return rows[column].astype("float64").mean()
+
+    return {
+        "sales": total("sales"),
+        "purchases": total("purchases"),
+        "full_margin": mean("full_margin"),
+        "fin_ins": mean("fin_ins"),
+        "kt": mean("kt"),
+        "pc1": mean("pc1"),
+        "ecac": mean("ecac"),
+        "pc1_minus_ecac": mean("pc1_minus_ecac"),
+        "nps": mean("nps"),
+        "nps_buyer": mean("nps") + 2,
+        "nps_seller": mean("nps") - 3,
+        "nps_relational": mean("nps"),
+        "leads": total("leads"),
+        "conversion": total("sales") / total("leads") * 100,
+        "cost_per_lead": mean("cost_per_lead"),
+        "sla": mean("sla_lead_to_sale"),
+        "cancellations": total("cancellations"),
+        "revenue": total("revenue"),
+        "ticket": mean("ticket_avg"),
+        "csat": mean("csat"),
+    }
+
+
+def filter_rows(df, filters):
+    mask = np.ones(len(df), dtype=bool)
+    for column, value in filters.items():
+        mask &= (df[column] == value).to_numpy()
+    return df[mask]
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+@pytest.mark.parametrize("days", [7, 30, 90])
+def test_kpis_match_pandas(frame, days, filters):
+    start = period_start(frame["date"].max(), days)
+    result = compute_kpis(build_metric_cube(frame), start, **filters)
+
+    node = filter_rows(frame, filters)
+    rows = node[node["date"] >= start]
+    first, last = rows["date"].min(), rows["date"].max()
+    prev_end = first - timedelta(days=1)
+    prev_start = prev_end - timedelta(days=(last - first).days)
+    previous_rows = node[node["date"].between(prev_start, prev_end)]
+
+    assert result["rows"] == len(rows)
+    assert result["previous_rows"] == len(previous_rows)
+    assert result["period"] == (first, last)
+    assert result["previous_period"] == (prev_start, prev_end)
+
+    values, previous = pandas_kpis(rows), pandas_kpis(previous_rows)
+    assert list(result["kpis"]) == list(KPIS)
+    for name, kpi in result["kpis"].items():
+        prev = previous[name] if len(previous_rows) else values[name]
+        assert kpi["value"] == pytest.approx(values[name], rel=1e-9), name
+        assert kpi["previous"] == pytest.approx(prev, rel=1e-9), name
+        if kpi["change"] is not None:
+            change = (values[name] - prev) / prev * 100
+            assert kpi["change"] == pytest.approx(change, rel=1e-6, abs=1e-9), name
+
+
+def test_defaults_of_missing_columns(daily_metrics):
+    frame = daily_metrics.drop(columns=["full_margin", "pc1", "pc1_minus_ecac"])
+    kpis = compute_kpis(build_metric_cube(frame))["kpis"]
+
+    rows = daily_metrics
+    assert kpis["full_margin"]["value"] == 950
+    assert kpis["pc1"]["value"] == pytest.approx(
+        950 + rows["fin_ins"].mean() + rows["kt"].mean()
+    )
+    assert kpis["pc1_minus_ecac"]["value"] == pytest.approx(
+        kpis["pc1"]["value"] - rows["ecac"].mean()
+    )
+
+
+def test_no_previous_period_compares_with_itself(daily_metrics):
+    result = compute_kpis(build_metric_cube(daily_metrics))
+    assert result["previous_rows"] == 0
+    for name, kpi in result["kpis"].items():
+        assert kpi["previous"] == kpi["value"], name
+        assert kpi["change"] is None, name
@@ -0,0 +1,147 @@
+"""
+Metric cube tests
+Window sums from the cube match pandas over the rows, whether the rows are
+already the cube cells in order or not
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+from utils.data_generator import generate_sample_data
+from utils.data_tick import period_start
+from utils.filter_engine import HIERARCHY_COLUMNS, sort_dataset
+from utils.metric_cube import (
+    ROWS,
+    build_metric_cube,
+    group_window_totals,
+    window_totals,
+)
+
+NOW = datetime(2024, 6, 14, 18, 30)
+FILTERS = (
+    {},
+    {"country": "Brasil"},
+    {"hub": "Kavak Santiago - Las Condes"},
+)
+
+
+@pytest.fixture(scope="module")
+def daily_metrics():
+    return sort_dataset(generate_sample_data(scale=1, now=NOW))["daily_metrics"]
+
+
+@pytest.fixture(scope="module", params=["sorted", "unsorted"])
+def frame(request, daily_metrics):
+    """
+    Sorted daily_metrics has one row per hub and day in cell order (the
+    cube copies it as is); shuffled, with some rows missing, the cube sums
+    the rows into their cells
+    """
+    if request.param == "sorted":
+        return daily_metrics
+    shuffled = daily_metrics.sample(frac=1, random_state=0)
+    missing = (shuffled["hub"] == FILTERS[2]["hub"]) & (
+        shuffled["date"] > shuffled["date"].max() - timedelta(days=10)
+    )
+    return shuffled[~missing.to_numpy()]
+
+
+def window_rows(df, start, end, filters):
+    mask = df["date"] >= start
+    if end is not None:
+        mask &= df["date"] < end
+    for column, value in filters.items():
+        mask &= df[column] == value
+    return df[mask.to_numpy()]
+
+
+def windows(df, days):
+    """Current period of the given days and the one before it"""
+    start = period_start(df["date"].max(), days)
+    return [(start, None), (start - timedelta(days=days), start)]
+
+
+def sum_columns(cube):
+    return [column for column in cube["columns"] if column != ROWS]
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+@pytest.mark.parametrize("days", [7, 30, 90])
+def test_window_totals_match_pandas(frame, days, filters):
+    cube = build_metric_cube(frame)
+    for start, end in windows(frame, days):
+        rows = window_rows(frame, start, end, filters)
+        expected = rows[sum_columns(cube)].astype("float64").sum()
+        totals = window_totals(cube, start, end, **filters)
+
+        assert totals[ROWS] == len(rows)
+        assert list(totals) == cube["columns"]
+        np.testing.assert_allclose(
+            [totals[column] for column in expected.index], expected, rtol=1e-9
+        )
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+@pytest.mark.parametrize("days", [7, 30, 90])
+def test_group_window_totals_match_pandas(frame, days, filters):
+    cube = build_metric_cube(frame)
+    columns = sum_columns(cube)
+    for start, end in windows(frame, days):
+        totals = group_window_totals(cube, start, end, **filters)
+        groups = totals.set_index(list(HIERARCHY_COLUMNS))
+
+        # Every group under the node, with ROWS = 0 when it has no rows in
+        # the window
+        nodes = window_rows(frame, frame["date"].min(), None, filters)
+        nodes = nodes.groupby(list(HIERARCHY_COLUMNS), observed=True).size()
+        assert sorted(groups.index) == sorted(nodes.index.map(tuple))
+
+        rows = window_rows(frame, start, end, filters)
+        rows = rows.astype(dict.fromkeys(columns, "float64"))
+        by_group = rows.groupby(list(HIERARCHY_COLUMNS), observed=True)
+        expected = by_group[columns].sum().assign(**{ROWS: by_group.size()})
+        expected.index = expected.index.map(tuple)
+        expected = expected.reindex(groups.index, fill_value=0)
+        np.testing.assert_allclose(
+            groups[columns + [ROWS]].to_numpy(), expected.to_numpy(), rtol=1e-9
+        )
+
+
+def test_rows_in_cell_order_are_copied(daily_metrics, monkeypatch):
+    calls = []
+    bincount = np.bincount
+
+    def counted(*args, **kwargs):
+        calls.append(args)
+        return bincount(*args, **kwargs)
+
+    monkeypatch.setattr(np, "bincount", counted)
+    build_metric_cube(daily_metrics)
+    assert not calls
+    build_metric_cube(daily_metrics.sample(frac=1, random_state=1))
+    assert calls
+
+
+def test_sorted_and_unsorted_rows_give_the_same_cube(daily_metrics):
+    sorted_cube = build_metric_cube(daily_metrics)
+    shuffled = daily_metrics.sample(frac=1, random_state=1)
+    shuffled_cube = build_metric_cube(shuffled)
+
+    assert shuffled_cube["columns"] == sorted_cube["columns"]
+    np.testing.assert_array_equal(shuffled_cube["days"], sorted_cube["days"])
+    for column in HIERARCHY_COLUMNS:
+        np.testing.assert_array_equal(
+            shuffled_cube["labels"][column], sorted_cube["labels"][column]
+        )
+    np.testing.assert_allclose(shuffled_cube["cum"], sorted_cube["cum"], rtol=1e-12)
+
+
+def test_empty_window(daily_metrics):
+    cube = build_metric_cube(daily_metrics)
+    after = pd.Timestamp(NOW) + timedelta(days=1)
+    totals = window_totals(cube, after)
+    assert totals[ROWS] == 0
+    assert set(totals.values()) == {0.0}
+    assert (group_window_totals(cube, after)[ROWS] == 0).all()
@@ -0,0 +1,82 @@
+"""
+Shared dataset tests
+Every role's views render without changing the process-wide dataset in place
+"""
+
+import os
+
+import pandas as pd
+import pytest
+from conftest import APP_DIR
+from streamlit.testing.v1 import AppTest
+from utils import data_store
+from utils.auth import DUMMY_USERS, authenticate
+from utils.data_store import _fingerprint, get_shared_data, modified_shared_data
+
+APP = os.path.join(APP_DIR, "app.py")
+
+
+def render(email, **state):
+    """Run the app logged in as a dummy user, with extra session state"""
+    app = AppTest.from_file(APP, default_timeout=300)
+    app.run()
+    _, user_info, _ = authenticate(email, DUMMY_USERS[email]["password"])
+    app.session_state["authenticated"] = True
+    app.session_state["user_email"] = email
+    app.session_state["user_info"] = user_info
+    for key, value in state.items():
+        app.session_state[key] = value
+    app.run()
+    assert not app.exception, [e.value for e in app.exception]
+    return app
+
+
+@pytest.mark.parametrize("email", list(DUMMY_USERS))
+def test_role_views_leave_shared_data_unchanged(email):
+    data = get_shared_data()
+    expected = _fingerprint(data)
+    render(email)
+    assert _fingerprint(data) == expected
+    assert get_shared_data() is data
+
+
+@pytest.mark.parametrize(
+    "state",
+    [
+        {"global_period": "YTD"},
+        {"global_country": "México", "global_period": "Últimos 7 días"},
+        {"navigation_view": "agent_profile"},
+        {"navigation_view": "customer_profile"},
+    ],
+    ids=["ytd", "country-7d", "agent-profile", "customer-profile"],
+)
+def test_admin_drill_downs_leave_shared_data_unchanged(state):
+    data = get_shared_data()
+    if state.get("navigation_view") == "agent_profile":
+        state["selected_agent_name"] = data["agent_performance"]["agent_name"].iloc[0]
+    if state.get("navigation_view") == "customer_profile":
+        state["selected_customer_id"] = data["customers"]["customer_id"].iloc[0]
+    expected = _fingerprint(data)
+    render("admin@kavak.com", **state)
+    assert _fingerprint(data) == expected
+
+
+def test_in_place_writes_are_detected(monkeypatch):
+    monkeypatch.setattr(data_store, "_state", dict(data_store._state))
+    data = {
+        "daily_metrics": pd.DataFrame(
+            {"date": pd.to_datetime(["2024-01-01", "2024-01-02"]), "sales": [1, 2]}
+        ),
+        "customers": pd.DataFrame({"customer_id": ["C1", "C2"]}),
+    }
+    data_store._publish_locked(data)
+    assert modified_shared_data(data) == []
+    assert data_store.check_shared_data(data) == []
+
+    data["daily_metrics"].loc[0, "sales"] = 10
+    data["customers"]["segment"] = "A"
+    assert modified_shared_data(data) == ["customers", "daily_metrics"]
+    assert data_store.check_shared_data(data) == ["customers", "daily_metrics"]
+
+    # Frames of other datasets (e.g. a previous version) are not checked
+    assert modified_shared_data({"daily_metrics": data["daily_metrics"]}) == []
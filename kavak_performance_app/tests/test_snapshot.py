@@ -0,0 +1,89 @@
+"""
+Snapshot tests
+A saved dataset loads back frame for frame, nested columns included, and
+only the newest KEEP_VERSIONS versions stay on disk
+"""
+
+import os
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+from utils.data_generator import generate_sample_data
+from utils.snapshot import (
+    KEEP_VERSIONS,
+    MANIFEST_NAME,
+    get_snapshot_version,
+    load_snapshot,
+    save_snapshot,
+)
+
+NOW = datetime(2024, 6, 14, 18, 30)
+
+
+@pytest.fixture(scope="module")
+def data():
+    return generate_sample_data(scale=1, now=NOW)
+
+
+def versions(snapshot_dir):
+    return sorted(name for name in os.listdir(snapshot_dir) if name != MANIFEST_NAME)
+
+
+def test_round_trip(data, tmp_path):
+    manifest = save_snapshot(data, tmp_path, metadata={"scale": 1})
+    loaded, loaded_manifest = load_snapshot(tmp_path)
+
+    assert loaded_manifest == manifest
+    assert manifest["scale"] == 1
+    assert list(loaded) == list(data)
+    for name, df in data.items():
+        assert manifest["datasets"][name]["rows"] == len(df), name
+        assert_frame_equal(loaded[name], df, obj=name)
+
+    # The kavako lists go through JSON and come back as lists
+    assert manifest["datasets"]["kavakos"]["json_columns"] == [
+        "certifications",
+        "languages",
+    ]
+    assert isinstance(loaded["kavakos"]["languages"].iloc[0], list)
+
+
+def test_nested_values_round_trip(tmp_path):
+    nested = pd.DataFrame(
+        {
+            "id": np.arange(3, dtype=np.int16),
+            "history": [
+                [{"at": pd.Timestamp(NOW), "on": date(2024, 6, 1), "n": np.int64(2)}],
+                [],
+                None,
+            ],
+            "tags": [["a", "b"], ["é"], []],
+            "score": pd.Series([np.float64(1.5), None, 3], dtype=object),
+        }
+    )
+    manifest = save_snapshot({"nested": nested}, tmp_path)
+    loaded, _ = load_snapshot(tmp_path)
+
+    assert manifest["datasets"]["nested"]["json_columns"] == [
+        "history",
+        "tags",
+        "score",
+    ]
+    assert_frame_equal(loaded["nested"], nested)
+    entry = loaded["nested"]["history"].iloc[0][0]
+    assert type(entry["at"]) is pd.Timestamp and type(entry["on"]) is date
+
+
+def test_old_versions_are_pruned(data, tmp_path):
+    small = {"daily_metrics": data["daily_metrics"].head(10)}
+    built = [
+        save_snapshot(small, tmp_path)["version"] for _ in range(KEEP_VERSIONS + 2)
+    ]
+
+    assert versions(tmp_path) == built[-KEEP_VERSIONS:]
+    assert get_snapshot_version(tmp_path) == built[-1]
+    loaded, _ = load_snapshot(tmp_path)
+    assert_frame_equal(loaded["daily_metrics"], small["daily_metrics"])
@@ -0,0 +1,87 @@
+"""
+Agent Operations
+agent_performance metrics by operation type (sales, purchases, trade-in), vectorized
+"""
+
+from utils.filter_engine import get_frame_cache
+
+# Metrics of each operation type (config.OPERATION_TYPES; "all" keeps the
+# frame's own columns). The operations counted replace "sales", and
+# conversion and revenue are recomputed from them.
+#   units: Columns summed into the operation count
+#   unit_revenue: Approximate revenue (or cost, for purchases) per operation
+OPERATION_METRICS = {
+    "sales": {
+        # Only count sales operations (sales_only + sales_tradein)
+        "units": ("sales_only", "sales_tradein"),
+        "unit_revenue": 20000.0,
+    },
+    "purchases": {
+        "units": ("purchases_total",),
+        "unit_revenue": 18000.0,
+    },
+    "tradein": {
+        "units": ("sales_tradein",),
+        "unit_revenue": 20000.0,
+    },
+}
+
+
+def operation_columns(df, operation_type):
+    """
+    sales, conversion and revenue of agent_performance rows for an operation type
+
+    Args:
+        df: agent_performance rows
+        operation_type: Key of OPERATION_METRICS
+
+    Returns:
+        Dict column -> Series aligned with df (conversion is 0 for agents
+        without leads); counts keep the frame's integer dtype, revenue is
+        float so the product cannot overflow
+    """
+    metrics = OPERATION_METRICS[operation_type]
+    units = df[metrics["units"][0]]
+    for column in metrics["units"][1:]:
+        units = units + df[column]
+    leads = df["leads"]
+    conversion = (units / leads.where(leads > 0)).fillna(0.0)
+    return {
+        "sales": units,
+        "conversion": conversion,
+        "revenue": units * metrics["unit_revenue"],
+    }
+
+
+def operation_view(df, operation_type):
+    """
+    agent_performance rows with the metrics of an operation type
+
+    Args:
+        df: agent_performance rows
+        operation_type: Key of config.OPERATION_TYPES ("all" = unchanged)
+
+    Returns:
+        df itself for "all", else a new frame with sales, conversion and
+        revenue replaced (other columns are shared with df)
+    """
+    if operation_type not in OPERATION_METRICS:
+        return df
+    return df.assign(**operation_columns(df, operation_type))
+
+
+def get_operation_view(df, operation_type):
+    """
+    operation_view of a frame, built once per frame and operation type
+
+    Meant for the shared agent_performance: the views of every operation
+    type live as long as the dataset version, so switching the operation
+    type only selects a frame.
+    """
+    if operation_type not in OPERATION_METRICS:
+        return df
+    return get_frame_cache(
+        df,
+        ("operation_view", operation_type),
+        lambda frame: operation_view(frame, operation_type),
+    )
@@ -7,278 +7,345 @@ from datetime import datetime, timedelta
 
 import numpy as np
 import pandas as pd
-from config import THRESHOLDS
-
-
-def detect_strategic_alerts(data, period_days=30):
+from config import OPERATIONAL_ALERT_RULES, THRESHOLDS
+from utils.alert_rules import evaluate_rules
+from utils.data_tick import get_dataset_day, period_start
+from utils.metric_cube import ROWS
+from utils.rollup import PERIOD_COLUMN, add_ratios, regroup, rollup
+
+# Alert severities, most severe first (sorting an alerts frame by "type"
+# puts critical alerts first)
+SEVERITIES = ("critical", "warning", "info")
+
+# Columns of an alerts frame and their types; hub and value are missing for
+# alerts that are not about a single hub
+ALERT_DTYPES = {
+    "type": pd.CategoricalDtype(SEVERITIES, ordered=True),
+    "title": None,
+    "description": None,
+    "timestamp": "datetime64[us]",
+    "metric": None,
+    "hub": None,
+    "value": "float64",
+}
+
+
+def alerts_frame(alerts):
     """
-    Detect strategic alerts for CEO dashboard
+    Alerts as a typed DataFrame
+
+    Args:
+        alerts: Dict column -> values, or list of alert dicts (type, title,
+                description, timestamp, metric, optional hub and value)
 
     Returns:
-        List of alert dictionaries with type, title, description, and timestamp
+        DataFrame with the ALERT_DTYPES columns, one row per alert; its
+        records (to_dict("records")) are the alert dicts render_alert_box
+        takes
     """
-    alerts = []
+    frame = pd.DataFrame(alerts)
+    columns = {}
+    for column, dtype in ALERT_DTYPES.items():
+        values = frame.get(column, pd.Series(None, frame.index, dtype=object))
+        columns[column] = values.astype(dtype) if dtype else values
+    return pd.DataFrame(columns)
 
-    # Get data for current and previous period
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=period_days)
-    prev_start = start_date - timedelta(days=period_days)
 
-    daily_df = data["daily_metrics"].copy()
-    daily_df["date"] = pd.to_datetime(daily_df["date"])
+def _describe(template, **values):
+    """template.format for every row of aligned value columns"""
+    names = list(values)
+    return [template.format(**dict(zip(names, row))) for row in zip(*values.values())]
 
-    current_period = daily_df[daily_df["date"] >= start_date]
-    previous_period = daily_df[
-        (daily_df["date"] >= prev_start) & (daily_df["date"] < start_date)
-    ]
 
-    # 1. HUBS CON CAÍDA EN CONVERSIÓN
-    alerts.extend(detect_conversion_drops(current_period, previous_period))
+def detect_strategic_alerts(data, period_days=30, now=None):
+    """
+    Detect strategic alerts for CEO dashboard
 
-    # 2. INVENTARIO CON AGING CRÍTICO
-    alerts.extend(detect_critical_inventory(data["inventory"]))
+    Args:
+        data: Dataset dict
+        period_days: Days of the current period (compared to the one before)
+        now: Current time of the dataset (default: its newest daily_metrics
+             timestamp, see data_tick.get_dataset_day)
 
-    # 3. CAÍDA ABRUPTA DE NPS
-    alerts.extend(detect_nps_drops(current_period, previous_period))
+    Returns:
+        Alerts DataFrame (see alerts_frame), critical first
+    """
+    daily_df = data["daily_metrics"]
+    if not pd.api.types.is_datetime64_any_dtype(daily_df["date"]):
+        daily_df = daily_df.assign(date=pd.to_datetime(daily_df["date"]))
 
-    # 4. AUMENTO SIGNIFICATIVO DE CANCELACIONES
-    alerts.extend(detect_cancellation_spikes(current_period, previous_period))
+    # Get data for current and previous period
+    if now is None:
+        now = get_dataset_day(data) if len(daily_df) else datetime.now()
+    start_date = period_start(now, period_days)
+    prev_start = start_date - timedelta(days=period_days)
 
-    # 5. VARIACIÓN SEMANAL DE CONVERSIÓN
-    alerts.extend(detect_conversion_volatility(daily_df, period_days))
+    # Per-hub sums of both periods from the rollup cube (see utils/rollup.py)
+    current_period = rollup(daily_df, "hub", start=start_date)
+    previous_period = rollup(daily_df, "hub", start=prev_start, end=start_date)
+
+    alerts = pd.concat(
+        [
+            # 1. HUBS CON CAÍDA EN CONVERSIÓN
+            detect_conversion_drops(current_period, previous_period),
+            # 2. INVENTARIO CON AGING CRÍTICO
+            detect_critical_inventory(data["inventory"]),
+            # 3. CAÍDA ABRUPTA DE NPS
+            detect_nps_drops(current_period, previous_period),
+            # 4. AUMENTO SIGNIFICATIVO DE CANCELACIONES
+            detect_cancellation_spikes(current_period, previous_period),
+            # 5. VARIACIÓN SEMANAL DE CONVERSIÓN
+            detect_conversion_volatility(daily_df, period_days, now),
+        ],
+        ignore_index=True,
+    )
 
-    # Sort by severity and timestamp
-    severity_order = {"critical": 0, "warning": 1, "info": 2}
-    alerts.sort(
-        key=lambda x: (severity_order.get(x["type"], 3), x["timestamp"]), reverse=True
+    # Sort by severity, newest first within a severity (alerts detected
+    # later come first)
+    alerts = alerts.iloc[::-1].sort_values(
+        ["type", "timestamp"], ascending=[True, False], kind="stable"
     )
+    return alerts.reset_index(drop=True)
 
-    return alerts
+
+def _compare_periods(current_period, previous_period, columns):
+    """
+    Per-hub sums of both periods side by side (hubs present in both)
+
+    Returns:
+        DataFrame indexed by hub, current columns as is and previous ones
+        with a "_prev" suffix, in the current period's hub order
+    """
+    current = regroup(current_period, "hub", columns)
+    previous = regroup(previous_period, "hub", columns)
+    return current.join(previous, how="inner", rsuffix="_prev")
 
 
 def detect_conversion_drops(current_period, previous_period, threshold_pct=10):
     """
     Detect hubs with significant conversion rate drops
-    """
-    alerts = []
 
-    # Calculate conversion by hub for both periods
-    current_by_hub = current_period.groupby("hub").agg({"sales": "sum", "leads": "sum"})
-    current_by_hub["conversion"] = (
-        current_by_hub["sales"] / current_by_hub["leads"] * 100
-    )
+    Args:
+        current_period, previous_period: Hub rollups of both periods
 
-    previous_by_hub = previous_period.groupby("hub").agg(
-        {"sales": "sum", "leads": "sum"}
-    )
-    previous_by_hub["conversion"] = (
-        previous_by_hub["sales"] / previous_by_hub["leads"] * 100
+    Returns:
+        Alerts DataFrame
+    """
+    hubs = _compare_periods(current_period, previous_period, ["sales", "leads"])
+    current_cvr = hubs["sales"] / hubs["leads"] * 100
+    previous_cvr = hubs["sales_prev"] / hubs["leads_prev"] * 100
+    drop_pct = (current_cvr - previous_cvr) / previous_cvr * 100
+
+    flagged = ((previous_cvr > 0) & (drop_pct < -threshold_pct)).to_numpy()
+    hub = hubs.index[flagged].astype(str)
+    current_cvr, previous_cvr = current_cvr[flagged], previous_cvr[flagged]
+    drop_pct = drop_pct[flagged]
+
+    return alerts_frame(
+        {
+            "type": np.select([drop_pct < -20], ["critical"], "warning"),
+            "title": "Caída en conversión - " + hub,
+            "description": _describe(
+                "Conversión bajó {drop:.1f}% vs periodo anterior ({previous:.1f}% → {current:.1f}%)",
+                drop=drop_pct.abs(),
+                previous=previous_cvr,
+                current=current_cvr,
+            ),
+            "timestamp": datetime.now(),
+            "metric": "conversion",
+            "hub": hub,
+            "value": drop_pct.to_numpy(),
+        }
     )
 
-    # Compare periods
-    for hub in current_by_hub.index:
-        if hub not in previous_by_hub.index:
-            continue
-
-        current_cvr = current_by_hub.loc[hub, "conversion"]
-        previous_cvr = previous_by_hub.loc[hub, "conversion"]
-
-        if previous_cvr > 0:
-            drop_pct = ((current_cvr - previous_cvr) / previous_cvr) * 100
-
-            if drop_pct < -threshold_pct:
-                alert_type = "critical" if drop_pct < -20 else "warning"
-                alerts.append(
-                    {
-                        "type": alert_type,
-                        "title": f"Caída en conversión - {hub}",
-                        "description": f"Conversión bajó {abs(drop_pct):.1f}% vs periodo anterior ({previous_cvr:.1f}% → {current_cvr:.1f}%)",
-                        "timestamp": datetime.now(),
-                        "metric": "conversion",
-                        "hub": hub,
-                        "value": drop_pct,
-                    }
-                )
-
-    return alerts
-
 
 def detect_critical_inventory(inventory_df, critical_days=60, warning_threshold=15):
     """
     Detect hubs with critical aging inventory
-    """
-    alerts = []
 
+    Returns:
+        Alerts DataFrame
+    """
     # Group by hub
     hub_inventory = (
-        inventory_df.groupby(["country", "hub"])
+        inventory_df.groupby(["country", "hub"], observed=True)
         .agg({"aging_60_plus": "sum", "total_inventory": "sum"})
         .reset_index()
     )
 
-    for _, row in hub_inventory.iterrows():
-        aging_count = row["aging_60_plus"]
-        total = row["total_inventory"]
-
-        if aging_count >= warning_threshold:
-            aging_pct = (aging_count / total * 100) if total > 0 else 0
-            alert_type = "critical" if aging_count >= 25 else "warning"
-
-            alerts.append(
-                {
-                    "type": alert_type,
-                    "title": f'Inventario envejecido - {row["hub"]}',
-                    "description": f"{aging_count} vehículos con más de {critical_days} días en inventario ({aging_pct:.0f}% del total)",
-                    "timestamp": datetime.now(),
-                    "metric": "inventory_aging",
-                    "hub": row["hub"],
-                    "value": aging_count,
-                }
-            )
-
-    return alerts
+    hub_inventory = hub_inventory[hub_inventory["aging_60_plus"] >= warning_threshold]
+    aging_count = hub_inventory["aging_60_plus"]
+    total = hub_inventory["total_inventory"]
+    aging_pct = (aging_count / total.where(total > 0) * 100).fillna(0)
+    hub = hub_inventory["hub"].astype(str)
+
+    return alerts_frame(
+        {
+            "type": np.select([aging_count >= 25], ["critical"], "warning"),
+            "title": ("Inventario envejecido - " + hub).to_numpy(),
+            "description": _describe(
+                "{aging} vehículos con más de {days} días en inventario ({pct:.0f}% del total)",
+                aging=aging_count,
+                days=[critical_days] * len(hub_inventory),
+                pct=aging_pct,
+            ),
+            "timestamp": datetime.now(),
+            "metric": "inventory_aging",
+            "hub": hub.to_numpy(),
+            "value": aging_count.to_numpy(),
+        }
+    )
 
 
 def detect_nps_drops(current_period, previous_period, threshold_points=5):
     """
     Detect significant NPS drops by hub
+
+    Hubs under the NPS threshold get a low-NPS alert; the others a drop
+    alert when NPS fell more than threshold_points.
+
+    Args:
+        current_period, previous_period: Hub rollups of both periods
+
+    Returns:
+        Alerts DataFrame
     """
-    alerts = []
-
-    # Calculate NPS by hub
-    current_nps = current_period.groupby("hub")["nps"].mean()
-    previous_nps = previous_period.groupby("hub")["nps"].mean()
-
-    for hub in current_nps.index:
-        if hub not in previous_nps.index:
-            continue
-
-        current = current_nps[hub]
-        previous = previous_nps[hub]
-        drop = previous - current
-
-        # Check if below threshold
-        if current < THRESHOLDS["nps_warning"]:
-            alert_type = (
-                "critical" if current < THRESHOLDS["nps_warning"] - 10 else "warning"
-            )
-            alerts.append(
-                {
-                    "type": alert_type,
-                    "title": f"NPS bajo - {hub}",
-                    "description": f'NPS actual: {current:.0f} (umbral: {THRESHOLDS["nps_warning"]})',
-                    "timestamp": datetime.now(),
-                    "metric": "nps",
-                    "hub": hub,
-                    "value": current,
-                }
-            )
-
-        # Check for significant drop
-        elif drop > threshold_points:
-            alerts.append(
-                {
-                    "type": "warning",
-                    "title": f"Caída en NPS - {hub}",
-                    "description": f"NPS bajó {drop:.0f} puntos vs periodo anterior ({previous:.0f} → {current:.0f})",
-                    "timestamp": datetime.now(),
-                    "metric": "nps",
-                    "hub": hub,
-                    "value": -drop,
-                }
-            )
-
-    return alerts
+    # NPS by hub (average of the daily values)
+    hubs = add_ratios(
+        _compare_periods(current_period, previous_period, ["nps", ROWS]),
+        "avg_nps",
+    )
+    current = hubs["avg_nps"]
+    previous = hubs["nps_prev"] / hubs[f"{ROWS}_prev"]
+    drop = previous - current
+
+    nps_warning = THRESHOLDS["nps_warning"]
+    low = (current < nps_warning).to_numpy()
+    flagged = low | (drop > threshold_points).to_numpy()
+    hub = hubs.index[flagged].astype(str)
+    current, previous, drop, low = (
+        current[flagged],
+        previous[flagged],
+        drop[flagged],
+        low[flagged],
+    )
+
+    descriptions = [
+        (
+            f"NPS actual: {value:.0f} (umbral: {nps_warning})"
+            if is_low
+            else f"NPS bajó {fall:.0f} puntos vs periodo anterior ({before:.0f} → {value:.0f})"
+        )
+        for value, before, fall, is_low in zip(current, previous, drop, low)
+    ]
+    return alerts_frame(
+        {
+            "type": np.select(
+                [low & (current < nps_warning - 10).to_numpy(), low],
+                ["critical", "warning"],
+                "warning",
+            ),
+            "title": np.where(low, "NPS bajo - ", "Caída en NPS - ") + hub,
+            "description": descriptions,
+            "timestamp": datetime.now(),
+            "metric": "nps",
+            "hub": hub,
+            "value": np.where(low, current, -drop),
+        }
+    )
 
 
 def detect_cancellation_spikes(current_period, previous_period, threshold_pct=25):
     """
     Detect significant increases in cancellations
+
+    Args:
+        current_period, previous_period: Hub rollups of both periods
+
+    Returns:
+        Alerts DataFrame
     """
-    alerts = []
-
-    # Calculate cancellations by hub
-    current_cancel = current_period.groupby("hub")["cancellations"].sum()
-    previous_cancel = previous_period.groupby("hub")["cancellations"].sum()
-
-    for hub in current_cancel.index:
-        if hub not in previous_cancel.index or previous_cancel[hub] == 0:
-            continue
-
-        current = current_cancel[hub]
-        previous = previous_cancel[hub]
-        increase_pct = ((current - previous) / previous) * 100
-
-        if increase_pct > threshold_pct:
-            alert_type = "critical" if increase_pct > 50 else "warning"
-            alerts.append(
-                {
-                    "type": alert_type,
-                    "title": f"Aumento de cancelaciones - {hub}",
-                    "description": f"Cancelaciones aumentaron {increase_pct:.0f}% vs periodo anterior ({previous:.0f} → {current:.0f})",
-                    "timestamp": datetime.now(),
-                    "metric": "cancellations",
-                    "hub": hub,
-                    "value": increase_pct,
-                }
-            )
-
-    return alerts
-
-
-def detect_conversion_volatility(daily_df, period_days=30):
+    hubs = _compare_periods(current_period, previous_period, ["cancellations"])
+    current = hubs["cancellations"]
+    previous = hubs["cancellations_prev"]
+    increase_pct = (current - previous) / previous.where(previous != 0) * 100
+
+    flagged = (increase_pct > threshold_pct).to_numpy()
+    hub = hubs.index[flagged].astype(str)
+    current, previous = current[flagged], previous[flagged]
+    increase_pct = increase_pct[flagged]
+
+    return alerts_frame(
+        {
+            "type": np.select([increase_pct > 50], ["critical"], "warning"),
+            "title": "Aumento de cancelaciones - " + hub,
+            "description": _describe(
+                "Cancelaciones aumentaron {increase:.0f}% vs periodo anterior ({previous:.0f} → {current:.0f})",
+                increase=increase_pct,
+                previous=previous,
+                current=current,
+            ),
+            "timestamp": datetime.now(),
+            "metric": "cancellations",
+            "hub": hub,
+            "value": increase_pct.to_numpy(),
+        }
+    )
+
+
+def detect_conversion_volatility(daily_df, period_days=30, now=None):
     """
     Detect high volatility in conversion rates (instability indicator)
-    """
-    alerts = []
 
-    # Get recent data
-    end_date = daily_df["date"].max()
-    start_date = end_date - timedelta(days=period_days)
-    recent_data = daily_df[daily_df["date"] >= start_date].copy()
+    Args:
+        daily_df: daily_metrics frame
+        period_days: Days of the period (whole days up to now)
+        now: Current time of the dataset (default: newest date of daily_df)
 
-    # Calculate weekly conversion by hub
-    recent_data["week"] = (
-        recent_data["date"].dt.to_period("W").apply(lambda r: r.start_time)
+    Returns:
+        Alerts DataFrame
+    """
+    # Get recent data
+    start_date = period_start(
+        daily_df["date"].max() if now is None else now, period_days
     )
 
-    weekly_conversion = (
-        recent_data.groupby(["hub", "week"])
-        .agg({"sales": "sum", "leads": "sum"})
-        .reset_index()
-    )
+    # Calculate weekly conversion by hub (weeks cut at the window start)
+    weekly_conversion = regroup(
+        rollup(daily_df, "hub", "week", start=start_date),
+        ["hub", PERIOD_COLUMN],
+        ["sales", "leads"],
+    ).reset_index()
 
     weekly_conversion["conversion"] = (
         weekly_conversion["sales"] / weekly_conversion["leads"] * 100
     )
 
     # Calculate volatility (standard deviation)
-    volatility = (
-        weekly_conversion.groupby("hub")["conversion"]
-        .agg(["std", "mean"])
-        .reset_index()
+    volatility = weekly_conversion.groupby("hub", observed=True)["conversion"].agg(
+        ["std", "mean"]
     )
-    volatility = volatility[volatility["std"].notna()]
 
     # Flag high volatility (coefficient of variation > 0.3)
-    for _, row in volatility.iterrows():
-        if row["mean"] > 0:
-            cv = row["std"] / row["mean"]
-
-            if cv > 0.3:  # 30% coefficient of variation
-                alerts.append(
-                    {
-                        "type": "warning",
-                        "title": f'Alta volatilidad en conversión - {row["hub"]}',
-                        "description": f"Conversión inestable (CV: {cv:.1%}). Revisar consistencia operativa.",
-                        "timestamp": datetime.now(),
-                        "metric": "conversion_volatility",
-                        "hub": row["hub"],
-                        "value": cv,
-                    }
-                )
-
-    return alerts
+    cv = volatility["std"] / volatility["mean"].where(volatility["mean"] > 0)
+    flagged = (cv > 0.3).to_numpy()
+    hub = volatility.index[flagged].astype(str)
+    cv = cv[flagged]
+
+    return alerts_frame(
+        {
+            "type": "warning",
+            "title": "Alta volatilidad en conversión - " + hub,
+            "description": _describe(
+                "Conversión inestable (CV: {cv:.1%}). Revisar consistencia operativa.",
+                cv=cv,
+            ),
+            "timestamp": datetime.now(),
+            "metric": "conversion_volatility",
+            "hub": hub,
+            "value": cv.to_numpy(),
+        }
+    )
 
 
 def detect_operational_alerts(filtered_data, hub_label=None):
@@ -286,244 +353,15 @@ def detect_operational_alerts(filtered_data, hub_label=None):
     Detect operational alerts for City Manager dashboard
     Includes dealership-approach alerts (capacity, opportunities, stock quality)
 
+    The rules and their thresholds are declared in
+    config.OPERATIONAL_ALERT_RULES and evaluated in one batched pass (see
+    utils/alert_rules.py).
+
     Args:
         filtered_data: Pre-filtered data dictionary
         hub_label: Optional hub/region label (not currently used in logic)
 
     Returns:
-        List of alert dictionaries
+        Alerts DataFrame (see alerts_frame)
     """
-    alerts = []
-
-    agents_df = filtered_data.get("agent_performance", pd.DataFrame())
-    inventory_df = filtered_data.get("inventory", pd.DataFrame())
-    daily_df = filtered_data.get("daily_metrics", pd.DataFrame())
-
-    # === NEW DEALERSHIP ALERTS ===
-
-    # 1. AGENTES SUBUTILIZADOS (Capacidad disponible)
-    if len(agents_df) > 0:
-        underutilized = agents_df[agents_df["utilization"] < 0.60]
-        if len(underutilized) > 0:
-            total_available_slots = underutilized["available_slots"].sum()
-            agent_names = ", ".join(underutilized["agent_name"].head(3).tolist())
-            more_text = (
-                f" y {len(underutilized) - 3} más" if len(underutilized) > 3 else ""
-            )
-
-            alerts.append(
-                {
-                    "type": "warning",
-                    "title": f"{len(underutilized)} agente(s) subutilizado(s)",
-                    "description": f"{total_available_slots:.0f} slots disponibles sin usar. Agentes: {agent_names}{more_text}. Asignar más leads.",
-                    "timestamp": datetime.now(),
-                    "metric": "agent_utilization",
-                }
-            )
-
-    # 2. STOCK DE BAJA CALIDAD ASIGNADO
-    if len(agents_df) > 0:
-        low_quality_stock = agents_df[agents_df["stock_attractiveness"] < 60]
-        if len(low_quality_stock) > 0:
-            agent_names = ", ".join(low_quality_stock["agent_name"].head(3).tolist())
-            more_text = (
-                f" y {len(low_quality_stock) - 3} más"
-                if len(low_quality_stock) > 3
-                else ""
-            )
-            avg_age = low_quality_stock["stock_avg_age"].mean()
-
-            alerts.append(
-                {
-                    "type": "critical",
-                    "title": f"{len(low_quality_stock)} agente(s) con stock poco atractivo",
-                    "description": f"Stock envejecido (promedio: {avg_age:.0f} días) afecta conversión. Agentes: {agent_names}{more_text}. Renovar inventario asignado.",
-                    "timestamp": datetime.now(),
-                    "metric": "stock_quality",
-                }
-            )
-
-    # 3. ALTO BACKLOG SIN CAPACIDAD
-    if len(agents_df) > 0:
-        high_backlog_low_capacity = agents_df[
-            (agents_df["backlog_cartera"] > 20) & (agents_df["available_slots"] < 5)
-        ]
-        if len(high_backlog_low_capacity) > 0:
-            agent_names = ", ".join(
-                high_backlog_low_capacity["agent_name"].head(3).tolist()
-            )
-            more_text = (
-                f" y {len(high_backlog_low_capacity) - 3} más"
-                if len(high_backlog_low_capacity) > 3
-                else ""
-            )
-
-            alerts.append(
-                {
-                    "type": "warning",
-                    "title": f"{len(high_backlog_low_capacity)} agente(s) con alto backlog y poca capacidad",
-                    "description": f"Agentes: {agent_names}{more_text}. Redistribuir cartera o aumentar capacidad.",
-                    "timestamp": datetime.now(),
-                    "metric": "backlog_capacity",
-                }
-            )
-
-    # 4. BAJO APROVECHAMIENTO DE OPORTUNIDADES
-    if len(agents_df) > 0:
-        low_aprovechamiento = agents_df[agents_df["aprovechamiento_pct"] < 15]
-        if len(low_aprovechamiento) > 0:
-            agent_names = ", ".join(low_aprovechamiento["agent_name"].head(3).tolist())
-            more_text = (
-                f" y {len(low_aprovechamiento) - 3} más"
-                if len(low_aprovechamiento) > 3
-                else ""
-            )
-
-            alerts.append(
-                {
-                    "type": "warning",
-                    "title": f"{len(low_aprovechamiento)} agente(s) con bajo aprovechamiento",
-                    "description": f"< 15% de oportunidades convertidas. Agentes: {agent_names}{more_text}. Revisar calidad de leads o capacitación.",
-                    "timestamp": datetime.now(),
-                    "metric": "aprovechamiento",
-                }
-            )
-
-    # 5. MISMATCH ENTRE STOCK Y LEADS
-    if len(agents_df) > 0:
-        low_match = agents_df[agents_df["lead_match_score"] < 60]
-        if len(low_match) > 0:
-            agent_names = ", ".join(low_match["agent_name"].head(3).tolist())
-            more_text = f" y {len(low_match) - 3} más" if len(low_match) > 3 else ""
-
-            alerts.append(
-                {
-                    "type": "info",
-                    "title": f"{len(low_match)} agente(s) con bajo match stock-leads",
-                    "description": f"El inventario asignado no coincide con lo que buscan los leads. Agentes: {agent_names}{more_text}. Reasignar stock.",
-                    "timestamp": datetime.now(),
-                    "metric": "lead_match",
-                }
-            )
-
-    # === TRADITIONAL ALERTS ===
-
-    # 6. AGENTS WITH LOW CONVERSION (traditional)
-    if len(agents_df) > 0:
-        low_conv_agents = agents_df[
-            agents_df["conversion"] < THRESHOLDS["conversion_warning"]
-        ]
-        if len(low_conv_agents) > 0:
-            agent_names = ", ".join(low_conv_agents["agent_name"].head(3).tolist())
-            more_text = (
-                f" y {len(low_conv_agents) - 3} más" if len(low_conv_agents) > 3 else ""
-            )
-
-            alerts.append(
-                {
-                    "type": "warning",
-                    "title": f"{len(low_conv_agents)} agente(s) con baja conversión",
-                    "description": f'Agentes: {agent_names}{more_text}. Conversión < {THRESHOLDS["conversion_warning"]*100:.0f}%',
-                    "timestamp": datetime.now(),
-                    "metric": "agent_conversion",
-                }
-            )
-
-    # 7. AGED INVENTORY
-    if len(inventory_df) > 0:
-        total_aged = inventory_df["aging_60_plus"].sum()
-        total_inventory = inventory_df["total_inventory"].sum()
-
-        if total_aged > 20:
-            aging_pct = (
-                (total_aged / total_inventory * 100) if total_inventory > 0 else 0
-            )
-            alert_type = "critical" if total_aged > 30 else "warning"
-
-            alerts.append(
-                {
-                    "type": alert_type,
-                    "title": f"Inventario envejecido: {total_aged} vehículos",
-                    "description": f"{aging_pct:.0f}% del inventario con más de 60 días. Considerar ajuste de precios o promociones.",
-                    "timestamp": datetime.now(),
-                    "metric": "inventory_aging",
-                }
-            )
-
-    # 8. HIGH NO-SHOW RATE
-    if len(agents_df) > 0:
-        high_noshow = agents_df[agents_df["noshow"] > THRESHOLDS["noshow_warning"]]
-        if len(high_noshow) > 0:
-            agent_names = ", ".join(high_noshow["agent_name"].head(3).tolist())
-            more_text = f" y {len(high_noshow) - 3} más" if len(high_noshow) > 3 else ""
-
-            alerts.append(
-                {
-                    "type": "warning",
-                    "title": f"{len(high_noshow)} agente(s) con alta tasa de no-show",
-                    "description": f"Agentes: {agent_names}{more_text}. Revisar proceso de confirmación de citas.",
-                    "timestamp": datetime.now(),
-                    "metric": "noshow_rate",
-                }
-            )
-
-    # 9. NPS DROP (recent days)
-    if len(daily_df) > 0:
-        recent_nps = daily_df.tail(7)["nps"].mean()  # Last 7 days
-
-        if recent_nps < THRESHOLDS["nps_warning"]:
-            alert_type = (
-                "critical" if recent_nps < THRESHOLDS["nps_warning"] - 10 else "warning"
-            )
-            alerts.append(
-                {
-                    "type": alert_type,
-                    "title": "NPS por debajo del umbral",
-                    "description": f'NPS promedio últimos 7 días: {recent_nps:.0f} (umbral: {THRESHOLDS["nps_warning"]}). Revisar experiencia de cliente.',
-                    "timestamp": datetime.now(),
-                    "metric": "nps",
-                }
-            )
-
-    # 10. LOW INVENTORY
-    if len(inventory_df) > 0 and len(daily_df) > 0:
-        total_available = inventory_df["available"].sum()
-        avg_sales_per_day = (
-            daily_df["sales"].sum() / len(daily_df) if len(daily_df) > 0 else 0
-        )
-
-        if avg_sales_per_day > 0:
-            days_of_inventory = total_available / avg_sales_per_day
-
-            if days_of_inventory < 15:
-                alerts.append(
-                    {
-                        "type": "warning",
-                        "title": "Inventario bajo",
-                        "description": f"Solo {days_of_inventory:.0f} días de inventario disponible. Considerar reabastecimiento.",
-                        "timestamp": datetime.now(),
-                        "metric": "inventory_low",
-                    }
-                )
-
-    # 11. HIGH CANCELLATION RATE
-    if len(daily_df) > 0:
-        total_reservations = daily_df["reservations"].sum()
-        total_cancellations = daily_df["cancellations"].sum()
-
-        if total_reservations > 0:
-            cancellation_rate = total_cancellations / total_reservations
-
-            if cancellation_rate > 0.15:  # 15% cancellation rate
-                alert_type = "critical" if cancellation_rate > 0.20 else "warning"
-                alerts.append(
-                    {
-                        "type": alert_type,
-                        "title": "Alta tasa de cancelaciones",
-                        "description": f"{cancellation_rate:.0%} de las reservas son canceladas. Revisar proceso de cierre.",
-                        "timestamp": datetime.now(),
-                        "metric": "cancellation_rate",
-                    }
-                )
-
-    return alerts
+    return alerts_frame(evaluate_rules(filtered_data, OPERATIONAL_ALERT_RULES))
@@ -0,0 +1,337 @@
+"""
+Alert Rules
+Declarative alert rules (config.OPERATIONAL_ALERT_RULES) compiled into one batched evaluation
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from config import THRESHOLDS
+
+# Comparison operators of filters and bands
+COMPARISONS = {"<": np.less, ">": np.greater}
+
+
+def _threshold(value):
+    """Number of a rule threshold (THRESHOLDS key or number)"""
+    return float(THRESHOLDS[value] if isinstance(value, str) else value)
+
+
+def compile_rules(rules):
+    """
+    Compile alert rules into per-frame evaluation plans
+
+    Every distinct (filters, window) row selection of a frame becomes one
+    mask and every aggregate one (mask, column) term, so evaluating the
+    rules scans each frame once however many rules read it.
+
+    Args:
+        rules: List of rule dicts (see config.OPERATIONAL_ALERT_RULES)
+
+    Returns:
+        Dict with the "rules", one "frames" plan per frame (columns,
+        filter clauses, masks and terms) and, per rule, the term tree of
+        its "value" and "details" with terms as (frame, term index)
+    """
+    frames = {}
+
+    def plan(name):
+        return frames.setdefault(
+            name,
+            {"columns": [], "clauses": [], "masks": [], "terms": []},
+        )
+
+    def column_index(frame_plan, column):
+        if column not in frame_plan["columns"]:
+            frame_plan["columns"].append(column)
+        return frame_plan["columns"].index(column)
+
+    def mask_index(frame_plan, where, window):
+        clauses = []
+        for column, comparison, threshold in where:
+            clause = (
+                column_index(frame_plan, column),
+                comparison,
+                _threshold(threshold),
+            )
+            if clause not in frame_plan["clauses"]:
+                frame_plan["clauses"].append(clause)
+            clauses.append(frame_plan["clauses"].index(clause))
+        mask = (tuple(sorted(clauses)), window)
+        if mask not in frame_plan["masks"]:
+            frame_plan["masks"].append(mask)
+        return frame_plan["masks"].index(mask)
+
+    def compile_value(rule, value):
+        if value[0] == "ratio":
+            return (
+                "ratio",
+                compile_value(rule, value[1]),
+                compile_value(rule, value[2]),
+                float(value[3]) if len(value) > 3 else np.nan,
+            )
+        aggregation, column, frame = (value + (None, None))[:3]
+        if frame is None or frame == rule["source"]:
+            frame, where, window = (
+                rule["source"],
+                rule.get("where", []),
+                rule.get("window"),
+            )
+        else:
+            where, window = [], None
+        frame_plan = plan(frame)
+        mask = mask_index(frame_plan, where, window)
+        column = None if column is None else column_index(frame_plan, column)
+        term = (aggregation, mask, column)
+        if term not in frame_plan["terms"]:
+            frame_plan["terms"].append(term)
+        return (frame, frame_plan["terms"].index(term))
+
+    compiled = []
+    for rule in rules:
+        compiled.append(
+            {
+                "value": compile_value(rule, rule["value"]),
+                "details": {
+                    name: compile_value(rule, value)
+                    for name, value in rule.get("details", {}).items()
+                },
+                "names": (
+                    (
+                        rule["source"],
+                        mask_index(
+                            plan(rule["source"]),
+                            rule.get("where", []),
+                            rule.get("window"),
+                        ),
+                    )
+                    if rule.get("names")
+                    else None
+                ),
+                "bands": [
+                    (severity, _threshold(threshold))
+                    for severity, threshold in rule["bands"]
+                ],
+            }
+        )
+    return {"rules": rules, "frames": frames, "compiled": compiled}
+
+
+def _group_codes(frames, by):
+    """Group code of every row of each frame, and the group labels"""
+    if by is None:
+        return {
+            name: np.zeros(len(df), dtype=np.intp) for name, df in frames.items()
+        }, [None]
+    labels = pd.Index(
+        sorted(set().union(*(df[by].dropna().unique() for df in frames.values())))
+    )
+    codes = {name: _label_codes(df[by], labels) for name, df in frames.items()}
+    return codes, list(labels)
+
+
+def _label_codes(values, labels):
+    """Position of every value in labels (-1 for missing values)"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Map the categories once instead of every row
+        positions = np.append(labels.get_indexer(values.cat.categories), -1)
+        return positions[values.cat.codes.to_numpy()].astype(np.intp)
+    return labels.get_indexer(values).astype(np.intp)
+
+
+def _group_sums(values, codes, n_groups):
+    """Column sums of a (rows x columns) array per group code (-1 = no group)"""
+    if n_groups == 1 and (codes == 0).all():
+        return values.sum(axis=0, keepdims=True)
+    kept = codes >= 0
+    values, codes = values[kept], codes[kept]
+    order = np.argsort(codes, kind="stable")
+    sizes = np.bincount(codes, minlength=n_groups)
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    sums = np.zeros((n_groups, values.shape[1]))
+    present = sizes > 0
+    if present.any():
+        sums[present] = np.add.reduceat(values[order], starts[present], axis=0)
+    return sums
+
+
+def _tail_rows(codes, window):
+    """Rows among the last `window` rows of their group (in frame order)"""
+    groups = codes + 1  # rows without a group (-1) form their own
+    order = np.argsort(groups, kind="stable")
+    ends = np.cumsum(np.bincount(groups))
+    from_end = np.empty(len(codes), dtype=np.intp)
+    from_end[order] = ends[groups[order]] - 1 - np.arange(len(codes))
+    return from_end < window
+
+
+def _evaluate_frame(df, frame_plan, codes, n_groups):
+    """
+    Every term of a frame plan per group, in one pass over the frame
+
+    Returns:
+        (terms, masks): groups x terms array (NaN for sums and means of
+        groups without rows in the frame) and the rows x masks array
+    """
+    rows = len(df)
+    columns = frame_plan["columns"]
+    values = np.empty((rows, len(columns)))
+    for k, column in enumerate(columns):
+        values[:, k] = df[column].to_numpy(np.float64)
+
+    # All filter clauses in one broadcast, then the clauses of each mask
+    passed = np.ones((rows, len(frame_plan["clauses"]) + 1), dtype=bool)
+    for k, (column, comparison, threshold) in enumerate(frame_plan["clauses"]):
+        passed[:, k] = COMPARISONS[comparison](values[:, column], threshold)
+    masks = np.empty((rows, len(frame_plan["masks"])), dtype=bool)
+    tails = {}
+    for m, (clauses, window) in enumerate(frame_plan["masks"]):
+        masks[:, m] = passed[:, list(clauses) or [-1]].all(axis=1)
+        if window is not None:
+            if window not in tails:
+                tails[window] = _tail_rows(codes, window)
+            masks[:, m] &= tails[window]
+
+    weights = np.zeros((rows, 2 * len(frame_plan["terms"]) + 1))
+    for t, (aggregation, mask, column) in enumerate(frame_plan["terms"]):
+        weights[:, 2 * t] = masks[:, mask]
+        if column is not None:
+            weights[:, 2 * t + 1] = np.where(masks[:, mask], values[:, column], 0.0)
+    weights[:, -1] = 1.0
+    sums = _group_sums(weights, codes, n_groups)
+
+    terms = np.empty((n_groups, len(frame_plan["terms"])))
+    has_rows = sums[:, -1] > 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for t, (aggregation, mask, column) in enumerate(frame_plan["terms"]):
+            count, total = sums[:, 2 * t], sums[:, 2 * t + 1]
+            if aggregation == "count":
+                terms[:, t] = count
+            elif aggregation == "sum":
+                terms[:, t] = np.where(has_rows, total, np.nan)
+            elif aggregation == "mean":
+                terms[:, t] = np.where(count > 0, total / count, np.nan)
+            else:
+                raise ValueError(f"Invalid aggregation: {aggregation}")
+    return terms, masks
+
+
+def _value(tree, terms):
+    """Per-group values of a compiled value tree"""
+    if tree[0] == "ratio":
+        numerator, denominator = _value(tree[1], terms), _value(tree[2], terms)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(denominator > 0, numerator / denominator, tree[3])
+    frame, term = tree
+    return terms[frame][:, term]
+
+
+def _first_names(df, column, mask, codes, n_groups, limit=3):
+    """
+    First `limit` values of a column among the masked rows of each group,
+    followed by how many more there are ("A, B, C y 2 más")
+    """
+    rows = np.flatnonzero(mask & (codes >= 0))
+    groups = codes[rows]
+    counts = np.bincount(groups, minlength=n_groups)
+    order = np.argsort(groups, kind="stable")
+    rank = np.arange(len(rows)) - (np.cumsum(counts) - counts)[groups[order]]
+    first = order[rank < limit]
+
+    names = [[] for _ in range(n_groups)]
+    for group, value in zip(groups[first], df[column].to_numpy()[rows[first]]):
+        names[group].append(str(value))
+    more = counts - limit
+    return [
+        ", ".join(values) + (f" y {more[group]} más" if more[group] > 0 else "")
+        for group, values in enumerate(names)
+    ]
+
+
+def evaluate_rules(data, rules, by=None):
+    """
+    Evaluate alert rules over a dataset in one batched pass
+
+    Args:
+        data: Dataset dict (missing frames count as empty)
+        rules: List of rule dicts, or compile_rules() of them
+        by: Column to evaluate every group of separately (e.g. "hub", one
+            alert per rule and hub) or None for the whole dataset as one scope
+
+    Returns:
+        Dict column -> values for alert_detector.alerts_frame, alerts in rule
+        order (groups in label order within a rule); "hub" holds the group
+        when by is given
+    """
+    plan = rules if isinstance(rules, dict) else compile_rules(rules)
+    present = {
+        name: data[name]
+        for name in plan["frames"]
+        if data.get(name) is not None and len(data[name]) > 0
+    }
+    codes, labels = _group_codes(present, by)
+    n_groups = len(labels)
+
+    terms, masks = {}, {}
+    for name, frame_plan in plan["frames"].items():
+        if name in present:
+            terms[name], masks[name] = _evaluate_frame(
+                present[name], frame_plan, codes[name], n_groups
+            )
+        else:
+            # No rows: counts are 0, sums and means missing
+            empty = [
+                0.0 if term[0] == "count" else np.nan for term in frame_plan["terms"]
+            ]
+            terms[name] = np.tile(empty, (n_groups, 1))
+
+    alerts = {
+        "type": [],
+        "title": [],
+        "description": [],
+        "metric": [],
+        "hub": [],
+        "value": [],
+    }
+    for rule, compiled in zip(plan["rules"], plan["compiled"]):
+        value = _value(compiled["value"], terms)
+        comparison = COMPARISONS[rule["comparison"]]
+        severity = np.select(
+            [comparison(value, threshold) for _, threshold in compiled["bands"]],
+            [severity for severity, _ in compiled["bands"]],
+            "",
+        )
+        fired = np.flatnonzero(severity != "")
+        if len(fired) == 0:
+            continue
+
+        details = {
+            name: _value(tree, terms) for name, tree in compiled["details"].items()
+        }
+        names = None
+        if compiled["names"] is not None:
+            frame, mask = compiled["names"]
+            names = _first_names(
+                present[frame],
+                rule["names"],
+                masks[frame][:, mask],
+                codes[frame],
+                n_groups,
+            )
+        for group in fired:
+            fields = dict(THRESHOLDS, value=value[group])
+            fields.update((name, values[group]) for name, values in details.items())
+            if names is not None:
+                fields["names"] = names[group]
+            alerts["type"].append(str(severity[group]))
+            alerts["title"].append(rule["title"].format(**fields))
+            alerts["description"].append(rule["description"].format(**fields))
+            alerts["metric"].append(rule["metric"])
+            alerts["hub"].append(None if by is None else str(labels[group]))
+            alerts["value"].append(float(value[group]))
+
+    alerts["timestamp"] = [datetime.now()] * len(alerts["type"])
+    if by is None:
+        del alerts["hub"]
+    return alerts
@@ -0,0 +1,162 @@
+"""
+Alert Service
+Alerts evaluated by a background worker once per dataset version and scope, shared across sessions
+"""
+
+import logging
+import queue
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from utils.alert_store import active_alerts, record_alerts
+from utils.data_store import get_data_version, get_shared_data
+
+# Alert keys kept (view, user scope, selections); the least recently read
+# ones are dropped along with their results
+ALERT_SERVICE_SIZE = 128
+
+# Seconds after which a result is re-evaluated on the same dataset version
+# (alert periods are relative to now)
+ALERT_MAX_AGE = 300
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_results = OrderedDict()
+_evaluators = {}
+_queue = queue.Queue()
+_state = {"version": None, "pending": set(), "worker": None}
+
+
+def alert_scope(key):
+    """Scope of an alert key in the alert store"""
+    return repr(key)
+
+
+def _evaluate(key, evaluate):
+    """
+    Run an evaluator on the current shared dataset and record it in the
+    alert store; the result holds the store's active alerts of the key
+    """
+    # Version read first: a tick in between only labels newer data as
+    # older, which triggers one more refresh
+    version = get_data_version()
+    evaluated_at = datetime.now()
+    record_alerts(alert_scope(key), evaluate(get_shared_data(), version), evaluated_at)
+    return {
+        "alerts": active_alerts(alert_scope(key)),
+        "version": version,
+        "evaluated_at": evaluated_at,
+        "error": None,
+    }
+
+
+def _store_locked(key, entry):
+    """Keep a result, dropping the least recently read keys past the limit"""
+    _results[key] = entry
+    _results.move_to_end(key)
+    while len(_results) > ALERT_SERVICE_SIZE:
+        dropped, _ = _results.popitem(last=False)
+        _evaluators.pop(dropped, None)
+
+
+def _work():
+    """Worker loop: re-evaluate scheduled keys one at a time"""
+    while True:
+        key = _queue.get()
+        with _lock:
+            evaluate = _evaluators.get(key)
+        try:
+            entry = _evaluate(key, evaluate) if evaluate is not None else None
+        except Exception as error:
+            # Keep serving the last result, flagged with the failure
+            logger.exception("Alert evaluation failed for %r", key)
+            entry = None
+            with _lock:
+                if key in _results:
+                    _results[key]["error"] = f"{type(error).__name__}: {error}"
+        with _lock:
+            if entry is not None and key in _evaluators:
+                _store_locked(key, entry)
+            _state["pending"].discard(key)
+
+
+def _schedule_locked(key):
+    """Queue a key for the worker (once), starting the worker if needed"""
+    if key in _state["pending"]:
+        return
+    _state["pending"].add(key)
+    _queue.put(key)
+    worker = _state["worker"]
+    if worker is None or not worker.is_alive():
+        worker = threading.Thread(target=_work, name="alert-service", daemon=True)
+        _state["worker"] = worker
+        worker.start()
+
+
+def _view_locked(key, entry):
+    """Result as returned to views (entry fields plus refresh status)"""
+    return dict(entry, refreshing=key in _state["pending"])
+
+
+def get_alerts(key, evaluate):
+    """
+    Alerts of a view and scope, read from the service
+
+    The first read of a key evaluates it in the caller. Later reads return
+    the stored result at once; when the dataset has a newer version (or
+    the result is older than ALERT_MAX_AGE) the worker re-evaluates it in
+    the background and the stale result is served meanwhile. A new
+    dataset version re-evaluates every key in use.
+
+    Every evaluation goes through the alert store (utils/alert_store.py):
+    alerts keep the timestamp of the evaluation where they fired, and
+    "new" marks the ones that fired in the last evaluation.
+
+    Args:
+        key: Hashable alert key (view, user scope, selections)
+        evaluate: Callable (data, version) -> alerts DataFrame over the
+                  shared dataset; it must not touch session state
+
+    Returns:
+        Dict with alerts (the key's active alerts, see
+        alert_store.active_alerts), version, evaluated_at, error (last
+        background failure, None if fine) and refreshing (a re-evaluation
+        is queued)
+    """
+    version = get_data_version()
+    with _lock:
+        _evaluators[key] = evaluate
+        if _state["version"] is None or version > _state["version"]:
+            _state["version"] = version
+            for known in _results:
+                if _results[known]["version"] < version:
+                    _schedule_locked(known)
+        entry = _results.get(key)
+        if entry is not None:
+            _results.move_to_end(key)
+            age = (datetime.now() - entry["evaluated_at"]).total_seconds()
+            if entry["version"] < version or age > ALERT_MAX_AGE:
+                _schedule_locked(key)
+            return _view_locked(key, entry)
+
+    # First read of this key: nothing to serve yet. Two sessions missing
+    # the same key at once both evaluate it; the second result wins
+    entry = _evaluate(key, evaluate)
+    with _lock:
+        _store_locked(key, entry)
+        return _view_locked(key, entry)
+
+
+def get_alert_age(result):
+    """Seconds since a get_alerts result was evaluated"""
+    return (datetime.now() - result["evaluated_at"]).total_seconds()
+
+
+def clear_alert_service():
+    """Drop every stored result (the worker keeps running)"""
+    with _lock:
+        _results.clear()
+        _evaluators.clear()
+        _state["version"] = None
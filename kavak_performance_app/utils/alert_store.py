@@ -0,0 +1,239 @@
+"""
+Alert Store
+Persistent alert state in SQLite: fingerprints per (rule, scope), firing on state transitions
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+import pandas as pd
+from utils.alert_detector import alerts_frame
+
+DEFAULT_ALERT_STORE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "alerts.db"
+)
+
+# Seconds a resolved alert stays suppressed: if it comes back within the TTL
+# (a metric flapping around its threshold) it resumes its episode instead of
+# firing again
+ALERT_SUPPRESSION_TTL = 3600
+
+# Days resolved alerts are kept in the history
+ALERT_HISTORY_DAYS = 30
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS alerts (
+    fingerprint TEXT PRIMARY KEY,
+    scope TEXT NOT NULL,
+    rule TEXT NOT NULL,
+    type TEXT NOT NULL,
+    title TEXT,
+    description TEXT,
+    metric TEXT,
+    hub TEXT,
+    value REAL,
+    position INTEGER,
+    active INTEGER NOT NULL,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    fired_at TEXT NOT NULL,
+    resolved_at TEXT,
+    fired INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS alerts_active ON alerts (scope, active, position);
+"""
+
+# Columns of an active alert as read by the views (fired_at is the alert's
+# timestamp: when its current episode started)
+_ACTIVE_COLUMNS = (
+    "type, title, description, fired_at, metric, hub, value, "
+    "first_seen, last_seen, fired_at = last_seen"
+)
+
+_lock = threading.Lock()
+_ready = set()
+
+
+def get_alert_store_path():
+    """Alert store file (KAVAK_ALERT_STORE or <app>/data/alerts.db)"""
+    return os.environ.get("KAVAK_ALERT_STORE", DEFAULT_ALERT_STORE)
+
+
+def _connect(path=None):
+    """Connection to the store, creating its file and schema on first use"""
+    path = path or get_alert_store_path()
+    if path not in _ready:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    if path not in _ready:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        _ready.add(path)
+    return conn
+
+
+def alert_rule(alert):
+    """Rule of an alert: what it is about (metric and hub), stable across runs"""
+    return f"{alert['metric']}|{alert.get('hub') or ''}"
+
+
+def alert_fingerprint(rule, scope):
+    """Fingerprint of an alert rule within a scope"""
+    return hashlib.sha1(f"{scope}\x1f{rule}".encode()).hexdigest()[:16]
+
+
+def record_alerts(scope, alerts, now=None, path=None):
+    """
+    Record one evaluation of a scope's alerts
+
+    An alert fires (fired_at = now) when it appears, or changes severity;
+    while it stays active only last_seen moves. Alerts of the scope that
+    are no longer reported are resolved. One resolved less than
+    ALERT_SUPPRESSION_TTL ago comes back without firing again.
+
+    Args:
+        scope: Scope key (e.g. view, user scope and selections)
+        alerts: Alerts DataFrame of the evaluation (see alerts_frame)
+        now: Evaluation time (default: now)
+        path: Store file (default: get_alert_store_path())
+
+    Returns:
+        Number of alerts that fired
+    """
+    now = now or datetime.now()
+    stamp = now.isoformat()
+    suppressed_since = (now - timedelta(seconds=ALERT_SUPPRESSION_TTL)).isoformat()
+    records = alerts.to_dict("records")
+
+    conn = _connect(path)
+    try:
+        with _lock, conn:
+            known = {
+                row[0]: row[1:]
+                for row in conn.execute(
+                    "SELECT fingerprint, active, type, resolved_at, fired_at, fired "
+                    "FROM alerts WHERE scope = ?",
+                    (scope,),
+                )
+            }
+
+            rows, fired = [], 0
+            for position, alert in enumerate(records):
+                rule = alert_rule(alert)
+                fingerprint = alert_fingerprint(rule, scope)
+                previous = known.pop(fingerprint, None)
+                if previous is None:
+                    fired_at, count = stamp, 1
+                else:
+                    active, severity, resolved_at, fired_at, count = previous
+                    resumed = active or (resolved_at or "") > suppressed_since
+                    if not resumed or severity != alert["type"]:
+                        fired_at, count = stamp, count + 1
+                fired += fired_at == stamp
+                rows.append(
+                    (
+                        fingerprint,
+                        scope,
+                        rule,
+                        str(alert["type"]),
+                        alert["title"],
+                        alert["description"],
+                        alert["metric"],
+                        alert.get("hub"),
+                        None if pd.isna(alert.get("value")) else float(alert["value"]),
+                        position,
+                        stamp,
+                        stamp,
+                        fired_at,
+                        count,
+                    )
+                )
+
+            # Keep first_seen of known alerts (the insert value is for new ones)
+            conn.executemany(
+                """
+                INSERT INTO alerts (fingerprint, scope, rule, type, title, description,
+                    metric, hub, value, position, active, first_seen, last_seen,
+                    fired_at, resolved_at, fired)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1, ?, ?, ?, NULL, ?)
+                ON CONFLICT (fingerprint) DO UPDATE SET
+                    type = excluded.type, title = excluded.title,
+                    description = excluded.description, value = excluded.value,
+                    position = excluded.position, active = 1,
+                    last_seen = excluded.last_seen, fired_at = excluded.fired_at,
+                    resolved_at = NULL, fired = excluded.fired
+                """,
+                rows,
+            )
+            resolved = [
+                (stamp, fingerprint) for fingerprint, row in known.items() if row[0]
+            ]
+            conn.executemany(
+                "UPDATE alerts SET active = 0, resolved_at = ? WHERE fingerprint = ?",
+                resolved,
+            )
+            expired = (now - timedelta(days=ALERT_HISTORY_DAYS)).isoformat()
+            conn.execute(
+                "DELETE FROM alerts WHERE active = 0 AND resolved_at < ?", (expired,)
+            )
+    finally:
+        conn.close()
+    return fired
+
+
+def _alerts_from_rows(rows):
+    """Alerts DataFrame from rows of _ACTIVE_COLUMNS"""
+    columns = ["type", "title", "description", "timestamp", "metric", "hub", "value"]
+    frame = pd.DataFrame(rows, columns=columns + ["first_seen", "last_seen", "new"])
+    for column in ("timestamp", "first_seen", "last_seen"):
+        frame[column] = pd.to_datetime(frame[column], format="ISO8601")
+    alerts = alerts_frame(frame[columns])
+    alerts["first_seen"] = frame["first_seen"].astype("datetime64[us]")
+    alerts["last_seen"] = frame["last_seen"].astype("datetime64[us]")
+    alerts["new"] = frame["new"].astype(bool)
+    return alerts
+
+
+def active_alerts(scope, path=None):
+    """
+    Active alerts of a scope, in the order of their last evaluation
+
+    Returns:
+        Alerts DataFrame (see alerts_frame) with the timestamp of the
+        current episode, plus first_seen, last_seen and new (fired in the
+        last evaluation)
+    """
+    conn = _connect(path)
+    try:
+        rows = conn.execute(
+            f"SELECT {_ACTIVE_COLUMNS} FROM alerts "
+            "WHERE scope = ? AND active = 1 ORDER BY position",
+            (scope,),
+        ).fetchall()
+    finally:
+        conn.close()
+    return _alerts_from_rows(rows)
+
+
+def alert_history(scope=None, path=None):
+    """
+    Every stored alert (active and resolved within ALERT_HISTORY_DAYS)
+
+    Returns:
+        DataFrame with one row per fingerprint, most recently seen first
+    """
+    conn = _connect(path)
+    try:
+        query = "SELECT * FROM alerts"
+        params = ()
+        if scope is not None:
+            query += " WHERE scope = ?"
+            params = (scope,)
+        return pd.read_sql_query(
+            query + " ORDER BY last_seen DESC", conn, params=params
+        )
+    finally:
+        conn.close()
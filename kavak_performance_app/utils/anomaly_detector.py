@@ -0,0 +1,315 @@
+"""
+Anomaly Detector
+Streaming statistical alerts (rolling z-score, EWMA, CUSUM) over daily_metrics as a hub x day array
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+from utils.alert_detector import alerts_frame
+from utils.filter_engine import DATE_COLUMN, date_window, day_range, get_day_partitions
+from utils.metric_cube import ROWS
+from utils.rollup import RATIOS
+
+# Daily hub ratios watched by the detector
+#   ratio: (numerator, denominator) columns of daily_metrics (ROWS = row count)
+#   direction: +1 when a rise is bad, -1 when a drop is bad (only bad
+#              deviations alert)
+#   format: Display format of a value
+ANOMALY_METRICS = {
+    "conversion": {
+        "label": "Conversión",
+        "ratio": RATIOS["conversion"],
+        "direction": -1,
+        "format": "{:.1%}",
+    },
+    "nps": {
+        "label": "NPS",
+        "ratio": RATIOS["avg_nps"],
+        "direction": -1,
+        "format": "{:.1f}",
+    },
+    "noshow": {
+        "label": "No-show",
+        "ratio": ("noshow", "appointments"),
+        "direction": 1,
+        "format": "{:.1%}",
+    },
+    "cancellations": {
+        "label": "Cancelaciones",
+        "ratio": RATIOS["cancellation_rate"],
+        "direction": 1,
+        "format": "{:.1%}",
+    },
+}
+
+# Days in the rolling baseline (mean and standard deviation of each hub)
+ANOMALY_WINDOW = 28
+
+# Baseline days a hub needs before it can alert on a metric
+ANOMALY_MIN_DAYS = 14
+
+# Rolling z-score limit (in baseline standard deviations)
+ZSCORE_LIMIT = 3.0
+
+# EWMA smoothing and control limit width (in EWMA standard deviations)
+EWMA_LAMBDA = 0.2
+EWMA_LIMIT = 3.0
+
+# CUSUM slack and decision interval over the z-scores (the sum restarts
+# after each change point)
+CUSUM_SLACK = 0.5
+CUSUM_LIMIT = 5.0
+
+# Detectors, in the order they are listed in an alert
+DETECTORS = {"zscore": "z-score", "ewma": "EWMA", "cusum": "CUSUM"}
+
+_lock = threading.Lock()
+_state = {"detector": None}
+
+
+def daily_hub_matrix(df, start=None):
+    """
+    Dense day x metric x hub array of the ANOMALY_METRICS ratios
+
+    Hubs are grouped by name (as in the other alerts), so a hub repeated
+    across regions is one series.
+
+    Args:
+        df: daily_metrics frame
+        start: First day included (None = every day)
+
+    Returns:
+        Dict with the sorted "days", the "hubs" (every category of the hub
+        column, so arrays of the same frame line up) and the "values"
+        array (NaN where a hub has no rows or a zero denominator)
+    """
+    rows = df if start is None else date_window(df, start, inclusive="both")
+    hubs = pd.Categorical(df["hub"]).categories
+    codes = pd.Categorical(rows["hub"], categories=hubs).codes
+
+    dates = rows[DATE_COLUMN].to_numpy()
+    partitions = get_day_partitions(df)
+    if partitions is not None:
+        first, _ = day_range(partitions["days"], start, inclusive="both")
+        days = partitions["days"][first:]
+    else:
+        days = np.unique(dates)
+    cells = np.searchsorted(days, dates) * len(hubs) + codes
+    shape = (len(days), len(hubs))
+
+    def total(column):
+        weights = None if column == ROWS else rows[column].to_numpy(np.float64)
+        return np.bincount(cells, weights, shape[0] * shape[1]).reshape(shape)
+
+    values = np.full((len(days), len(ANOMALY_METRICS), len(hubs)), np.nan)
+    for m, metric in enumerate(ANOMALY_METRICS.values()):
+        numerator, denominator = (total(column) for column in metric["ratio"])
+        np.divide(numerator, denominator, out=values[:, m], where=denominator > 0)
+    return {"days": days, "hubs": hubs, "values": values}
+
+
+def new_anomaly_state(hubs):
+    """
+    Empty detector state for a hub axis
+
+    Every array is metrics x hubs, except the window ring buffer (days x
+    metrics x hubs) whose running sums give the baseline in O(1) per day.
+    """
+    shape = (len(ANOMALY_METRICS), len(hubs))
+    return {
+        "hubs": hubs,
+        "day": None,
+        "last": None,
+        "slot": 0,
+        "window": np.full((ANOMALY_WINDOW,) + shape, np.nan),
+        "count": np.zeros(shape),
+        "sum": np.zeros(shape),
+        "sumsq": np.zeros(shape),
+        "ewma": np.full(shape, np.nan),
+        "cusum": np.zeros(shape),
+        "step": None,
+        "alerts": None,
+    }
+
+
+def update_anomaly_state(state, day, values):
+    """
+    Advance the detector by one day for every hub and metric at once
+
+    The day is scored against the baseline of the previous ANOMALY_WINDOW
+    days, then enters the window. Missing values (NaN) leave a hub's
+    series untouched.
+
+    Args:
+        state: Detector state (new_anomaly_state), updated in place
+        day: datetime64 of the day
+        values: Metrics x hubs ratios of the day
+
+    Returns:
+        Dict with the day's values, baseline mean and std, z-scores, EWMA
+        and CUSUM statistics and one boolean metrics x hubs array per
+        DETECTORS key under "flags"
+    """
+    direction = np.array([m["direction"] for m in ANOMALY_METRICS.values()])[:, None]
+    valid = ~np.isnan(values)
+    count = state["count"]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = state["sum"] / count
+        variance = (state["sumsq"] - state["sum"] * mean) / (count - 1)
+    std = np.sqrt(np.maximum(variance, 0.0))
+    ready = valid & (count >= ANOMALY_MIN_DAYS) & (std > 0)
+
+    z = np.zeros_like(values)
+    np.divide(values - mean, std, out=z, where=ready)
+    deviation = direction * z
+
+    # EWMA of the raw values, against steady-state limits of the baseline
+    ewma = state["ewma"]
+    smoothed = np.where(
+        np.isnan(ewma), values, EWMA_LAMBDA * values + (1 - EWMA_LAMBDA) * ewma
+    )
+    ewma = np.where(valid, smoothed, ewma)
+    ewma_limit = EWMA_LIMIT * std * np.sqrt(EWMA_LAMBDA / (2 - EWMA_LAMBDA))
+
+    # One-sided CUSUM of the z-scores in the bad direction
+    cusum = np.where(
+        ready, np.maximum(0.0, state["cusum"] + deviation - CUSUM_SLACK), state["cusum"]
+    )
+
+    flags = {
+        "zscore": ready & (deviation > ZSCORE_LIMIT),
+        "ewma": ready & (direction * (ewma - mean) > ewma_limit),
+        "cusum": cusum > CUSUM_LIMIT,
+    }
+    step = {
+        "day": day,
+        "values": values,
+        "mean": mean,
+        "std": std,
+        "z": z,
+        "ewma": ewma,
+        "cusum": cusum,
+        "flags": flags,
+    }
+
+    # Slide the window: drop the oldest day, add this one
+    window = state["window"]
+    oldest = window[state["slot"]]
+    dropped = ~np.isnan(oldest)
+    state["count"] = count - dropped + valid
+    state["sum"] = state["sum"] - np.where(dropped, oldest, 0.0)
+    state["sum"] += np.where(valid, values, 0.0)
+    state["sumsq"] = state["sumsq"] - np.where(dropped, oldest**2, 0.0)
+    state["sumsq"] += np.where(valid, values**2, 0.0)
+    window[state["slot"]] = values
+    state["slot"] = (state["slot"] + 1) % ANOMALY_WINDOW
+
+    state["ewma"] = ewma
+    state["cusum"] = np.where(flags["cusum"], 0.0, cusum)
+    state["day"] = day
+    state["last"] = values
+    state["step"] = step
+    state["alerts"] = None
+    return step
+
+
+def anomaly_alerts(step, hubs):
+    """
+    Alerts of one detector step: one per hub and metric with any signal
+
+    Critical when two or more detectors agree, warning otherwise; the most
+    extreme z-scores come first within a severity.
+
+    Returns:
+        Alerts DataFrame (see alert_detector.alerts_frame)
+    """
+    flags = np.stack(list(step["flags"].values()))
+    metrics, positions = np.nonzero(flags.any(axis=0))
+    signals = flags[:, metrics, positions]
+    severity = np.select([signals.sum(axis=0) >= 2], ["critical"], "warning")
+
+    metric_keys = list(ANOMALY_METRICS)
+    descriptions = []
+    for i, (m, h) in enumerate(zip(metrics, positions)):
+        metric = ANOMALY_METRICS[metric_keys[m]]
+        detectors = [
+            label for label, fired in zip(DETECTORS.values(), signals[:, i]) if fired
+        ]
+        descriptions.append(
+            f"{metric['label']} de {metric['format'].format(step['values'][m, h])} "
+            f"vs media de {metric['format'].format(step['mean'][m, h])} en "
+            f"{ANOMALY_WINDOW} días (z = {step['z'][m, h]:+.1f}) · "
+            f"Señales: {', '.join(detectors)}"
+        )
+
+    alerts = alerts_frame(
+        {
+            "type": severity,
+            "title": [
+                f"Anomalía en {ANOMALY_METRICS[metric_keys[m]]['label']} - {hubs[h]}"
+                for m, h in zip(metrics, positions)
+            ],
+            "description": descriptions,
+            "timestamp": np.full(len(metrics), step["day"]),
+            "metric": [metric_keys[m] for m in metrics],
+            "hub": [str(hubs[h]) for h in positions],
+            "value": step["values"][metrics, positions],
+        }
+    )
+    alerts["z"] = np.abs(step["z"][metrics, positions])
+    alerts = alerts.sort_values(["type", "z"], ascending=[True, False], kind="stable")
+    return alerts.drop(columns="z").reset_index(drop=True)
+
+
+def _continues(detector, df):
+    """Whether a frame extends the series a detector state has seen"""
+    if detector is None or detector["day"] is None:
+        return None
+    if not pd.Categorical(df["hub"]).categories.equals(detector["hubs"]):
+        return None
+    matrix = daily_hub_matrix(df, start=detector["day"])
+    if len(matrix["days"]) == 0 or matrix["days"][0] != detector["day"]:
+        return None
+    # Same values on the last day seen: the frame was advanced, not rebuilt
+    if not np.array_equal(matrix["values"][0], detector["last"], equal_nan=True):
+        return None
+    return matrix
+
+
+def get_anomaly_alerts(daily_metrics):
+    """
+    Anomaly alerts of the latest day of daily_metrics, across every hub
+
+    The detector state is kept across calls: a frame that continues the
+    last one seen (the shared dataset after a tick, see data_tick.py) only
+    feeds the new days through update_anomaly_state, and the history is
+    replayed only for a new or regenerated dataset.
+
+    Args:
+        daily_metrics: Full daily_metrics frame (every hub; filter the
+                       alerts by hub for a scope)
+
+    Returns:
+        Alerts DataFrame (see anomaly_alerts)
+    """
+    with _lock:
+        detector = _state["detector"]
+        matrix = _continues(detector, daily_metrics)
+        if matrix is None:
+            matrix = daily_hub_matrix(daily_metrics)
+            detector = new_anomaly_state(matrix["hubs"])
+            first = 0
+        else:
+            first = 1
+        for day, values in zip(matrix["days"][first:], matrix["values"][first:]):
+            update_anomaly_state(detector, day, values)
+        _state["detector"] = detector
+
+        if detector["step"] is None:
+            return alerts_frame([])
+        if detector["alerts"] is None:
+            detector["alerts"] = anomaly_alerts(detector["step"], detector["hubs"])
+        return detector["alerts"]
@@ -7,6 +7,9 @@ Future: Google SSO integration
 from datetime import datetime
 
 import streamlit as st
+from utils.filter_cache import cached_filter
+from utils.filter_engine import filter_dataset
+from utils.row_scope import apply_row_scope, get_row_scope
 
 # Dummy users database (MVP)
 # In production, this would come from a database or Google SSO
@@ -271,43 +274,106 @@ def can_access_hub(country, hub):
     return hub == user_hub
 
 
-def get_filtered_data_for_user(data):
+def get_user_scope():
     """
-    Filter data based on user's role and permissions
-    Returns filtered data dictionary
+    Data scope of the current user as a hashable (country, hub) pair
+
+    CEO (and no user) see everything: ("Todos", "Todos").
     """
     user_info = get_current_user()
-    if not user_info:
-        return data
-
-    role = user_info["role"]
+    if not user_info or user_info["role"] == "CEO":
+        return ("Todos", "Todos")
+    return (user_info.get("country", "Todos"), user_info.get("hub", "Todos"))
 
-    # CEO sees everything
-    if role == "CEO":
-        return data
 
-    # Filter based on country and hub
-    user_country = user_info.get("country", "Todos")
-    user_hub = user_info.get("hub", "Todos")
+def scope_filters(country=None, region=None, hub=None):
+    """
+    Hierarchy filters narrowed to the current user's scope
 
-    filtered_data = {}
+    Args:
+        country, region, hub: Requested levels (None = any)
 
-    for key, df in data.items():
-        if df is None or len(df) == 0:
-            filtered_data[key] = df
+    Returns:
+        Dict of country/region/hub filters, or None when the request falls
+        outside the user's scope
+    """
+    filters = {"country": country, "region": region, "hub": hub}
+    for level, value in zip(("country", "hub"), get_user_scope()):
+        if value == "Todos":
             continue
+        if filters[level] not in (None, value):
+            return None
+        filters[level] = value
+    return filters
+
 
-        # Check if dataframe has country/hub columns
-        if "country" in df.columns:
-            if user_country != "Todos":
-                df = df[df["country"] == user_country]
+def get_user_row_scope():
+    """
+    Rows of the session's shared dataset the current user may see
+
+    Built once per dataset version and user scope (see utils/row_scope.py).
+
+    Returns:
+        Row scope dict, or None for users that see every row
+    """
+    return resolve_row_scope(
+        st.session_state.data_version, st.session_state.data, get_user_scope()
+    )
 
-            if "hub" in df.columns and user_hub != "Todos":
-                df = df[df["hub"] == user_hub]
 
-        filtered_data[key] = df
+def resolve_row_scope(version, data, scope):
+    """
+    Row scope of a (country, hub) user scope over a shared dataset version
+
+    Does not read session state, so background workers can use it.
+
+    Returns:
+        Row scope dict, or None for scopes that see every row
+    """
+    user_country, user_hub = scope
+    if (user_country, user_hub) == ("Todos", "Todos"):
+        return None
+    return get_row_scope(
+        version,
+        data,
+        country=None if user_country == "Todos" else user_country,
+        hub=None if user_hub == "Todos" else user_hub,
+    )
+
+
+def scoped_dataset(version, data, scope):
+    """Shared dataset restricted to a user scope (data itself for full scopes)"""
+    row_scope = resolve_row_scope(version, data, scope)
+    return data if row_scope is None else apply_row_scope(data, row_scope)
+
+
+def get_filtered_data_for_user(data):
+    """
+    Filter data based on user's role and permissions
+    Returns filtered data dictionary
+
+    For the session's shared dataset the frames are taken from the user's
+    precomputed row scope, and results are memoized across sessions per
+    (dataset version, user scope), see utils/filter_cache.py.
+    """
+    user_country, user_hub = get_user_scope()
+
+    # CEO sees everything
+    if (user_country, user_hub) == ("Todos", "Todos"):
+        return data
 
-    return filtered_data
+    if data is not st.session_state.get("data"):
+        # Filter based on country and hub ("Todos" does not filter that level)
+        return filter_dataset(
+            data,
+            country=None if user_country == "Todos" else user_country,
+            hub=None if user_hub == "Todos" else user_hub,
+        )
+    return cached_filter(
+        st.session_state.data_version,
+        ("user", user_country, user_hub),
+        lambda: apply_row_scope(data, get_user_row_scope()),
+    )
 
 
 def get_role_description(role):
@@ -0,0 +1,446 @@
+"""
+Performance benchmarks for the data generators
+Compares the vectorized engines against the original row-by-row loops
+
+Run from the app directory:
+    python -m utils.benchmarks
+"""
+
+import random
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from config import AGENTS_PER_HUB, COUNTRIES, HUBS, REGIONS_HUBS
+from utils.data_generator import (
+    APPOINTMENT_FIRST_NAMES,
+    APPOINTMENT_LAST_NAMES,
+    APPOINTMENT_NOTES,
+    APPOINTMENT_PRIORITY,
+    APPOINTMENT_RESULT_WEIGHTS,
+    APPOINTMENT_RESULTS,
+    APPOINTMENT_STATUS_WEIGHTS,
+    APPOINTMENT_STATUSES_FUTURE,
+    APPOINTMENT_STATUSES_PAST,
+    APPOINTMENT_TIME_SLOTS,
+    APPOINTMENT_TYPES,
+    APPOINTMENT_VEHICLES,
+    COUNTRY_UNIT_ECONOMICS,
+    COUNTRY_VOLUME_SCALE,
+    MEXICO_REGION_DATA,
+    REAL_DELIVERIES_DATA,
+    DAY_NAMES_ES,
+    REGION_DAILY_SCALE,
+    generate_daily_metrics,
+    generate_region_appointments,
+    get_agenda_months,
+)
+
+
+def legacy_generate_daily_metrics(date_range):
+    """
+    Original row-by-row daily metrics loop (country → region → hub → date)
+    Kept only as the baseline for benchmark_daily_metrics
+    """
+    records = []
+
+    for country in COUNTRIES:
+        # Get country-specific unit economics
+        country_ue = COUNTRY_UNIT_ECONOMICS.get(
+            country,
+            COUNTRY_UNIT_ECONOMICS["México"],  # Default to Mexico
+        )
+        volume_scale = COUNTRY_VOLUME_SCALE.get(country, 0.2)
+
+        # Get regions for this country
+        regions = HUBS[country]  # Region names
+
+        # Get real delivery data if available for this country
+        country_deliveries = REAL_DELIVERIES_DATA.get(country, {})
+
+        for region in regions:
+            # Get all hubs for this region
+            region_hubs = REGIONS_HUBS.get(country, {}).get(region, [region])
+
+            if not region_hubs:
+                region_hubs = [region]
+
+            # Get real deliveries for this region (to distribute among hubs)
+            region_real_deliveries = country_deliveries.get(region, {})
+
+            # Get region-specific data for México
+            region_data = (
+                MEXICO_REGION_DATA.get(region, None) if country == "México" else None
+            )
+
+            # Calculate hub weights based on hub name patterns (simulate different sizes)
+            hub_weights = {}
+            for hub in region_hubs:
+                # Larger hubs get more weight
+                if any(
+                    x in hub.lower()
+                    for x in [
+                        "cdmx",
+                        "fashion",
+                        "hq",
+                        "midtown",
+                        "palermo",
+                        "pinheiros",
+                    ]
+                ):
+                    hub_weights[hub] = 1.5
+                elif any(x in hub.lower() for x in ["aliado", "carshop", "wh"]):
+                    hub_weights[hub] = 0.6
+                else:
+                    hub_weights[hub] = 1.0
+
+            total_weight = sum(hub_weights.values())
+
+            # Region scale for fallback data generation
+            if region_data:
+                region_scale = region_data["sales_pct"] * 30  # Scale factor
+            else:
+                region_scale = REGION_DAILY_SCALE.get(region, 1.0)
+
+            for hub in region_hubs:
+                # Hub's proportion of region's total
+                hub_proportion = hub_weights[hub] / total_weight
+
+                for date in date_range:
+                    month_key = date.strftime("%Y-%m")
+
+                    # Base sales/deliveries
+                    if month_key in region_real_deliveries:
+                        # Use real data distributed by hub proportion
+                        monthly_deliveries = region_real_deliveries[month_key]
+                        hub_monthly = monthly_deliveries * hub_proportion
+                        days_in_month = (
+                            date.replace(day=28) + timedelta(days=4)
+                        ).replace(day=1) - timedelta(days=1)
+                        avg_daily = hub_monthly / days_in_month.day
+                        sales = max(1, int(avg_daily * np.random.uniform(0.7, 1.3)))
+                    else:
+                        # Fallback: generate data scaled by region and hub proportion
+                        day_factor = 1 + 0.1 * np.sin(2 * np.pi * date.dayofyear / 365)
+                        trend_factor = 1 + 0.02 * (date - date_range[0]).days / len(
+                            date_range
+                        )
+
+                        # Base sales per hub
+                        base_sales = np.random.poisson(2) * hub_weights[hub]
+                        sales = max(
+                            1,
+                            int(base_sales * day_factor * trend_factor * region_scale),
+                        )
+
+                    # Calculate funnel metrics backwards from sales
+                    # Based on real efficiency: Sales/Purchases ratio
+                    efficiency_range = country_ue["efficiency"]
+                    efficiency = np.random.uniform(*efficiency_range)
+
+                    # Purchases = Sales / Efficiency (efficiency < 1 means more purchases than sales)
+                    purchases = max(1, int(sales / efficiency))
+
+                    # Funnel: Leads → Appointments (60%) → Reservations (50%) → Sales (75%)
+                    reservations = max(1, int(sales / np.random.uniform(0.70, 0.85)))
+                    appointments = max(
+                        1, int(reservations / np.random.uniform(0.45, 0.55))
+                    )
+                    leads = max(1, int(appointments / np.random.uniform(0.55, 0.65)))
+
+                    # Unit economics from real data
+                    ticket_avg = np.random.uniform(*country_ue["ticket_avg"])
+                    full_margin = np.random.uniform(*country_ue["full_margin"])
+                    fin_ins = np.random.uniform(*country_ue["fin_ins"])
+                    kt = np.random.uniform(*country_ue["kt"])
+                    pc1 = full_margin + fin_ins + kt  # PC1 = FM + F&I + KT
+                    ecac_range = country_ue["ecac"]
+                    ecac = np.random.uniform(*ecac_range)
+
+                    # NPS from real data
+                    nps_buyer = np.random.uniform(*country_ue["nps_buyer"])
+                    nps_seller = np.random.uniform(*country_ue["nps_seller"])
+                    # Average NPS for general metric
+                    nps = (nps_buyer + nps_seller) / 2
+
+                    # Cost per lead derived from eCAC
+                    # eCAC = (CPL * Leads) / Sales, so CPL = (eCAC * Sales) / Leads
+                    cost_per_lead = (ecac * sales) / leads if leads > 0 else ecac / 3
+
+                    records.append(
+                        {
+                            "date": date,
+                            "country": country,
+                            "region": region,
+                            "hub": hub,
+                            "leads": leads,
+                            "appointments": appointments,
+                            "reservations": reservations,
+                            "sales": sales,
+                            "purchases": purchases,
+                            "cancellations": int(
+                                reservations * np.random.uniform(0.05, 0.12)
+                            ),
+                            "noshow": int(appointments * np.random.uniform(0.08, 0.18)),
+                            "nps": nps,
+                            "nps_buyer": nps_buyer,
+                            "nps_seller": nps_seller,
+                            "csat": np.random.uniform(75, 92),
+                            "revenue": sales * ticket_avg,
+                            "ticket_avg": ticket_avg,
+                            "full_margin": full_margin,
+                            "fin_ins": fin_ins,
+                            "kt": kt,
+                            "pc1": pc1,
+                            "ecac": ecac,
+                            "pc1_minus_ecac": pc1 - ecac,
+                            "cost_per_lead": cost_per_lead,
+                            "sla_lead_to_sale": np.random.uniform(4, 12),
+                            "efficiency": efficiency,
+                        }
+                    )
+
+    return pd.DataFrame(records)
+
+
+def legacy_generate_hub_month_appointments(
+    month_start, country, region, hub, first_id=5000
+):
+    """
+    Original row-by-row agenda loop for one hub-month (day → appointment)
+    Kept only as the baseline for benchmark_appointments
+    """
+    appointments = []
+    appointment_id = first_id
+    today = datetime.now()
+    current_date = month_start.to_pydatetime()
+    month_end = (month_start + pd.offsets.MonthEnd(0)).to_pydatetime()
+    agent_ids = list(range(1, AGENTS_PER_HUB + 1))
+
+    while current_date <= month_end:
+        # Skip Sundays (day 6)
+        if current_date.weekday() == 6:
+            current_date += timedelta(days=1)
+            continue
+
+        # Number of appointments per day (more on weekends)
+        if current_date.weekday() == 5:  # Saturday
+            num_appointments = np.random.randint(15, 25)
+        else:
+            num_appointments = np.random.randint(10, 20)
+
+        for _ in range(num_appointments):
+            agent_id = random.choice(agent_ids)
+            appt_type = random.choice(APPOINTMENT_TYPES)
+            time_str = random.choice(APPOINTMENT_TIME_SLOTS)
+            hour, minute = map(int, time_str.split(":"))
+            appt_datetime = current_date.replace(hour=hour, minute=minute)
+
+            # Determine status based on date
+            if current_date.date() < today.date():
+                status = np.random.choice(
+                    APPOINTMENT_STATUSES_PAST, p=APPOINTMENT_STATUS_WEIGHTS["past"]
+                )
+            elif current_date.date() == today.date():
+                if appt_datetime < datetime.now():
+                    status = np.random.choice(
+                        APPOINTMENT_STATUSES_PAST,
+                        p=APPOINTMENT_STATUS_WEIGHTS["today_past"],
+                    )
+                else:
+                    status = np.random.choice(
+                        APPOINTMENT_STATUSES_FUTURE,
+                        p=APPOINTMENT_STATUS_WEIGHTS["today_future"],
+                    )
+            else:
+                status = np.random.choice(
+                    APPOINTMENT_STATUSES_FUTURE, p=APPOINTMENT_STATUS_WEIGHTS["future"]
+                )
+
+            customer_name = (
+                f"{random.choice(APPOINTMENT_FIRST_NAMES)} "
+                f"{random.choice(APPOINTMENT_LAST_NAMES)}"
+            )
+            customer_id = f"CL-{np.random.randint(1000, 9999)}"
+            customer_phone = (
+                f"+52 55 {np.random.randint(1000, 9999)} "
+                f"{np.random.randint(1000, 9999)}"
+            )
+            vehicle = random.choice(APPOINTMENT_VEHICLES)
+
+            result = None
+            if status == "Completada":
+                result = np.random.choice(
+                    APPOINTMENT_RESULTS, p=APPOINTMENT_RESULT_WEIGHTS
+                )
+
+            appointments.append(
+                {
+                    "appointment_id": f"APT-{appointment_id}",
+                    "date": current_date.date(),
+                    "time": time_str,
+                    "datetime": appt_datetime,
+                    "country": country,
+                    "region": region,
+                    "hub": hub,
+                    "agent_id": agent_id,
+                    "customer_id": customer_id,
+                    "customer_name": customer_name,
+                    "customer_phone": customer_phone,
+                    "appointment_type": appt_type["type"],
+                    "type_icon": appt_type["icon"],
+                    "duration_min": appt_type["duration_min"],
+                    "vehicle_interest": (
+                        f"{vehicle['brand']} {vehicle['model']} {vehicle['year']}"
+                    ),
+                    "vehicle_price": vehicle["price"],
+                    "status": status,
+                    "priority": APPOINTMENT_PRIORITY.get(appt_type["type"], "Normal"),
+                    "notes": random.choice(APPOINTMENT_NOTES),
+                    "result": result,
+                    "is_today": current_date.date() == today.date(),
+                    "is_past": current_date.date() < today.date(),
+                    "is_future": current_date.date() > today.date(),
+                    "week_number": current_date.isocalendar()[1],
+                    "day_of_week": current_date.strftime("%A"),
+                    "day_of_week_es": DAY_NAMES_ES[current_date.weekday()],
+                }
+            )
+            appointment_id += 1
+
+        current_date += timedelta(days=1)
+
+    return pd.DataFrame(appointments)
+
+
+def _time_call(func, *args, repeat=1):
+    """Best wall-clock time (seconds) of func(*args) over repeat runs"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def benchmark_daily_metrics(days_options=(90, 365, 1095), repeat=1, seed=42):
+    """
+    Benchmark generate_daily_metrics against the original loop
+
+    Args:
+        days_options: History lengths (in days) to benchmark
+        repeat: Runs per configuration (best time is reported)
+        seed: Seed of every run (global seed for the loop, Generator otherwise)
+
+    Returns:
+        DataFrame with rows, loop/vectorized seconds and speedup per window
+    """
+    results = []
+    end_date = datetime.now()
+
+    for days in days_options:
+        date_range = pd.date_range(
+            start=end_date - timedelta(days=days), end=end_date, freq="D"
+        )
+
+        np.random.seed(seed)
+        loop_seconds, loop_df = _time_call(
+            legacy_generate_daily_metrics, date_range, repeat=repeat
+        )
+        vector_seconds, vector_df = _time_call(
+            generate_daily_metrics,
+            date_range,
+            None,
+            np.random.default_rng(seed),
+            repeat=repeat,
+        )
+
+        # Both engines must produce the same schema
+        assert list(loop_df.columns) == list(vector_df.columns)
+        assert len(loop_df) == len(vector_df)
+
+        results.append(
+            {
+                "days": days,
+                "rows": len(vector_df),
+                "loop_seconds": loop_seconds,
+                "vectorized_seconds": vector_seconds,
+                "speedup": loop_seconds / vector_seconds if vector_seconds else None,
+            }
+        )
+
+    return pd.DataFrame(results)
+
+
+def benchmark_appointments(months_options=(1, 3), hubs=30, repeat=1, seed=42):
+    """
+    Benchmark the batched agenda generator against the original loop
+
+    Args:
+        months_options: Agenda lengths (in months) to benchmark
+        hubs: Hub-months generated per month (the agenda scales with hubs)
+        repeat: Runs per configuration (best time is reported)
+        seed: Seed of every run (global seed for the loop, Generator otherwise)
+
+    Returns:
+        DataFrame with rows, loop/vectorized seconds and speedup per length
+    """
+    results = []
+
+    for months in months_options:
+        month_starts = get_agenda_months(months)
+        hub_names = [f"Hub {i}" for i in range(hubs)]
+
+        def run_loop():
+            return pd.concat(
+                [
+                    legacy_generate_hub_month_appointments(
+                        month_start, "México", "Ciudad de México", hub
+                    )
+                    for hub in hub_names
+                    for month_start in month_starts
+                ],
+                ignore_index=True,
+            )
+
+        np.random.seed(seed)
+        random.seed(seed)
+        loop_seconds, loop_df = _time_call(run_loop, repeat=repeat)
+        vector_seconds, vector_df = _time_call(
+            generate_region_appointments,
+            "México",
+            "Ciudad de México",
+            hub_names,
+            month_starts,
+            5000,
+            None,
+            np.random.default_rng(seed),
+            repeat=repeat,
+        )
+
+        # Both engines must produce the same schema
+        assert list(loop_df.columns) == list(vector_df.columns)
+
+        results.append(
+            {
+                "months": months,
+                "hubs": hubs,
+                "rows": len(vector_df),
+                "loop_seconds": loop_seconds,
+                "vectorized_seconds": vector_seconds,
+                "speedup": loop_seconds / vector_seconds if vector_seconds else None,
+            }
+        )
+
+    return pd.DataFrame(results)
+
+
+if __name__ == "__main__":
+    print("generate_daily_metrics: loop vs vectorized")
+    print(benchmark_daily_metrics().to_string(index=False))
+    print()
+    print("appointments: loop vs batched per hub-month")
+    print(benchmark_appointments().to_string(index=False))
@@ -0,0 +1,343 @@
+"""
+Celeste Conversation Data
+Lazy, deterministic Celeste AI conversations and briefs per customer
+"""
+
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+import numpy as np
+from utils.random_streams import DATASET_SEED, choice, get_key_rng, randint, sample
+
+# Briefs kept in memory (an agent opens a handful of profiles per shift)
+CELESTE_CACHE_SIZE = 512
+
+
+def generate_celeste_conversation(
+    customer_id, vehicle_interests, score, status, rng=None, now=None
+):
+    """
+    Generate simulated Celeste AI conversation data for a customer
+
+    Args:
+        rng: np.random.Generator to draw from (a fresh one if omitted)
+        now: Reference time for relative timestamps (defaults to now)
+    """
+    rng = rng or np.random.default_rng()
+    now = now or datetime.now()
+
+    # Last interaction with Celeste
+    hours_ago = randint(rng, 1, 72)
+    last_interaction = now - timedelta(hours=hours_ago)
+
+    # Number of messages exchanged
+    messages_count = randint(rng, 5, 45)
+
+    # Budget range based on score
+    budget_options = [
+        ("$150,000 - $200,000", 175000),
+        ("$200,000 - $250,000", 225000),
+        ("$250,000 - $300,000", 275000),
+        ("$300,000 - $350,000", 325000),
+        ("$350,000 - $450,000", 400000),
+    ]
+    budget_range = choice(rng, budget_options)
+
+    # Financing interest
+    financing_options = [
+        {"interested": True, "months": 24, "down_payment_pct": 30},
+        {"interested": True, "months": 36, "down_payment_pct": 20},
+        {"interested": True, "months": 48, "down_payment_pct": 15},
+        {"interested": True, "months": 60, "down_payment_pct": 10},
+        {"interested": False, "months": 0, "down_payment_pct": 100},
+    ]
+    financing_interest = choice(rng, financing_options)
+
+    # Trade-in info
+    tradein_options = [
+        None,
+        {"brand": "Nissan", "model": "Versa", "year": 2018, "estimated_value": 95000},
+        {
+            "brand": "Toyota",
+            "model": "Corolla",
+            "year": 2019,
+            "estimated_value": 145000,
+        },
+        {"brand": "Honda", "model": "Civic", "year": 2017, "estimated_value": 125000},
+        {"brand": "Mazda", "model": "3", "year": 2020, "estimated_value": 175000},
+        {
+            "brand": "Volkswagen",
+            "model": "Jetta",
+            "year": 2018,
+            "estimated_value": 115000,
+        },
+    ]
+    tradein_info = choice(rng, tradein_options)
+
+    # Main objections/concerns
+    objection_options = [
+        "Precio inicial le pareció alto",
+        "Quiere ver el vehículo en persona antes de decidir",
+        "Dudas sobre la garantía extendida",
+        "Preocupación por el kilometraje",
+        "Necesita aprobación de financiamiento primero",
+        "Comparando con otras opciones",
+        "Tiempo de entrega muy largo",
+        "Quiere negociar el precio del trade-in",
+    ]
+    num_objections = randint(rng, 0, 3)
+    main_objections = sample(rng, objection_options, num_objections)
+
+    # Vehicles shown by Celeste
+    vehicle_brands = ["Toyota", "Honda", "Nissan", "Mazda", "Volkswagen", "Ford"]
+    vehicle_models = {
+        "SUV": ["RAV4", "CR-V", "X-Trail", "CX-5", "Tiguan", "Escape"],
+        "Sedán": ["Corolla", "Civic", "Sentra", "3", "Jetta", "Focus"],
+        "Pickup": ["Hilux", "Ridgeline", "Frontier", "BT-50", "Amarok", "Ranger"],
+        "Hatchback": ["Yaris", "Fit", "March", "2", "Polo", "Fiesta"],
+        "Premium": ["Camry", "Accord", "Altima", "6", "Passat", "Fusion"],
+    }
+
+    # Get vehicle type from interests
+    interest_type = (
+        vehicle_interests.split(",")[0].strip() if vehicle_interests else "SUV"
+    )
+    if interest_type not in vehicle_models:
+        interest_type = "SUV"
+
+    vehicles_shown = []
+    num_vehicles = randint(rng, 2, 5)
+    lotes = ["A1", "A2", "B1", "B2", "B3", "C1", "C2", "D1"]
+
+    for i in range(num_vehicles):
+        brand = choice(rng, vehicle_brands)
+        model = choice(rng, vehicle_models[interest_type])
+        year = randint(rng, 2019, 2024)
+        price = int(budget_range[1] * rng.uniform(0.85, 1.15))
+        vin = f"VIN-{randint(rng, 10000, 99999)}"
+        lote = choice(rng, lotes)
+
+        vehicles_shown.append(
+            {
+                "brand": brand,
+                "model": model,
+                "year": year,
+                "price": price,
+                "vin": vin,
+                "lote": lote,
+                "is_favorite": i == 0,  # First one is favorite
+            }
+        )
+
+    # Generate conversation summary
+    summary_templates = [
+        f"Busca {interest_type} familiar, presupuesto {budget_range[0]}",
+        f"Interesado en {interest_type}, {'con' if financing_interest['interested'] else 'sin'} financiamiento",
+        f"Cliente {'VIP' if status == 'VIP' else 'activo'} buscando {interest_type}",
+    ]
+    summary_base = choice(rng, summary_templates)
+
+    if financing_interest["interested"]:
+        summary_base += (
+            f". Preguntó por financiamiento a {financing_interest['months']} meses"
+        )
+
+    if tradein_info:
+        summary_base += f". Tiene {tradein_info['brand']} {tradein_info['model']} {tradein_info['year']} para trade-in"
+
+    if main_objections:
+        summary_base += f". Duda principal: {main_objections[0].lower()}"
+
+    # Generate recommendations for the agent
+    recommendations = []
+
+    if financing_interest["interested"]:
+        recommendations.append(
+            f"Ten preparada cotización de financiamiento a {financing_interest['months']} meses "
+            f"con enganche del {financing_interest['down_payment_pct']}%"
+        )
+
+    if tradein_info:
+        recommendations.append(
+            f"Verificar estado del trade-in ({tradein_info['brand']} {tradein_info['model']} "
+            f"{tradein_info['year']}) - valor estimado ${tradein_info['estimated_value']:,}"
+        )
+
+    if vehicles_shown:
+        fav = vehicles_shown[0]
+        recommendations.append(
+            f"Su vehículo favorito es el {fav['brand']} {fav['model']} {fav['year']} "
+            f"- está en Lote {fav['lote']}"
+        )
+
+    if "Precio" in str(main_objections):
+        recommendations.append("Sensible al precio - mencionar promociones actuales")
+
+    if "garantía" in str(main_objections).lower():
+        recommendations.append(
+            "Explicar beneficios de Kavak Total (garantía extendida)"
+        )
+
+    if score > 75:
+        recommendations.append("Cliente con alta propensión - priorizar cierre")
+
+    # Generate sample conversation messages
+    conversation_messages = generate_sample_conversation(
+        interest_type,
+        budget_range[0],
+        financing_interest,
+        tradein_info,
+        vehicles_shown,
+        rng=rng,
+        now=now,
+    )
+
+    return {
+        "conversation": conversation_messages,
+        "summary": summary_base,
+        "recommendations": recommendations,
+        "vehicles_shown": vehicles_shown,
+        "last_interaction": last_interaction,
+        "messages_count": messages_count,
+        "main_objections": main_objections,
+        "budget_range": budget_range[0],
+        "financing_interest": financing_interest,
+        "tradein_info": tradein_info,
+    }
+
+
+def generate_sample_conversation(
+    interest_type, budget, financing, tradein, vehicles, rng=None, now=None
+):
+    """Generate sample conversation messages between customer and Celeste"""
+    rng = rng or np.random.default_rng()
+    now = now or datetime.now()
+    messages = []
+
+    # Opening
+    messages.append(
+        {
+            "sender": "customer",
+            "message": f"Hola, estoy buscando un {interest_type}",
+            "timestamp": now - timedelta(hours=randint(rng, 2, 48)),
+        }
+    )
+
+    messages.append(
+        {
+            "sender": "celeste",
+            "message": f"¡Hola! Soy Celeste, tu asesora virtual de Kavak. "
+            f"Me encanta ayudarte a encontrar tu {interest_type} ideal. "
+            f"¿Tienes algún presupuesto en mente?",
+            "timestamp": now - timedelta(hours=randint(rng, 2, 48)),
+        }
+    )
+
+    messages.append(
+        {
+            "sender": "customer",
+            "message": f"Sí, estoy pensando en algo entre {budget}",
+            "timestamp": now - timedelta(hours=randint(rng, 1, 24)),
+        }
+    )
+
+    if financing and financing.get("interested"):
+        messages.append(
+            {
+                "sender": "customer",
+                "message": f"¿Tienen opciones de financiamiento? Me interesaría a {financing['months']} meses",
+                "timestamp": now - timedelta(hours=randint(rng, 1, 12)),
+            }
+        )
+
+        messages.append(
+            {
+                "sender": "celeste",
+                "message": f"¡Claro! Tenemos excelentes opciones de financiamiento. "
+                f"A {financing['months']} meses con un enganche del {financing['down_payment_pct']}% "
+                f"tendrías mensualidades muy accesibles. ¿Te gustaría ver una cotización detallada?",
+                "timestamp": now - timedelta(hours=randint(rng, 1, 12)),
+            }
+        )
+
+    if tradein:
+        messages.append(
+            {
+                "sender": "customer",
+                "message": f"Tengo un {tradein['brand']} {tradein['model']} {tradein['year']} "
+                f"que me gustaría dar a cuenta",
+                "timestamp": now - timedelta(hours=randint(rng, 1, 6)),
+            }
+        )
+
+        messages.append(
+            {
+                "sender": "celeste",
+                "message": f"¡Perfecto! El trade-in es una excelente opción. "
+                f"Tu {tradein['brand']} {tradein['model']} {tradein['year']} podría tener "
+                f"un valor estimado de ${tradein['estimated_value']:,}. "
+                f"Un especialista lo evaluará cuando vengas al hub.",
+                "timestamp": now - timedelta(hours=randint(rng, 1, 6)),
+            }
+        )
+
+    if vehicles:
+        fav = vehicles[0]
+        messages.append(
+            {
+                "sender": "celeste",
+                "message": f"Basado en lo que me cuentas, te recomiendo ver el "
+                f"{fav['brand']} {fav['model']} {fav['year']} a ${fav['price']:,}. "
+                f"Tiene excelentes reviews y está dentro de tu presupuesto.",
+                "timestamp": now - timedelta(hours=randint(rng, 1, 3)),
+            }
+        )
+
+        messages.append(
+            {
+                "sender": "customer",
+                "message": "Se ve muy bien, me gustaría verlo en persona",
+                "timestamp": now - timedelta(hours=randint(rng, 0, 2)),
+            }
+        )
+
+        messages.append(
+            {
+                "sender": "celeste",
+                "message": f"¡Excelente! Te agendo una cita en el hub. "
+                f"El {fav['brand']} {fav['model']} está disponible en el Lote {fav['lote']}. "
+                f"¿Qué día te queda mejor?",
+                "timestamp": now - timedelta(hours=randint(rng, 0, 1)),
+            }
+        )
+
+    return messages
+
+
+@lru_cache(maxsize=CELESTE_CACHE_SIZE)
+def get_celeste_data(
+    customer_key, vehicle_interests, score, status, anchor, seed=DATASET_SEED
+):
+    """
+    Celeste conversation and brief for one customer, generated on first use
+
+    Deterministic for a given customer, anchor time and dataset seed (the
+    customer's own stream, see random_streams.get_key_rng), so the content
+    is the same on every rerun and for every session; cached with a bounded
+    LRU.
+
+    Args:
+        customer_key: Integer customer id
+        vehicle_interests: Customer's comma-separated segments of interest
+        score: Customer score (propensity to buy)
+        status: Customer status
+        anchor: Reference time for relative timestamps (e.g. start of today)
+        seed: Root seed of the dataset
+
+    Returns:
+        Dict as returned by generate_celeste_conversation (treat as read-only)
+    """
+    rng = get_key_rng("customers", "celeste", customer_key, seed)
+    return generate_celeste_conversation(
+        customer_key, vehicle_interests, score, status, rng=rng, now=anchor
+    )
@@ -2,6 +2,8 @@
 Reusable UI components for Streamlit
 """
 
+from datetime import datetime
+
 import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
@@ -448,7 +450,7 @@ def render_metric_comparison(
             st.markdown(f"### :red[↓ {delta_pct:.1f}%]")
 
 
-def render_alert_box(alert_type, title, description, timestamp=None):
+def render_alert_box(alert_type, title, description, timestamp=None, new=False):
     """
     Render an alert box with styling
 
@@ -456,12 +458,21 @@ def render_alert_box(alert_type, title, description, timestamp=None):
         alert_type: 'critical', 'warning', or 'info'
         title: Alert title
         description: Alert description
-        timestamp: Optional timestamp
+        timestamp: Optional timestamp (when the alert fired)
+        new: Whether the alert fired in the last evaluation
     """
     icons = {"critical": "🚨", "warning": "⚠️", "info": "ℹ️"}
 
     icon = icons.get(alert_type, "ℹ️")
-    timestamp_str = f" - {timestamp.strftime('%H:%M')}" if timestamp else ""
+    timestamp_str = ""
+    if timestamp:
+        # Alerts from the alert store may have fired on an earlier day
+        time_format = (
+            "%H:%M" if timestamp.date() == datetime.now().date() else "%d/%m %H:%M"
+        )
+        timestamp_str = f" - {timestamp.strftime(time_format)}"
+    if new:
+        timestamp_str += " · 🆕 Nueva"
 
     st.markdown(
         f"""
@@ -474,6 +485,34 @@ def render_alert_box(alert_type, title, description, timestamp=None):
     )
 
 
+def render_freshness_caption(
+    evaluated_at, refreshing=False, label="Evaluadas", error=None
+):
+    """
+    Render how long ago a background result was computed
+
+    Args:
+        evaluated_at: Datetime of the evaluation
+        refreshing: Whether a newer evaluation is on its way
+        label: Caption prefix
+        error: Failure of the last background evaluation (the result shown
+               is the previous one), None if it succeeded
+    """
+    if error:
+        st.warning(
+            f"⚠️ No se pudo actualizar ({error}); se muestra el resultado anterior"
+        )
+    seconds = max(0, int((datetime.now() - evaluated_at).total_seconds()))
+    if seconds < 60:
+        age = f"{seconds} s"
+    elif seconds < 3600:
+        age = f"{seconds // 60} min"
+    else:
+        age = f"{seconds // 3600} h"
+    status = " · actualizando…" if refreshing else ""
+    st.caption(f"🕒 {label} hace {age}{status}")
+
+
 def render_funnel_chart(stages, values, title="Funnel de Conversión"):
     """
     Render a funnel chart
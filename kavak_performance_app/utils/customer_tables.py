@@ -0,0 +1,265 @@
+"""
+Customer Side Tables
+Flat customer frame plus columnar side tables keyed by integer customer id
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from utils.celeste_data import get_celeste_data
+from utils.random_streams import DATASET_SEED, get_key_rng
+
+# Nested customer columns moved out of the customers frame
+NESTED_COLUMNS = ["transactions"]
+
+# Side table name -> columns (every table starts with customer_key and is
+# stored sorted by it)
+SIDE_TABLES = {
+    "customer_transactions": [
+        "customer_key",
+        "transaction_id",
+        "date",
+        "type",
+        "vehicle",
+        "vehicle_price",
+        "ancillaries_total",
+        "total_amount",
+        "financing",
+        "down_payment",
+        "cancel_reason",
+        "stage",
+    ],
+    "transaction_ancillaries": [
+        "customer_key",
+        "transaction_id",
+        "name",
+        "price",
+        "category",
+    ],
+    "customer_interactions": [
+        "customer_key",
+        "timestamp",
+        "interaction_type",
+        "note",
+        "agent_name",
+    ],
+}
+
+# Interaction log: one entry per call/message/visit counted on the customer
+INTERACTION_COUNTERS = {
+    "num_calls": "Llamada",
+    "num_messages": "WhatsApp",
+    "num_visits": "Visita Hub",
+}
+
+INTERACTION_NOTES = {
+    "Llamada": [
+        "Cliente interesado en ver vehículos este fin de semana",
+        "Seguimiento sobre cotización enviada",
+        "Respondió preguntas sobre financiamiento",
+        "No contestó - dejar mensaje",
+    ],
+    "WhatsApp": [
+        "Envió fotos de vehículos de interés",
+        "Preguntó sobre disponibilidad",
+        "Solicitó agendar cita",
+        "Compartió documentación para pre-aprobación",
+    ],
+    "Visita Hub": [
+        "Cliente visitó showroom - vio 3 vehículos",
+        "Realizó test drive de SUV",
+        "Dejó documentos para evaluación",
+        "Agendó segunda visita",
+    ],
+}
+
+INTERACTION_AGENTS = ["Juan García", "María López", "Carlos Pérez", "Ana Martínez"]
+
+
+def customer_key_from_id(customer_id):
+    """Integer key of a customer id ("CL-1042" -> 1042)"""
+    return int(str(customer_id).rsplit("-", 1)[-1])
+
+
+# =============================================================================
+# NORMALIZATION
+# =============================================================================
+
+
+def _build_interactions(customers, keys, now, seed=DATASET_SEED):
+    """
+    Build the interactions log for a chunk of customers
+
+    Each customer draws from its own stream (random_streams.get_key_rng), so
+    the log follows the dataset seed without consuming the customers'
+    stream, and does not depend on how customers are chunked.
+    """
+    counts = customers[list(INTERACTION_COUNTERS)].to_numpy()
+    max_days = np.maximum(customers["days_since_registration"].to_numpy(), 2)
+    agents = np.array(INTERACTION_AGENTS, dtype=object)
+    columns = {name: [] for name in SIDE_TABLES["customer_interactions"]}
+
+    for key, customer_counts, days in zip(keys, counts, max_days):
+        rng = get_key_rng("customers", "customer_interactions", key, seed)
+        for interaction_type, rows in zip(
+            INTERACTION_COUNTERS.values(), customer_counts
+        ):
+            if rows == 0:
+                continue
+            notes = np.array(INTERACTION_NOTES[interaction_type], dtype=object)
+            minutes_ago = rng.integers(1, days, rows) * 1440 - rng.integers(
+                0, 1440, rows
+            )
+            columns["customer_key"].append(np.full(rows, key, dtype=np.int64))
+            columns["timestamp"].append(minutes_ago)
+            columns["interaction_type"].append(
+                np.full(rows, interaction_type, dtype=object)
+            )
+            columns["note"].append(notes[rng.integers(0, len(notes), rows)])
+            columns["agent_name"].append(agents[rng.integers(0, len(agents), rows)])
+
+    if not columns["customer_key"]:
+        return pd.DataFrame(columns=SIDE_TABLES["customer_interactions"])
+
+    interactions = pd.DataFrame(
+        {name: np.concatenate(values) for name, values in columns.items()}
+    )
+    interactions["timestamp"] = now - pd.to_timedelta(
+        interactions["timestamp"], unit="min"
+    )
+
+    # Newest first within each customer, customers in key order
+    return interactions.sort_values(
+        ["customer_key", "timestamp"], ascending=[True, False], kind="stable"
+    ).reset_index(drop=True)
+
+
+def normalize_customers(customers, now=None, seed=DATASET_SEED):
+    """
+    Split a customers frame with nested objects into a flat frame + side tables
+
+    Args:
+        customers: DataFrame as produced by the customer generator (one row
+                   per customer with lists/dicts in the NESTED_COLUMNS)
+        now: Reference time for the interaction timestamps (defaults to now)
+        seed: Root seed of the dataset (interaction streams)
+
+    Returns:
+        Dict with "customers" (flat) and one DataFrame per SIDE_TABLES entry
+    """
+    keys = customers["customer_id"].map(customer_key_from_id).to_numpy(np.int64)
+    rows = {name: [] for name in SIDE_TABLES if name != "customer_interactions"}
+
+    for key, record in zip(keys, customers[NESTED_COLUMNS].itertuples(index=False)):
+        for transaction in record.transactions:
+            rows["customer_transactions"].append({"customer_key": key, **transaction})
+            for ancillary in transaction.get("ancillaries", []):
+                rows["transaction_ancillaries"].append(
+                    {
+                        "customer_key": key,
+                        "transaction_id": transaction["transaction_id"],
+                        **ancillary,
+                    }
+                )
+
+    flat = customers.drop(columns=NESTED_COLUMNS)
+    flat.insert(1, "customer_key", keys)
+
+    tables = {"customers": flat}
+    for name, table_rows in rows.items():
+        tables[name] = pd.DataFrame(table_rows, columns=SIDE_TABLES[name])
+
+    # Cancellations carry no financing flag; store them as not financed
+    transactions = tables["customer_transactions"]
+    transactions["financing"] = transactions["financing"].fillna(False).astype(bool)
+    tables["customer_interactions"] = _build_interactions(
+        customers, keys, now or datetime.now(), seed
+    )
+    return tables
+
+
+# =============================================================================
+# LOOKUPS
+# =============================================================================
+
+
+def get_customer_rows(table, customer_key):
+    """
+    Rows of a side table for one customer
+
+    Side tables are sorted by customer_key, so this is a binary search plus a
+    slice (no scan of the table).
+    """
+    if table is None or len(table) == 0:
+        return pd.DataFrame(columns=[] if table is None else table.columns)
+    keys = table["customer_key"].to_numpy()
+    start, stop = np.searchsorted(keys, [customer_key, customer_key + 1])
+    return table.iloc[start:stop]
+
+
+def get_customer_row(customers, customer_id):
+    """Row of the customers frame for a customer id (None if not found)"""
+    try:
+        customer_key = customer_key_from_id(customer_id)
+    except ValueError:
+        return None
+    rows = get_customer_rows(customers, customer_key)
+    if len(rows) == 0:
+        return None
+    return rows.iloc[0]
+
+
+def get_customer_record(data, customer_id, now, seed=DATASET_SEED):
+    """
+    Full customer dict for the profile/copilot views
+
+    Combines the flat customer row with the customer's Celeste conversation
+    and brief (celeste_conversation, celeste_summary, celeste_vehicles_shown,
+    celeste_main_objections, celeste_recommendations, ...), which are only
+    generated the first time someone opens that customer, from the
+    customer's stream of the dataset seed.
+
+    Args:
+        data: Dataset dict
+        customer_id: Customer id ("CL-1042")
+        now: Current time of the dataset (data_store.get_data_now), so the
+             conversation lines up with the customer's own dates
+        seed: Root seed of the dataset
+
+    Returns:
+        Dict, or None when the customer does not exist
+    """
+    row = get_customer_row(data.get("customers"), customer_id)
+    if row is None:
+        return None
+
+    record = row.to_dict()
+
+    # Anchored to the start of the dataset's day so timestamps are stable
+    # across reruns
+    celeste = get_celeste_data(
+        int(record["customer_key"]),
+        record["vehicle_interests"],
+        int(record["customer_score"]),
+        str(record["status"]),
+        pd.Timestamp(now).normalize().to_pydatetime(),
+        seed,
+    )
+
+    # Copy the lists so a view cannot alter the cached brief
+    record.update(
+        {
+            "celeste_conversation": list(celeste["conversation"]),
+            "celeste_summary": celeste["summary"],
+            "celeste_recommendations": list(celeste["recommendations"]),
+            "celeste_vehicles_shown": list(celeste["vehicles_shown"]),
+            "celeste_last_interaction": celeste["last_interaction"],
+            "celeste_messages_count": celeste["messages_count"],
+            "celeste_main_objections": list(celeste["main_objections"]),
+            "celeste_budget_range": celeste["budget_range"],
+            "celeste_financing_interest": celeste["financing_interest"],
+            "celeste_tradein_info": celeste["tradein_info"],
+        }
+    )
+    return record
@@ -4,12 +4,22 @@ Uses real delivery data and unit economics from actual Kavak dashboards
 """
 
 import os
-import random
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 
 import numpy as np
 import pandas as pd
 from config import AGENTS_PER_HUB, COUNTRIES, HUBS, REGIONS_HUBS, VEHICLE_SEGMENTS
+from utils.customer_tables import normalize_customers
+from utils.random_streams import (
+    DATASET_NAMES,
+    DATASET_SEED,
+    choice,
+    get_dataset_rng,
+    randint,
+    sample,
+)
+from utils.schema import apply_schema
 
 # =============================================================================
 # REAL DATA CONSTANTS - Based on actual Kavak dashboard (December 2024)
@@ -194,238 +204,366 @@ REAL_DELIVERIES_DATA = {
 }
 
 
-def generate_sample_data():
+# =============================================================================
+# SCALE - Synthetic footprint multiplier for load testing
+# =============================================================================
+
+# Baseline footprint (scale = 1)
+BASE_HISTORY_DAYS = 90
+BASE_HUBS_PER_REGION = 3  # Hubs sampled per region for agents/customers/agenda
+
+# Target rows per daily_metrics chunk when streaming large scales
+DAILY_METRICS_CHUNK_ROWS = 500_000
+
+
+def get_data_scale():
+    """Read the data scale factor from KAVAK_DATA_SCALE (defaults to 1)"""
+    return float(os.environ.get("KAVAK_DATA_SCALE", 1))
+
+
+def get_scale_profile(scale=1.0):
     """
-    Generate comprehensive sample data for the application
+    Translate a scale factor into concrete generator sizes
+
+    Hubs (and with them agents, customers and appointments) are multiplied by
+    round(scale) by replicating each region's hub list; history days are
+    multiplied by scale.
     """
-    np.random.seed(42)
-    random.seed(42)
-
-    # Date range: last 90 days
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=90)
-    date_range = pd.date_range(start=start_date, end=end_date, freq="D")
-
-    data = {
-        "daily_metrics": generate_daily_metrics(date_range),
-        "agent_performance": generate_agent_performance(),
-        "inventory": generate_inventory_data(),
-        "funnel": generate_funnel_data(date_range),
-        "alerts": generate_alerts(),
-        "customers": generate_customer_data(),
-        "appointments": generate_appointments_data(),  # NEW: Citas/Agenda
-        "kavakos": generate_kavakos_data(),  # NEW: Lista de Kavakos
+    if scale <= 0:
+        raise ValueError(f"scale must be positive, got {scale}")
+
+    hub_replicas = max(1, int(round(scale)))
+    return {
+        "scale": scale,
+        "hub_replicas": hub_replicas,
+        "hubs_per_region": BASE_HUBS_PER_REGION * hub_replicas,
+        "history_days": max(1, int(round(BASE_HISTORY_DAYS * scale))),
     }
 
-    return data
 
+def get_region_hubs(country, region, scale=1.0):
+    """
+    Get the hubs of a region, replicated according to the scale factor
 
-def generate_daily_metrics(date_range):
+    Replicas keep the original name with a " #n" suffix so they stay inside
+    the same country/region.
     """
-    Generate daily aggregated metrics by country, region and hub.
-    Uses real unit economics data from actual Kavak dashboards.
-    Data is generated at HUB level (most granular), so aggregating by region
-    will correctly sum all hubs within that region.
+    region_hubs = REGIONS_HUBS.get(country, {}).get(region, [region]) or [region]
+    replicas = get_scale_profile(scale)["hub_replicas"]
+    return list(region_hubs) + [
+        f"{hub} #{i}" for i in range(2, replicas + 1) for hub in region_hubs
+    ]
+
+
+def get_history_date_range(scale=1.0, end_date=None):
+    """Date range covered by daily_metrics for the given scale"""
+    end_date = end_date or datetime.now()
+    start_date = end_date - timedelta(days=get_scale_profile(scale)["history_days"])
+    return pd.date_range(start=start_date, end=end_date, freq="D")
+
+
+def _concat_chunks(chunks):
+    """Concatenate streamed DataFrame chunks into a single frame"""
+    frames = list(chunks)
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def generate_sample_data(
+    scale=None, compact=True, workers=None, seed=DATASET_SEED, now=None
+):
     """
-    records = []
+    Generate comprehensive sample data for the application
 
-    for country in COUNTRIES:
-        # Get country-specific unit economics
-        country_ue = COUNTRY_UNIT_ECONOMICS.get(
-            country,
-            COUNTRY_UNIT_ECONOMICS["México"],  # Default to Mexico
-        )
-        volume_scale = COUNTRY_VOLUME_SCALE.get(country, 0.2)
+    Each dataset draws from its own Generator spawned from SeedSequence(seed)
+    and every generator shares the same reference time, so the result is
+    identical whatever the number of workers.
+
+    Args:
+        scale: Footprint multiplier (defaults to KAVAK_DATA_SCALE or 1)
+        compact: Apply the compact dtypes of utils/schema.py
+        workers: Processes building datasets concurrently (defaults to
+                 KAVAK_DATA_WORKERS or 1, i.e. in-process)
+        seed: Root seed of the dataset streams
+        now: Reference time (defaults to now)
+    """
+    if scale is None:
+        scale = get_data_scale()
+    if workers is None:
+        workers = get_generation_workers()
+    now = now or datetime.now()
+
+    data = {}
+    for tables in _map_datasets(scale, now, seed, compact, workers):
+        data.update(tables)
+    return data
 
-        # Get regions for this country
-        regions = HUBS[country]  # Region names
 
-        # Get real delivery data if available for this country
-        country_deliveries = REAL_DELIVERIES_DATA.get(country, {})
+# Region daily sales scale used when there is no real delivery data for a month
+REGION_DAILY_SCALE = {
+    # México - regiones específicas (based on real MTD data)
+    "Ciudad de México": 10.0,  # ~303 MTD = ~10/day
+    "Guadalajara": 1.4,  # ~41 MTD
+    "Monterrey": 1.2,  # ~36 MTD
+    "Puebla": 0.8,  # ~24 MTD
+    "Querétaro": 0.77,  # ~23 MTD
+    "Cuernavaca": 1.17,  # ~35 MTD
+    "León": 0.33,  # ~10 MTD
+    "San Luis Potosí": 0.27,  # ~8 MTD
+    # Otros países - la región es el país
+    "Brasil": 3.7,  # ~110 MTD
+    "Argentina": 3.3,  # ~98 MTD
+    "Chile": 3.5,  # ~106 MTD
+}
 
-        for region in regions:
-            # Get all hubs for this region
-            region_hubs = REGIONS_HUBS.get(country, {}).get(region, [region])
 
-            if not region_hubs:
-                region_hubs = [region]
+def get_hub_weight(hub):
+    """Relative size of a hub based on its name (simulates different hub sizes)"""
+    hub_lower = hub.lower()
+    # Larger hubs get more weight
+    if any(
+        x in hub_lower
+        for x in ["cdmx", "fashion", "hq", "midtown", "palermo", "pinheiros"]
+    ):
+        return 1.5
+    elif any(x in hub_lower for x in ["aliado", "carshop", "wh"]):
+        return 0.6
+    return 1.0
 
-            # Get real deliveries for this region (to distribute among hubs)
-            region_real_deliveries = country_deliveries.get(region, {})
 
-            # Get region-specific data for México
-            region_data = (
-                MEXICO_REGION_DATA.get(region, None) if country == "México" else None
-            )
+def build_hub_catalog(scale=1.0):
+    """
+    Build the flat hub catalog used by the daily metrics engine
 
-            # Calculate hub weights based on hub name patterns (simulate different sizes)
-            hub_weights = {}
-            for hub in region_hubs:
-                # Larger hubs get more weight
-                if any(
-                    x in hub.lower()
-                    for x in [
-                        "cdmx",
-                        "fashion",
-                        "hq",
-                        "midtown",
-                        "palermo",
-                        "pinheiros",
-                    ]
-                ):
-                    hub_weights[hub] = 1.5
-                elif any(x in hub.lower() for x in ["aliado", "carshop", "wh"]):
-                    hub_weights[hub] = 0.6
-                else:
-                    hub_weights[hub] = 1.0
+    Returns:
+        DataFrame with one row per (country, region, hub) in config order,
+        plus the hub weight, its share of the region and the region scale
+    """
+    records = []
 
-            total_weight = sum(hub_weights.values())
+    for country in COUNTRIES:
+        for region in HUBS[country]:
+            region_hubs = get_region_hubs(country, region, scale)
 
             # Region scale for fallback data generation
+            region_data = (
+                MEXICO_REGION_DATA.get(region, None) if country == "México" else None
+            )
             if region_data:
                 region_scale = region_data["sales_pct"] * 30  # Scale factor
             else:
-                region_scale = {
-                    # México - regiones específicas (based on real MTD data)
-                    "Ciudad de México": 10.0,  # ~303 MTD = ~10/day
-                    "Guadalajara": 1.4,  # ~41 MTD
-                    "Monterrey": 1.2,  # ~36 MTD
-                    "Puebla": 0.8,  # ~24 MTD
-                    "Querétaro": 0.77,  # ~23 MTD
-                    "Cuernavaca": 1.17,  # ~35 MTD
-                    "León": 0.33,  # ~10 MTD
-                    "San Luis Potosí": 0.27,  # ~8 MTD
-                    # Otros países - la región es el país
-                    "Brasil": 3.7,  # ~110 MTD
-                    "Argentina": 3.3,  # ~98 MTD
-                    "Chile": 3.5,  # ~106 MTD
-                }.get(region, 1.0)
-
-            for hub in region_hubs:
-                # Hub's proportion of region's total
-                hub_proportion = hub_weights[hub] / total_weight
-
-                for date in date_range:
-                    month_key = date.strftime("%Y-%m")
-
-                    # Base sales/deliveries
-                    if month_key in region_real_deliveries:
-                        # Use real data distributed by hub proportion
-                        monthly_deliveries = region_real_deliveries[month_key]
-                        hub_monthly = monthly_deliveries * hub_proportion
-                        days_in_month = (
-                            date.replace(day=28) + timedelta(days=4)
-                        ).replace(day=1) - timedelta(days=1)
-                        avg_daily = hub_monthly / days_in_month.day
-                        sales = max(1, int(avg_daily * np.random.uniform(0.7, 1.3)))
-                    else:
-                        # Fallback: generate data scaled by region and hub proportion
-                        day_factor = 1 + 0.1 * np.sin(2 * np.pi * date.dayofyear / 365)
-                        trend_factor = 1 + 0.02 * (date - date_range[0]).days / len(
-                            date_range
-                        )
+                region_scale = REGION_DAILY_SCALE.get(region, 1.0)
 
-                        # Base sales per hub
-                        base_sales = np.random.poisson(2) * hub_weights[hub]
-                        sales = max(
-                            1,
-                            int(base_sales * day_factor * trend_factor * region_scale),
-                        )
+            weights = [get_hub_weight(hub) for hub in region_hubs]
+            total_weight = sum(weights)
 
-                    # Calculate funnel metrics backwards from sales
-                    # Based on real efficiency: Sales/Purchases ratio
-                    efficiency_range = country_ue["efficiency"]
-                    efficiency = np.random.uniform(*efficiency_range)
+            for hub, weight in zip(region_hubs, weights):
+                records.append(
+                    {
+                        "country": country,
+                        "region": region,
+                        "hub": hub,
+                        "hub_weight": weight,
+                        "hub_proportion": weight / total_weight,
+                        "region_scale": region_scale,
+                    }
+                )
 
-                    # Purchases = Sales / Efficiency (efficiency < 1 means more purchases than sales)
-                    purchases = max(1, int(sales / efficiency))
+    return pd.DataFrame(records)
 
-                    # Funnel: Leads → Appointments (60%) → Reservations (50%) → Sales (75%)
-                    reservations = max(1, int(sales / np.random.uniform(0.70, 0.85)))
-                    appointments = max(
-                        1, int(reservations / np.random.uniform(0.45, 0.55))
-                    )
-                    leads = max(1, int(appointments / np.random.uniform(0.55, 0.65)))
-
-                    # Unit economics from real data
-                    ticket_avg = np.random.uniform(*country_ue["ticket_avg"])
-                    full_margin = np.random.uniform(*country_ue["full_margin"])
-                    fin_ins = np.random.uniform(*country_ue["fin_ins"])
-                    kt = np.random.uniform(*country_ue["kt"])
-                    pc1 = full_margin + fin_ins + kt  # PC1 = FM + F&I + KT
-                    ecac_range = country_ue["ecac"]
-                    ecac = np.random.uniform(*ecac_range)
-
-                    # NPS from real data
-                    nps_buyer = np.random.uniform(*country_ue["nps_buyer"])
-                    nps_seller = np.random.uniform(*country_ue["nps_seller"])
-                    # Average NPS for general metric
-                    nps = (nps_buyer + nps_seller) / 2
-
-                    # Cost per lead derived from eCAC
-                    # eCAC = (CPL * Leads) / Sales, so CPL = (eCAC * Sales) / Leads
-                    cost_per_lead = (ecac * sales) / leads if leads > 0 else ecac / 3
-
-                    records.append(
-                        {
-                            "date": date,
-                            "country": country,
-                            "region": region,
-                            "hub": hub,
-                            "leads": leads,
-                            "appointments": appointments,
-                            "reservations": reservations,
-                            "sales": sales,
-                            "purchases": purchases,
-                            "cancellations": int(
-                                reservations * np.random.uniform(0.05, 0.12)
-                            ),
-                            "noshow": int(appointments * np.random.uniform(0.08, 0.18)),
-                            "nps": nps,
-                            "nps_buyer": nps_buyer,
-                            "nps_seller": nps_seller,
-                            "csat": np.random.uniform(75, 92),
-                            "revenue": sales * ticket_avg,
-                            "ticket_avg": ticket_avg,
-                            "full_margin": full_margin,
-                            "fin_ins": fin_ins,
-                            "kt": kt,
-                            "pc1": pc1,
-                            "ecac": ecac,
-                            "pc1_minus_ecac": pc1 - ecac,
-                            "cost_per_lead": cost_per_lead,
-                            "sla_lead_to_sale": np.random.uniform(4, 12),
-                            "efficiency": efficiency,
-                        }
-                    )
 
-    return pd.DataFrame(records)
+def _uniform_by_country(rng, country_idx, ue_ranges, key):
+    """Draw one uniform value per row using the row's country range for key"""
+    low = np.array([r[key][0] for r in ue_ranges])[country_idx]
+    high = np.array([r[key][1] for r in ue_ranges])[country_idx]
+    return rng.uniform(low, high)
+
+
+def generate_daily_metrics(date_range, hub_catalog=None, rng=None):
+    """
+    Generate daily aggregated metrics by country, region and hub.
+    Uses real unit economics data from actual Kavak dashboards.
+    Data is generated at HUB level (most granular), so aggregating by region
+    will correctly sum all hubs within that region.
 
+    The hub × date grid is built as flat arrays (hub-major, same row order as
+    the original nested loops) and every metric is drawn with one vectorized
+    call per column.
 
-def generate_agent_performance():
+    Args:
+        date_range: Dates to generate
+        hub_catalog: Hubs to generate (see build_hub_catalog)
+        rng: np.random.Generator (defaults to the daily_metrics stream)
+    """
+    if hub_catalog is None:
+        hub_catalog = build_hub_catalog()
+    if rng is None:
+        rng = get_dataset_rng("daily_metrics")
+
+    dates = pd.DatetimeIndex(date_range)
+    num_hubs = len(hub_catalog)
+    num_dates = len(dates)
+    n = num_hubs * num_dates
+
+    # Hub-level attributes repeated over the date axis
+    hub_idx = np.repeat(np.arange(num_hubs), num_dates)
+    date_idx = np.tile(np.arange(num_dates), num_hubs)
+
+    countries = hub_catalog["country"].to_numpy()
+    regions = hub_catalog["region"].to_numpy()
+    country_names = list(dict.fromkeys(countries))
+    ue_ranges = [
+        COUNTRY_UNIT_ECONOMICS.get(c, COUNTRY_UNIT_ECONOMICS["México"])
+        for c in country_names
+    ]
+    country_idx = pd.Index(country_names).get_indexer(countries)[hub_idx]
+
+    hub_weight = hub_catalog["hub_weight"].to_numpy()[hub_idx]
+    hub_proportion = hub_catalog["hub_proportion"].to_numpy()[hub_idx]
+    region_scale = hub_catalog["region_scale"].to_numpy()[hub_idx]
+
+    # Real monthly deliveries per (hub, month) where available, NaN otherwise
+    month_keys = dates.strftime("%Y-%m")
+    unique_months, month_idx = np.unique(month_keys, return_inverse=True)
+    real_by_hub_month = np.full((num_hubs, len(unique_months)), np.nan)
+    for h in range(num_hubs):
+        region_real = REAL_DELIVERIES_DATA.get(countries[h], {}).get(regions[h], {})
+        for m, month_key in enumerate(unique_months):
+            if month_key in region_real:
+                real_by_hub_month[h, m] = region_real[month_key]
+    monthly_deliveries = real_by_hub_month[hub_idx, month_idx[date_idx]]
+    has_real = ~np.isnan(monthly_deliveries)
+
+    # Base sales/deliveries
+    # Real data distributed by hub proportion
+    days_in_month = dates.days_in_month.to_numpy()[date_idx]
+    avg_daily = np.nan_to_num(monthly_deliveries) * hub_proportion / days_in_month
+    real_sales = avg_daily * rng.uniform(0.7, 1.3, n)
+
+    # Fallback: generate data scaled by region and hub proportion
+    day_factor = 1 + 0.1 * np.sin(2 * np.pi * dates.dayofyear.to_numpy() / 365)
+    trend_factor = 1 + 0.02 * (dates - dates[0]).days.to_numpy() / num_dates
+    base_sales = rng.poisson(2, n) * hub_weight
+    fallback_sales = (
+        base_sales * day_factor[date_idx] * trend_factor[date_idx] * region_scale
+    )
+
+    sales = np.maximum(
+        1, np.where(has_real, real_sales, fallback_sales).astype(np.int64)
+    )
+
+    # Calculate funnel metrics backwards from sales
+    # Based on real efficiency: Sales/Purchases ratio
+    efficiency = _uniform_by_country(rng, country_idx, ue_ranges, "efficiency")
+
+    # Purchases = Sales / Efficiency (efficiency < 1 means more purchases than sales)
+    purchases = np.maximum(1, (sales / efficiency).astype(np.int64))
+
+    # Funnel: Leads → Appointments (60%) → Reservations (50%) → Sales (75%)
+    reservations = np.maximum(1, (sales / rng.uniform(0.70, 0.85, n)).astype(np.int64))
+    appointments = np.maximum(
+        1, (reservations / rng.uniform(0.45, 0.55, n)).astype(np.int64)
+    )
+    leads = np.maximum(1, (appointments / rng.uniform(0.55, 0.65, n)).astype(np.int64))
+
+    # Unit economics from real data
+    ticket_avg = _uniform_by_country(rng, country_idx, ue_ranges, "ticket_avg")
+    full_margin = _uniform_by_country(rng, country_idx, ue_ranges, "full_margin")
+    fin_ins = _uniform_by_country(rng, country_idx, ue_ranges, "fin_ins")
+    kt = _uniform_by_country(rng, country_idx, ue_ranges, "kt")
+    pc1 = full_margin + fin_ins + kt  # PC1 = FM + F&I + KT
+    ecac = _uniform_by_country(rng, country_idx, ue_ranges, "ecac")
+
+    # NPS from real data
+    nps_buyer = _uniform_by_country(rng, country_idx, ue_ranges, "nps_buyer")
+    nps_seller = _uniform_by_country(rng, country_idx, ue_ranges, "nps_seller")
+
+    # Cost per lead derived from eCAC
+    # eCAC = (CPL * Leads) / Sales, so CPL = (eCAC * Sales) / Leads (leads >= 1)
+    cost_per_lead = ecac * sales / leads
+
+    cancellations = (reservations * rng.uniform(0.05, 0.12, n)).astype(np.int64)
+    noshow = (appointments * rng.uniform(0.08, 0.18, n)).astype(np.int64)
+
+    return pd.DataFrame(
+        {
+            "date": dates[date_idx],
+            "country": countries[hub_idx],
+            "region": regions[hub_idx],
+            "hub": hub_catalog["hub"].to_numpy()[hub_idx],
+            "leads": leads,
+            "appointments": appointments,
+            "reservations": reservations,
+            "sales": sales,
+            "purchases": purchases,
+            "cancellations": cancellations,
+            "noshow": noshow,
+            "nps": (nps_buyer + nps_seller) / 2,  # Average NPS for general metric
+            "nps_buyer": nps_buyer,
+            "nps_seller": nps_seller,
+            "csat": rng.uniform(75, 92, n),
+            "revenue": sales * ticket_avg,
+            "ticket_avg": ticket_avg,
+            "full_margin": full_margin,
+            "fin_ins": fin_ins,
+            "kt": kt,
+            "pc1": pc1,
+            "ecac": ecac,
+            "pc1_minus_ecac": pc1 - ecac,
+            "cost_per_lead": cost_per_lead,
+            "sla_lead_to_sale": rng.uniform(4, 12, n),
+            "efficiency": efficiency,
+        }
+    )
+
+
+def iter_daily_metrics_chunks(date_range, scale=1.0, chunk_rows=None, rng=None):
+    """
+    Stream daily metrics in chunks of whole hubs
+
+    Each chunk holds roughly chunk_rows rows, so memory stays bounded no
+    matter how many hubs or days the scale factor produces.
+    """
+    if rng is None:
+        rng = get_dataset_rng("daily_metrics")
+    hub_catalog = build_hub_catalog(scale)
+    chunk_rows = chunk_rows or DAILY_METRICS_CHUNK_ROWS
+    hubs_per_chunk = max(1, chunk_rows // max(1, len(date_range)))
+
+    for start in range(0, len(hub_catalog), hubs_per_chunk):
+        yield generate_daily_metrics(
+            date_range, hub_catalog.iloc[start : start + hubs_per_chunk], rng
+        )
+
+
+def iter_agent_performance_chunks(scale=1.0, rng=None):
     """Generate agent-level performance data with capacity and opportunity metrics"""
+    if rng is None:
+        rng = get_dataset_rng("agent_performance")
     records = []
+    hubs_per_region = get_scale_profile(scale)["hubs_per_region"]
     agent_id = 1
 
     for country in COUNTRIES:
         regions = HUBS[country]  # These are now region names
         for region in regions:
             # Get hubs for this region
-            region_hubs = REGIONS_HUBS.get(country, {}).get(region, [region])
+            region_hubs = get_region_hubs(country, region, scale)
 
             # If no specific hubs, use region name as hub
             if not region_hubs:
                 region_hubs = [region]
 
             # Select a few hubs for this region (or just one if few available)
-            num_hubs_to_use = min(3, len(region_hubs))
+            num_hubs_to_use = min(hubs_per_region, len(region_hubs))
             hubs_to_use = (
-                random.sample(region_hubs, num_hubs_to_use)
+                sample(rng, region_hubs, num_hubs_to_use)
                 if len(region_hubs) > 0
                 else [region]
             )
 
-            for hub in hubs_to_use[:3]:  # Use up to 3 hubs per region
+            for hub in hubs_to_use[:hubs_per_region]:  # 3 per region (× scale)
                 for i in range(AGENTS_PER_HUB):
                     # Generate agent name - lista ampliada para más variedad
                     first_names = [
@@ -492,31 +630,25 @@ def generate_agent_performance():
                         "Aguilar",
                         "Cruz",
                     ]
-                    agent_name = (
-                        f"{random.choice(first_names)} {random.choice(last_names)}"
-                    )
+                    agent_name = f"{choice(rng, first_names)} {choice(rng, last_names)}"
 
                 # CAPACITY METRICS (como concesionaria)
                 slots_per_week = 40  # 8 slots/día × 5 días
-                appointments = int(
-                    np.random.uniform(25, 40)
-                )  # Citas agendadas - aumentado
+                appointments = int(rng.uniform(25, 40))  # Citas agendadas - aumentado
                 utilization = appointments / slots_per_week
                 available_slots = max(0, slots_per_week - appointments)
 
                 # BACKLOG DE CARTERA (leads no convertidos aún)
-                backlog_cartera = int(
-                    np.random.uniform(15, 50)
-                )  # Aumentado para más leads
+                backlog_cartera = int(rng.uniform(15, 50))  # Aumentado para más leads
 
                 # LEADS Y CONVERSIÓN
-                leads_nuevos = int(np.random.uniform(150, 400))
+                leads_nuevos = int(rng.uniform(150, 400))
                 total_opportunities = (
                     appointments + backlog_cartera
                 )  # Oportunidades reales
 
-                reservations = int(appointments * np.random.uniform(0.3, 0.7))
-                sales = int(reservations * np.random.uniform(0.5, 0.9))
+                reservations = int(appointments * rng.uniform(0.3, 0.7))
+                sales = int(reservations * rng.uniform(0.5, 0.9))
 
                 # CONVERSIÓN REAL = conversiones / oportunidades totales
                 conversion_real = (
@@ -525,14 +657,14 @@ def generate_agent_performance():
 
                 # DESGLOSE POR TIPO DE OPERACIÓN
                 # Sales (Ventas puras): 60-70% del total
-                sales_only = int(sales * np.random.uniform(0.60, 0.70))
+                sales_only = int(sales * rng.uniform(0.60, 0.70))
 
                 # Trade-in (Cliente entrega auto como parte de pago): 20-30%
-                sales_tradein = int(sales * np.random.uniform(0.20, 0.30))
+                sales_tradein = int(sales * rng.uniform(0.20, 0.30))
 
                 # Purchases (Compras puras): diferentes volumen
                 purchases = int(
-                    np.random.uniform(sales * 0.8, sales * 1.3)
+                    rng.uniform(sales * 0.8, sales * 1.3)
                 )  # Compras pueden ser más
 
                 # Purchases con trade-in (ya contadas en trade-in):
@@ -545,35 +677,35 @@ def generate_agent_performance():
 
                 # CALIDAD DEL STOCK ASIGNADO
                 # Número de autos asignados al agente
-                stock_assigned = int(np.random.uniform(8, 20))
+                stock_assigned = int(rng.uniform(8, 20))
 
                 # Edad promedio del stock (días)
-                stock_avg_age = np.random.uniform(10, 65)
+                stock_avg_age = rng.uniform(10, 65)
 
                 # Atractivo del stock (0-100)
                 # Factores: edad, precio competitivo, demanda del segmento
                 age_factor = max(0, 100 - stock_avg_age * 1.2)  # Penaliza edad
-                demand_factor = np.random.uniform(60, 95)  # Demanda del segmento
-                price_factor = np.random.uniform(70, 100)  # Competitividad de precio
+                demand_factor = rng.uniform(60, 95)  # Demanda del segmento
+                price_factor = rng.uniform(70, 100)  # Competitividad de precio
                 stock_attractiveness = (
                     age_factor * 0.4 + demand_factor * 0.3 + price_factor * 0.3
                 )
 
                 # Match con leads (qué tan bien coincide el stock con lo que buscan los leads)
-                lead_match_score = np.random.uniform(50, 100)
+                lead_match_score = rng.uniform(50, 100)
 
                 # EFICIENCIA AJUSTADA (conversión × calidad de stock)
                 efficiency_score = conversion_real * (stock_attractiveness / 100)
 
                 # ANCILLARIES (Productos adicionales)
                 # Seguros: 30-70% de penetración
-                insurance_sold = int(sales * np.random.uniform(0.30, 0.70))
+                insurance_sold = int(sales * rng.uniform(0.30, 0.70))
                 insurance_penetration = (
                     (insurance_sold / sales * 100) if sales > 0 else 0
                 )
 
                 # Garantías Extendidas (Kavak Total): 20-50% de penetración
-                extended_warranty_sold = int(sales * np.random.uniform(0.20, 0.50))
+                extended_warranty_sold = int(sales * rng.uniform(0.20, 0.50))
                 extended_warranty_penetration = (
                     (extended_warranty_sold / sales * 100) if sales > 0 else 0
                 )
@@ -586,7 +718,7 @@ def generate_agent_performance():
 
                 # FINANCING (Financiamiento)
                 # 35-55% de las ventas se financian
-                financing_sold = int(sales * np.random.uniform(0.35, 0.55))
+                financing_sold = int(sales * rng.uniform(0.35, 0.55))
                 financing_penetration = (
                     (financing_sold / sales * 100) if sales > 0 else 0
                 )
@@ -597,11 +729,11 @@ def generate_agent_performance():
 
                 # Ownership Score: % de clientes manejados de principio a fin
                 # Simula handoffs (clientes que cambiaron de agente)
-                handoffs = int(sales * np.random.uniform(0.05, 0.25))
+                handoffs = int(sales * rng.uniform(0.05, 0.25))
                 ownership_score = ((sales - handoffs) / sales * 100) if sales > 0 else 0
 
                 # NPS personal del agente
-                nps_personal = np.random.uniform(45, 90)
+                nps_personal = rng.uniform(45, 90)
 
                 # CÁLCULO DE PUNTOS COMPUESTOS
                 # Base: 100 pts por entrega
@@ -656,7 +788,7 @@ def generate_agent_performance():
 
                 # MÉTRICAS DE EFICIENCIA PARA CITY MANAGER
                 # Revenue per slot (eficiencia del uso de capacidad)
-                revenue_generated = sales * np.random.uniform(18000, 28000)
+                revenue_generated = sales * rng.uniform(18000, 28000)
                 slots_used = appointments
                 revenue_per_slot = (
                     revenue_generated / slots_used if slots_used > 0 else 0
@@ -734,13 +866,13 @@ def generate_agent_performance():
                         "financing_penetration": financing_penetration,
                         # Métricas existentes
                         "nps": nps_personal,
-                        "csat": np.random.uniform(65, 95),
+                        "csat": rng.uniform(65, 95),
                         "noshow": appointments
-                        * np.random.uniform(0.05, 0.30)
+                        * rng.uniform(0.05, 0.30)
                         / appointments
                         if appointments > 0
                         else 0,
-                        "avg_response_time": np.random.uniform(0.5, 4),  # hours
+                        "avg_response_time": rng.uniform(0.5, 4),  # hours
                         "revenue": revenue_generated,
                         # ══════════════════════════════════════════════
                         # OWNERSHIP & PUNTOS COMPUESTOS
@@ -767,11 +899,21 @@ def generate_agent_performance():
                 )
                 agent_id += 1
 
-    return pd.DataFrame(records)
+            # Emit one chunk per region so large scales stay memory-bounded
+            if records:
+                yield pd.DataFrame(records)
+                records = []
+
 
+def generate_agent_performance(scale=1.0, rng=None):
+    """Generate agent-level performance data (all regions in one frame)"""
+    return _concat_chunks(iter_agent_performance_chunks(scale, rng))
 
-def generate_inventory_data():
+
+def generate_inventory_data(rng=None):
     """Generate inventory data by region and segment using real stock health data"""
+    if rng is None:
+        rng = get_dataset_rng("inventory")
     records = []
 
     for country in COUNTRIES:
@@ -790,21 +932,17 @@ def generate_inventory_data():
                     "Chile": (20, 65),
                 }.get(country, (20, 60))
 
-                total_inventory = int(np.random.uniform(*base_inventory))
+                total_inventory = int(rng.uniform(*base_inventory))
 
                 # Reserved and VIP based on readiness
                 readiness = operational["readiness"]
-                reserved = int(total_inventory * np.random.uniform(0.08, 0.18))
-                vip = int(total_inventory * np.random.uniform(0.03, 0.10))
+                reserved = int(total_inventory * rng.uniform(0.08, 0.18))
+                vip = int(total_inventory * rng.uniform(0.03, 0.10))
 
                 # Aging based on real stock health data
-                aging_0_30_pct = stock_health["aging_0_30"] + np.random.uniform(
-                    -0.05, 0.05
-                )
-                aging_30_90_pct = stock_health["aging_30_90"] + np.random.uniform(
-                    -0.05, 0.05
-                )
-                aging_90_plus_pct = stock_health["aging_90_plus"] + np.random.uniform(
+                aging_0_30_pct = stock_health["aging_0_30"] + rng.uniform(-0.05, 0.05)
+                aging_30_90_pct = stock_health["aging_30_90"] + rng.uniform(-0.05, 0.05)
+                aging_90_plus_pct = stock_health["aging_90_plus"] + rng.uniform(
                     -0.03, 0.03
                 )
 
@@ -826,30 +964,32 @@ def generate_inventory_data():
                         "aging_0_30": int(total_inventory * aging_0_30_pct),
                         "aging_30_60": int(total_inventory * aging_30_90_pct * 0.6),
                         "aging_60_plus": int(total_inventory * aging_60_plus_pct),
-                        "avg_days_in_inventory": np.random.uniform(18, 55),
+                        "avg_days_in_inventory": rng.uniform(18, 55),
                         "sell_rate_30d": operational["sell_rate_30d"]
-                        + np.random.uniform(-0.05, 0.05),
+                        + rng.uniform(-0.05, 0.05),
                         "sell_rate_60d": operational["sell_rate_60d"]
-                        + np.random.uniform(-0.05, 0.05),
-                        "readiness": readiness + np.random.uniform(-0.03, 0.03),
+                        + rng.uniform(-0.05, 0.05),
+                        "readiness": readiness + rng.uniform(-0.03, 0.03),
                     }
                 )
 
     return pd.DataFrame(records)
 
 
-def generate_funnel_data(date_range):
+def generate_funnel_data(date_range, rng=None):
     """Generate funnel conversion data"""
+    if rng is None:
+        rng = get_dataset_rng("funnel")
     records = []
 
     for country in COUNTRIES:
         regions = HUBS[country]
         for region in regions:
             # Last 30 days aggregate
-            leads = int(np.random.uniform(1000, 3000))
-            appointments = int(leads * np.random.uniform(0.5, 0.7))
-            reservations = int(appointments * np.random.uniform(0.4, 0.6))
-            sales = int(reservations * np.random.uniform(0.6, 0.8))
+            leads = int(rng.uniform(1000, 3000))
+            appointments = int(leads * rng.uniform(0.5, 0.7))
+            reservations = int(appointments * rng.uniform(0.4, 0.6))
+            sales = int(reservations * rng.uniform(0.6, 0.8))
 
             records.append(
                 {
@@ -874,41 +1014,46 @@ def generate_funnel_data(date_range):
     return pd.DataFrame(records)
 
 
-def generate_alerts():
+def generate_alerts(now=None):
     """Generate sample alerts"""
+    now = now or datetime.now()
     alerts = [
         {
             "type": "critical",
             "title": "Caída en conversión - CDMX Sur",
             "description": "Conversión bajó 15% vs semana anterior",
-            "timestamp": datetime.now() - timedelta(hours=2),
+            "timestamp": now - timedelta(hours=2),
         },
         {
             "type": "warning",
             "title": "Inventario envejecido - Monterrey",
             "description": "25 vehículos con más de 60 días en inventario",
-            "timestamp": datetime.now() - timedelta(hours=5),
+            "timestamp": now - timedelta(hours=5),
         },
         {
             "type": "info",
             "title": "NPS mejorado - Guadalajara",
             "description": "NPS subió a 82 (+8 puntos)",
-            "timestamp": datetime.now() - timedelta(hours=8),
+            "timestamp": now - timedelta(hours=8),
         },
         {
             "type": "critical",
             "title": "Alta tasa de no-show - São Paulo",
             "description": "No-show rate: 32% (límite: 25%)",
-            "timestamp": datetime.now() - timedelta(hours=12),
+            "timestamp": now - timedelta(hours=12),
         },
     ]
 
     return pd.DataFrame(alerts)
 
 
-def generate_customer_data():
+def iter_customer_chunks(scale=1.0, rng=None, now=None):
     """Generate customer/user data with detailed transaction history and ancillaries"""
+    if rng is None:
+        rng = get_dataset_rng("customers")
+    now = now or datetime.now()
     customers = []
+    hubs_per_region = get_scale_profile(scale)["hubs_per_region"]
     customer_id = 1000
 
     # Ancillary products/services
@@ -929,23 +1074,23 @@ def generate_customer_data():
         regions = HUBS[country]
         for region in regions:
             # Get hubs for this region
-            region_hubs = REGIONS_HUBS.get(country, {}).get(region, [region])
+            region_hubs = get_region_hubs(country, region, scale)
 
             # If no specific hubs, use region name as hub
             if not region_hubs:
                 region_hubs = [region]
 
             # Select a few hubs for this region
-            num_hubs_to_use = min(3, len(region_hubs))
+            num_hubs_to_use = min(hubs_per_region, len(region_hubs))
             hubs_to_use = (
-                random.sample(region_hubs, num_hubs_to_use)
+                sample(rng, region_hubs, num_hubs_to_use)
                 if len(region_hubs) > 0
                 else [region]
             )
 
-            for hub in hubs_to_use[:3]:  # Up to 3 hubs per region
-                num_customers = np.random.randint(
-                    40, 70
+            for hub in hubs_to_use[:hubs_per_region]:  # 3 per region (× scale)
+                num_customers = randint(
+                    rng, 40, 70
                 )  # 40-70 customers per hub - increased for better demo
 
                 for _ in range(num_customers):
@@ -983,11 +1128,9 @@ def generate_customer_data():
                     "Gómez",
                 ]
 
-                customer_name = (
-                    f"{random.choice(first_names)} {random.choice(last_names)}"
-                )
+                customer_name = f"{choice(rng, first_names)} {choice(rng, last_names)}"
                 email = f"cliente{customer_id}@email.com"
-                phone = f"+52 55 {np.random.randint(1000, 9999)} {np.random.randint(1000, 9999)}"
+                phone = f"+52 55 {randint(rng, 1000, 9999)} {randint(rng, 1000, 9999)}"
 
                 # Customer status - más clientes activos para tener cartera
                 status_options = ["Nuevo", "Activo", "VIP", "Recurrente", "Inactivo"]
@@ -998,44 +1141,41 @@ def generate_customer_data():
                     0.10,
                     0.02,
                 ]  # Mayor peso a Nuevo y Activo
-                status = np.random.choice(status_options, p=status_weights)
+                status = rng.choice(status_options, p=status_weights)
 
                 # VIP flag
-                is_vip = status == "VIP" or np.random.random() < 0.1
+                is_vip = status == "VIP" or rng.random() < 0.1
 
                 # Registration date
-                days_since_registration = np.random.randint(30, 365)
-                registration_date = datetime.now() - timedelta(
-                    days=days_since_registration
-                )
+                days_since_registration = randint(rng, 30, 365)
+                registration_date = now - timedelta(days=days_since_registration)
 
                 # Transaction history
                 num_transactions = 0
                 if status == "Nuevo":
-                    num_transactions = np.random.randint(0, 2)
+                    num_transactions = randint(rng, 0, 2)
                 elif status == "Activo":
-                    num_transactions = np.random.randint(1, 3)
+                    num_transactions = randint(rng, 1, 3)
                 elif status == "VIP" or status == "Recurrente":
-                    num_transactions = np.random.randint(2, 5)
+                    num_transactions = randint(rng, 2, 5)
                 else:  # Inactivo
-                    num_transactions = np.random.randint(1, 2)
+                    num_transactions = randint(rng, 1, 2)
 
                 # Sales and cancellations
-                num_sales = min(
-                    num_transactions, np.random.randint(0, num_transactions + 1)
-                )
+                num_sales = min(num_transactions, randint(rng, 0, num_transactions + 1))
                 num_cancellations = num_transactions - num_sales
 
                 # Generate detailed transactions
                 transactions = []
                 for i in range(num_transactions):
                     trans_date = registration_date + timedelta(
-                        days=np.random.randint(0, days_since_registration)
+                        days=randint(rng, 0, days_since_registration)
                     )
                     is_sale = i < num_sales
 
                     # Vehicle details
-                    vehicle_brand = random.choice(
+                    vehicle_brand = choice(
+                        rng,
                         [
                             "Toyota",
                             "Honda",
@@ -1044,21 +1184,19 @@ def generate_customer_data():
                             "Volkswagen",
                             "Ford",
                             "Chevrolet",
-                        ]
-                    )
-                    vehicle_model = random.choice(
-                        ["Sedan", "SUV", "Pickup", "Hatchback"]
+                        ],
                     )
-                    vehicle_year = np.random.randint(2018, 2024)
+                    vehicle_model = choice(rng, ["Sedan", "SUV", "Pickup", "Hatchback"])
+                    vehicle_year = randint(rng, 2018, 2024)
                     vehicle_name = f"{vehicle_brand} {vehicle_model} {vehicle_year}"
-                    vehicle_price = np.random.uniform(150000, 350000)
+                    vehicle_price = rng.uniform(150000, 350000)
 
                     if is_sale:
                         # Successful sale
                         # Ancillaries sold with this transaction
-                        num_ancillaries = np.random.randint(1, 4)
-                        selected_ancillaries = random.sample(
-                            ancillary_products, num_ancillaries
+                        num_ancillaries = randint(rng, 1, 4)
+                        selected_ancillaries = sample(
+                            rng, ancillary_products, num_ancillaries
                         )
                         ancillaries_total = sum(
                             [a["price"] for a in selected_ancillaries]
@@ -1074,10 +1212,10 @@ def generate_customer_data():
                                 "ancillaries": selected_ancillaries,
                                 "ancillaries_total": ancillaries_total,
                                 "total_amount": vehicle_price + ancillaries_total,
-                                "financing": random.choice([True, False]),
+                                "financing": choice(rng, [True, False]),
                                 "down_payment": vehicle_price
-                                * np.random.uniform(0.15, 0.3)
-                                if random.choice([True, False])
+                                * rng.uniform(0.15, 0.3)
+                                if choice(rng, [True, False])
                                 else vehicle_price,
                             }
                         )
@@ -1098,14 +1236,15 @@ def generate_customer_data():
                                 "type": "Cancelación",
                                 "vehicle": vehicle_name,
                                 "vehicle_price": vehicle_price,
-                                "cancel_reason": random.choice(cancel_reasons),
-                                "stage": random.choice(
+                                "cancel_reason": choice(rng, cancel_reasons),
+                                "stage": choice(
+                                    rng,
                                     [
                                         "Reserva",
                                         "Test Drive",
                                         "Negociación",
                                         "Documentos",
-                                    ]
+                                    ],
                                 ),
                             }
                         )
@@ -1135,9 +1274,9 @@ def generate_customer_data():
 
                 # Vehicle interests
                 interests = []
-                num_interests = np.random.randint(1, 4)
+                num_interests = randint(rng, 1, 4)
                 for _ in range(num_interests):
-                    interests.append(random.choice(VEHICLE_SEGMENTS))
+                    interests.append(choice(rng, VEHICLE_SEGMENTS))
                 vehicle_interests = ", ".join(list(set(interests)))
 
                 # Preferred brands (based on transactions or random)
@@ -1151,50 +1290,51 @@ def generate_customer_data():
                         else "Sin preferencia"
                     )
                 else:
-                    preferred_brands = random.choice(
+                    preferred_brands = choice(
+                        rng,
                         [
                             "Toyota, Honda",
                             "Nissan, Mazda",
                             "Volkswagen",
                             "Ford, Chevrolet",
                             "Sin preferencia",
-                        ]
+                        ],
                     )
 
                 # Assign to agent (from the hub)
-                agent_id = np.random.randint(1, AGENTS_PER_HUB + 1)
+                agent_id = randint(rng, 1, AGENTS_PER_HUB + 1)
 
                 # Customer score (propensity to buy)
                 if status == "VIP":
-                    customer_score = np.random.randint(80, 100)
+                    customer_score = randint(rng, 80, 100)
                 elif status == "Recurrente":
-                    customer_score = np.random.randint(70, 90)
+                    customer_score = randint(rng, 70, 90)
                 elif status == "Activo":
-                    customer_score = np.random.randint(50, 80)
+                    customer_score = randint(rng, 50, 80)
                 elif status == "Nuevo":
-                    customer_score = np.random.randint(40, 70)
+                    customer_score = randint(rng, 40, 70)
                 else:  # Inactivo
-                    customer_score = np.random.randint(20, 50)
+                    customer_score = randint(rng, 20, 50)
 
                 # NPS rating (if they bought)
                 if num_sales > 0:
                     if is_vip:
-                        nps_rating = np.random.randint(8, 11)
+                        nps_rating = randint(rng, 8, 11)
                     else:
-                        nps_rating = np.random.randint(0, 11)
+                        nps_rating = randint(rng, 0, 11)
                 else:
                     nps_rating = None
 
                 # Last interaction
-                days_since_last_interaction = np.random.randint(1, 30)
-                last_interaction_date = datetime.now() - timedelta(
+                days_since_last_interaction = randint(rng, 1, 30)
+                last_interaction_date = now - timedelta(
                     days=days_since_last_interaction
                 )
 
                 # Interaction history (calls, messages, visits)
-                num_calls = np.random.randint(0, 10)
-                num_messages = np.random.randint(0, 15)
-                num_visits = np.random.randint(0, 5)
+                num_calls = randint(rng, 0, 10)
+                num_messages = randint(rng, 0, 15)
+                num_visits = randint(rng, 0, 5)
 
                 # Notes / comments
                 notes_options = [
@@ -1209,12 +1349,10 @@ def generate_customer_data():
                     "Quiere test drive antes de decidir",
                     "Interesado en paquete completo con seguros",
                 ]
-                notes = random.choice(notes_options)
+                notes = choice(rng, notes_options)
 
-                # Generate Celeste (AI) conversation data
-                celeste_data = generate_celeste_conversation(
-                    customer_id, vehicle_interests, customer_score, status
-                )
+                # Celeste (AI) conversation data is generated lazily per customer
+                # when a profile is opened (utils/celeste_data.py)
 
                 customers.append(
                     {
@@ -1246,604 +1384,511 @@ def generate_customer_data():
                         "notes": notes,
                         "days_since_registration": days_since_registration,
                         "transactions": transactions,  # Full transaction history
-                        # Celeste AI conversation data
-                        "celeste_conversation": celeste_data["conversation"],
-                        "celeste_summary": celeste_data["summary"],
-                        "celeste_recommendations": celeste_data["recommendations"],
-                        "celeste_vehicles_shown": celeste_data["vehicles_shown"],
-                        "celeste_last_interaction": celeste_data["last_interaction"],
-                        "celeste_messages_count": celeste_data["messages_count"],
-                        "celeste_main_objections": celeste_data["main_objections"],
-                        "celeste_budget_range": celeste_data["budget_range"],
-                        "celeste_financing_interest": celeste_data[
-                            "financing_interest"
-                        ],
-                        "celeste_tradein_info": celeste_data["tradein_info"],
                     }
                 )
 
                 customer_id += 1
 
-    return pd.DataFrame(customers)
+            # Emit one chunk per region so large scales stay memory-bounded
+            if customers:
+                yield pd.DataFrame(customers)
+                customers = []
 
 
-def generate_celeste_conversation(customer_id, vehicle_interests, score, status):
-    """Generate simulated Celeste AI conversation data for a customer"""
+def generate_customer_data(scale=1.0, rng=None, now=None):
+    """Generate customer data (all regions in one frame, nested objects inline)"""
+    return _concat_chunks(iter_customer_chunks(scale, rng, now))
 
-    # Last interaction with Celeste
-    hours_ago = np.random.randint(1, 72)
-    last_interaction = datetime.now() - timedelta(hours=hours_ago)
 
-    # Number of messages exchanged
-    messages_count = np.random.randint(5, 45)
+def iter_customer_table_chunks(scale=1.0, rng=None, now=None, seed=DATASET_SEED):
+    """Stream customers as dicts of flat frame + side tables, one per region"""
+    now = now or datetime.now()
+    for chunk in iter_customer_chunks(scale, rng, now):
+        yield normalize_customers(chunk, now, seed)
 
-    # Budget range based on score
-    budget_options = [
-        ("$150,000 - $200,000", 175000),
-        ("$200,000 - $250,000", 225000),
-        ("$250,000 - $300,000", 275000),
-        ("$300,000 - $350,000", 325000),
-        ("$350,000 - $450,000", 400000),
-    ]
-    budget_range = random.choice(budget_options)
-
-    # Financing interest
-    financing_options = [
-        {"interested": True, "months": 24, "down_payment_pct": 30},
-        {"interested": True, "months": 36, "down_payment_pct": 20},
-        {"interested": True, "months": 48, "down_payment_pct": 15},
-        {"interested": True, "months": 60, "down_payment_pct": 10},
-        {"interested": False, "months": 0, "down_payment_pct": 100},
-    ]
-    financing_interest = random.choice(financing_options)
 
-    # Trade-in info
-    tradein_options = [
-        None,
-        {"brand": "Nissan", "model": "Versa", "year": 2018, "estimated_value": 95000},
-        {
-            "brand": "Toyota",
-            "model": "Corolla",
-            "year": 2019,
-            "estimated_value": 145000,
-        },
-        {"brand": "Honda", "model": "Civic", "year": 2017, "estimated_value": 125000},
-        {"brand": "Mazda", "model": "3", "year": 2020, "estimated_value": 175000},
-        {
-            "brand": "Volkswagen",
-            "model": "Jetta",
-            "year": 2018,
-            "estimated_value": 115000,
-        },
-    ]
-    tradein_info = random.choice(tradein_options)
-
-    # Main objections/concerns
-    objection_options = [
-        "Precio inicial le pareció alto",
-        "Quiere ver el vehículo en persona antes de decidir",
-        "Dudas sobre la garantía extendida",
-        "Preocupación por el kilometraje",
-        "Necesita aprobación de financiamiento primero",
-        "Comparando con otras opciones",
-        "Tiempo de entrega muy largo",
-        "Quiere negociar el precio del trade-in",
-    ]
-    num_objections = np.random.randint(0, 3)
-    main_objections = random.sample(objection_options, num_objections)
-
-    # Vehicles shown by Celeste
-    vehicle_brands = ["Toyota", "Honda", "Nissan", "Mazda", "Volkswagen", "Ford"]
-    vehicle_models = {
-        "SUV": ["RAV4", "CR-V", "X-Trail", "CX-5", "Tiguan", "Escape"],
-        "Sedán": ["Corolla", "Civic", "Sentra", "3", "Jetta", "Focus"],
-        "Pickup": ["Hilux", "Ridgeline", "Frontier", "BT-50", "Amarok", "Ranger"],
-        "Hatchback": ["Yaris", "Fit", "March", "2", "Polo", "Fiesta"],
-        "Premium": ["Camry", "Accord", "Altima", "6", "Passat", "Fusion"],
-    }
+def generate_customer_tables(scale=1.0, rng=None, now=None, seed=DATASET_SEED):
+    """
+    Generate the flat customers frame and its side tables
 
-    # Get vehicle type from interests
-    interest_type = (
-        vehicle_interests.split(",")[0].strip() if vehicle_interests else "SUV"
-    )
-    if interest_type not in vehicle_models:
-        interest_type = "SUV"
-
-    vehicles_shown = []
-    num_vehicles = np.random.randint(2, 5)
-    lotes = ["A1", "A2", "B1", "B2", "B3", "C1", "C2", "D1"]
-
-    for i in range(num_vehicles):
-        brand = random.choice(vehicle_brands)
-        model = random.choice(vehicle_models[interest_type])
-        year = np.random.randint(2019, 2024)
-        price = int(budget_range[1] * np.random.uniform(0.85, 1.15))
-        vin = f"VIN-{np.random.randint(10000, 99999)}"
-        lote = random.choice(lotes)
-
-        vehicles_shown.append(
-            {
-                "brand": brand,
-                "model": model,
-                "year": year,
-                "price": price,
-                "vin": vin,
-                "lote": lote,
-                "is_favorite": i == 0,  # First one is favorite
-            }
-        )
+    Returns:
+        Dict with customers, customer_transactions, transaction_ancillaries
+        and customer_interactions
+    """
+    chunks = {}
+    for tables in iter_customer_table_chunks(scale, rng, now, seed):
+        for name, table in tables.items():
+            chunks.setdefault(name, []).append(table)
+    return {name: _concat_chunks(frames) for name, frames in chunks.items()}
 
-    # Generate conversation summary
-    summary_templates = [
-        f"Busca {interest_type} familiar, presupuesto {budget_range[0]}",
-        f"Interesado en {interest_type}, {'con' if financing_interest['interested'] else 'sin'} financiamiento",
-        f"Cliente {'VIP' if status == 'VIP' else 'activo'} buscando {interest_type}",
-    ]
-    summary_base = random.choice(summary_templates)
 
-    if financing_interest["interested"]:
-        summary_base += (
-            f". Preguntó por financiamiento a {financing_interest['months']} meses"
-        )
+# =============================================================================
+# APPOINTMENTS - Agenda catalogs
+# =============================================================================
 
-    if tradein_info:
-        summary_base += f". Tiene {tradein_info['brand']} {tradein_info['model']} {tradein_info['year']} para trade-in"
+APPOINTMENT_TYPES = [
+    {"type": "Test Drive", "duration_min": 45, "icon": "🚗"},
+    {"type": "Evaluación Trade-in", "duration_min": 30, "icon": "🔄"},
+    {"type": "Firma de Contrato", "duration_min": 60, "icon": "📝"},
+    {"type": "Entrega de Vehículo", "duration_min": 90, "icon": "🎉"},
+    {"type": "Consulta Financiamiento", "duration_min": 30, "icon": "💰"},
+    {"type": "Revisión de Vehículo", "duration_min": 45, "icon": "🔍"},
+    {"type": "Primera Visita", "duration_min": 60, "icon": "👋"},
+    {"type": "Seguimiento", "duration_min": 30, "icon": "📞"},
+]
+
+# Priority by appointment type (anything else is "Normal")
+APPOINTMENT_PRIORITY = {
+    "Firma de Contrato": "Alta",
+    "Entrega de Vehículo": "Alta",
+    "Test Drive": "Media",
+    "Evaluación Trade-in": "Media",
+}
 
-    if main_objections:
-        summary_base += f". Duda principal: {main_objections[0].lower()}"
+APPOINTMENT_STATUSES_PAST = ["Completada", "No Show", "Cancelada", "Reagendada"]
+APPOINTMENT_STATUSES_FUTURE = ["Confirmada", "Pendiente", "Por Confirmar"]
+APPOINTMENT_STATUSES = APPOINTMENT_STATUSES_PAST + APPOINTMENT_STATUSES_FUTURE
+
+# Status weights by timing: past days, today before/after the current time,
+# future days
+APPOINTMENT_STATUS_WEIGHTS = {
+    "past": [0.70, 0.15, 0.10, 0.05],
+    "today_past": [0.75, 0.12, 0.08, 0.05],
+    "today_future": [0.60, 0.25, 0.15],
+    "future": [0.55, 0.30, 0.15],
+}
 
-    # Generate recommendations for the agent
-    recommendations = []
+# Time slots (business hours)
+APPOINTMENT_TIME_SLOTS = [
+    "09:00",
+    "09:30",
+    "10:00",
+    "10:30",
+    "11:00",
+    "11:30",
+    "12:00",
+    "12:30",
+    "13:00",
+    "14:00",
+    "14:30",
+    "15:00",
+    "15:30",
+    "16:00",
+    "16:30",
+    "17:00",
+    "17:30",
+    "18:00",
+]
+
+# Customer names for appointments
+APPOINTMENT_FIRST_NAMES = [
+    "Carlos",
+    "María",
+    "José",
+    "Ana",
+    "Luis",
+    "Carmen",
+    "Miguel",
+    "Laura",
+    "Fernando",
+    "Patricia",
+    "Ricardo",
+    "Elena",
+    "Jorge",
+    "Isabel",
+    "Diego",
+    "Sofía",
+    "Andrés",
+    "Valentina",
+    "Pablo",
+    "Camila",
+    "Roberto",
+    "Gabriela",
+    "Sergio",
+    "Alejandra",
+    "Francisco",
+    "Daniela",
+    "Eduardo",
+    "Paulina",
+]
+APPOINTMENT_LAST_NAMES = [
+    "González",
+    "Rodríguez",
+    "Martínez",
+    "López",
+    "García",
+    "Hernández",
+    "Pérez",
+    "Sánchez",
+    "Ramírez",
+    "Torres",
+    "Flores",
+    "Rivera",
+    "Gómez",
+    "Díaz",
+    "Morales",
+    "Vargas",
+    "Rojas",
+    "Castro",
+    "Ortiz",
+    "Ruiz",
+]
+
+# Vehicle options for appointments
+APPOINTMENT_VEHICLES = [
+    {"brand": "Toyota", "model": "RAV4", "year": 2022, "price": 385000},
+    {"brand": "Honda", "model": "CR-V", "year": 2021, "price": 365000},
+    {"brand": "Nissan", "model": "X-Trail", "year": 2023, "price": 420000},
+    {"brand": "Mazda", "model": "CX-5", "year": 2022, "price": 395000},
+    {"brand": "Volkswagen", "model": "Tiguan", "year": 2021, "price": 355000},
+    {"brand": "Toyota", "model": "Corolla", "year": 2022, "price": 285000},
+    {"brand": "Honda", "model": "Civic", "year": 2023, "price": 325000},
+    {"brand": "Nissan", "model": "Sentra", "year": 2022, "price": 275000},
+    {"brand": "Mazda", "model": "3", "year": 2021, "price": 295000},
+    {"brand": "Ford", "model": "Escape", "year": 2022, "price": 375000},
+    {"brand": "Chevrolet", "model": "Equinox", "year": 2021, "price": 345000},
+    {"brand": "Hyundai", "model": "Tucson", "year": 2023, "price": 380000},
+]
+
+APPOINTMENT_NOTES = [
+    "Cliente muy interesado",
+    "Traerá acompañante",
+    "Ya vio el auto online",
+    "Tiene trade-in",
+    "Preguntó por financiamiento",
+    "Cliente referido",
+    "Segunda visita",
+    "Viene de otra ciudad",
+    "Prefiere pago de contado",
+    "Interesado en garantía extendida",
+    "",
+    "",
+]
+
+# Result of completed appointments
+APPOINTMENT_RESULTS = [
+    "Interesado - Seguimiento",
+    "Reservó vehículo",
+    "Firmó contrato",
+    "Pendiente decisión",
+    "No le interesó",
+    "Solicitó cotización",
+    "Agendó segunda cita",
+]
+APPOINTMENT_RESULT_WEIGHTS = [0.25, 0.20, 0.15, 0.15, 0.10, 0.10, 0.05]
+
+DAY_NAMES_ES = [
+    "Lunes",
+    "Martes",
+    "Miércoles",
+    "Jueves",
+    "Viernes",
+    "Sábado",
+    "Domingo",
+]
+
+# Time of day of each slot, for building appointment datetimes
+_SLOT_OFFSETS = pd.to_timedelta(
+    [f"{slot}:00" for slot in APPOINTMENT_TIME_SLOTS]
+).to_numpy()
+
+
+def get_agenda_months(months=1, today=None):
+    """
+    First day of each agenda month, oldest first, ending with the current month
+    """
+    today = today or datetime.now()
+    current = pd.Timestamp(today.year, today.month, 1)
+    return [current - pd.DateOffset(months=i) for i in range(months - 1, -1, -1)]
 
-    if financing_interest["interested"]:
-        recommendations.append(
-            f"Ten preparada cotización de financiamiento a {financing_interest['months']} meses "
-            f"con enganche del {financing_interest['down_payment_pct']}%"
-        )
 
-    if tradein_info:
-        recommendations.append(
-            f"Verificar estado del trade-in ({tradein_info['brand']} {tradein_info['model']} "
-            f"{tradein_info['year']}) - valor estimado ${tradein_info['estimated_value']:,}"
-        )
+def _draw_weighted(u, weights):
+    """Map uniform draws to option indices following the given weights"""
+    cumulative = np.cumsum(weights)
+    return np.minimum(np.searchsorted(cumulative, u, side="right"), len(weights) - 1)
 
-    if vehicles_shown:
-        fav = vehicles_shown[0]
-        recommendations.append(
-            f"Su vehículo favorito es el {fav['brand']} {fav['model']} {fav['year']} "
-            f"- está en Lote {fav['lote']}"
-        )
 
-    if "Precio" in str(main_objections):
-        recommendations.append("Sensible al precio - mencionar promociones actuales")
+def _draw_appointment_statuses(rng, day_timing, slot_datetimes, now):
+    """
+    Draw one status per appointment, conditioned on when it happens
+
+    Args:
+        rng: np.random.Generator to draw from
+        day_timing: Per-row -1 (past day), 0 (today) or 1 (future day)
+        slot_datetimes: Per-row appointment datetime (datetime64)
+        now: Current datetime (splits today's slots into past/future)
+
+    Returns:
+        Array of indices into APPOINTMENT_STATUSES
+    """
+    u = rng.random(len(day_timing))
+    before_now = slot_datetimes < np.datetime64(now)
+    future_offset = len(APPOINTMENT_STATUSES_PAST)
+    groups = {
+        "past": (day_timing < 0, 0),
+        "today_past": ((day_timing == 0) & before_now, 0),
+        "today_future": ((day_timing == 0) & ~before_now, future_offset),
+        "future": (day_timing > 0, future_offset),
+    }
 
-    if "garantía" in str(main_objections).lower():
-        recommendations.append(
-            "Explicar beneficios de Kavak Total (garantía extendida)"
+    statuses = np.empty(len(day_timing), dtype=np.int8)
+    for key, (mask, offset) in groups.items():
+        statuses[mask] = offset + _draw_weighted(
+            u[mask], APPOINTMENT_STATUS_WEIGHTS[key]
         )
+    return statuses
 
-    if score > 75:
-        recommendations.append("Cliente con alta propensión - priorizar cierre")
 
-    # Generate sample conversation messages
-    conversation_messages = generate_sample_conversation(
-        interest_type, budget_range[0], financing_interest, tradein_info, vehicles_shown
-    )
+def draw_hub_month_appointments(month_start, now=None, rng=None):
+    """
+    Draw one hub's agenda for one month as arrays (no per-row Python loop)
 
-    return {
-        "conversation": conversation_messages,
-        "summary": summary_base,
-        "recommendations": recommendations,
-        "vehicles_shown": vehicles_shown,
-        "last_interaction": last_interaction,
-        "messages_count": messages_count,
-        "main_objections": main_objections,
-        "budget_range": budget_range[0],
-        "financing_interest": financing_interest,
-        "tradein_info": tradein_info,
-    }
+    Args:
+        month_start: First day of the month (Timestamp)
+        now: Current datetime (defaults to datetime.now())
+        rng: np.random.Generator (defaults to the appointments stream)
 
+    Returns:
+        Dict of per-appointment arrays (see draw_hub_days_appointments)
+    """
+    # Business days of the month (Sundays closed)
+    days = pd.date_range(month_start, month_start + pd.offsets.MonthEnd(0), freq="D")
+    return draw_hub_days_appointments(days[days.weekday != 6], now, rng)
 
-def generate_sample_conversation(interest_type, budget, financing, tradein, vehicles):
-    """Generate sample conversation messages between customer and Celeste"""
-    messages = []
 
-    # Opening
-    messages.append(
-        {
-            "sender": "customer",
-            "message": f"Hola, estoy buscando un {interest_type}",
-            "timestamp": datetime.now() - timedelta(hours=np.random.randint(2, 48)),
-        }
-    )
+def draw_hub_days_appointments(days, now=None, rng=None):
+    """
+    Draw one hub's agenda for a set of business days as arrays
 
-    messages.append(
-        {
-            "sender": "celeste",
-            "message": f"¡Hola! Soy Celeste, tu asesora virtual de Kavak. "
-            f"Me encanta ayudarte a encontrar tu {interest_type} ideal. "
-            f"¿Tienes algún presupuesto en mente?",
-            "timestamp": datetime.now() - timedelta(hours=np.random.randint(2, 48)),
-        }
+    Appointment counts, types, slots, statuses (conditioned on past/today/
+    future) and results are drawn in batches for all the days at once.
+
+    Args:
+        days: DatetimeIndex of the days to fill
+        now: Current datetime (defaults to datetime.now())
+        rng: np.random.Generator (defaults to the appointments stream)
+
+    Returns:
+        Dict of per-appointment arrays (days, catalog indices and numbers)
+    """
+    now = now or datetime.now()
+    if rng is None:
+        rng = get_dataset_rng("appointments")
+
+    saturday = days.weekday == 5
+
+    # Appointments per day (more on Saturdays)
+    counts = rng.integers(np.where(saturday, 15, 10), np.where(saturday, 25, 20))
+    n = int(counts.sum())
+    day = np.repeat(days.to_numpy().astype("datetime64[D]"), counts)
+
+    draws = {
+        "day": day,
+        "agent_id": rng.integers(1, AGENTS_PER_HUB + 1, n),
+        "type_idx": rng.integers(0, len(APPOINTMENT_TYPES), n),
+        "slot_idx": rng.integers(0, len(APPOINTMENT_TIME_SLOTS), n),
+    }
+
+    day_timing = np.sign((day - np.datetime64(now.date())).astype(np.int64))
+    slot_datetimes = day.astype("datetime64[us]") + _SLOT_OFFSETS[draws["slot_idx"]]
+    draws["status_idx"] = _draw_appointment_statuses(
+        rng, day_timing, slot_datetimes, now
     )
 
-    messages.append(
-        {
-            "sender": "customer",
-            "message": f"Sí, estoy pensando en algo entre {budget}",
-            "timestamp": datetime.now() - timedelta(hours=np.random.randint(1, 24)),
-        }
+    # Customer info and vehicle of interest
+    draws["first_name_idx"] = rng.integers(0, len(APPOINTMENT_FIRST_NAMES), n)
+    draws["last_name_idx"] = rng.integers(0, len(APPOINTMENT_LAST_NAMES), n)
+    draws["customer_number"] = rng.integers(1000, 9999, n)
+    draws["phone_a"] = rng.integers(1000, 9999, n)
+    draws["phone_b"] = rng.integers(1000, 9999, n)
+    draws["vehicle_idx"] = rng.integers(0, len(APPOINTMENT_VEHICLES), n)
+    draws["notes_idx"] = rng.integers(0, len(APPOINTMENT_NOTES), n)
+
+    # Result only for completed appointments (-1 = no result)
+    completed = draws["status_idx"] == APPOINTMENT_STATUSES.index("Completada")
+    result_idx = np.full(n, -1, dtype=np.int8)
+    result_idx[completed] = _draw_weighted(
+        rng.random(int(completed.sum())), APPOINTMENT_RESULT_WEIGHTS
     )
+    draws["result_idx"] = result_idx
+    return draws
 
-    if financing and financing.get("interested"):
-        messages.append(
-            {
-                "sender": "customer",
-                "message": f"¿Tienen opciones de financiamiento? Me interesaría a {financing['months']} meses",
-                "timestamp": datetime.now() - timedelta(hours=np.random.randint(1, 12)),
-            }
-        )
 
-        messages.append(
-            {
-                "sender": "celeste",
-                "message": f"¡Claro! Tenemos excelentes opciones de financiamiento. "
-                f"A {financing['months']} meses con un enganche del {financing['down_payment_pct']}% "
-                f"tendrías mensualidades muy accesibles. ¿Te gustaría ver una cotización detallada?",
-                "timestamp": datetime.now() - timedelta(hours=np.random.randint(1, 12)),
-            }
-        )
+def _lookup_labels(labels, idx):
+    """
+    Categorical of catalog labels looked up by index (-1 becomes missing)
 
-    if tradein:
-        messages.append(
-            {
-                "sender": "customer",
-                "message": f"Tengo un {tradein['brand']} {tradein['model']} {tradein['year']} "
-                f"que me gustaría dar a cuenta",
-                "timestamp": datetime.now() - timedelta(hours=np.random.randint(1, 6)),
-            }
-        )
+    Builds the column straight from integer codes, so no per-row string
+    objects are created.
+    """
+    categories, codes = np.unique(np.asarray(labels, dtype=object), return_inverse=True)
+    return pd.Categorical.from_codes(np.where(idx < 0, -1, codes[idx]), categories)
 
-        messages.append(
-            {
-                "sender": "celeste",
-                "message": f"¡Perfecto! El trade-in es una excelente opción. "
-                f"Tu {tradein['brand']} {tradein['model']} {tradein['year']} podría tener "
-                f"un valor estimado de ${tradein['estimated_value']:,}. "
-                f"Un especialista lo evaluará cuando vengas al hub.",
-                "timestamp": datetime.now() - timedelta(hours=np.random.randint(1, 6)),
-            }
-        )
 
-    if vehicles:
-        fav = vehicles[0]
-        messages.append(
-            {
-                "sender": "celeste",
-                "message": f"Basado en lo que me cuentas, te recomiendo ver el "
-                f"{fav['brand']} {fav['model']} {fav['year']} a ${fav['price']:,}. "
-                f"Tiene excelentes reviews y está dentro de tu presupuesto.",
-                "timestamp": datetime.now() - timedelta(hours=np.random.randint(1, 3)),
-            }
-        )
+def build_appointments_frame(batches, first_id=5000, now=None):
+    """
+    Assemble agenda rows from drawn hub-months
 
-        messages.append(
-            {
-                "sender": "customer",
-                "message": "Se ve muy bien, me gustaría verlo en persona",
-                "timestamp": datetime.now() - timedelta(hours=np.random.randint(0, 2)),
-            }
-        )
+    Labels, ids and calendar attributes are derived once for all batches, so
+    the per-batch cost is only the random draws. Label columns come out as
+    categoricals (the dtype utils/schema.py stores them with).
 
-        messages.append(
-            {
-                "sender": "celeste",
-                "message": f"¡Excelente! Te agendo una cita en el hub. "
-                f"El {fav['brand']} {fav['model']} está disponible en el Lote {fav['lote']}. "
-                f"¿Qué día te queda mejor?",
-                "timestamp": datetime.now() - timedelta(hours=np.random.randint(0, 1)),
-            }
-        )
+    Args:
+        batches: List of ((country, region, hub), draws) pairs, where draws
+                 comes from draw_hub_month_appointments
+        first_id: Number of the first APT-<n> id
+        now: Current datetime (defaults to datetime.now())
 
-    return messages
+    Returns:
+        DataFrame with one row per appointment
+    """
+    now = now or datetime.now()
+    sizes = [len(draws["day"]) for _, draws in batches]
+    columns = {
+        key: np.concatenate([draws[key] for _, draws in batches])
+        for key in batches[0][1]
+    }
+    n = len(columns["day"])
+    batch_idx = np.repeat(np.arange(len(batches)), sizes)
 
+    def location(level):
+        return _lookup_labels([place[level] for place, _ in batches], batch_idx)
 
-def generate_appointments_data():
-    """
-    Generate appointments/agenda data for the current month
-    Includes past, today, and future appointments
-    """
-    appointments = []
-    appointment_id = 5000
+    def numbers(prefix, values):
+        return prefix + pd.Series(values).astype(str)
+
+    day = columns["day"]
+    type_idx = columns["type_idx"]
+    slot_idx = columns["slot_idx"]
+    vehicle_idx = columns["vehicle_idx"]
+    day_timing = np.sign((day - np.datetime64(now.date())).astype(np.int64))
 
-    # Current date info
-    today = datetime.now()
-    current_month_start = today.replace(
-        day=1, hour=0, minute=0, second=0, microsecond=0
+    # Calendar attributes computed once per distinct day
+    unique_days, day_idx = np.unique(day, return_inverse=True)
+    calendar = pd.DatetimeIndex(unique_days)
+
+    customer_names = (
+        np.array(APPOINTMENT_FIRST_NAMES, dtype=object)[columns["first_name_idx"]]
+        + " "
+        + np.array(APPOINTMENT_LAST_NAMES, dtype=object)[columns["last_name_idx"]]
     )
+    types = APPOINTMENT_TYPES
+    vehicles = APPOINTMENT_VEHICLES
 
-    # Calculate end of month
-    if today.month == 12:
-        next_month = today.replace(year=today.year + 1, month=1, day=1)
-    else:
-        next_month = today.replace(month=today.month + 1, day=1)
-    current_month_end = next_month - timedelta(days=1)
-
-    # Appointment types
-    appointment_types = [
-        {"type": "Test Drive", "duration_min": 45, "icon": "🚗"},
-        {"type": "Evaluación Trade-in", "duration_min": 30, "icon": "🔄"},
-        {"type": "Firma de Contrato", "duration_min": 60, "icon": "📝"},
-        {"type": "Entrega de Vehículo", "duration_min": 90, "icon": "🎉"},
-        {"type": "Consulta Financiamiento", "duration_min": 30, "icon": "💰"},
-        {"type": "Revisión de Vehículo", "duration_min": 45, "icon": "🔍"},
-        {"type": "Primera Visita", "duration_min": 60, "icon": "👋"},
-        {"type": "Seguimiento", "duration_min": 30, "icon": "📞"},
-    ]
+    return pd.DataFrame(
+        {
+            "appointment_id": numbers("APT-", np.arange(first_id, first_id + n)),
+            "date": np.array(calendar.date, dtype=object)[day_idx],
+            "time": _lookup_labels(APPOINTMENT_TIME_SLOTS, slot_idx),
+            "datetime": day.astype("datetime64[us]") + _SLOT_OFFSETS[slot_idx],
+            "country": location(0),
+            "region": location(1),
+            "hub": location(2),
+            "agent_id": columns["agent_id"].astype(np.int64),
+            "customer_id": numbers("CL-", columns["customer_number"]),
+            "customer_name": customer_names,
+            "customer_phone": (
+                numbers("+52 55 ", columns["phone_a"])
+                + numbers(" ", columns["phone_b"])
+            ),
+            "appointment_type": _lookup_labels([t["type"] for t in types], type_idx),
+            "type_icon": _lookup_labels([t["icon"] for t in types], type_idx),
+            "duration_min": np.array([t["duration_min"] for t in types])[type_idx],
+            "vehicle_interest": _lookup_labels(
+                [f"{v['brand']} {v['model']} {v['year']}" for v in vehicles],
+                vehicle_idx,
+            ),
+            "vehicle_price": np.array([v["price"] for v in vehicles])[vehicle_idx],
+            "status": _lookup_labels(APPOINTMENT_STATUSES, columns["status_idx"]),
+            "priority": _lookup_labels(
+                [APPOINTMENT_PRIORITY.get(t["type"], "Normal") for t in types],
+                type_idx,
+            ),
+            "notes": np.array(APPOINTMENT_NOTES, dtype=object)[columns["notes_idx"]],
+            "result": _lookup_labels(APPOINTMENT_RESULTS, columns["result_idx"]),
+            "is_today": day_timing == 0,
+            "is_past": day_timing < 0,
+            "is_future": day_timing > 0,
+            "week_number": calendar.isocalendar().week.to_numpy(np.int64)[day_idx],
+            "day_of_week": _lookup_labels(calendar.day_name(), day_idx),
+            "day_of_week_es": _lookup_labels(
+                np.array(DAY_NAMES_ES, dtype=object)[calendar.weekday], day_idx
+            ),
+        }
+    )
 
-    # Appointment statuses
-    statuses_past = ["Completada", "No Show", "Cancelada", "Reagendada"]
-    statuses_future = ["Confirmada", "Pendiente", "Por Confirmar"]
-
-    # Time slots (business hours)
-    time_slots = [
-        "09:00",
-        "09:30",
-        "10:00",
-        "10:30",
-        "11:00",
-        "11:30",
-        "12:00",
-        "12:30",
-        "13:00",
-        "14:00",
-        "14:30",
-        "15:00",
-        "15:30",
-        "16:00",
-        "16:30",
-        "17:00",
-        "17:30",
-        "18:00",
-    ]
 
-    # Customer names for appointments
-    first_names = [
-        "Carlos",
-        "María",
-        "José",
-        "Ana",
-        "Luis",
-        "Carmen",
-        "Miguel",
-        "Laura",
-        "Fernando",
-        "Patricia",
-        "Ricardo",
-        "Elena",
-        "Jorge",
-        "Isabel",
-        "Diego",
-        "Sofía",
-        "Andrés",
-        "Valentina",
-        "Pablo",
-        "Camila",
-        "Roberto",
-        "Gabriela",
-        "Sergio",
-        "Alejandra",
-        "Francisco",
-        "Daniela",
-        "Eduardo",
-        "Paulina",
-    ]
-    last_names = [
-        "González",
-        "Rodríguez",
-        "Martínez",
-        "López",
-        "García",
-        "Hernández",
-        "Pérez",
-        "Sánchez",
-        "Ramírez",
-        "Torres",
-        "Flores",
-        "Rivera",
-        "Gómez",
-        "Díaz",
-        "Morales",
-        "Vargas",
-        "Rojas",
-        "Castro",
-        "Ortiz",
-        "Ruiz",
-    ]
+def generate_region_appointments(
+    country, region, hubs, month_starts, first_id=5000, now=None, rng=None
+):
+    """
+    Generate the agenda of a set of hubs over several months
 
-    # Vehicle options for appointments
-    vehicles = [
-        {"brand": "Toyota", "model": "RAV4", "year": 2022, "price": 385000},
-        {"brand": "Honda", "model": "CR-V", "year": 2021, "price": 365000},
-        {"brand": "Nissan", "model": "X-Trail", "year": 2023, "price": 420000},
-        {"brand": "Mazda", "model": "CX-5", "year": 2022, "price": 395000},
-        {"brand": "Volkswagen", "model": "Tiguan", "year": 2021, "price": 355000},
-        {"brand": "Toyota", "model": "Corolla", "year": 2022, "price": 285000},
-        {"brand": "Honda", "model": "Civic", "year": 2023, "price": 325000},
-        {"brand": "Nissan", "model": "Sentra", "year": 2022, "price": 275000},
-        {"brand": "Mazda", "model": "3", "year": 2021, "price": 295000},
-        {"brand": "Ford", "model": "Escape", "year": 2022, "price": 375000},
-        {"brand": "Chevrolet", "model": "Equinox", "year": 2021, "price": 345000},
-        {"brand": "Hyundai", "model": "Tucson", "year": 2023, "price": 380000},
+    Every hub-month is drawn in one batch and the rows are assembled into a
+    single DataFrame (hub-major, then month, then day - same order as the
+    original nested loops).
+    """
+    now = now or datetime.now()
+    if rng is None:
+        rng = get_dataset_rng("appointments")
+    batches = [
+        ((country, region, hub), draw_hub_month_appointments(month_start, now, rng))
+        for hub in hubs
+        for month_start in month_starts
     ]
+    return build_appointments_frame(batches, first_id, now)
 
-    # Generate appointments for each hub
-    for country in COUNTRIES:
-        regions = HUBS[country]
-        for region in regions:
-            region_hubs = REGIONS_HUBS.get(country, {}).get(region, [region])
-            if not region_hubs:
-                region_hubs = [region]
 
-            for hub in region_hubs[:3]:  # Use up to 3 hubs per region
-                # Get agents for this hub
-                agent_ids = list(range(1, AGENTS_PER_HUB + 1))
-
-                # Generate appointments for the entire month
-                current_date = current_month_start
-                while current_date <= current_month_end:
-                    # Skip Sundays (day 6)
-                    if current_date.weekday() == 6:
-                        current_date += timedelta(days=1)
-                        continue
-
-                    # Number of appointments per day (more on weekends) - INCREASED
-                    if current_date.weekday() == 5:  # Saturday
-                        num_appointments = np.random.randint(15, 25)
-                    else:
-                        num_appointments = np.random.randint(10, 20)
-
-                    for _ in range(num_appointments):
-                        # Select random agent
-                        agent_id = random.choice(agent_ids)
-
-                        # Select appointment type
-                        appt_type = random.choice(appointment_types)
-
-                        # Select time slot
-                        time_str = random.choice(time_slots)
-                        hour, minute = map(int, time_str.split(":"))
-                        appt_datetime = current_date.replace(hour=hour, minute=minute)
-
-                        # Determine status based on date
-                        if current_date.date() < today.date():
-                            # Past appointment
-                            status_weights = [0.70, 0.15, 0.10, 0.05]
-                            status = np.random.choice(statuses_past, p=status_weights)
-                        elif current_date.date() == today.date():
-                            # Today's appointment
-                            if appt_datetime < datetime.now():
-                                status_weights = [0.75, 0.12, 0.08, 0.05]
-                                status = np.random.choice(
-                                    statuses_past, p=status_weights
-                                )
-                            else:
-                                status_weights = [0.60, 0.25, 0.15]
-                                status = np.random.choice(
-                                    statuses_future, p=status_weights
-                                )
-                        else:
-                            # Future appointment
-                            status_weights = [0.55, 0.30, 0.15]
-                            status = np.random.choice(statuses_future, p=status_weights)
-
-                        # Customer info
-                        customer_name = (
-                            f"{random.choice(first_names)} {random.choice(last_names)}"
-                        )
-                        customer_id = f"CL-{np.random.randint(1000, 9999)}"
-                        customer_phone = f"+52 55 {np.random.randint(1000, 9999)} {np.random.randint(1000, 9999)}"
+def iter_appointment_chunks(scale=1.0, months=1, rng=None, now=None):
+    """
+    Generate appointments/agenda data
+    Includes past, today, and future appointments
 
-                        # Vehicle of interest
-                        vehicle = random.choice(vehicles)
-                        vehicle_str = (
-                            f"{vehicle['brand']} {vehicle['model']} {vehicle['year']}"
-                        )
+    Args:
+        scale: Footprint multiplier (hubs per region)
+        months: Agenda months to generate, ending with the current month
+        rng: np.random.Generator (defaults to the appointments stream)
+        now: Current datetime (defaults to datetime.now())
+    """
+    if rng is None:
+        rng = get_dataset_rng("appointments")
+    hubs_per_region = get_scale_profile(scale)["hubs_per_region"]
+    appointment_id = 5000
+    now = now or datetime.now()
+    month_starts = get_agenda_months(months, now)
 
-                        # Priority based on appointment type
-                        if appt_type["type"] in [
-                            "Firma de Contrato",
-                            "Entrega de Vehículo",
-                        ]:
-                            priority = "Alta"
-                        elif appt_type["type"] in ["Test Drive", "Evaluación Trade-in"]:
-                            priority = "Media"
-                        else:
-                            priority = "Normal"
-
-                        # Notes
-                        notes_options = [
-                            "Cliente muy interesado",
-                            "Traerá acompañante",
-                            "Ya vio el auto online",
-                            "Tiene trade-in",
-                            "Preguntó por financiamiento",
-                            "Cliente referido",
-                            "Segunda visita",
-                            "Viene de otra ciudad",
-                            "Prefiere pago de contado",
-                            "Interesado en garantía extendida",
-                            "",
-                            "",
-                        ]
-                        notes = random.choice(notes_options)
-
-                        # Result (for completed appointments)
-                        result = None
-                        if status == "Completada":
-                            result_options = [
-                                "Interesado - Seguimiento",
-                                "Reservó vehículo",
-                                "Firmó contrato",
-                                "Pendiente decisión",
-                                "No le interesó",
-                                "Solicitó cotización",
-                                "Agendó segunda cita",
-                            ]
-                            result_weights = [0.25, 0.20, 0.15, 0.15, 0.10, 0.10, 0.05]
-                            result = np.random.choice(result_options, p=result_weights)
-
-                        appointments.append(
-                            {
-                                "appointment_id": f"APT-{appointment_id}",
-                                "date": current_date.date(),
-                                "time": time_str,
-                                "datetime": appt_datetime,
-                                "country": country,
-                                "region": region,
-                                "hub": hub,
-                                "agent_id": agent_id,
-                                "customer_id": customer_id,
-                                "customer_name": customer_name,
-                                "customer_phone": customer_phone,
-                                "appointment_type": appt_type["type"],
-                                "type_icon": appt_type["icon"],
-                                "duration_min": appt_type["duration_min"],
-                                "vehicle_interest": vehicle_str,
-                                "vehicle_price": vehicle["price"],
-                                "status": status,
-                                "priority": priority,
-                                "notes": notes,
-                                "result": result,
-                                "is_today": current_date.date() == today.date(),
-                                "is_past": current_date.date() < today.date(),
-                                "is_future": current_date.date() > today.date(),
-                                "week_number": current_date.isocalendar()[1],
-                                "day_of_week": current_date.strftime("%A"),
-                                "day_of_week_es": [
-                                    "Lunes",
-                                    "Martes",
-                                    "Miércoles",
-                                    "Jueves",
-                                    "Viernes",
-                                    "Sábado",
-                                    "Domingo",
-                                ][current_date.weekday()],
-                            }
-                        )
+    # Generate appointments for each hub
+    for country in COUNTRIES:
+        for region in HUBS[country]:
+            region_hubs = get_region_hubs(country, region, scale) or [region]
+            chunk = generate_region_appointments(
+                country,
+                region,
+                region_hubs[:hubs_per_region],  # 3 per region (× scale)
+                month_starts,
+                appointment_id,
+                now,
+                rng,
+            )
+            appointment_id += len(chunk)
 
-                        appointment_id += 1
+            # Emit one chunk per region so large scales stay memory-bounded
+            yield chunk
 
-                    current_date += timedelta(days=1)
 
-    return pd.DataFrame(appointments)
+def generate_appointments_data(scale=1.0, months=1, rng=None, now=None):
+    """Generate appointments/agenda data (all regions in one frame)"""
+    return _concat_chunks(iter_appointment_chunks(scale, months, rng, now))
 
 
-def generate_kavakos_data():
+def iter_kavako_chunks(scale=1.0, rng=None, now=None):
     """
     Generate detailed Kavako (agent) profiles with extended information
     """
+    if rng is None:
+        rng = get_dataset_rng("kavakos")
     kavakos = []
+    hubs_per_region = get_scale_profile(scale)["hubs_per_region"]
     kavako_id = 1
 
     # Extended first names
@@ -1967,49 +2012,47 @@ def generate_kavakos_data():
         "Curso Servicio al Cliente Avanzado",
     ]
 
-    today = datetime.now()
+    today = now or datetime.now()
 
     for country in COUNTRIES:
         regions = HUBS[country]
         for region in regions:
-            region_hubs = REGIONS_HUBS.get(country, {}).get(region, [region])
+            region_hubs = get_region_hubs(country, region, scale)
             if not region_hubs:
                 region_hubs = [region]
 
-            for hub in region_hubs[:3]:  # Up to 3 hubs per region
+            for hub in region_hubs[:hubs_per_region]:  # 3 per region (× scale)
                 # Generate 15-25 kavakos per hub
-                num_kavakos = np.random.randint(15, 26)
+                num_kavakos = randint(rng, 15, 26)
 
                 for i in range(num_kavakos):
-                    name = f"{random.choice(first_names)} {random.choice(last_names)}"
+                    name = f"{choice(rng, first_names)} {choice(rng, last_names)}"
                     email = f"{name.lower().replace(' ', '.').replace('á','a').replace('é','e').replace('í','i').replace('ó','o').replace('ú','u')}@kavak.com"
 
                     # Seniority
-                    months_at_kavak = np.random.randint(3, 48)
+                    months_at_kavak = randint(rng, 3, 48)
                     hire_date = today - timedelta(days=months_at_kavak * 30)
 
                     if months_at_kavak >= 24:
                         seniority = "Senior"
-                        base_conversion = np.random.uniform(0.18, 0.28)
+                        base_conversion = rng.uniform(0.18, 0.28)
                     elif months_at_kavak >= 12:
                         seniority = "Mid"
-                        base_conversion = np.random.uniform(0.14, 0.22)
+                        base_conversion = rng.uniform(0.14, 0.22)
                     else:
                         seniority = "Junior"
-                        base_conversion = np.random.uniform(0.10, 0.18)
+                        base_conversion = rng.uniform(0.10, 0.18)
 
                     # Performance metrics (current month)
-                    leads_assigned = np.random.randint(80, 200)
+                    leads_assigned = randint(rng, 80, 200)
                     appointments_scheduled = int(
-                        leads_assigned * np.random.uniform(0.35, 0.55)
+                        leads_assigned * rng.uniform(0.35, 0.55)
                     )
                     appointments_completed = int(
-                        appointments_scheduled * np.random.uniform(0.70, 0.90)
-                    )
-                    reservations = int(
-                        appointments_completed * np.random.uniform(0.40, 0.65)
+                        appointments_scheduled * rng.uniform(0.70, 0.90)
                     )
-                    sales = int(reservations * np.random.uniform(0.60, 0.85))
+                    reservations = int(appointments_completed * rng.uniform(0.40, 0.65))
+                    sales = int(reservations * rng.uniform(0.60, 0.85))
 
                     # Calculate metrics
                     conversion_rate = (
@@ -2022,29 +2065,29 @@ def generate_kavakos_data():
                     )
 
                     # Today's schedule
-                    appointments_today = np.random.randint(3, 8)
-                    appointments_completed_today = np.random.randint(
-                        0, min(appointments_today, 4)
+                    appointments_today = randint(rng, 3, 8)
+                    appointments_completed_today = randint(
+                        rng, 0, min(appointments_today, 4)
                     )
                     appointments_pending_today = (
                         appointments_today - appointments_completed_today
                     )
 
                     # This week
-                    appointments_this_week = np.random.randint(15, 35)
-                    sales_this_week = np.random.randint(2, 8)
+                    appointments_this_week = randint(rng, 15, 35)
+                    sales_this_week = randint(rng, 2, 8)
 
                     # Ancillaries
-                    financing_penetration = np.random.uniform(0.35, 0.65)
-                    insurance_penetration = np.random.uniform(0.40, 0.70)
-                    warranty_penetration = np.random.uniform(0.25, 0.55)
+                    financing_penetration = rng.uniform(0.35, 0.65)
+                    insurance_penetration = rng.uniform(0.40, 0.70)
+                    warranty_penetration = rng.uniform(0.25, 0.55)
 
                     # NPS & CSAT
-                    nps = np.random.uniform(55, 92)
-                    csat = np.random.uniform(70, 98)
+                    nps = rng.uniform(55, 92)
+                    csat = rng.uniform(70, 98)
 
                     # Response time (hours)
-                    avg_response_time = np.random.uniform(0.3, 3.5)
+                    avg_response_time = rng.uniform(0.3, 3.5)
 
                     # Points and level
                     total_points = int(
@@ -2064,13 +2107,13 @@ def generate_kavakos_data():
                         level = "🥉 Bronze"
 
                     # Ownership score
-                    ownership_score = np.random.uniform(75, 98)
+                    ownership_score = rng.uniform(75, 98)
 
                     # Specialization and certifications
-                    specialization = random.choice(specializations)
-                    num_certs = np.random.randint(1, 4)
-                    certifications = random.sample(certifications_pool, num_certs)
-                    languages = random.choice(languages_options)
+                    specialization = choice(rng, specializations)
+                    num_certs = randint(rng, 1, 4)
+                    certifications = sample(rng, certifications_pool, num_certs)
+                    languages = choice(rng, languages_options)
 
                     # Status
                     status_options = [
@@ -2081,7 +2124,7 @@ def generate_kavakos_data():
                         "Disponible",
                     ]
                     status_weights = [0.40, 0.25, 0.15, 0.05, 0.15]
-                    current_status = np.random.choice(status_options, p=status_weights)
+                    current_status = rng.choice(status_options, p=status_weights)
 
                     # Avatar placeholder
                     avatar_colors = [
@@ -2098,7 +2141,7 @@ def generate_kavakos_data():
                             "kavako_id": kavako_id,
                             "name": name,
                             "email": email,
-                            "phone": f"+52 55 {np.random.randint(1000, 9999)} {np.random.randint(1000, 9999)}",
+                            "phone": f"+52 55 {randint(rng, 1000, 9999)} {randint(rng, 1000, 9999)}",
                             "country": country,
                             "region": region,
                             "hub": hub,
@@ -2109,7 +2152,7 @@ def generate_kavakos_data():
                             "certifications": certifications,
                             "languages": languages,
                             "current_status": current_status,
-                            "avatar_color": random.choice(avatar_colors),
+                            "avatar_color": choice(rng, avatar_colors),
                             # Monthly metrics
                             "leads_assigned": leads_assigned,
                             "appointments_scheduled": appointments_scheduled,
@@ -2145,4 +2188,179 @@ def generate_kavakos_data():
 
                     kavako_id += 1
 
-    return pd.DataFrame(kavakos)
+            # Emit one chunk per region so large scales stay memory-bounded
+            if kavakos:
+                yield pd.DataFrame(kavakos)
+                kavakos = []
+
+
+def generate_kavakos_data(scale=1.0, rng=None, now=None):
+    """Generate Kavako profiles (all regions in one frame)"""
+    return _concat_chunks(iter_kavako_chunks(scale, rng, now))
+
+
+# =============================================================================
+# DATASET RUNNER - One seeded stream per dataset, optionally across processes
+# =============================================================================
+
+
+def _dataset_chunks(name, scale, date_range, rng, now, seed=DATASET_SEED):
+    """
+    Chunk iterator of one dataset, drawing from the given Generator (and
+    per-entity streams of the root seed, see random_streams.get_key_rng)
+    """
+    if name == "daily_metrics":
+        return iter_daily_metrics_chunks(date_range, scale, rng=rng)
+    if name == "agent_performance":
+        return iter_agent_performance_chunks(scale, rng)
+    if name == "inventory":
+        return iter([generate_inventory_data(rng)])
+    if name == "funnel":
+        return iter([generate_funnel_data(date_range, rng)])
+    if name == "alerts":
+        return iter([generate_alerts(now)])
+    if name == "customers":
+        return iter_customer_table_chunks(scale, rng, now, seed)
+    if name == "appointments":
+        return iter_appointment_chunks(scale, rng=rng, now=now)
+    if name == "kavakos":
+        return iter_kavako_chunks(scale, rng, now)
+    raise ValueError(f"Unknown dataset: {name}")
+
+
+def get_generation_workers():
+    """Worker processes for dataset generation (KAVAK_DATA_WORKERS, default 1)"""
+    return max(1, int(os.environ.get("KAVAK_DATA_WORKERS", 1)))
+
+
+def iter_dataset_stream(name, scale=1.0, now=None, seed=DATASET_SEED):
+    """
+    Stream one dataset as (table name, chunk) pairs
+
+    The dataset draws only from its own Generator (see utils/random_streams.py),
+    so its output does not depend on which other datasets are generated, in
+    which order, or in which process.
+    """
+    now = now or datetime.now()
+    rng = get_dataset_rng(name, seed)
+    date_range = get_history_date_range(scale, now)
+
+    for chunk in _dataset_chunks(name, scale, date_range, rng, now, seed):
+        # Customer chunks carry the flat frame plus its side tables
+        if isinstance(chunk, dict):
+            yield from chunk.items()
+        else:
+            yield name, chunk
+
+
+def build_dataset(name, scale=1.0, now=None, seed=DATASET_SEED, compact=True):
+    """
+    Build one dataset in memory (unit of work of the process pool)
+
+    Returns:
+        Dict of table name -> DataFrame (customers also returns its side tables)
+    """
+    chunks = {}
+    for table, chunk in iter_dataset_stream(name, scale, now, seed):
+        chunks.setdefault(table, []).append(chunk)
+    tables = {table: _concat_chunks(frames) for table, frames in chunks.items()}
+    return apply_schema(tables) if compact else tables
+
+
+def _map_datasets(scale, now, seed, compact, workers):
+    """Build every dataset, in DATASET_NAMES order, in-process or in a pool"""
+    if workers <= 1:
+        for name in DATASET_NAMES:
+            yield build_dataset(name, scale, now, seed, compact)
+        return
+
+    count = len(DATASET_NAMES)
+    with ProcessPoolExecutor(max_workers=min(workers, count)) as executor:
+        yield from executor.map(
+            build_dataset,
+            DATASET_NAMES,
+            [scale] * count,
+            [now] * count,
+            [seed] * count,
+            [compact] * count,
+        )
+
+
+def iter_dataset_chunks(scale=1.0, now=None, seed=DATASET_SEED, workers=1):
+    """
+    Stream every dataset as (name, chunk) pairs
+
+    Large datasets arrive in bounded chunks (daily_metrics by hub block, the
+    rest by region); small lookup tables arrive as a single chunk. With more
+    than one worker each dataset is built whole in a worker process instead
+    (more memory, same rows).
+    """
+    now = now or datetime.now()
+    if workers <= 1:
+        for name in DATASET_NAMES:
+            yield from iter_dataset_stream(name, scale, now, seed)
+        return
+
+    for tables in _map_datasets(scale, now, seed, False, workers):
+        yield from tables.items()
+
+
+def main(argv=None):
+    """Command line entry point: python -m utils.data_generator --scale 10"""
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Generate Kavak sample data")
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=get_data_scale(),
+        help="Footprint multiplier for hubs, agents, customers, appointments "
+        "and days (default: KAVAK_DATA_SCALE or 1)",
+    )
+    parser.add_argument(
+        "--out", help="Directory where each dataset is appended as <name>.csv"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=get_generation_workers(),
+        help="Processes building datasets concurrently; output is identical "
+        "for any value (default: KAVAK_DATA_WORKERS or 1)",
+    )
+    args = parser.parse_args(argv)
+
+    profile = get_scale_profile(args.scale)
+    print(
+        f"Scale {profile['scale']:g}: {profile['hub_replicas']}x hubs, "
+        f"{profile['history_days']} days of history"
+    )
+
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+
+    stats = {}
+    started = time.perf_counter()
+    for name, chunk in iter_dataset_chunks(args.scale, workers=args.workers):
+        entry = stats.setdefault(name, {"rows": 0, "chunks": 0, "peak_mb": 0.0})
+        entry["rows"] += len(chunk)
+        entry["chunks"] += 1
+        entry["peak_mb"] = max(
+            entry["peak_mb"], chunk.memory_usage(deep=True).sum() / 1024**2
+        )
+
+        if args.out:
+            path = os.path.join(args.out, f"{name}.csv")
+            first = entry["chunks"] == 1
+            chunk.to_csv(path, mode="w" if first else "a", header=first, index=False)
+
+    for name, entry in stats.items():
+        print(
+            f"  {name:<24} {entry['rows']:>12,} rows  {entry['chunks']:>5} chunks  "
+            f"largest chunk {entry['peak_mb']:,.1f} MB"
+        )
+    print(f"Done in {time.perf_counter() - started:,.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""
+Shared Dataset Store
+Builds the sample dataset once per server process and shares it across sessions
+"""
+
+import logging
+import os
+import threading
+from datetime import datetime
+
+import pandas as pd
+from utils.data_generator import generate_sample_data, get_data_scale
+from utils.data_tick import advance_dataset, get_dataset_day, period_start
+from utils.filter_engine import sort_dataset
+from utils.snapshot import load_snapshot, read_manifest
+
+# Views read the shared frames without defensive copies: with copy-on-write
+# (always on from pandas 3) a frame derived from them (filter, column subset,
+# shallow copy) never writes back into them
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+logger = logging.getLogger(__name__)
+
+# Process-wide state. Every Streamlit session reads from the same dict, so the
+# frames inside must be treated as read-only by the views (modified_shared_data).
+_lock = threading.Lock()
+_state = {
+    "data": None,
+    "version": 0,
+    "built_at": None,
+    "snapshot_version": None,
+    "scale": None,
+    "ticked_at": None,
+    "fingerprint": None,
+    "pins": None,
+    "now": None,
+}
+
+
+def _column_buffer(series):
+    """Identity of a column's data: changes whenever the column is written"""
+    values = series.array
+    if isinstance(values, pd.Categorical):
+        values = values.codes
+    elif isinstance(
+        values,
+        (
+            pd.arrays.NumpyExtensionArray,
+            pd.arrays.DatetimeArray,
+            pd.arrays.TimedeltaArray,
+        ),
+    ):
+        values = values.to_numpy()
+    else:
+        return id(values)
+    return values.__array_interface__["data"][0]
+
+
+def _fingerprint(data):
+    """Columns, length, dtypes and column buffers of every frame of a dataset"""
+    return {
+        name: (
+            tuple(df.columns),
+            len(df),
+            tuple(map(str, df.dtypes)),
+            tuple(_column_buffer(df[column]) for column in df.columns),
+        )
+        for name, df in data.items()
+        if isinstance(df, pd.DataFrame)
+    }
+
+
+def _publish_locked(data):
+    """Make data the shared dataset (caller must hold the lock)"""
+    _state["data"] = data
+    _state["now"] = get_dataset_day(data)
+    _state["fingerprint"] = _fingerprint(data)
+    # A second reference to every column: copy-on-write then moves any
+    # in-place write to a fresh buffer, which the fingerprint tells apart
+    _state["pins"] = {
+        name: df.copy(deep=False)
+        for name, df in data.items()
+        if isinstance(df, pd.DataFrame)
+    }
+
+
+def load_or_generate():
+    """
+    Default builder: load the on-disk snapshot if there is one, else generate
+
+    Returns:
+        (dataset dict, snapshot manifest or None)
+    """
+    data, manifest = load_snapshot()
+    if data is not None:
+        return data, manifest
+    return generate_sample_data(), None
+
+
+def _build_locked(builder):
+    """Build the dataset with the given builder (caller must hold the lock)"""
+    if builder is None:
+        data, manifest = load_or_generate()
+    else:
+        data, manifest = builder(), None
+    # daily_metrics partitioned by day so date windows are row slices
+    _publish_locked(sort_dataset(data))
+    _state["snapshot_version"] = manifest["version"] if manifest else None
+    _state["scale"] = manifest.get("scale", 1.0) if manifest else get_data_scale()
+    _state["version"] += 1
+    _state["built_at"] = datetime.now()
+    _state["ticked_at"] = None
+
+
+def get_shared_data():
+    """
+    Get the process-wide dataset, building it on first use
+
+    Returns:
+        Dictionary of DataFrames shared by every session (do not mutate)
+    """
+    if _state["data"] is None:
+        with _lock:
+            # Another session may have built it while we waited for the lock
+            if _state["data"] is None:
+                _build_locked(None)
+    return _state["data"]
+
+
+def get_data_version():
+    """
+    Get the current dataset version (bumped on every build/refresh)
+
+    Views key their caches on this value; it only changes when the shared
+    dataset is actually replaced.
+    """
+    return _state["version"]
+
+
+def get_data_now():
+    """
+    Current time of the shared dataset (its newest daily_metrics timestamp)
+
+    Generated data ends when it was built and each tick adds the next day,
+    so "today" and every "last N days" period follow this clock, never the
+    wall clock: a ticked or older snapshot keeps consistent windows.
+    """
+    get_shared_data()
+    return _state["now"]
+
+
+def get_data_period_start(days):
+    """First instant of the dataset's last `days` days (see data_tick.period_start)"""
+    return period_start(get_data_now(), days)
+
+
+def get_snapshot_version():
+    """Version stamp of the snapshot being served (None if generated in-process)"""
+    return _state["snapshot_version"]
+
+
+def get_data_built_at():
+    """Get the datetime when the current dataset was built"""
+    return _state["built_at"]
+
+
+def refresh_shared_data(builder=None):
+    """
+    Rebuild the shared dataset and bump its version
+
+    Without a builder the on-disk snapshot is reloaded when a newer one has
+    been written (a few milliseconds); with no snapshot the data is regenerated.
+
+    Args:
+        builder: Optional callable returning the new dataset dict
+
+    Returns:
+        The current dataset version
+    """
+    with _lock:
+        if builder is None and _state["snapshot_version"] is not None:
+            manifest = read_manifest()
+            if manifest and manifest["version"] == _state["snapshot_version"]:
+                return _state["version"]
+        _build_locked(builder)
+        return _state["version"]
+
+
+def _advance_locked(days):
+    """Tick the dataset forward (caller must hold the lock)"""
+    _publish_locked(
+        sort_dataset(advance_dataset(_state["data"], _state["scale"], days))
+    )
+    _state["version"] += 1
+    _state["ticked_at"] = datetime.now()
+
+
+def advance_shared_data(days=1):
+    """
+    Advance the shared dataset by whole days (next-day tick) and bump its version
+
+    Only the new day is generated (see utils/data_tick.py); sessions pick up
+    the new dict on their next rerun.
+
+    Returns:
+        The current dataset version
+    """
+    get_shared_data()
+    with _lock:
+        _advance_locked(days)
+        return _state["version"]
+
+
+def get_tick_interval():
+    """Seconds between automatic ticks (KAVAK_TICK_SECONDS, 0 = off)"""
+    return float(os.environ.get("KAVAK_TICK_SECONDS", 0))
+
+
+def advance_shared_data_if_due(interval=None):
+    """
+    Tick the shared dataset when the interval has elapsed (wall display mode)
+
+    Called on every rerun; at most one session performs each tick.
+
+    Returns:
+        True if this call advanced the dataset
+    """
+    interval = get_tick_interval() if interval is None else interval
+    if not interval:
+        return False
+
+    get_shared_data()
+    last = _state["ticked_at"] or _state["built_at"]
+    if (datetime.now() - last).total_seconds() < interval:
+        return False
+
+    with _lock:
+        # Another session may have ticked while we waited for the lock
+        last = _state["ticked_at"] or _state["built_at"]
+        if (datetime.now() - last).total_seconds() < interval:
+            return False
+        _advance_locked(1)
+        return True
+
+
+def attach_session_data(session_state):
+    """
+    Point a session at the shared dataset
+
+    Session state only keeps a reference to the shared dict plus its version,
+    so per-session memory does not grow with the size of the dataset.
+    """
+    data = get_shared_data()
+    session_state.data = data
+    session_state.data_version = get_data_version()
+    return data
+
+
+def shared_data_checks_enabled():
+    """Whether app.py checks the shared dataset on reruns (KAVAK_CHECK_SHARED_DATA)"""
+    return os.environ.get("KAVAK_CHECK_SHARED_DATA", "") not in ("", "0")
+
+
+def modified_shared_data(data):
+    """
+    Frames of the shared dataset that were changed in place
+
+    Views get the shared frames without copies, so a view that adds, drops
+    or writes columns of one of them (or replaces a frame of the dict)
+    would change what every session sees. One buffer lookup per column.
+
+    Args:
+        data: Dataset dict a session rendered (other versions are skipped)
+
+    Returns:
+        Sorted names of the modified frames (empty if none)
+    """
+    with _lock:
+        if data is not _state["data"]:
+            return []
+        expected = _state["fingerprint"]
+    current = _fingerprint(data)
+    return sorted(
+        name
+        for name in expected.keys() | current.keys()
+        if expected.get(name) != current.get(name)
+    )
+
+
+def check_shared_data(data):
+    """
+    Log a warning if the shared dataset was changed in place
+
+    A debugging aid (see shared_data_checks_enabled); the views are covered
+    by tests/test_shared_data.py.
+
+    Returns:
+        Sorted names of the modified frames (see modified_shared_data)
+    """
+    modified = modified_shared_data(data)
+    if modified:
+        logger.warning(
+            "Shared dataset modified in place: %s (views must work on derived frames)",
+            ", ".join(modified),
+        )
+    return modified
@@ -0,0 +1,288 @@
+"""
+Next-Day Data Tick
+Advance an existing dataset (in memory or snapshot) by one simulated day
+"""
+
+import numpy as np
+import pandas as pd
+from utils.data_generator import (
+    APPOINTMENT_RESULT_WEIGHTS,
+    APPOINTMENT_RESULTS,
+    APPOINTMENT_STATUS_WEIGHTS,
+    APPOINTMENT_STATUSES_FUTURE,
+    APPOINTMENT_STATUSES_PAST,
+    build_appointments_frame,
+    build_hub_catalog,
+    draw_hub_days_appointments,
+    generate_daily_metrics,
+)
+from utils.filter_engine import get_day_partitions
+from utils.random_streams import DATASET_SEED, get_day_rng
+from utils.schema import append_rows, compact_frame
+
+# Daily probability of a customer moving between statuses (VIP never moves)
+CUSTOMER_STATUS_TRANSITIONS = {
+    "Nuevo": {"Activo": 0.05},
+    "Activo": {"Recurrente": 0.01, "Inactivo": 0.01},
+    "Recurrente": {"Inactivo": 0.005},
+    "Inactivo": {"Activo": 0.02},
+}
+
+# Share of customers contacted on any given day
+CUSTOMER_DAILY_CONTACT_RATE = 0.15
+
+
+def get_dataset_day(data):
+    """Simulated current time of a dataset (newest daily_metrics timestamp)"""
+    return pd.Timestamp(data["daily_metrics"]["date"].max())
+
+
+def period_start(now, days):
+    """
+    First instant of a "last N days" period ending on the day of now
+
+    Periods are whole calendar days, today included, so they hold exactly
+    `days` days of daily_metrics whatever the time of day of its rows.
+
+    Args:
+        now: Current time of the dataset (get_dataset_day)
+        days: Number of days
+
+    Returns:
+        Timestamp at midnight
+    """
+    return pd.Timestamp(now).normalize() - pd.Timedelta(days=days - 1)
+
+
+def _set_labels(series, mask, values):
+    """Copy of a label column with the masked rows replaced"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        missing = [v for v in pd.unique(values) if v not in series.cat.categories]
+        if missing:
+            series = series.cat.add_categories(missing)
+    series = series.copy()
+    series.iloc[np.flatnonzero(mask)] = values
+    return series
+
+
+# =============================================================================
+# PER-DATASET TICKS
+# =============================================================================
+
+
+def advance_daily_metrics(daily, now, scale=1.0, rng=None):
+    """
+    Roll daily_metrics forward: add one row per hub for now, drop the oldest day
+
+    Args:
+        daily: Current daily_metrics frame
+        now: Timestamp of the new day (same time of day as the existing rows)
+        scale: Scale the dataset was generated with (defines the hubs)
+        rng: np.random.Generator for the new rows
+
+    Returns:
+        New daily_metrics frame with the same number of days
+    """
+    hub_catalog = build_hub_catalog(scale)
+    dates = daily["date"]
+    if (dates == dates.max()).sum() != len(hub_catalog):
+        raise ValueError(
+            f"daily_metrics does not match the hubs of scale {scale}; "
+            "pass the scale the dataset was generated with"
+        )
+
+    # Day-partitioned frames (see utils/filter_engine.py) drop the oldest day
+    # as a prefix slice and get the new day, in hierarchy order, at the end
+    partitions = get_day_partitions(daily)
+    if partitions is not None:
+        kept = daily.iloc[partitions["offsets"][1] :]
+    else:
+        kept = daily[dates > dates.min()]
+
+    rows = compact_frame(
+        generate_daily_metrics(pd.DatetimeIndex([now]), hub_catalog, rng)
+    )
+    rows = rows.sort_values(["country", "region", "hub"], kind="stable")
+    return append_rows(kept, rows)
+
+
+def advance_appointments(appointments, now, rng):
+    """
+    Move the agenda forward to now
+
+    Open appointments whose day has passed get a final status (and result),
+    the today/past/future flags are recomputed, the oldest agenda day is
+    dropped and the next business day is booked for every hub.
+
+    Args:
+        appointments: Current appointments frame
+        now: New current time (Timestamp)
+        rng: np.random.Generator for the transitions and new bookings
+
+    Returns:
+        New appointments frame
+    """
+    today = np.datetime64(now.date())
+    day = appointments["datetime"].to_numpy().astype("datetime64[D]")
+
+    # Status transitions of the appointments that went by while open
+    due = (day < today) & appointments["status"].isin(APPOINTMENT_STATUSES_FUTURE)
+    due = due.to_numpy()
+    statuses = rng.choice(
+        APPOINTMENT_STATUSES_PAST,
+        size=int(due.sum()),
+        p=APPOINTMENT_STATUS_WEIGHTS["past"],
+    )
+    completed = np.zeros(len(appointments), dtype=bool)
+    completed[np.flatnonzero(due)[statuses == "Completada"]] = True
+    results = rng.choice(
+        APPOINTMENT_RESULTS, size=int(completed.sum()), p=APPOINTMENT_RESULT_WEIGHTS
+    )
+
+    updated = appointments.assign(
+        status=_set_labels(appointments["status"], due, statuses),
+        result=_set_labels(appointments["result"], completed, results),
+        is_today=day == today,
+        is_past=day < today,
+        is_future=day > today,
+    )
+
+    # Roll the agenda window: drop the oldest day, book the next business day
+    horizon = pd.Timestamp(day.max()) + pd.Timedelta(days=1)
+    if horizon.weekday() == 6:  # Sundays closed
+        horizon += pd.Timedelta(days=1)
+
+    hubs = appointments[["country", "region", "hub"]].drop_duplicates()
+    batches = [
+        (place, draw_hub_days_appointments(pd.DatetimeIndex([horizon]), now, rng))
+        for place in hubs.itertuples(index=False, name=None)
+    ]
+    first_id = appointments["appointment_id"].str.slice(4).astype(np.int64).max() + 1
+    booked = build_appointments_frame(batches, int(first_id), now)
+
+    return append_rows(updated[day > day.min()], compact_frame(booked))
+
+
+def advance_customers(customers, now, rng):
+    """
+    Age the customer base by one day
+
+    Registration age grows by a day, a share of customers is contacted
+    (last_interaction_date = now) and statuses move following
+    CUSTOMER_STATUS_TRANSITIONS.
+    """
+    n = len(customers)
+    contacted = rng.random(n) < CUSTOMER_DAILY_CONTACT_RATE
+    u = rng.random(n)
+
+    status = customers["status"].astype(object).to_numpy()
+    new_status = status.copy()
+    for source, targets in CUSTOMER_STATUS_TRANSITIONS.items():
+        threshold = 0.0
+        for target, probability in targets.items():
+            moves = (
+                (status == source) & (u >= threshold) & (u < threshold + probability)
+            )
+            new_status[moves] = target
+            threshold += probability
+
+    changed = new_status != status
+    return customers.assign(
+        status=_set_labels(customers["status"], changed, new_status[changed]),
+        last_interaction_date=customers["last_interaction_date"].where(~contacted, now),
+        days_since_registration=customers["days_since_registration"] + 1,
+    )
+
+
+# =============================================================================
+# DATASET TICK
+# =============================================================================
+
+
+def advance_dataset(data, scale=1.0, days=1, seed=DATASET_SEED):
+    """
+    Advance a dataset by whole days instead of regenerating it
+
+    Only one day of rows is generated per tick; frames that do not change
+    (agents, inventory, funnel, ...) are shared with the input dict, and the
+    ones that do are copied once (append_rows concatenates whole columns,
+    the only part of a tick that grows with the history). Each
+    simulated day draws from its own stream, so replaying the same ticks on
+    the same dataset gives the same result.
+
+    Args:
+        data: Dataset dict (generated or loaded from a snapshot)
+        scale: Scale the dataset was generated with
+        days: Number of days to advance
+        seed: Root seed of the tick streams
+
+    Returns:
+        New dataset dict
+    """
+    data = dict(data)
+    for _ in range(days):
+        now = get_dataset_day(data) + pd.Timedelta(days=1)
+
+        data["daily_metrics"] = advance_daily_metrics(
+            data["daily_metrics"], now, scale, get_day_rng("daily_metrics", now, seed)
+        )
+        if "appointments" in data:
+            data["appointments"] = advance_appointments(
+                data["appointments"], now, get_day_rng("appointments", now, seed)
+            )
+        if "customers" in data:
+            data["customers"] = advance_customers(
+                data["customers"], now, get_day_rng("customers", now, seed)
+            )
+
+    return data
+
+
+def main(argv=None):
+    """Command line entry point: python -m utils.data_tick --days 1"""
+    import argparse
+    import time
+
+    from utils.history_store import read_history_manifest, write_partitions
+    from utils.snapshot import get_snapshot_dir, load_snapshot, save_snapshot
+
+    parser = argparse.ArgumentParser(
+        description="Advance the snapshot by whole days and write it as a new version"
+    )
+    parser.add_argument("--days", type=int, default=1, help="Days to advance")
+    parser.add_argument(
+        "--snapshot-dir",
+        default=get_snapshot_dir(),
+        help="Snapshot directory (default: KAVAK_SNAPSHOT_DIR or data/snapshot)",
+    )
+    args = parser.parse_args(argv)
+
+    data, manifest = load_snapshot(args.snapshot_dir)
+    if data is None:
+        parser.error(f"No snapshot found in {args.snapshot_dir}")
+
+    started = time.perf_counter()
+    scale = manifest.get("scale", 1.0)
+    daily = data["daily_metrics"]
+    data = advance_dataset(data, scale, args.days)
+    ticked = time.perf_counter() - started
+
+    # Days rolled out of the snapshot move to the history store, if there is one
+    history = read_history_manifest()
+    if history is not None:
+        first_day = data["daily_metrics"]["date"].iloc[0]
+        write_partitions(daily[daily["date"] < first_day], history["dir"])
+
+    new_manifest = save_snapshot(
+        data,
+        args.snapshot_dir,
+        metadata={"scale": scale, "previous_version": manifest["version"]},
+    )
+    print(
+        f"Advanced {args.days} day(s) to {get_dataset_day(data):%Y-%m-%d} "
+        f"in {ticked:,.2f}s; snapshot {new_manifest['version']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Filter Result Cache
+Filtered dataset dicts shared across sessions, keyed by dataset version, with LRU eviction
+"""
+
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+# Filter results kept (each one is a dict of mostly slices of the shared frames)
+FILTER_CACHE_SIZE = 256
+
+_lock = threading.Lock()
+_cache = OrderedDict()
+_state = {"version": None, "hits": 0, "misses": 0, "evictions": 0}
+
+
+def _share(result):
+    """
+    Per-caller copy of a cached result
+
+    A new dict of shallow frame copies: with pandas copy-on-write nothing a
+    session does to its frames (new columns, in-place edits) reaches the
+    cached result or other sessions, and no data is copied up front. Nested
+    dicts (the "filters" selections, flat dicts of scalars) are copied too.
+    """
+    return {name: _share_value(value) for name, value in result.items()}
+
+
+def _share_value(value):
+    """Per-caller copy of one entry of a cached result (see _share)"""
+    if isinstance(value, pd.DataFrame):
+        return value.copy(deep=False)
+    if isinstance(value, dict):
+        return dict(value)
+    return value
+
+
+def cached_filter(version, key, compute):
+    """
+    Memoize a filtered dataset dict across sessions
+
+    Results of older dataset versions are dropped as soon as a newer version
+    is seen, so the cache never pins frames of a replaced dataset; a session
+    still rendering an older version gets its result computed, not cached.
+
+    Args:
+        version: Dataset version the result is computed from (data_store)
+        key: Hashable filter tuple (view, user scope, filters, period start, ...)
+        compute: Callable returning the filtered dataset dict on a miss
+
+    Returns:
+        Filtered dataset dict (a private copy for the caller)
+    """
+    with _lock:
+        if _state["version"] is None or version > _state["version"]:
+            _cache.clear()
+            _state["version"] = version
+        result = _cache.get(key) if version == _state["version"] else None
+        if result is not None:
+            _cache.move_to_end(key)
+            _state["hits"] += 1
+            return _share(result)
+        _state["misses"] += 1
+
+    # Computed outside the lock; two sessions missing the same key at once
+    # both compute it and the second one simply replaces the first
+    result = dict(compute())
+
+    with _lock:
+        if version == _state["version"]:
+            _cache[key] = result
+            _cache.move_to_end(key)
+            while len(_cache) > FILTER_CACHE_SIZE:
+                _cache.popitem(last=False)
+                _state["evictions"] += 1
+    return _share(result)
+
+
+def get_filter_cache_stats():
+    """
+    Hit/miss counters of the filter cache
+
+    Returns:
+        Dict with hits, misses, evictions, hit_rate, size and maxsize
+    """
+    with _lock:
+        lookups = _state["hits"] + _state["misses"]
+        return {
+            "hits": _state["hits"],
+            "misses": _state["misses"],
+            "evictions": _state["evictions"],
+            "hit_rate": _state["hits"] / lookups if lookups else 0.0,
+            "size": len(_cache),
+            "maxsize": FILTER_CACHE_SIZE,
+        }
+
+
+def clear_filter_cache():
+    """Drop every cached result and reset the counters"""
+    with _lock:
+        _cache.clear()
+        _state.update(version=None, hits=0, misses=0, evictions=0)
@@ -0,0 +1,470 @@
+"""
+Hierarchical Filter Engine
+Country/region/hub/date filters as row-range slices over sorted indexes
+"""
+
+import weakref
+
+import numpy as np
+import pandas as pd
+
+# Hierarchy levels, outermost first
+HIERARCHY_COLUMNS = ("country", "region", "hub")
+
+DATE_COLUMN = "date"
+
+# Datasets stored physically sorted by (date, country, region, hub), i.e.
+# partitioned by day: any date window is one row slice found through the
+# per-day offsets, and the next-day tick only touches both ends. Hierarchy
+# filters go through the sort permutation of the hierarchy index. The other
+# frames keep their own row order (customers are sorted by customer_key for
+# the side-table lookups).
+PARTITIONED_DATASETS = ("daily_metrics",)
+
+# (id(frame), kind) -> (weakref to the frame, index); entries go away with
+# the frame
+_indexes = {}
+
+
+def get_frame_cache(df, kind, build):
+    """
+    Per-frame derived structure (index, cube, ...) built by build(df) on
+    first use and kept while the frame lives
+    """
+    key = (id(df), kind)
+    entry = _indexes.get(key)
+    if entry is not None and entry[0]() is df:
+        return entry[1]
+
+    index = build(df)
+    _indexes[key] = (weakref.ref(df), index)
+    weakref.finalize(df, _indexes.pop, key, None)
+    return index
+
+
+def _to_datetime64(value):
+    """Timestamp-like value as np.datetime64 for searchsorted"""
+    return np.datetime64(pd.Timestamp(value), "us")
+
+
+def _bound_sides(inclusive):
+    """searchsorted sides of the start and end bounds (Series.between style)"""
+    if inclusive not in ("both", "left", "right", "neither"):
+        raise ValueError(f"Invalid inclusive value: {inclusive}")
+    start_side = "left" if inclusive in ("both", "left") else "right"
+    end_side = "right" if inclusive in ("both", "right") else "left"
+    return start_side, end_side
+
+
+# =============================================================================
+# SORTING
+# =============================================================================
+
+
+def _group_codes(df, columns):
+    """Integer key per row that sorts like the hierarchy columns (by category)"""
+    key = np.zeros(len(df), dtype=np.int64)
+    for column in columns:
+        series = df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes = series.cat.codes.to_numpy().astype(np.int64)
+            size = len(series.cat.categories) + 1
+        else:
+            codes, uniques = pd.factorize(series, sort=True)
+            size = len(uniques) + 1
+        key = key * size + codes + 1
+    return key
+
+
+def _sort_keys(df):
+    """(hierarchy columns present, date array or None) of a frame"""
+    columns = [column for column in HIERARCHY_COLUMNS if column in df.columns]
+    dates = None
+    if DATE_COLUMN in df.columns and pd.api.types.is_datetime64_any_dtype(
+        df[DATE_COLUMN]
+    ):
+        dates = df[DATE_COLUMN].to_numpy()
+    return columns, dates
+
+
+def _is_sorted(first, second=None):
+    """Whether rows are ordered by first, then second (both arrays)"""
+    if not np.all(first[1:] >= first[:-1]):
+        return False
+    if second is None:
+        return True
+    tie = first[1:] == first[:-1]
+    return bool(np.all(second[1:][tie] >= second[:-1][tie]))
+
+
+def _hierarchy_order(df):
+    """
+    Stable permutation that sorts a frame by hierarchy, then date
+
+    Returns:
+        (group key per row, dates, permutation or None if already sorted)
+    """
+    columns, dates = _sort_keys(df)
+    groups = _group_codes(df, columns)
+
+    # Cheap linear checks first
+    if _is_sorted(groups, dates):
+        return groups, dates, None
+    if dates is not None and not _is_sorted(dates):
+        return groups, dates, np.lexsort((dates, groups))
+
+    # Rows already in date order (day-partitioned frames): a stable sort by
+    # group keeps them in date order inside every group. Small keys take
+    # numpy's linear-time radix sort.
+    keys = groups.astype(np.int16) if groups.max() < 2**15 else groups
+    return groups, dates, np.argsort(keys, kind="stable")
+
+
+def sort_by_date(df):
+    """
+    Sort a frame by (date, country, region, hub)
+
+    Returns the same frame when it is already in order (the usual case after
+    the first build), else a sorted copy with a fresh RangeIndex.
+    """
+    columns, dates = _sort_keys(df)
+    if dates is None:
+        return df
+    groups = _group_codes(df, columns)
+    if _is_sorted(dates, groups):
+        return df
+    return df.take(np.lexsort((groups, dates))).reset_index(drop=True)
+
+
+def sort_dataset(data):
+    """
+    Sort the PARTITIONED_DATASETS of a dataset dict by date
+
+    Returns:
+        New dict (frames already in order are shared with the input)
+    """
+    data = dict(data)
+    for name in PARTITIONED_DATASETS:
+        if isinstance(data.get(name), pd.DataFrame):
+            data[name] = sort_by_date(data[name])
+    return data
+
+
+# =============================================================================
+# DATE PARTITIONS
+# =============================================================================
+
+
+def build_day_partitions(df):
+    """
+    Per-day row offsets of a frame sorted by date
+
+    Returns:
+        Dict with the distinct dates ("days") and "offsets" (rows of
+        days[i] are offsets[i]:offsets[i + 1]), or None when the frame has
+        no datetime "date" column or is not sorted by it
+    """
+    dates = _sort_keys(df)[1]
+    if dates is None or not _is_sorted(dates):
+        return None
+    starts = np.flatnonzero(np.r_[True, dates[1:] != dates[:-1]]) if len(df) else []
+    starts = np.asarray(starts, dtype=np.int64)
+    return {"days": dates[starts], "offsets": np.r_[starts, len(df)]}
+
+
+def get_day_partitions(df):
+    """Day partitions of a frame (see build_day_partitions), cached"""
+    return get_frame_cache(df, "days", build_day_partitions)
+
+
+def date_window(df, start=None, end=None, inclusive="left"):
+    """
+    Rows of a frame with start <= date < end
+
+    On day-partitioned frames this is two binary searches over the days and
+    a row slice, so a YTD or multi-year window costs the same as a week.
+    Other frames fall back to a boolean mask.
+
+    Args:
+        df: DataFrame with a "date" column
+        start: First date (None = open)
+        end: Last date (None = open)
+        inclusive: Which bounds are included, as in Series.between
+                   ("left" by default: start included, end excluded)
+
+    Returns:
+        DataFrame slice; treat it as read-only
+    """
+    partitions = get_day_partitions(df)
+    if partitions is None:
+        start_side, end_side = _bound_sides(inclusive)
+        dates = df[DATE_COLUMN]
+        mask = np.ones(len(df), dtype=bool)
+        if start is not None:
+            mask &= dates >= start if start_side == "left" else dates > start
+        if end is not None:
+            mask &= dates <= end if end_side == "right" else dates < end
+        return df[mask]
+
+    first, last = day_range(partitions["days"], start, end, inclusive)
+    offsets = partitions["offsets"]
+    return df.iloc[offsets[first] : offsets[last]]
+
+
+def day_range(days, start=None, end=None, inclusive="left"):
+    """
+    Positions [first, last) of the sorted days inside a date window
+
+    Args:
+        days: Sorted datetime64 array of distinct days
+        start, end, inclusive: Window as in date_window
+
+    Returns:
+        (first, last) with first <= last
+    """
+    start_side, end_side = _bound_sides(inclusive)
+    first = 0 if start is None else days.searchsorted(_to_datetime64(start), start_side)
+    last = (
+        len(days) if end is None else days.searchsorted(_to_datetime64(end), end_side)
+    )
+    return int(first), int(max(first, last))
+
+
+# =============================================================================
+# HIERARCHY INDEX
+# =============================================================================
+
+
+def build_hierarchy_index(df):
+    """
+    Index a frame by its hierarchy groups
+
+    Every (country, region, hub) group is a contiguous row range of the
+    frame in hierarchy order; dates are sorted inside each range so a date
+    cutoff is a binary search.
+
+    Args:
+        df: DataFrame with any of the HIERARCHY_COLUMNS (and maybe a date)
+
+    Returns:
+        Dict with the group labels, their [start, stop) ranges, the date array
+        in hierarchy order and the permutation to that order (None when the
+        frame is already sorted)
+    """
+    columns = [column for column in HIERARCHY_COLUMNS if column in df.columns]
+    groups, dates, order = _hierarchy_order(df)
+    if order is not None:
+        groups = groups[order]
+        dates = dates[order] if dates is not None else None
+
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]]) if len(df) else []
+    starts = np.asarray(starts, dtype=np.int64)
+    first_rows = starts if order is None else order[starts]
+    return {
+        "labels": {
+            column: np.asarray(df[column].take(first_rows), dtype=object)
+            for column in columns
+        },
+        "starts": starts,
+        "stops": np.r_[starts[1:], len(df)].astype(np.int64),
+        "dates": dates,
+        "order": order,
+    }
+
+
+def get_hierarchy_index(df):
+    """Hierarchy index of a frame, built on first use and kept while it lives"""
+    return get_frame_cache(df, "hierarchy", build_hierarchy_index)
+
+
+def select_groups(labels, country=None, region=None, hub=None):
+    """
+    Boolean mask of the hierarchy groups under a node
+
+    Args:
+        labels: Group labels of a hierarchy index (column -> array)
+        country, region, hub: Levels to match (None or missing = any)
+    """
+    size = len(next(iter(labels.values()))) if labels else 1
+    selected = np.ones(size, dtype=bool)
+    for column, value in zip(HIERARCHY_COLUMNS, (country, region, hub)):
+        if value is not None and column in labels:
+            selected &= labels[column] == value
+    return selected
+
+
+# =============================================================================
+# FILTERS
+# =============================================================================
+
+
+def _range_positions(df, index, starts, stops):
+    """Frame positions of the rows of the given ranges (in index order)"""
+    lengths = stops - starts
+    positions = np.repeat(starts - np.cumsum(np.r_[0, lengths[:-1]]), lengths)
+    positions += np.arange(lengths.sum())
+    if index["order"] is not None:
+        # Back to the frame's own row order, like a boolean mask would give;
+        # large selections are ordered through a mask instead of a sort
+        positions = index["order"][positions]
+        if len(positions) * 16 < len(df):
+            positions = np.sort(positions)
+        else:
+            mask = np.zeros(len(df), dtype=bool)
+            mask[positions] = True
+            positions = np.flatnonzero(mask)
+    return positions
+
+
+def _take_ranges(df, index, starts, stops):
+    """Rows of the given ranges (in index order) as a slice or a take"""
+    if index["order"] is None and len(starts) == 1:
+        return df.iloc[starts[0] : stops[0]]
+    return df.take(_range_positions(df, index, starts, stops))
+
+
+def group_rows(df, groups):
+    """
+    Positions of the rows of some hierarchy groups, in the frame's row order
+
+    Args:
+        df: DataFrame with hierarchy columns
+        groups: Boolean mask over the groups of the frame's hierarchy index
+
+    Returns:
+        Sorted int64 array of row positions
+    """
+    index = get_hierarchy_index(df)
+    starts, stops = index["starts"][groups], index["stops"][groups]
+    if len(starts) == 0:
+        return np.zeros(0, dtype=np.int64)
+    return np.asarray(_range_positions(df, index, starts, stops), dtype=np.int64)
+
+
+def take_rows(df, rows):
+    """Rows at sorted positions, as a slice when they are contiguous"""
+    if len(rows) == 0:
+        return df.iloc[:0]
+    if rows[-1] - rows[0] + 1 == len(rows):
+        return df.iloc[int(rows[0]) : int(rows[-1]) + 1]
+    return df.take(rows)
+
+
+def filter_frame(
+    df,
+    country=None,
+    region=None,
+    hub=None,
+    start=None,
+    end=None,
+    inclusive="left",
+    groups=None,
+):
+    """
+    Rows of a frame under a hierarchy node and inside a date window
+
+    Cost grows with the number of hierarchy groups and matching rows, not
+    with the size of the frame. Levels set to None (or missing from the
+    frame) are not filtered; start/end only apply to frames with a datetime
+    "date" column.
+
+    Args:
+        df: DataFrame with country/region/hub columns
+        country: Country to keep
+        region: Region to keep
+        hub: Hub to keep
+        start: First date to keep (None = open)
+        end: Last date to keep (None = open)
+        inclusive: Which date bounds are included (see date_window)
+        groups: Boolean mask over the frame's hierarchy groups to stay
+                within (a row scope, see utils/row_scope.py)
+
+    Returns:
+        DataFrame slice (a view when the rows are contiguous); treat it as
+        read-only
+    """
+    levels = [
+        (column, value)
+        for column, value in zip(HIERARCHY_COLUMNS, (country, region, hub))
+        if value is not None and column in df.columns
+    ]
+    dated = _sort_keys(df)[1] is not None
+    if not levels and groups is None:
+        if dated and (start is not None or end is not None):
+            return date_window(df, start, end, inclusive)
+        return df.iloc[:]
+
+    index = get_hierarchy_index(df)
+    selected = select_groups(index["labels"], country, region, hub)
+    if groups is not None:
+        selected &= groups
+
+    starts, stops = index["starts"][selected], index["stops"][selected]
+    if dated and (start is not None or end is not None):
+        # Dates are sorted inside every group: one binary search per bound
+        start_side, end_side = _bound_sides(inclusive)
+        group_dates = [index["dates"][first:stop] for first, stop in zip(starts, stops)]
+        firsts = starts
+        if start is not None:
+            low = _to_datetime64(start)
+            starts = firsts + np.array(
+                [dates.searchsorted(low, start_side) for dates in group_dates],
+                dtype=np.int64,
+            )
+        if end is not None:
+            high = _to_datetime64(end)
+            stops = firsts + np.array(
+                [dates.searchsorted(high, end_side) for dates in group_dates],
+                dtype=np.int64,
+            )
+        keep = starts < stops
+        starts, stops = starts[keep], stops[keep]
+
+    if len(starts) == 0:
+        return df.iloc[:0]
+    return _take_ranges(df, index, starts, stops)
+
+
+def snap_start(df, start):
+    """
+    First date of a frame on or after start
+
+    Filtering from the snapped date gives exactly the same rows, so it can
+    stand in for a "now minus N days" cutoff in cache keys (it only changes
+    when the cutoff crosses a date present in the data).
+
+    Returns:
+        Timestamp (Timestamp.max when no date qualifies), or start itself
+        for frames without a datetime "date" column
+    """
+    dates = _sort_keys(df)[1]
+    if start is None or dates is None:
+        return start
+    partitions = get_day_partitions(df)
+    days = partitions["days"] if partitions is not None else np.unique(dates)
+    position = days.searchsorted(_to_datetime64(start))
+    if position == len(days):
+        return pd.Timestamp.max
+    return pd.Timestamp(days[position])
+
+
+def filter_dataset(data, names=None, **filters):
+    """
+    Apply filter_frame to several frames of a dataset dict
+
+    Args:
+        data: Dataset dict
+        names: Datasets to filter (default: every frame with a country
+               column); the others are passed through unchanged
+        **filters: country/region/hub/start/end (see filter_frame)
+
+    Returns:
+        New dict with the same keys
+    """
+    filtered = {}
+    for name, df in data.items():
+        wanted = names is None or name in names
+        if wanted and isinstance(df, pd.DataFrame) and "country" in df.columns:
+            df = filter_frame(df, **filters)
+        filtered[name] = df
+    return filtered
@@ -0,0 +1,456 @@
+"""
+History Store
+Multi-year daily_metrics on disk, partitioned by year/month, read with partition pruning
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc as ipc
+from utils.filter_engine import DATE_COLUMN, sort_by_date
+from utils.metric_cube import ROWS
+from utils.schema import compact_frame
+
+# Bump when the partition layout changes so old stores are ignored
+HISTORY_FORMAT = 1
+
+MANIFEST_NAME = "manifest.json"
+
+DEFAULT_HISTORY_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "history"
+)
+
+# Hierarchy columns the readers filter on
+LEVEL_COLUMNS = ("country", "region", "hub")
+
+# Window sums kept (a few floats each), keyed by store state and window
+SUMS_CACHE_SIZE = 128
+
+_lock = threading.Lock()
+_sums = OrderedDict()
+
+
+def get_history_dir():
+    """History directory (KAVAK_HISTORY_DIR or <app>/data/history)"""
+    return os.environ.get("KAVAK_HISTORY_DIR", DEFAULT_HISTORY_DIR)
+
+
+def _partition_file(key):
+    """Relative path of a partition file (hive-style year=/month= folders)"""
+    year, month = key.split("-")
+    return os.path.join(f"year={year}", f"month={month}.arrow")
+
+
+# =============================================================================
+# MANIFEST
+# =============================================================================
+
+
+def read_history_manifest(history_dir=None):
+    """
+    Read the history manifest
+
+    Returns:
+        Manifest dict ("partitions": key -> file, rows, first_day, last_day)
+        with the store directory under "dir", or None when there is no store
+    """
+    history_dir = history_dir or get_history_dir()
+    path = os.path.join(history_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != HISTORY_FORMAT or not manifest["partitions"]:
+        return None
+    manifest["dir"] = history_dir
+    return manifest
+
+
+def _write_manifest(history_dir, manifest):
+    """Write the manifest atomically so readers never see a partial file"""
+    manifest = {key: value for key, value in manifest.items() if key != "dir"}
+    manifest["updated_at"] = datetime.now().isoformat()
+    tmp_path = os.path.join(history_dir, f".{MANIFEST_NAME}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, os.path.join(history_dir, MANIFEST_NAME))
+
+
+# =============================================================================
+# WRITE
+# =============================================================================
+
+
+def _to_table(df):
+    """daily_metrics rows as an Arrow table (categories stored as plain text)"""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    schema = pa.schema(
+        [
+            (
+                field.with_type(field.type.value_type)
+                if pa.types.is_dictionary(field.type)
+                else field
+            )
+            for field in table.schema
+        ],
+        metadata=table.schema.metadata,
+    )
+    return table.cast(schema)
+
+
+def write_partitions(df, history_dir=None):
+    """
+    Store daily_metrics rows in their year/month partitions
+
+    Days already stored are replaced by the new rows; every touched
+    partition is rewritten whole (a month at most) and swapped in
+    atomically, then the manifest is updated.
+
+    Args:
+        df: daily_metrics rows (any days, any order)
+        history_dir: Store directory (defaults to get_history_dir())
+
+    Returns:
+        The updated manifest
+    """
+    history_dir = history_dir or get_history_dir()
+    os.makedirs(history_dir, exist_ok=True)
+    manifest = read_history_manifest(history_dir) or {
+        "format": HISTORY_FORMAT,
+        "partitions": {},
+    }
+
+    days = df[DATE_COLUMN].dt.normalize()
+    for key, rows in df.groupby(days.dt.strftime("%Y-%m"), sort=True):
+        entry = manifest["partitions"].get(key)
+        if entry is not None:
+            stored = _read_frame(history_dir, entry)
+            replaced = (
+                stored[DATE_COLUMN]
+                .dt.normalize()
+                .isin(rows[DATE_COLUMN].dt.normalize().unique())
+            )
+            rows = pd.concat([stored[~replaced], rows], ignore_index=True)
+        rows = sort_by_date(compact_frame(rows.reset_index(drop=True)))
+
+        path = os.path.join(history_dir, _partition_file(key))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        table = _to_table(rows)
+        with ipc.new_file(f"{path}.tmp", table.schema) as writer:
+            writer.write_table(table)
+        os.replace(f"{path}.tmp", path)
+
+        manifest["partitions"][key] = {
+            "file": _partition_file(key),
+            "rows": len(rows),
+            "first_day": rows[DATE_COLUMN].iloc[0].isoformat(),
+            "last_day": rows[DATE_COLUMN].iloc[-1].isoformat(),
+        }
+
+    manifest["partitions"] = dict(sorted(manifest["partitions"].items()))
+    _write_manifest(history_dir, manifest)
+    return read_history_manifest(history_dir)
+
+
+# =============================================================================
+# READ
+# =============================================================================
+
+
+def day_window(start=None, end=None, inclusive="left", before=None):
+    """
+    Calendar days of a date window as a half-open [low, high) range
+
+    Stored days keep the time of day of the run that generated them, which
+    need not match the in-memory dataset's; windows are therefore resolved
+    to whole days (a bound on day D includes or excludes all of D), which is
+    what date_window does on data with one timestamp per day.
+
+    Args:
+        start, end, inclusive: Date window (see filter_engine.date_window)
+        before: Only days before this one (e.g. the first in-memory day)
+
+    Returns:
+        (low, high) midnight timestamps (None = open)
+    """
+    one_day = pd.Timedelta(days=1)
+    low = high = None
+    if start is not None:
+        low = pd.Timestamp(start).normalize()
+        if inclusive in ("right", "neither"):
+            low += one_day
+    if end is not None:
+        high = pd.Timestamp(end).normalize()
+        if inclusive in ("right", "both"):
+            high += one_day
+    if before is not None:
+        before = pd.Timestamp(before).normalize()
+        high = before if high is None else min(high, before)
+    return low, high
+
+
+def prune_partitions(manifest, low=None, high=None):
+    """
+    Partitions with days inside [low, high) (see day_window), oldest first
+
+    Returns:
+        List of (manifest entry, whether every row is inside the window)
+    """
+    selected = []
+    for entry in manifest["partitions"].values():
+        first = pd.Timestamp(entry["first_day"]).normalize()
+        last = pd.Timestamp(entry["last_day"]).normalize()
+        if (low is not None and last < low) or (high is not None and first >= high):
+            continue
+        inside = (low is None or first >= low) and (high is None or last < high)
+        selected.append((entry, inside))
+    return selected
+
+
+def _read_table(history_dir, entry, columns=None):
+    """One partition as an Arrow table, memory-mapped (nothing copied)"""
+    source = pa.memory_map(os.path.join(history_dir, entry["file"]), "r")
+    table = ipc.open_file(source).read_all()
+    return table.select(columns) if columns is not None else table
+
+
+def _read_frame(history_dir, entry):
+    """One whole partition as a compact DataFrame"""
+    return compact_frame(_read_table(history_dir, entry).to_pandas())
+
+
+def _row_filter(table, low, high, filters):
+    """Boolean Arrow mask of the rows of a partition to keep (None = all)"""
+    mask = None
+    conditions = []
+    dates = table.column(DATE_COLUMN)
+    if low is not None:
+        conditions.append(pc.greater_equal(dates, pa.scalar(low, type=dates.type)))
+    if high is not None:
+        conditions.append(pc.less(dates, pa.scalar(high, type=dates.type)))
+    for column in LEVEL_COLUMNS:
+        if filters.get(column) is not None:
+            conditions.append(pc.equal(table.column(column), filters[column]))
+    for condition in conditions:
+        mask = condition if mask is None else pc.and_(mask, condition)
+    return mask
+
+
+def iter_history(
+    manifest,
+    start=None,
+    end=None,
+    inclusive="left",
+    country=None,
+    region=None,
+    hub=None,
+    columns=None,
+    before=None,
+):
+    """
+    Stream the rows of a window as Arrow tables, one partition at a time
+
+    Only the partitions the window touches are opened (memory-mapped); the
+    dates of a partition are only compared when the window cuts it.
+
+    Args:
+        manifest: History manifest (read_history_manifest)
+        start, end, inclusive: Date window (see day_window)
+        country, region, hub: Hierarchy node (None = any)
+        columns: Columns to read (default: all)
+        before: Only days before this one (e.g. the first in-memory day)
+    """
+    low, high = day_window(start, end, inclusive, before)
+    filters = {"country": country, "region": region, "hub": hub}
+    for entry, inside in prune_partitions(manifest, low, high):
+        table = _read_table(manifest["dir"], entry)
+        if inside:
+            mask = _row_filter(table, None, None, filters)
+        else:
+            mask = _row_filter(table, low, high, filters)
+        if mask is not None:
+            table = table.filter(mask)
+        if table.num_rows:
+            yield table.select(columns) if columns is not None else table
+
+
+def load_history(manifest, start=None, end=None, inclusive="left", **filters):
+    """
+    Rows of a window as a compact daily_metrics DataFrame
+
+    Only the touched partitions are read; use window_sums for aggregates
+    over long windows instead of materializing the rows.
+
+    Returns:
+        DataFrame sorted by (date, country, region, hub)
+    """
+    tables = list(iter_history(manifest, start, end, inclusive, **filters))
+    if not tables:
+        # Empty frame with the stored schema
+        entry = next(iter(manifest["partitions"].values()))
+        tables = [_read_table(manifest["dir"], entry).slice(0, 0)]
+    return compact_frame(pa.concat_tables(tables).to_pandas())
+
+
+def _stream_sums(manifest, start, end, inclusive, filters):
+    """Window sums read partition by partition (see window_sums)"""
+    totals = {ROWS: 0.0}
+    for table in iter_history(manifest, start, end, inclusive, **filters):
+        for field in table.schema:
+            if pa.types.is_integer(field.type) or pa.types.is_floating(field.type):
+                value = pc.sum(table.column(field.name).cast(pa.float64())).as_py()
+                totals[field.name] = totals.get(field.name, 0.0) + (value or 0.0)
+        totals[ROWS] += table.num_rows
+    return totals
+
+
+def window_sums(manifest, start=None, end=None, inclusive="left", **filters):
+    """
+    Sums of every numeric column over a window, streamed partition by partition
+
+    Memory stays at one partition whatever the window length; results are
+    memoized per store update, so reruns with the same period are free.
+
+    Args:
+        manifest: History manifest
+        start, end, inclusive: Date window
+        **filters: country/region/hub (None = any) and before (see
+                   iter_history)
+
+    Returns:
+        Dict column -> sum plus ROWS, like metric_cube.window_totals
+    """
+    key = (
+        manifest["dir"],
+        manifest.get("updated_at"),
+        None if start is None else pd.Timestamp(start),
+        None if end is None else pd.Timestamp(end),
+        inclusive,
+        tuple(sorted(filters.items())),
+    )
+    with _lock:
+        totals = _sums.get(key)
+        if totals is not None:
+            _sums.move_to_end(key)
+            return dict(totals)
+
+    totals = _stream_sums(manifest, start, end, inclusive, filters)
+    with _lock:
+        _sums[key] = totals
+        while len(_sums) > SUMS_CACHE_SIZE:
+            _sums.popitem(last=False)
+    return dict(totals)
+
+
+def day_bounds(manifest, start=None, end=None, inclusive="left", before=None):
+    """
+    First and last stored day inside a window
+
+    Reads the date column of at most the first and last touched partitions.
+
+    Returns:
+        (first, last) timestamps, or None when the window has no rows
+    """
+    low, high = day_window(start, end, inclusive, before)
+    partitions = prune_partitions(manifest, low, high)
+    bounds = []
+    for entry, inside in partitions[:1] + partitions[1:][-1:]:
+        if inside:
+            bounds += [
+                pd.Timestamp(entry["first_day"]),
+                pd.Timestamp(entry["last_day"]),
+            ]
+            continue
+        table = _read_table(manifest["dir"], entry, [DATE_COLUMN])
+        dates = table.filter(_row_filter(table, low, high, {})).column(DATE_COLUMN)
+        if len(dates):
+            bounds += [
+                pd.Timestamp(pc.min(dates).as_py()),
+                pd.Timestamp(pc.max(dates).as_py()),
+            ]
+    if not bounds:
+        return None
+    return min(bounds), max(bounds)
+
+
+# =============================================================================
+# BUILD
+# =============================================================================
+
+
+def build_history(years, scale=1.0, end=None, history_dir=None, seed=None):
+    """
+    Generate years of daily_metrics history, one month at a time
+
+    Each month draws from the daily_metrics stream of its first day, so a
+    rebuild gives the same rows and memory stays at one month of data.
+
+    Args:
+        years: Years of history before end
+        scale: Scale of the dataset the history goes with (defines the hubs)
+        end: First day not covered (defaults to the first day of a freshly
+             generated dataset, so history and in-memory days line up)
+        history_dir: Store directory
+        seed: Root seed (defaults to the dataset seed)
+
+    Returns:
+        The updated manifest
+    """
+    from utils.data_generator import (
+        build_hub_catalog,
+        generate_daily_metrics,
+        get_history_date_range,
+    )
+    from utils.random_streams import DATASET_SEED, get_day_rng
+
+    seed = DATASET_SEED if seed is None else seed
+    end = pd.Timestamp(end) if end is not None else get_history_date_range(scale)[0]
+    days = pd.date_range(end - pd.DateOffset(years=years), end, inclusive="left")
+    hub_catalog = build_hub_catalog(scale)
+
+    manifest = None
+    for _, month in days.to_series().groupby(days.strftime("%Y-%m")):
+        rng = get_day_rng("daily_metrics", month.iloc[0], seed)
+        rows = generate_daily_metrics(pd.DatetimeIndex(month), hub_catalog, rng)
+        manifest = write_partitions(rows, history_dir)
+    return manifest
+
+
+def main(argv=None):
+    """Command line entry point: python -m utils.history_store --years 3"""
+    import argparse
+    import time
+
+    from utils.data_generator import get_data_scale
+
+    parser = argparse.ArgumentParser(
+        description="Generate multi-year daily_metrics history partitioned by month"
+    )
+    parser.add_argument("--years", type=int, default=2, help="Years of history")
+    parser.add_argument(
+        "--scale", type=float, default=get_data_scale(), help="Data scale factor"
+    )
+    parser.add_argument(
+        "--history-dir",
+        default=get_history_dir(),
+        help="History directory (default: KAVAK_HISTORY_DIR or data/history)",
+    )
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    manifest = build_history(args.years, args.scale, history_dir=args.history_dir)
+    rows = sum(entry["rows"] for entry in manifest["partitions"].values())
+    print(
+        f"Wrote {len(manifest['partitions'])} partitions ({rows:,} rows) to "
+        f"{args.history_dir} in {time.perf_counter() - started:,.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
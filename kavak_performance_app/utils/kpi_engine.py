@@ -0,0 +1,361 @@
+"""
+KPI Engine
+Executive Dashboard KPIs and their previous-period comparison in one reduction
+"""
+
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+from utils.filter_engine import day_range, select_groups
+from utils.history_store import day_bounds, window_sums
+from utils.metric_cube import ROWS
+
+# Executive Dashboard KPIs in card order. Every KPI is numerator /
+# denominator over window sums of daily_metrics (denominator None = the
+# plain sum, ROWS = the average of the daily values), times scale plus
+# offset. A default (number or function of the KPIs before it) stands in
+# when the numerator column is missing.
+#   section: dashboard block of the card (None = computed, not drawn)
+#   group: cards drawn together between separators inside a section
+#   compare: show the change vs the previous period on the card
+KPIS = {
+    "sales": {
+        "label": "Entregas",
+        "numerator": "sales",
+        "format": "{:,.0f}",
+        "section": "financials",
+        "group": "volume",
+    },
+    "purchases": {
+        "label": "Compras",
+        "numerator": "purchases",
+        "format": "{:,.0f}",
+        "section": "financials",
+        "group": "volume",
+    },
+    "full_margin": {
+        "label": "Full Margin",
+        "numerator": "full_margin",
+        "denominator": ROWS,
+        "default": 950,
+        "format": "${:,.0f}",
+        "section": "financials",
+        "group": "unit_economics",
+    },
+    "fin_ins": {
+        "label": "Fin & Ins",
+        "numerator": "fin_ins",
+        "denominator": ROWS,
+        "default": 1200,
+        "format": "${:,.0f}",
+        "section": "financials",
+        "group": "unit_economics",
+    },
+    "kt": {
+        "label": "KT",  # KT = Kavak Trade
+        "numerator": "kt",
+        "denominator": ROWS,
+        "default": 150,
+        "format": "${:,.0f}",
+        "section": "financials",
+        "group": "unit_economics",
+    },
+    "pc1": {
+        "label": "PC1",
+        "numerator": "pc1",
+        "denominator": ROWS,
+        "default": lambda kpi: kpi["full_margin"] + kpi["fin_ins"] + kpi["kt"],
+        "format": "${:,.0f}",
+        "section": "financials",
+        "group": "contribution",
+    },
+    "ecac": {
+        "label": "eCAC",
+        "numerator": "ecac",
+        "denominator": ROWS,
+        "default": 350,
+        "format": "${:,.0f}",
+        "section": "financials",
+        "group": "contribution",
+        "delta_color": "inverse",
+    },
+    "pc1_minus_ecac": {
+        "label": "PC1 - eCAC",
+        "numerator": "pc1_minus_ecac",
+        "denominator": ROWS,
+        "default": lambda kpi: kpi["pc1"] - kpi["ecac"],
+        "format": "${:,.0f}",
+        "section": "financials",
+        "group": "contribution",
+    },
+    # Mock NPS breakdowns (Buyer/Seller/Relational) based on the average NPS
+    "nps": {
+        "label": "NPS Promedio",
+        "numerator": "nps",
+        "denominator": ROWS,
+        "format": "{:.0f}",
+        "section": "customer",
+        "compare": False,
+    },
+    "nps_buyer": {
+        "label": "NPS Buyer",
+        "numerator": "nps",
+        "denominator": ROWS,
+        "offset": 2,  # Buyers usually happier
+        "format": "{:.0f}",
+        "section": "customer",
+        "compare": False,
+    },
+    "nps_seller": {
+        "label": "NPS Seller",
+        "numerator": "nps",
+        "denominator": ROWS,
+        "offset": -3,  # Sellers often more critical on price
+        "format": "{:.0f}",
+        "section": "customer",
+        "compare": False,
+    },
+    "nps_relational": {
+        "label": "NPS Relacional",
+        "numerator": "nps",
+        "denominator": ROWS,
+        "format": "{:.0f}",
+        "section": "customer",
+        "compare": False,
+    },
+    "leads": {
+        "label": "Leads Totales",
+        "numerator": "leads",
+        "format": "{:.0f}",
+        "section": "demand",
+    },
+    "conversion": {
+        "label": "Conversión Total",
+        "numerator": "sales",
+        "denominator": "leads",
+        "scale": 100,
+        "format": "{:.1f}%",
+        "section": "demand",
+    },
+    "cost_per_lead": {
+        "label": "Costo por Lead",
+        "numerator": "cost_per_lead",
+        "denominator": ROWS,
+        "format": "${:.0f}",
+        "section": "demand",
+        "delta_color": "inverse",
+    },
+    "sla": {
+        "label": "SLA Lead → Venta",
+        "numerator": "sla_lead_to_sale",
+        "denominator": ROWS,
+        "format": "{:.1f} días",
+        "section": "operations",
+        "compare": False,
+    },
+    "cancellations": {
+        "label": "Cancelaciones",
+        "numerator": "cancellations",
+        "format": "{:.0f}",
+        "section": "operations",
+        "compare": False,
+        "delta_color": "inverse",
+    },
+    "revenue": {
+        "label": "Revenue",
+        "numerator": "revenue",
+        "format": "${:,.0f}",
+        "section": None,
+    },
+    "ticket": {
+        "label": "Ticket Promedio",
+        "numerator": "ticket_avg",
+        "denominator": ROWS,
+        "format": "${:,.0f}",
+        "section": None,
+    },
+    "csat": {
+        "label": "CSAT",
+        "numerator": "csat",
+        "denominator": ROWS,
+        "format": "{:.1f}",
+        "section": None,
+    },
+}
+
+
+def previous_period(first_day, last_day):
+    """
+    Period of the same length right before [first_day, last_day]
+
+    Returns:
+        (start, end) timestamps, both days included
+    """
+    period_length = (last_day - first_day).days + 1
+    prev_end = first_day - timedelta(days=1)
+    prev_start = prev_end - timedelta(days=period_length - 1)
+    return prev_start, prev_end
+
+
+def _history_sums(history, start, end, inclusive, before, columns, filters):
+    """Window sums of the on-disk history before the cube, in cube column order"""
+    totals = window_sums(history, start, end, inclusive, before=before, **filters)
+    return np.array([totals.get(column, 0.0) for column in columns])
+
+
+def _period_sums(cube, start, end, inclusive, selected, history=None, filters=None):
+    """Window sums of the current and previous period: (2, columns) array"""
+    days = cube["days"]
+    first, last = day_range(days, start, end, inclusive)
+    period = previous = None
+    prev_first = prev_last = first
+    if first < last:
+        period = (pd.Timestamp(days[first]), pd.Timestamp(days[last - 1]))
+
+    # Days before the cube come from the history store (only the partitions
+    # the window touches are read)
+    first_day = pd.Timestamp(days[0]) if len(days) else None
+    reaches_history = (
+        history is not None
+        and first_day is not None
+        and (start is None or pd.Timestamp(start) < first_day)
+    )
+    if reaches_history:
+        bounds = day_bounds(history, start, end, inclusive, before=first_day)
+        if bounds is not None:
+            # Stored days on the clock of the cube's days
+            time_of_day = first_day - first_day.normalize()
+            bounds = [day.normalize() + time_of_day for day in bounds]
+            period = (bounds[0], period[1] if period else bounds[1])
+
+    if period is not None:
+        previous = previous_period(*period)
+        prev_first, prev_last = day_range(days, *previous, "both")
+
+    # One gather of the four cube edges for both windows
+    edges = cube["cum"][[first, last, prev_first, prev_last]][:, :, selected]
+    edges = edges.sum(axis=2)
+    sums = edges[[1, 3]] - edges[[0, 2]]
+
+    columns, filters = cube["columns"], filters or {}
+    if reaches_history:
+        sums[0] += _history_sums(
+            history, start, end, inclusive, first_day, columns, filters
+        )
+    if history is not None and previous is not None and previous[0] < first_day:
+        sums[1] += _history_sums(
+            history, *previous, "both", first_day, columns, filters
+        )
+    return sums, period, previous
+
+
+def compute_kpis(
+    cube,
+    start=None,
+    end=None,
+    inclusive="left",
+    country=None,
+    region=None,
+    hub=None,
+    history=None,
+):
+    """
+    Every KPI of the registry for a filter spec, with the previous period
+
+    The previous period has the length of the current one (first to last
+    day with data) and ends the day before it; when it has no data the KPIs
+    compare against themselves (no change).
+
+    With a history store, the days of either period before the first day of
+    the cube are summed from the store, so long periods (YTD) cover more
+    than the in-memory window without loading it.
+
+    Args:
+        cube: Metric cube of daily_metrics (utils/metric_cube.py)
+        start, end, inclusive: Current date window (see filter_engine)
+        country, region, hub: Hierarchy node (None = any)
+        history: History manifest (utils/history_store.py), or None to use
+                 the cube only
+
+    Returns:
+        Dict with:
+            kpis: name -> dict with the registry entry (label, format,
+                  section, group, compare, delta_color) plus value,
+                  previous and change (% vs previous, None when the
+                  previous value is 0 or equal)
+            rows, previous_rows: Rows of daily_metrics behind each period
+            period, previous_period: (first, last) day of each period, or
+                                     None for an empty window
+    """
+    selected = select_groups(cube["labels"], country, region, hub)
+    filters = {"country": country, "region": region, "hub": hub}
+    sums, period, previous = _period_sums(
+        cube, start, end, inclusive, selected, history, filters
+    )
+
+    # Numerators and denominators of every KPI as column positions; missing
+    # numerators point at a NaN column and plain sums at a column of ones
+    position = {column: i for i, column in enumerate(cube["columns"])}
+    ones, missing = len(position), len(position) + 1
+    sums = np.c_[sums, np.ones(2), np.full(2, np.nan)]
+    numerators = [position.get(kpi["numerator"], missing) for kpi in KPIS.values()]
+    denominators = [
+        (
+            position.get(kpi.get("denominator"), missing)
+            if kpi.get("denominator")
+            else ones
+        )
+        for kpi in KPIS.values()
+    ]
+    scale = np.array([kpi.get("scale", 1) for kpi in KPIS.values()])
+    offset = np.array([kpi.get("offset", 0) for kpi in KPIS.values()])
+
+    numerator, denominator = sums[:, numerators], sums[:, denominators]
+    values = np.divide(
+        numerator, denominator, out=np.zeros_like(numerator), where=denominator != 0
+    )
+    values = np.where(np.isnan(numerator), np.nan, values * scale + offset)
+
+    # Defaults of missing columns, in registry order (they may use the KPIs
+    # before them)
+    by_name = dict(zip(KPIS, values.T))
+    for name, kpi in KPIS.items():
+        if "default" in kpi and np.isnan(by_name[name]).all():
+            default = kpi["default"]
+            by_name[name] = (
+                default(by_name) if callable(default) else np.full(2, float(default))
+            )
+
+    rows, previous_rows = int(sums[0, position[ROWS]]), int(sums[1, position[ROWS]])
+    kpis = {}
+    for name, kpi in KPIS.items():
+        value, prev = (float(v) for v in by_name[name])
+        if previous_rows == 0:
+            prev = value
+        change = None
+        if prev != 0 and prev != value:
+            change = (value - prev) / prev * 100
+        kpis[name] = {
+            "section": None,
+            "group": None,
+            "compare": True,
+            "delta_color": "normal",
+            **kpi,
+            "value": value,
+            "previous": prev,
+            "change": change,
+        }
+
+    return {
+        "kpis": kpis,
+        "rows": rows,
+        "previous_rows": previous_rows,
+        "period": period,
+        "previous_period": previous,
+    }
+
+
+def section_kpis(kpis, section):
+    """KPIs of one dashboard section, in registry order"""
+    return [kpi for kpi in kpis.values() if kpi["section"] == section]
@@ -0,0 +1,148 @@
+"""
+Metric Cube
+Prefix sums of daily_metrics over hub x day x metric for O(1) window aggregates
+"""
+
+import numpy as np
+import pandas as pd
+from utils.filter_engine import (
+    DATE_COLUMN,
+    build_day_partitions,
+    day_range,
+    get_day_partitions,
+    get_frame_cache,
+    get_hierarchy_index,
+    select_groups,
+)
+
+# Extra cube column with the number of rows, so means are sum / rows
+ROWS = "rows"
+
+
+def _cube_columns(df):
+    """Numeric columns of a frame (every one of them is summed in the cube)"""
+    return [
+        column
+        for column in df.columns
+        if pd.api.types.is_numeric_dtype(df[column])
+        and not pd.api.types.is_bool_dtype(df[column])
+    ]
+
+
+def build_metric_cube(df):
+    """
+    Cumulative sums of every numeric column per day and hierarchy group
+
+    cum[d, k, g] is the sum of column k over the rows of group g dated
+    before days[d], so the sum over days [i, j) is cum[j] - cum[i]: any
+    window costs two (columns x groups) lookups. Means come from the
+    sums and the ROWS count (daily_metrics has no nulls).
+
+    Args:
+        df: Frame with a datetime "date" column and hierarchy columns
+
+    Returns:
+        Dict with the group "labels" (as in the hierarchy index), the sorted
+        "days", the cube "columns" and the "cum" array (days+1 x columns x
+        groups, float64: about one float per cell of daily_metrics)
+    """
+    index = get_hierarchy_index(df)
+    group_sizes = index["stops"] - index["starts"]
+    groups = np.repeat(np.arange(len(group_sizes)), group_sizes)
+    if index["order"] is not None:
+        row_groups = np.empty_like(groups)
+        row_groups[index["order"]] = groups
+        groups = row_groups
+
+    partitions = get_day_partitions(df) or build_day_partitions(
+        df.sort_values(DATE_COLUMN)[[DATE_COLUMN]]
+    )
+    days = partitions["days"]
+    cells = np.searchsorted(days, df[DATE_COLUMN].to_numpy()) * len(group_sizes)
+    cells += groups
+
+    columns = _cube_columns(df)
+    shape = (len(days), len(group_sizes))
+    cum = np.zeros((len(days) + 1, len(columns) + 1, len(group_sizes)))
+
+    # daily_metrics sorted by date (filter_engine.sort_dataset) has one row
+    # per hub and day in cell order: the rows are the cube cells as they are
+    if len(cells) == shape[0] * shape[1] and np.array_equal(
+        cells, np.arange(len(cells))
+    ):
+        for k, column in enumerate(columns):
+            cum[1:, k] = df[column].to_numpy().reshape(shape)
+        cum[1:, -1] = 1
+    else:
+        size = shape[0] * shape[1]
+        for k, column in enumerate(columns):
+            weights = df[column].to_numpy(np.float64)
+            cum[1:, k] = np.bincount(cells, weights, size).reshape(shape)
+        cum[1:, -1] = np.bincount(cells, minlength=size).reshape(shape)
+
+    np.cumsum(cum[1:], axis=0, out=cum[1:])
+    return {
+        "labels": index["labels"],
+        "days": days,
+        "columns": columns + [ROWS],
+        "cum": cum,
+    }
+
+
+def get_metric_cube(df):
+    """Metric cube of a frame (see build_metric_cube), built once per frame"""
+    return get_frame_cache(df, "metric_cube", build_metric_cube)
+
+
+def group_window_totals(
+    cube, start=None, end=None, inclusive="left", country=None, region=None, hub=None
+):
+    """
+    Window sums per hierarchy group: two lookups per group
+
+    Args:
+        cube: Metric cube (get_metric_cube)
+        start, end, inclusive: Date window (see filter_engine.date_window)
+        country, region, hub: Hierarchy node (None = any)
+
+    Returns:
+        DataFrame with the group labels, one column per cube column and the
+        ROWS count (groups without rows in the window included, ROWS = 0)
+    """
+    first, last = day_range(cube["days"], start, end, inclusive)
+    selected = select_groups(cube["labels"], country, region, hub)
+    cum = cube["cum"]
+    sums = cum[last][:, selected] - cum[first][:, selected]
+
+    totals = pd.DataFrame(sums.T, columns=cube["columns"])
+    for column, labels in reversed(cube["labels"].items()):
+        totals.insert(0, column, labels[selected])
+    return totals
+
+
+def window_totals(
+    cube, start=None, end=None, inclusive="left", country=None, region=None, hub=None
+):
+    """
+    Sums of every cube column over a hierarchy node and date window
+
+    Returns:
+        Dict column -> sum, plus ROWS (number of rows in the window)
+    """
+    first, last = day_range(cube["days"], start, end, inclusive)
+    selected = select_groups(cube["labels"], country, region, hub)
+    cum = cube["cum"]
+    sums = (cum[last][:, selected] - cum[first][:, selected]).sum(axis=1)
+    return dict(zip(cube["columns"], sums.tolist()))
+
+
+def frame_totals(df):
+    """Same dict as window_totals computed straight from the rows of a frame"""
+    totals = {column: float(df[column].sum()) for column in _cube_columns(df)}
+    totals[ROWS] = float(len(df))
+    return totals
+
+
+def window_mean(totals, column):
+    """Mean of a column from window totals (NaN for an empty window)"""
+    return totals[column] / totals[ROWS] if totals[ROWS] else np.nan
@@ -0,0 +1,85 @@
+"""
+Random Streams
+Independent, reproducible numpy Generators for each dataset generator
+"""
+
+import numpy as np
+
+# Root seed of the sample dataset
+DATASET_SEED = 42
+
+# Every dataset draws from its own child of SeedSequence(DATASET_SEED); the
+# position in this tuple is the child's spawn key, so only append new names.
+DATASET_NAMES = (
+    "daily_metrics",
+    "agent_performance",
+    "inventory",
+    "funnel",
+    "alerts",
+    "customers",
+    "appointments",
+    "kavakos",
+)
+
+# Per-entity streams under a dataset (see get_key_rng); the position in this
+# tuple is part of the spawn key, so only append new names.
+KEY_STREAMS = (
+    "customer_interactions",
+    "celeste",
+)
+
+
+def get_dataset_seed(name, seed=DATASET_SEED):
+    """
+    SeedSequence of one dataset
+
+    Same as SeedSequence(seed).spawn(len(DATASET_NAMES))[index of name], but
+    without spawning the siblings, so a worker process can rebuild it alone.
+    """
+    return np.random.SeedSequence(seed, spawn_key=(DATASET_NAMES.index(name),))
+
+
+def get_dataset_rng(name, seed=DATASET_SEED):
+    """np.random.Generator for one dataset"""
+    return np.random.default_rng(get_dataset_seed(name, seed))
+
+
+def get_day_rng(name, day, seed=DATASET_SEED):
+    """
+    np.random.Generator for one dataset on one simulated day
+
+    Used by the next-day tick (utils/data_tick.py): replaying the same days
+    from the same dataset gives the same rows.
+    """
+    spawn_key = (DATASET_NAMES.index(name), day.toordinal())
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=spawn_key))
+
+
+def get_key_rng(name, stream, key, seed=DATASET_SEED):
+    """
+    np.random.Generator for one entity of a dataset (e.g. one customer)
+
+    A child of get_dataset_seed(name, seed) keyed by the stream and the
+    entity's integer key: an entity's draws follow the root seed but do not
+    depend on the other entities or on how they are chunked.
+    """
+    spawn_key = get_dataset_seed(name, seed).spawn_key + (
+        KEY_STREAMS.index(stream),
+        int(key),
+    )
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=spawn_key))
+
+
+def randint(rng, low, high):
+    """Python int in [low, high) drawn from a numpy Generator"""
+    return int(rng.integers(low, high))
+
+
+def choice(rng, options):
+    """Pick one element of a list with a numpy Generator"""
+    return options[rng.integers(len(options))]
+
+
+def sample(rng, options, k):
+    """Pick k distinct elements of a list with a numpy Generator"""
+    return [options[i] for i in rng.choice(len(options), size=k, replace=False)]
@@ -0,0 +1,215 @@
+"""
+Rollup Cube
+daily_metrics aggregated at day/week/month x hub/region/country grain
+"""
+
+import numpy as np
+import pandas as pd
+from utils.filter_engine import (
+    day_range,
+    get_frame_cache,
+    get_hierarchy_index,
+    select_groups,
+)
+from utils.metric_cube import ROWS, get_metric_cube
+
+# Hierarchy columns that identify a node of each level
+LEVELS = {
+    "total": (),
+    "country": ("country",),
+    "region": ("country", "region"),
+    "hub": ("country", "region", "hub"),
+}
+
+# Time grains as pandas periods (weeks start on Monday, as to_period("W"))
+TIME_GRAINS = {"day": "D", "week": "W", "month": "M"}
+
+# Column of the period start in grained rollups
+PERIOD_COLUMN = "period"
+
+# Ratio metrics as (numerator, denominator) sums of the rollup; both parts
+# add up across hubs and periods, so a ratio of any rollup row is exact
+# (averages of daily values are sum / ROWS)
+RATIOS = {
+    "conversion": ("sales", "leads"),
+    "appointment_rate": ("appointments", "leads"),
+    "cancellation_rate": ("cancellations", "reservations"),
+    "avg_nps": ("nps", ROWS),
+    "avg_csat": ("csat", ROWS),
+    "avg_sla": ("sla_lead_to_sale", ROWS),
+    "avg_ticket": ("ticket_avg", ROWS),
+    "avg_cost_per_lead": ("cost_per_lead", ROWS),
+}
+
+
+def build_periods(days, grain):
+    """
+    Period of every day of a metric cube
+
+    Returns:
+        Dict with an integer "code" per day (equal within a period) and the
+        period "start" timestamp per day
+    """
+    periods = pd.DatetimeIndex(days).to_period(TIME_GRAINS[grain])
+    return {
+        "code": np.asarray(periods.asi8, dtype=np.int64),
+        "start": np.asarray(periods.start_time, dtype="datetime64[us]"),
+    }
+
+
+def _get_periods(df, grain):
+    """Periods of the days of a frame's metric cube, cached per frame"""
+    return get_frame_cache(
+        df,
+        ("periods", grain),
+        lambda frame: build_periods(get_metric_cube(frame)["days"], grain),
+    )
+
+
+def _node_starts(labels, columns, selected):
+    """First selected group of every node of a level (groups are contiguous)"""
+    count = int(selected.sum())
+    if count == 0:
+        return np.zeros(0, dtype=np.int64)
+    change = np.zeros(count, dtype=bool)
+    change[0] = True
+    for column in columns:
+        values = labels[column][selected]
+        change[1:] |= values[1:] != values[:-1]
+    return np.flatnonzero(change)
+
+
+def rollup(
+    df,
+    level="hub",
+    grain=None,
+    start=None,
+    end=None,
+    inclusive="left",
+    country=None,
+    region=None,
+    hub=None,
+):
+    """
+    Sums of every numeric column of daily_metrics per level node and period
+
+    Read from the prefix sums of the metric cube: every (node, period) cell
+    costs two lookups per hub, whatever the number of rows behind it.
+    Periods are cut at the window bounds, so the first and last week of a
+    window only hold its days (like grouping the rows of the window).
+
+    Args:
+        df: daily_metrics frame (any row order)
+        level: Key of LEVELS
+        grain: Key of TIME_GRAINS, or None for one period (the whole window)
+        start, end, inclusive: Date window (see filter_engine.date_window)
+        country, region, hub: Hierarchy node to restrict to (None = any)
+
+    Returns:
+        DataFrame with the level columns (frame dtypes), PERIOD_COLUMN when
+        grained, every summed column (integers as int64) and ROWS; one row
+        per node and period with data, ordered as groupby(observed=True)
+    """
+    columns = LEVELS[level]
+    cube = get_metric_cube(df)
+    labels = cube["labels"]
+    first, last = day_range(cube["days"], start, end, inclusive)
+
+    if first == last:
+        period_starts = np.zeros(0, dtype=np.int64)
+    elif grain is None:
+        period_starts = np.array([first])
+    else:
+        codes = _get_periods(df, grain)["code"][first:last]
+        period_starts = first + np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+
+    selected = select_groups(labels, country, region, hub)
+    node_starts = _node_starts(labels, columns, selected)
+    edges = cube["cum"][np.r_[period_starts, last]][:, :, selected]
+    sums = edges[1:] - edges[:-1]
+    if len(node_starts):
+        sums = np.add.reduceat(sums, node_starts, axis=2)
+    else:
+        sums = sums[:, :, :0]
+
+    # (periods, columns, nodes) -> one row per node and period with data
+    n_periods, n_nodes = len(period_starts), len(node_starts)
+    values = sums.transpose(2, 0, 1).reshape(n_nodes * n_periods, sums.shape[1])
+    keep = values[:, -1] > 0
+    values = values[keep]
+
+    # Labels taken from the first row of every node, in the frame's dtypes
+    index = get_hierarchy_index(df)
+    first_rows = index["starts"]
+    if index["order"] is not None:
+        first_rows = index["order"][first_rows]
+    node_rows = np.repeat(first_rows[selected][node_starts], n_periods)[keep]
+    result = {column: df[column].array.take(node_rows) for column in columns}
+    if grain is not None:
+        period_labels = _get_periods(df, grain)["start"][period_starts]
+        result[PERIOD_COLUMN] = np.tile(period_labels, n_nodes)[keep]
+
+    for position, column in enumerate(cube["columns"]):
+        integer = column == ROWS or pd.api.types.is_integer_dtype(df[column])
+        result[column] = values[:, position].astype(np.int64 if integer else float)
+    return pd.DataFrame(result)
+
+
+def get_rollup(df, level="hub", grain="day"):
+    """
+    Whole-history rollup of a frame at one grain, materialized once per frame
+
+    Args:
+        df: daily_metrics frame
+        level: Key of LEVELS
+        grain: Key of TIME_GRAINS (or None for all days together)
+
+    Returns:
+        Rollup DataFrame (see rollup); treat it as read-only
+    """
+    return get_frame_cache(
+        df, ("rollup", level, grain), lambda frame: rollup(frame, level, grain)
+    )
+
+
+def add_ratios(frame, *names):
+    """
+    Rollup frame with ratio metrics added from their numerator/denominator
+
+    Args:
+        frame: Rollup DataFrame (or a further aggregation of one)
+        *names: Keys of RATIOS
+
+    Returns:
+        New DataFrame with one float column per ratio (inf/NaN where the
+        denominator is 0)
+    """
+    return frame.assign(
+        **{name: frame[RATIOS[name][0]] / frame[RATIOS[name][1]] for name in names}
+    )
+
+
+def regroup(frame, by, columns=None):
+    """
+    Re-aggregate a rollup frame by other keys (e.g. hub name only)
+
+    Sums stay sums, so ratios added afterwards with add_ratios are exact.
+
+    Args:
+        frame: Rollup DataFrame
+        by: Column or list of columns to group by
+        columns: Summed columns to keep (default: every non-key column)
+
+    Returns:
+        DataFrame indexed by the keys
+    """
+    keys = [by] if isinstance(by, str) else list(by)
+    if columns is None:
+        columns = [
+            column
+            for column in frame.columns
+            if column not in keys
+            and column not in LEVELS["hub"]
+            and column != PERIOD_COLUMN
+        ]
+    return frame.groupby(keys, observed=True)[list(columns)].sum()
@@ -0,0 +1,98 @@
+"""
+Row Scopes
+Rows of every dataset a user scope may see, computed once per dataset version
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+from utils.filter_engine import (
+    get_hierarchy_index,
+    group_rows,
+    select_groups,
+    take_rows,
+)
+
+_lock = threading.Lock()
+_scopes = {}
+_state = {"version": None}
+
+
+def build_row_scope(data, country=None, hub=None):
+    """
+    Rows of every dataset inside a country/hub scope
+
+    Args:
+        data: Dataset dict
+        country: Country of the scope (None = any)
+        hub: Hub of the scope (None = any)
+
+    Returns:
+        Dict dataset name -> {"groups": boolean mask over the frame's
+        hierarchy groups, "rows": sorted row positions (int32)}; datasets
+        without a country column are not scoped and left out
+    """
+    scope = {}
+    for name, df in data.items():
+        if not isinstance(df, pd.DataFrame) or "country" not in df.columns:
+            continue
+        labels = get_hierarchy_index(df)["labels"]
+        groups = select_groups(labels, country=country, hub=hub)
+        rows = group_rows(df, groups)
+        if len(df) < 2**31:
+            rows = rows.astype(np.int32)
+        scope[name] = {"groups": groups, "rows": rows}
+    return scope
+
+
+def get_row_scope(version, data, country=None, hub=None):
+    """
+    Row scope of the shared dataset, built once per dataset version and scope
+
+    Scopes of older versions are dropped as soon as a newer version is seen;
+    a session still rendering an older version gets its scope built, not
+    stored.
+
+    Args:
+        version: Dataset version of data (data_store)
+        data: Shared dataset dict
+        country, hub: Scope levels (None = any)
+
+    Returns:
+        Row scope dict (see build_row_scope); treat it as read-only
+    """
+    key = (country, hub)
+    with _lock:
+        if _state["version"] is None or version > _state["version"]:
+            _scopes.clear()
+            _state["version"] = version
+        scope = _scopes.get(key) if version == _state["version"] else None
+    if scope is not None:
+        return scope
+
+    scope = build_row_scope(data, country, hub)
+    with _lock:
+        if version == _state["version"]:
+            _scopes[key] = scope
+    return scope
+
+
+def apply_row_scope(data, scope):
+    """
+    Dataset dict restricted to a row scope
+
+    Only the rows in the scope are read; datasets the scope does not cover
+    are passed through unchanged.
+    """
+    return {
+        name: take_rows(df, scope[name]["rows"]) if name in scope else df
+        for name, df in data.items()
+    }
+
+
+def scope_groups(scope, name):
+    """Group mask of one dataset for filter_frame (None = not scoped)"""
+    if scope is None or name not in scope:
+        return None
+    return scope[name]["groups"]
@@ -0,0 +1,259 @@
+"""
+Dataset Schema
+Compact dtypes for the generated DataFrames (categoricals, narrow ints and floats)
+"""
+
+import numpy as np
+import pandas as pd
+from config import COUNTRIES, HUBS, REGIONS_HUBS, VEHICLE_SEGMENTS
+
+# Low-cardinality label columns stored as categoricals (categories taken from
+# the data, sorted). country/region/hub/segment use the config dimensions.
+CATEGORY_COLUMNS = {
+    "status",
+    "priority",
+    "result",
+    "incentive_level",
+    "optimization_quadrant",
+    "appointment_type",
+    "type_icon",
+    "time",
+    "day_of_week",
+    "day_of_week_es",
+    "vehicle_interest",
+    "seniority",
+    "specialization",
+    "current_status",
+    "level",
+    "avatar_color",
+    "type",
+    "stage",
+    "cancel_reason",
+    "category",
+    "interaction_type",
+    "agent_name",
+}
+
+# Money columns keep float64 so totals stay exact to the cent; every other
+# float (ratios, scores, NPS, days) is stored as float32.
+FLOAT64_COLUMNS = {
+    "revenue",
+    "ticket_avg",
+    "full_margin",
+    "fin_ins",
+    "kt",
+    "pc1",
+    "ecac",
+    "pc1_minus_ecac",
+    "cost_per_lead",
+    "total_revenue",
+    "revenue_per_slot",
+    "vehicle_price",
+    "ancillaries_total",
+    "total_amount",
+    "down_payment",
+}
+
+# Integer columns go to int16 only with headroom, so adding two of them
+# (e.g. sales + purchases) cannot overflow.
+INT16_LIMIT = 2**14
+
+
+def _unique(values):
+    """Deduplicate keeping first-seen order"""
+    return list(dict.fromkeys(values))
+
+
+def get_dimension_categories():
+    """
+    Category lists for the hierarchy dimensions, in config order
+
+    Regions include the legacy HUBS keys and hubs include region names,
+    because inventory/funnel are generated at region level.
+    """
+    regions = _unique(
+        region
+        for country in COUNTRIES
+        for region in list(REGIONS_HUBS.get(country, {})) + HUBS.get(country, [])
+    )
+    hubs = _unique(
+        [
+            hub
+            for country in COUNTRIES
+            for region_hubs in REGIONS_HUBS.get(country, {}).values()
+            for hub in region_hubs
+        ]
+        + regions
+    )
+    return {
+        "country": list(COUNTRIES),
+        "region": regions,
+        "hub": hubs,
+        "segment": list(VEHICLE_SEGMENTS),
+    }
+
+
+DIMENSION_CATEGORIES = get_dimension_categories()
+
+
+def _to_category(series, categories=None):
+    """Convert a label column to categorical (config categories + unseen values)"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        observed = series.cat.categories
+    else:
+        observed = series.dropna().unique()
+
+    if categories is None:
+        categories = sorted(observed)
+    else:
+        known = set(categories)
+        categories = categories + sorted(v for v in observed if v not in known)
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        if list(series.cat.categories) == categories:
+            return series
+        return series.cat.set_categories(categories)
+    return series.astype(pd.CategoricalDtype(categories))
+
+
+def is_category_column(column):
+    """Whether a column is stored as categorical by the schema"""
+    return column in DIMENSION_CATEGORIES or column in CATEGORY_COLUMNS
+
+
+def _narrow_int(series):
+    """Smallest signed int dtype (int16/int32) that holds the column"""
+    if series.empty:
+        return series
+    low, high = series.min(), series.max()
+    if -INT16_LIMIT <= low and high <= INT16_LIMIT:
+        return series.astype(np.int16)
+    if np.iinfo(np.int32).min <= low and high <= np.iinfo(np.int32).max:
+        return series.astype(np.int32)
+    return series
+
+
+def compact_frame(df):
+    """
+    Return a copy of a DataFrame with compact dtypes
+
+    Args:
+        df: DataFrame as produced by the generators
+
+    Returns:
+        DataFrame with categorical labels, int16/int32 counts and float32 ratios
+    """
+    columns = {}
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_bool_dtype(series):
+            pass
+        elif is_category_column(column):
+            series = _to_category(series, DIMENSION_CATEGORIES.get(column))
+        elif pd.api.types.is_integer_dtype(series):
+            series = _narrow_int(series)
+        elif pd.api.types.is_float_dtype(series) and column not in FLOAT64_COLUMNS:
+            series = series.astype(np.float32)
+        columns[column] = series
+    return pd.DataFrame(columns, index=df.index)
+
+
+def append_rows(df, rows):
+    """
+    Append rows to a compact frame without losing its dtypes
+
+    A plain concat turns categoricals with different categories into object
+    columns; here the categories are merged and the new rows are cast to the
+    frame's dtypes (integers are widened only if the new values need it).
+
+    Args:
+        df: Compact DataFrame (see compact_frame)
+        rows: DataFrame with the same columns
+
+    Returns:
+        New DataFrame with a fresh RangeIndex
+    """
+    widened = {}
+    aligned = {}
+    for column in df.columns:
+        old, new = df[column], rows[column]
+        if isinstance(old.dtype, pd.CategoricalDtype):
+            new = _to_category(new, list(old.cat.categories))
+            if len(new.cat.categories) != len(old.cat.categories):
+                widened[column] = old.cat.set_categories(new.cat.categories)
+        elif pd.api.types.is_integer_dtype(old) and len(new):
+            info = np.iinfo(old.dtype)
+            if new.min() < info.min or new.max() > info.max:
+                widened[column] = old = old.astype(np.int64)
+            new = new.astype(old.dtype)
+        elif new.dtype != old.dtype and (
+            pd.api.types.is_float_dtype(old)
+            or pd.api.types.is_datetime64_any_dtype(old)
+        ):
+            new = new.astype(old.dtype)
+        aligned[column] = new
+
+    if widened:
+        df = df.assign(**widened)
+    return pd.concat([df, pd.DataFrame(aligned, index=rows.index)], ignore_index=True)
+
+
+def apply_schema(data):
+    """
+    Apply compact dtypes to every DataFrame of a dataset dict
+
+    Args:
+        data: Dictionary of DataFrames (see generate_sample_data)
+
+    Returns:
+        New dictionary with compacted DataFrames
+    """
+    return {
+        name: compact_frame(df) if isinstance(df, pd.DataFrame) else df
+        for name, df in data.items()
+    }
+
+
+def memory_report(before, after):
+    """
+    Compare deep memory usage of two versions of a dataset dict
+
+    Returns:
+        DataFrame with one row per dataset (MB before/after and reduction)
+    """
+    rows = []
+    for name, df in before.items():
+        before_mb = df.memory_usage(deep=True).sum() / 1024**2
+        after_mb = after[name].memory_usage(deep=True).sum() / 1024**2
+        rows.append(
+            {
+                "dataset": name,
+                "rows": len(df),
+                "before_mb": round(before_mb, 2),
+                "after_mb": round(after_mb, 2),
+                "reduction": round(1 - after_mb / before_mb, 3) if before_mb else 0.0,
+            }
+        )
+
+    total_before = sum(row["before_mb"] for row in rows)
+    total_after = sum(row["after_mb"] for row in rows)
+    rows.append(
+        {
+            "dataset": "TOTAL",
+            "rows": sum(row["rows"] for row in rows),
+            "before_mb": round(total_before, 2),
+            "after_mb": round(total_after, 2),
+            "reduction": round(1 - total_after / total_before, 3),
+        }
+    )
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    import sys
+
+    from utils.data_generator import generate_sample_data, get_data_scale
+
+    scale = float(sys.argv[1]) if len(sys.argv) > 1 else get_data_scale()
+    raw = generate_sample_data(scale, compact=False)
+    print(memory_report(raw, apply_schema(raw)).to_string(index=False))
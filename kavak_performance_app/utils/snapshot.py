@@ -0,0 +1,346 @@
+"""
+Dataset Snapshots
+Columnar (Arrow IPC) snapshots of the dataset dict, loaded memory-mapped at startup
+"""
+
+import json
+import os
+import shutil
+import uuid
+from datetime import date, datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc as ipc
+from utils.schema import compact_frame, is_category_column
+
+# Bump when the on-disk layout or the dataset tables change so old snapshots
+# are ignored (2: customers normalized, Celeste data generated lazily)
+SNAPSHOT_FORMAT = 2
+
+MANIFEST_NAME = "manifest.json"
+
+# Versions kept on disk after a build (the serving app may still map the
+# previous one until it reloads)
+KEEP_VERSIONS = 2
+
+DEFAULT_SNAPSHOT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "snapshot"
+)
+
+
+def get_snapshot_dir():
+    """Snapshot directory (KAVAK_SNAPSHOT_DIR or <app>/data/snapshot)"""
+    return os.environ.get("KAVAK_SNAPSHOT_DIR", DEFAULT_SNAPSHOT_DIR)
+
+
+# =============================================================================
+# NESTED COLUMNS - lists/dicts stored as JSON text
+# =============================================================================
+
+
+def _encode_value(value):
+    """JSON default hook that keeps timestamps distinguishable from strings"""
+    if isinstance(value, datetime):
+        return {"$ts": value.isoformat()}
+    if isinstance(value, date):
+        return {"$date": value.isoformat()}
+    if hasattr(value, "item"):  # numpy scalars
+        return value.item()
+    raise TypeError(f"Cannot encode {type(value).__name__} in snapshot")
+
+
+def _decode_object(obj):
+    """JSON object hook reversing _encode_value"""
+    if len(obj) == 1:
+        if "$ts" in obj:
+            return pd.Timestamp(obj["$ts"])
+        if "$date" in obj:
+            return date.fromisoformat(obj["$date"])
+    return obj
+
+
+def _find_json_columns(df):
+    """
+    Object columns Arrow cannot round-trip as-is
+
+    Anything but plain strings or dates (lists, dicts, Timestamps or numbers
+    mixed with None) is stored as JSON so the views get back exactly the
+    Python objects the generator produced.
+    """
+    json_columns = []
+    for column in df.columns:
+        if df[column].dtype != object:
+            continue
+        kinds = {type(value) for value in df[column]} - {str, type(None)}
+        if kinds and kinds != {date}:
+            json_columns.append(column)
+    return json_columns
+
+
+def _encode_frame(df, json_columns):
+    """Prepare a DataFrame for Arrow (JSON-encode nested columns)"""
+    if not json_columns:
+        return df
+    encoded = df.copy()
+    for column in json_columns:
+        encoded[column] = [
+            json.dumps(value, default=_encode_value, ensure_ascii=False)
+            for value in df[column]
+        ]
+    return encoded
+
+
+def _decode_frame(df, json_columns):
+    """Reverse _encode_frame in place"""
+    for column in json_columns:
+        df[column] = pd.Series(
+            [json.loads(value, object_hook=_decode_object) for value in df[column]],
+            index=df.index,
+            dtype=object,
+        )
+    return df
+
+
+# =============================================================================
+# WRITE
+# =============================================================================
+
+
+def _new_version():
+    """Unique snapshot version stamp, sortable in build order"""
+    return f"{datetime.now():%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+
+
+def _write_manifest(snapshot_dir, manifest):
+    """Write the manifest atomically so readers never see a partial file"""
+    tmp_path = os.path.join(snapshot_dir, f".{MANIFEST_NAME}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, os.path.join(snapshot_dir, MANIFEST_NAME))
+
+
+def _prune_versions(snapshot_dir, keep):
+    """Delete old version folders, keeping the newest ones"""
+    versions = sorted(
+        name
+        for name in os.listdir(snapshot_dir)
+        if os.path.isdir(os.path.join(snapshot_dir, name)) and not name.startswith(".")
+    )
+    for name in versions[:-keep]:
+        shutil.rmtree(os.path.join(snapshot_dir, name), ignore_errors=True)
+
+
+def write_snapshot(chunks, snapshot_dir=None, metadata=None):
+    """
+    Write a dataset snapshot from a stream of (name, DataFrame) chunks
+
+    Each dataset becomes one Arrow IPC file inside a new version folder; the
+    manifest is swapped in last, so a running app keeps reading the previous
+    version until it reloads.
+
+    Args:
+        chunks: Iterable of (dataset name, DataFrame chunk) pairs
+        snapshot_dir: Target directory (defaults to get_snapshot_dir())
+        metadata: Extra fields stored in the manifest (e.g. scale)
+
+    Returns:
+        The manifest of the new snapshot
+    """
+    snapshot_dir = snapshot_dir or get_snapshot_dir()
+    version = _new_version()
+    version_dir = os.path.join(snapshot_dir, version)
+    os.makedirs(version_dir)
+
+    datasets = {}
+    writers = {}
+    try:
+        for name, chunk in chunks:
+            entry = datasets.get(name)
+            if entry is None:
+                json_columns = _find_json_columns(chunk)
+                table = pa.Table.from_pandas(
+                    _encode_frame(chunk, json_columns), preserve_index=False
+                )
+                # All-None columns in the first chunk would be typed as null;
+                # store them as text so later chunks with values still fit.
+                # Categorical chunks carry their own dictionaries, which an
+                # IPC file cannot replace, so they are stored as plain values
+                # (load_snapshot dictionary-encodes them again).
+                schema = pa.schema(
+                    [
+                        (
+                            field.with_type(pa.string())
+                            if pa.types.is_null(field.type)
+                            else (
+                                field.with_type(field.type.value_type)
+                                if pa.types.is_dictionary(field.type)
+                                else field
+                            )
+                        )
+                        for field in table.schema
+                    ],
+                    metadata=table.schema.metadata,
+                )
+                table = table.cast(schema)
+                entry = datasets[name] = {
+                    "file": f"{version}/{name}.arrow",
+                    "rows": 0,
+                    "json_columns": json_columns,
+                    "schema": table.schema,
+                }
+                writers[name] = ipc.new_file(
+                    os.path.join(snapshot_dir, entry["file"]), table.schema
+                )
+            else:
+                table = pa.Table.from_pandas(
+                    _encode_frame(chunk, entry["json_columns"]),
+                    schema=entry["schema"],
+                    preserve_index=False,
+                )
+
+            writers[name].write_table(table)
+            entry["rows"] += len(chunk)
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    for entry in datasets.values():
+        del entry["schema"]
+
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "version": version,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "datasets": datasets,
+        **(metadata or {}),
+    }
+    _write_manifest(snapshot_dir, manifest)
+    _prune_versions(snapshot_dir, KEEP_VERSIONS)
+    return manifest
+
+
+def save_snapshot(data, snapshot_dir=None, metadata=None):
+    """Write an in-memory dataset dict as a snapshot"""
+    return write_snapshot(data.items(), snapshot_dir, metadata)
+
+
+# =============================================================================
+# READ
+# =============================================================================
+
+
+def read_manifest(snapshot_dir=None):
+    """
+    Read the current snapshot manifest
+
+    Returns:
+        Manifest dict, or None when there is no usable snapshot
+    """
+    path = os.path.join(snapshot_dir or get_snapshot_dir(), MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        return None
+    return manifest
+
+
+def get_snapshot_version(snapshot_dir=None):
+    """Version stamp of the current snapshot (None if there is none)"""
+    manifest = read_manifest(snapshot_dir)
+    return manifest["version"] if manifest else None
+
+
+def load_snapshot(snapshot_dir=None, manifest=None):
+    """
+    Load a snapshot memory-mapped
+
+    Arrow buffers are mapped straight from disk; numeric columns without
+    nulls are handed to pandas without copying. Compact dtypes
+    (utils/schema.py) are applied on load.
+
+    Returns:
+        (dataset dict, manifest), or (None, None) when there is no snapshot
+    """
+    snapshot_dir = snapshot_dir or get_snapshot_dir()
+    manifest = manifest or read_manifest(snapshot_dir)
+    if manifest is None:
+        return None, None
+
+    data = {}
+    for name, entry in manifest["datasets"].items():
+        source = pa.memory_map(os.path.join(snapshot_dir, entry["file"]), "r")
+        table = ipc.open_file(source).read_all()
+
+        # Dictionary-encode label columns in Arrow (much faster than pandas)
+        for index, field in enumerate(table.schema):
+            is_text = pa.types.is_string(field.type) or pa.types.is_large_string(
+                field.type
+            )
+            if is_text and is_category_column(field.name):
+                encoded = pc.dictionary_encode(table.column(index))
+                table = table.set_column(index, field.name, encoded)
+
+        df = table.to_pandas(split_blocks=True, date_as_object=True)
+        data[name] = compact_frame(_decode_frame(df, entry["json_columns"]))
+
+    return data, manifest
+
+
+def main(argv=None):
+    """Command line entry point: python -m utils.snapshot --scale 10"""
+    import argparse
+    import time
+
+    from utils.data_generator import (
+        get_data_scale,
+        get_generation_workers,
+        iter_dataset_chunks,
+    )
+
+    parser = argparse.ArgumentParser(
+        description="Generate the dataset once and write it as a snapshot"
+    )
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=get_data_scale(),
+        help="Footprint multiplier (default: KAVAK_DATA_SCALE or 1)",
+    )
+    parser.add_argument(
+        "--out",
+        default=get_snapshot_dir(),
+        help="Snapshot directory (default: KAVAK_SNAPSHOT_DIR or data/snapshot)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=get_generation_workers(),
+        help="Processes building datasets concurrently; output is identical "
+        "for any value (default: KAVAK_DATA_WORKERS or 1)",
+    )
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    manifest = write_snapshot(
+        iter_dataset_chunks(args.scale, workers=args.workers),
+        args.out,
+        metadata={"scale": args.scale},
+    )
+    built = time.perf_counter() - started
+
+    started = time.perf_counter()
+    load_snapshot(args.out)
+    loaded = time.perf_counter() - started
+
+    print(f"Snapshot {manifest['version']} written to {args.out}")
+    for name, entry in manifest["datasets"].items():
+        print(f"  {name:<24} {entry['rows']:>12,} rows")
+    print(f"Built in {built:,.1f}s, loads in {loaded:,.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,21 +3,40 @@ CEO Executive Dashboard View
 High-level strategic view with country/hub filters
 """
 
-from datetime import datetime, timedelta
+import itertools
+from datetime import datetime
 
 import numpy as np
 import pandas as pd
 import streamlit as st
 from config import COLORS, COUNTRIES, HUBS, PERIOD_OPTIONS
 from utils.alert_detector import detect_strategic_alerts
+from utils.alert_service import get_alerts
+from utils.anomaly_detector import get_anomaly_alerts
 from utils.components import (
     render_alert_box,
     render_bar_chart,
+    render_freshness_caption,
     render_funnel_chart,
     render_kpi_card,
     render_kpi_grid,
     render_trend_chart,
 )
+from utils.auth import (
+    get_user_row_scope,
+    get_user_scope,
+    scope_filters,
+    scoped_dataset,
+)
+from utils.data_store import get_data_period_start
+from utils.data_tick import get_dataset_day
+from utils.filter_cache import cached_filter
+from utils.filter_engine import filter_frame, snap_start
+from utils.history_store import read_history_manifest
+from utils.kpi_engine import compute_kpis, section_kpis
+from utils.metric_cube import ROWS, get_metric_cube, window_totals
+from utils.rollup import LEVELS, add_ratios, regroup, rollup
+from utils.row_scope import scope_groups
 
 
 def render_ceo_dashboard(data):
@@ -31,8 +50,7 @@ def render_ceo_dashboard(data):
     # render_filters() removed
 
     # Get filtered data using global keys
-    filtered_data = filter_data(
-        data,
+    filtered_data = get_filtered_data(
         st.session_state.get("global_country", "Todos"),
         st.session_state.get("global_region", "Todos"),
         st.session_state.get("global_hub", "Todos los Hubs"),
@@ -59,269 +77,241 @@ def render_ceo_dashboard(data):
     period_days = PERIOD_OPTIONS[
         st.session_state.get("global_period", "Últimos 30 días")
     ]
-    render_alerts_section(data, period_days)
-
-
-def filter_data(data, country, region, hub, period):
-    """Filter data based on selections"""
-    daily_metrics = data["daily_metrics"].copy()
-    inventory = data["inventory"].copy()
-    funnel = data["funnel"].copy()
-
-    # Filter by country
-    if country != "Todos":
-        daily_metrics = daily_metrics[daily_metrics["country"] == country]
-        inventory = inventory[inventory["country"] == country]
-        funnel = funnel[funnel["country"] == country]
-
-    # Filter by region
-    if region != "Todos":
-        daily_metrics = daily_metrics[daily_metrics["region"] == region]
-        inventory = inventory[inventory["region"] == region]
-        funnel = funnel[funnel["region"] == region]
-
-    # Filter by hub
-    if hub != "Todos los Hubs":
-        daily_metrics = daily_metrics[daily_metrics["hub"] == hub]
-        inventory = inventory[inventory["hub"] == hub]
-        funnel = funnel[funnel["hub"] == hub]
-
-    # Filter by period
-    days = PERIOD_OPTIONS[period]
-    cutoff_date = datetime.now() - timedelta(days=days)
-    daily_metrics = daily_metrics[daily_metrics["date"] >= cutoff_date]
+    render_alerts_section(period_days)
+    render_anomalies_section()
+
+
+def get_filtered_data(country, region, hub, period):
+    """
+    filter_data memoized across sessions
+
+    Cut from the shared dataset within the user's row scope (the same rows
+    as filtering the user's own frames, without re-indexing them). Keyed by
+    dataset version, user scope, selections and the first date of the
+    period (see utils/filter_cache.py).
+    """
+    cutoff_date = get_period_start(
+        st.session_state.data["daily_metrics"], PERIOD_OPTIONS[period]
+    )
+    return cached_filter(
+        st.session_state.data_version,
+        ("ceo", get_user_scope(), country, region, hub, cutoff_date),
+        lambda: filter_data(
+            st.session_state.data,
+            country,
+            region,
+            hub,
+            period,
+            cutoff_date,
+            get_user_row_scope(),
+        ),
+    )
+
+
+def get_period_start(daily_metrics, days):
+    """
+    First date of a "last N days" period, stable between reruns
+
+    Snapped to the first in-memory day on or after the cutoff; periods that
+    start before the in-memory days (YTD) reach into the history store when
+    there is one, and start at the cutoff's day instead.
+    """
+    start = get_data_period_start(days)
+    cutoff_date = snap_start(daily_metrics, start)
+    first_days = daily_metrics["date"].iloc[:1]
+    if (
+        len(first_days)
+        and start < first_days.iloc[0]
+        and read_history_manifest() is not None
+    ):
+        cutoff_date = pd.Timestamp(start).normalize()
+    return cutoff_date
+
+
+def filter_data(data, country, region, hub, period, cutoff_date=None, scope=None):
+    """
+    Filter data based on selections
+
+    scope: Row scope of the user over data (see utils/row_scope.py), or
+           None when data holds only rows the user may see
+    """
+    # "Todos" selections do not filter that level
+    filters = {
+        "country": None if country == "Todos" else country,
+        "region": None if region == "Todos" else region,
+        "hub": None if hub == "Todos los Hubs" else hub,
+    }
+    if cutoff_date is None:
+        cutoff_date = get_data_period_start(PERIOD_OPTIONS[period])
 
     return {
-        "daily_metrics": daily_metrics,
-        "agent_performance": data["agent_performance"],
-        "inventory": inventory,
-        "funnel": funnel,
+        "daily_metrics": filter_frame(
+            data["daily_metrics"],
+            start=cutoff_date,
+            groups=scope_groups(scope, "daily_metrics"),
+            **filters,
+        ),
+        "agent_performance": filter_frame(
+            data["agent_performance"], groups=scope_groups(scope, "agent_performance")
+        ),
+        "inventory": filter_frame(
+            data["inventory"], groups=scope_groups(scope, "inventory"), **filters
+        ),
+        "funnel": filter_frame(
+            data["funnel"], groups=scope_groups(scope, "funnel"), **filters
+        ),
+        # Selections behind the frames, for aggregates read from the metric cube
+        "filters": dict(filters, start=cutoff_date),
     }
 
 
-def render_kpi_section(filtered_data):
-    """Render KPI cards grouped by category using real unit economics from data"""
-    df = filtered_data["daily_metrics"]
+def get_window_totals(start=None, end=None, inclusive="left", **filters):
+    """
+    daily_metrics sums over a window from the shared dataset's metric cube
 
-    if len(df) == 0:
-        st.warning("No hay datos para los filtros seleccionados")
-        return
+    Args:
+        start, end, inclusive: Date window (see utils/filter_engine.py)
+        **filters: country/region/hub selections (None = any); narrowed to
+                   the user's scope
 
-    # Calculate aggregated metrics
-    total_sales = df["sales"].sum()
-    total_purchases = df["purchases"].sum()
-    total_revenue = df["revenue"].sum()
-    avg_ticket = df["ticket_avg"].mean()
-    total_leads = df["leads"].sum()
-    total_conversions = total_sales / total_leads if total_leads > 0 else 0
-    avg_cost_per_lead = df["cost_per_lead"].mean()
-    avg_nps = df["nps"].mean()
-    avg_csat = df["csat"].mean()
-    avg_sla = df["sla_lead_to_sale"].mean()
-    total_cancellations = df["cancellations"].sum()
+    Returns:
+        Dict column -> sum plus ROWS (see utils/metric_cube.py)
+    """
+    cube = get_metric_cube(st.session_state.data["daily_metrics"])
+    filters = scope_filters(**filters)
+    if filters is None:
+        return dict.fromkeys(cube["columns"], 0.0)
+    return window_totals(cube, start, end, inclusive, **filters)
 
-    # Calculate inventory metrics
-    inventory_df = filtered_data.get("inventory", pd.DataFrame())
-    if len(inventory_df) > 0:
-        total_inventory = inventory_df["total_inventory"].sum()
-        available_inventory = inventory_df["available"].sum()
-    else:
-        total_inventory = 0
-        available_inventory = 0
-
-    # Use real unit economics from data (now comes from data_generator with real values)
-    full_margin = df["full_margin"].mean() if "full_margin" in df.columns else 950
-    fin_ins_unit_economic = df["fin_ins"].mean() if "fin_ins" in df.columns else 1200
-    warranty_unit_economic = (
-        df["kt"].mean() if "kt" in df.columns else 150
-    )  # KT = Kavak Trade
-
-    # PC1 from data or calculate
-    pc1 = (
-        df["pc1"].mean()
-        if "pc1" in df.columns
-        else (full_margin + fin_ins_unit_economic + warranty_unit_economic)
-    )
 
-    # eCAC from data
-    current_ecac = df["ecac"].mean() if "ecac" in df.columns else 350
+def get_scoped_rollup(level, grain=None, start=None, **filters):
+    """
+    Rollup of the shared daily_metrics within the user's scope
 
-    # PC1 - eCAC
-    pc1_minus_ecac = (
-        df["pc1_minus_ecac"].mean()
-        if "pc1_minus_ecac" in df.columns
-        else (pc1 - current_ecac)
-    )
+    Args:
+        level, grain, start: See utils/rollup.py
+        **filters: country/region/hub selections (None = any)
 
-    # Gross Margin Stock
-    potential_revenue = (
-        avg_ticket * available_inventory if available_inventory > 0 else 0
-    )
-    gross_margin_stock = (
-        potential_revenue / available_inventory if available_inventory > 0 else 0
-    )
+    Returns:
+        Rollup DataFrame (empty when the selections fall outside the scope)
+    """
+    daily_metrics = st.session_state.data["daily_metrics"]
+    filters = scope_filters(**filters)
+    if filters is None:
+        return rollup(daily_metrics, level, grain, start).iloc[:0]
+    return rollup(daily_metrics, level, grain, start, **filters)
 
-    # Calculate deltas (compare to previous period)
-    prev_period_df = get_previous_period_data(df)
-
-    # Previous period metrics for deltas
-    if len(prev_period_df) > 0:
-        prev_sales = prev_period_df["sales"].sum()
-        prev_purchases = prev_period_df["purchases"].sum()
-        prev_revenue = prev_period_df["revenue"].sum()
-        prev_leads = prev_period_df["leads"].sum()
-        prev_cost_per_lead = prev_period_df["cost_per_lead"].mean()
-        prev_avg_ticket = prev_revenue / prev_sales if prev_sales > 0 else 0
-
-        # Previous unit economics from data
-        prev_full_margin = (
-            prev_period_df["full_margin"].mean()
-            if "full_margin" in prev_period_df.columns
-            else full_margin
-        )
-        prev_fin_ins_unit_economic = (
-            prev_period_df["fin_ins"].mean()
-            if "fin_ins" in prev_period_df.columns
-            else fin_ins_unit_economic
-        )
-        prev_warranty_unit_economic = (
-            prev_period_df["kt"].mean()
-            if "kt" in prev_period_df.columns
-            else warranty_unit_economic
-        )
-        prev_pc1 = (
-            prev_period_df["pc1"].mean() if "pc1" in prev_period_df.columns else pc1
-        )
-        prev_ecac = (
-            prev_period_df["ecac"].mean()
-            if "ecac" in prev_period_df.columns
-            else current_ecac
-        )
-        prev_pc1_minus_ecac = (
-            prev_period_df["pc1_minus_ecac"].mean()
-            if "pc1_minus_ecac" in prev_period_df.columns
-            else pc1_minus_ecac
-        )
-        prev_conversion = prev_sales / prev_leads if prev_leads > 0 else 0
-    else:
-        prev_sales = total_sales
-        prev_purchases = total_purchases
-        prev_revenue = total_revenue
-        prev_leads = total_leads
-        prev_cost_per_lead = avg_cost_per_lead
-        prev_full_margin = full_margin
-        prev_avg_ticket = avg_ticket
-        prev_conversion = total_conversions
-        prev_fin_ins_unit_economic = fin_ins_unit_economic
-        prev_warranty_unit_economic = warranty_unit_economic
-        prev_pc1 = pc1
-        prev_ecac = current_ecac
-        prev_pc1_minus_ecac = pc1_minus_ecac
 
-    # 1. FINANCIEROS
-    # st.subheader("💰 Financieros") (Removed by request)
+def get_kpis(filtered_data):
+    """
+    KPI engine result for the filtered data (see utils/kpi_engine.py)
 
-    # KPIs en una sola fila con separadores visuales entre secciones
-    col1, col2, sep1, col3, col4, col5, sep2, col6, col7, col8 = st.columns(
-        [1, 1, 0.1, 1, 1, 1, 0.1, 1, 1, 1]
+    Read from the shared dataset's metric cube with the frames' selections
+    narrowed to the user's scope, plus the history store for the days of a
+    period before the in-memory ones; frames without their selections are
+    aggregated from their own rows.
+    """
+    filters = filtered_data.get("filters")
+    scoped = None
+    if filters is not None and "data" in st.session_state:
+        scoped = scope_filters(
+            country=filters.get("country"),
+            region=filters.get("region"),
+            hub=filters.get("hub"),
+        )
+    if scoped is None:
+        return compute_kpis(get_metric_cube(filtered_data["daily_metrics"]))
+
+    cube = get_metric_cube(st.session_state.data["daily_metrics"])
+    return compute_kpis(
+        cube,
+        filters.get("start"),
+        filters.get("end"),
+        history=read_history_manifest(),
+        **scoped,
     )
 
-    # Sección 1: Volumen
-    with col1:
-        delta_sales = calculate_delta(total_sales, prev_sales)
-        st.metric("Entregas", f"{total_sales:,.0f}", delta_sales)
-    with col2:
-        delta_purchases = calculate_delta(total_purchases, prev_purchases)
-        st.metric("Compras", f"{total_purchases:,.0f}", delta_purchases)
-
-    # Separador vertical 1
-    with sep1:
-        st.markdown(
-            "<div style='border-left: 2px solid #CBD5E1; height: 60px; margin: 0 auto;'></div>",
-            unsafe_allow_html=True,
-        )
 
-    # Sección 2: Unit Economics
-    with col3:
-        delta_margin = calculate_delta(full_margin, prev_full_margin)
-        st.metric("Full Margin", f"${full_margin:,.0f}", delta_margin)
-    with col4:
-        delta_fin_ins = calculate_delta(
-            fin_ins_unit_economic, prev_fin_ins_unit_economic
-        )
-        st.metric("Fin & Ins", f"${fin_ins_unit_economic:,.0f}", delta_fin_ins)
-    with col5:
-        delta_warranty = calculate_delta(
-            warranty_unit_economic, prev_warranty_unit_economic
-        )
-        st.metric("KT", f"${warranty_unit_economic:,.0f}", delta_warranty)
+def format_kpi(kpi):
+    """Display value of a KPI card"""
+    return kpi["format"].format(kpi["value"])
 
-    # Separador vertical 2
-    with sep2:
-        st.markdown(
-            "<div style='border-left: 2px solid #CBD5E1; height: 60px; margin: 0 auto;'></div>",
-            unsafe_allow_html=True,
-        )
 
-    # Sección 3: Contribution & CAC
-    with col6:
-        delta_pc1 = calculate_delta(pc1, prev_pc1)
-        st.metric("PC1", f"${pc1:,.0f}", delta_pc1)
-    with col7:
-        delta_ecac = calculate_delta(current_ecac, prev_ecac)
-        st.metric("eCAC", f"${current_ecac:,.0f}", delta_ecac, delta_color="inverse")
-    with col8:
-        delta_pc1_ecac = calculate_delta(pc1_minus_ecac, prev_pc1_minus_ecac)
-        st.metric("PC1 - eCAC", f"${pc1_minus_ecac:,.0f}", delta_pc1_ecac)
+def format_change(kpi):
+    """Delta of a KPI card vs the previous period (None = no delta)"""
+    if not kpi["compare"] or kpi["change"] is None:
+        return None
+    return f"{kpi['change']:+.1f}%"
 
-    # 2. EXPERIENCIA DE CLIENTE
-    st.markdown("---")
-    st.subheader("Experiencia de Cliente")
 
-    # Mock NPS breakdowns (Buyer/Seller/Relational) based on avg_nps
-    nps_buyer = avg_nps + 2  # Buyers usually happier
-    nps_seller = avg_nps - 3  # Sellers often more critical on price
-    nps_relational = avg_nps  # Proxy
+def get_kpi_card(kpi):
+    """KPI engine entry as a render_kpi_grid card"""
+    return {
+        "label": kpi["label"],
+        "value": format_kpi(kpi),
+        "delta": format_change(kpi),
+        "delta_color": kpi["delta_color"],
+    }
+
 
-    cx_kpis = [
-        {"label": "NPS Promedio", "value": avg_nps, "format": "%.0f", "delta": None},
-        {"label": "NPS Buyer", "value": nps_buyer, "format": "%.0f", "delta": None},
-        {"label": "NPS Seller", "value": nps_seller, "format": "%.0f", "delta": None},
-        {
-            "label": "NPS Relacional",
-            "value": nps_relational,
-            "format": "%.0f",
-            "delta": None,
-        },
+def get_kpi_cards(kpis, section):
+    """Cards of one dashboard section, in registry order"""
+    return [get_kpi_card(kpi) for kpi in section_kpis(kpis, section)]
+
+
+def render_kpi_section(filtered_data):
+    """Render KPI cards grouped by category using real unit economics from data"""
+    df = filtered_data["daily_metrics"]
+
+    if len(df) == 0:
+        st.warning("No hay datos para los filtros seleccionados")
+        return
+
+    # Every card value and its previous-period comparison from one pass over
+    # the metric cube (see utils/kpi_engine.py)
+    kpis = get_kpis(filtered_data)["kpis"]
+
+    # 1. FINANCIEROS
+    # st.subheader("💰 Financieros") (Removed by request)
+
+    # KPIs en una sola fila con separadores visuales entre secciones
+    groups = [
+        list(group)
+        for _, group in itertools.groupby(
+            section_kpis(kpis, "financials"), key=lambda kpi: kpi["group"]
+        )
     ]
-    render_kpi_grid(cx_kpis, columns=4)
+    widths = []
+    for group in groups:
+        widths += ([0.1] if widths else []) + [1] * len(group)
+    columns = iter(st.columns(widths))
+
+    for idx, group in enumerate(groups):
+        # Separador vertical entre secciones
+        if idx > 0:
+            with next(columns):
+                st.markdown(
+                    "<div style='border-left: 2px solid #CBD5E1; height: 60px; margin: 0 auto;'></div>",
+                    unsafe_allow_html=True,
+                )
+        for kpi in group:
+            with next(columns):
+                st.metric(
+                    kpi["label"],
+                    format_kpi(kpi),
+                    format_change(kpi),
+                    delta_color=kpi["delta_color"],
+                )
+
+    # 2. EXPERIENCIA DE CLIENTE
+    st.markdown("---")
+    st.subheader("Experiencia de Cliente")
+    render_kpi_grid(get_kpi_cards(kpis, "customer"), columns=4)
 
     # 3. EFICIENCIA COMERCIAL
     st.markdown("---")
     st.subheader("Eficiencia Comercial")
-
-    demand_kpis = [
-        {
-            "label": "Leads Totales",
-            "value": total_leads,
-            "format": "%.0f",
-            "delta": calculate_delta(total_leads, prev_leads),
-        },
-        {
-            "label": "Conversión Total",
-            "value": total_conversions * 100,
-            "format": "%.1f%%",
-            "delta": calculate_delta(total_conversions, prev_conversion),
-        },
-        {
-            "label": "Costo por Lead",
-            "value": avg_cost_per_lead,
-            "format": "$%.0f",
-            "delta": calculate_delta(avg_cost_per_lead, prev_cost_per_lead),
-            "delta_color": "inverse",
-        },
-    ]
-    render_kpi_grid(demand_kpis, columns=3)
+    render_kpi_grid(get_kpi_cards(kpis, "demand"), columns=3)
 
     # 4. OPERACIÓN / EFICIENCIA
     st.markdown("---")
@@ -357,12 +347,7 @@ def render_kpi_section(filtered_data):
     aging_pct = (aged_inventory / total_inventory * 100) if total_inventory > 0 else 0
 
     ops_kpis = [
-        {
-            "label": "SLA Lead → Venta",
-            "value": avg_sla,
-            "format": "%.1f días",
-            "delta": None,
-        },
+        get_kpi_card(kpis["sla"]),
         {
             "label": "Velocity Inventario",
             "value": inventory_velocity,
@@ -376,13 +361,7 @@ def render_kpi_section(filtered_data):
             "delta": f"{aging_pct:.1f}%",
             "delta_color": "inverse",
         },
-        {
-            "label": "Cancelaciones",
-            "value": total_cancellations,
-            "format": "%.0f",
-            "delta": None,
-            "delta_color": "inverse",
-        },
+        get_kpi_card(kpis["cancellations"]),
     ]
     render_kpi_grid(ops_kpis, columns=4)
 
@@ -430,31 +409,33 @@ def render_hub_comparison_section(filtered_data, country_filter):
     else:
         st.caption("Comparación de todos los hubs")
 
-    df = filtered_data["daily_metrics"]
+    # Aggregate by hub (window sums of the rollup cube; averages of the
+    # daily values are sum / ROWS)
+    hub_comparison = regroup(
+        get_scoped_rollup("hub", **filtered_data["filters"]),
+        ["country", "hub"],
+        [
+            "sales",
+            "leads",
+            "appointments",
+            "reservations",
+            "cancellations",
+            "noshow",
+            "nps",
+            "csat",
+            "revenue",
+            "sla_lead_to_sale",
+            ROWS,
+        ],
+    )
 
-    if len(df) == 0:
+    if len(hub_comparison) == 0:
         st.warning("No hay datos para comparar")
         return
 
-    # Aggregate by hub
-    hub_comparison = (
-        df.groupby(["country", "hub"])
-        .agg(
-            {
-                "sales": "sum",
-                "leads": "sum",
-                "appointments": "sum",
-                "reservations": "sum",
-                "cancellations": "sum",
-                "noshow": "sum",
-                "nps": "mean",
-                "csat": "mean",
-                "revenue": "sum",
-                "sla_lead_to_sale": "mean",
-            }
-        )
-        .reset_index()
-    )
+    for column in ("nps", "csat", "sla_lead_to_sale"):
+        hub_comparison[column] = hub_comparison[column] / hub_comparison[ROWS]
+    hub_comparison = hub_comparison.drop(columns=ROWS).reset_index()
 
     # Calculate derived metrics
     hub_comparison["conversion"] = (
@@ -483,7 +464,7 @@ def render_hub_comparison_section(filtered_data, country_filter):
     inventory_df = filtered_data.get("inventory", pd.DataFrame())
     if len(inventory_df) > 0:
         inventory_by_hub = (
-            inventory_df.groupby(["country", "hub"])
+            inventory_df.groupby(["country", "hub"], observed=True)
             .agg({"total_inventory": "sum", "available": "sum", "aging_60_plus": "sum"})
             .reset_index()
         )
@@ -529,7 +510,7 @@ def render_hub_comparison_section(filtered_data, country_filter):
                 "leads",
                 "sla_lead_to_sale",
             ]
-        ].copy()
+        ]
 
         kpi_display.columns = [
             "Hub",
@@ -596,7 +577,7 @@ def render_hub_comparison_section(filtered_data, country_filter):
                 "cancellation_rate",
                 "noshow_rate",
             ]
-        ].copy()
+        ]
 
         funnel_display.columns = [
             "Hub",
@@ -670,7 +651,7 @@ def render_hub_comparison_section(filtered_data, country_filter):
                 "cancellation_rate",
                 "sla_lead_to_sale",
             ]
-        ].copy()
+        ]
 
         cx_display.columns = [
             "Hub",
@@ -709,7 +690,7 @@ def render_hub_comparison_section(filtered_data, country_filter):
         if "total_inventory" in hub_comparison.columns:
             inv_display = hub_comparison[
                 ["hub", "total_inventory", "aging_60_plus", "aging_pct"]
-            ].copy()
+            ]
 
             inv_display.columns = [
                 "Hub",
@@ -775,21 +756,15 @@ def render_performance_table_section(data, country_filter):
     # Get period filter
     period = st.session_state.get("ceo_period", "Últimos 30 días")
     days = PERIOD_OPTIONS[period]
-    cutoff_date = datetime.now() - timedelta(days=days)
+    cutoff_date = get_data_period_start(days)
 
-    # Filter daily_metrics by period - this now has hub-level data
-    daily_metrics = data["daily_metrics"].copy()
-    daily_metrics = daily_metrics[daily_metrics["date"] >= cutoff_date]
+    country = None if country_filter == "Todos" else country_filter
 
-    # Filter by country if selected
-    if country_filter != "Todos":
-        daily_metrics = daily_metrics[daily_metrics["country"] == country_filter]
-
-    inventory_df = data.get("inventory", pd.DataFrame()).copy()
+    inventory_df = data.get("inventory", pd.DataFrame())
     if country_filter != "Todos" and len(inventory_df) > 0:
         inventory_df = inventory_df[inventory_df["country"] == country_filter]
 
-    if len(daily_metrics) == 0:
+    if get_window_totals(cutoff_date, country=country)[ROWS] == 0:
         st.warning("No hay datos para mostrar")
         return
 
@@ -805,25 +780,20 @@ def render_performance_table_section(data, country_filter):
         )
 
     # === BUILD AGGREGATED DATA ===
-    # Both views use the same daily_metrics source, just aggregated differently
-    if aggregation_level == "Por Región":
-        # Aggregate by country + region (sum all hubs within region)
-        perf_df = (
-            daily_metrics.groupby(["country", "region"])
-            .agg(
-                {
-                    "sales": "sum",
-                    "leads": "sum",
-                    "nps": "mean",
-                }
-            )
-            .reset_index()
-        )
+    # Both views read the period sums of the rollup cube, just at another level
+    level = "region" if aggregation_level == "Por Región" else "hub"
+    perf_df = add_ratios(
+        get_scoped_rollup(level, start=cutoff_date, country=country), "avg_nps"
+    )
+    perf_df = perf_df[list(LEVELS[level]) + ["sales", "leads", "avg_nps"]].rename(
+        columns={"avg_nps": "nps"}
+    )
 
+    if aggregation_level == "Por Región":
         # Add inventory data (already at region level)
         if len(inventory_df) > 0:
             inv_agg = (
-                inventory_df.groupby(["country", "region"])
+                inventory_df.groupby(["country", "region"], observed=True)
                 .agg(
                     {
                         "total_inventory": "sum",
@@ -842,27 +812,16 @@ def render_performance_table_section(data, country_filter):
             perf_df["aging_60_plus"] = 0
 
         # Create display name
-        perf_df["Ubicación"] = perf_df["country"] + " - " + perf_df["region"]
-
-    else:  # Por Hub - Aggregate by hub (more granular, same source data)
-        # Aggregate by country + region + hub
-        perf_df = (
-            daily_metrics.groupby(["country", "region", "hub"])
-            .agg(
-                {
-                    "sales": "sum",
-                    "leads": "sum",
-                    "nps": "mean",
-                }
-            )
-            .reset_index()
+        perf_df["Ubicación"] = (
+            perf_df["country"].astype(str) + " - " + perf_df["region"].astype(str)
         )
 
+    else:  # Por Hub - Aggregate by hub (more granular, same source data)
         # Add inventory data by hub (distribute region inventory proportionally)
         if len(inventory_df) > 0:
             # Inventory is at region level, distribute proportionally by hub sales
             inv_by_region = (
-                inventory_df.groupby(["country", "region"])
+                inventory_df.groupby(["country", "region"], observed=True)
                 .agg(
                     {
                         "total_inventory": "sum",
@@ -875,7 +834,7 @@ def render_performance_table_section(data, country_filter):
 
             # Count hubs per region for fallback distribution
             hubs_per_region = (
-                perf_df.groupby(["country", "region"])
+                perf_df.groupby(["country", "region"], observed=True)
                 .size()
                 .reset_index(name="hub_count")
             )
@@ -890,9 +849,9 @@ def render_performance_table_section(data, country_filter):
             ).fillna(1)
 
             # Calculate hub's proportion of region sales
-            region_sales = perf_df.groupby(["country", "region"])["sales"].transform(
-                "sum"
-            )
+            region_sales = perf_df.groupby(["country", "region"], observed=True)[
+                "sales"
+            ].transform("sum")
             perf_df["sales_pct"] = np.where(
                 region_sales > 0,
                 perf_df["sales"] / region_sales,
@@ -946,7 +905,7 @@ def render_performance_table_section(data, country_filter):
             "available",
             "Aging %",
         ]
-    ].copy()
+    ]
 
     display_df.columns = [
         "Ubicación",
@@ -1058,21 +1017,42 @@ def render_performance_table_section(data, country_filter):
             )
 
 
-def render_alerts_section(data, period_days):
+def get_strategic_alerts(period_days):
+    """
+    Strategic alerts of the user's scope from the alert service
+
+    Evaluated once per dataset version, scope and period by the service's
+    background worker (see utils/alert_service.py), so reruns and other
+    sessions with the same scope read the stored result.
+    """
+    scope = get_user_scope()
+    return get_alerts(
+        ("ceo", scope, period_days),
+        lambda data, version: detect_strategic_alerts(
+            scoped_dataset(version, data, scope), period_days, get_dataset_day(data)
+        ),
+    )
+
+
+def render_alerts_section(period_days):
     """Render strategic alerts with dynamic detection - collapsible by type"""
     st.subheader("Alertas Estratégicas")
 
-    # Detect alerts dynamically
-    alerts = detect_strategic_alerts(data, period_days)
+    # Detect alerts dynamically (in the background, see get_strategic_alerts)
+    result = get_strategic_alerts(period_days)
+    alerts = result["alerts"]
+    render_freshness_caption(
+        result["evaluated_at"], result["refreshing"], error=result["error"]
+    )
 
     if len(alerts) == 0:
         st.success("✅ No hay alertas activas - Todas las métricas están saludables")
         return
 
     # Separate alerts by type
-    critical_alerts = [a for a in alerts if a["type"] == "critical"]
-    warning_alerts = [a for a in alerts if a["type"] == "warning"]
-    info_alerts = [a for a in alerts if a["type"] == "info"]
+    critical_alerts = alerts[alerts["type"] == "critical"].to_dict("records")
+    warning_alerts = alerts[alerts["type"] == "warning"].to_dict("records")
+    info_alerts = alerts[alerts["type"] == "info"].to_dict("records")
 
     # Display alert summary
     col_summary1, col_summary2, col_summary3 = st.columns(3)
@@ -1099,6 +1079,7 @@ def render_alerts_section(data, period_days):
                         alert["title"],
                         alert["description"],
                         alert.get("timestamp"),
+                        alert.get("new", False),
                     )
 
     # Render warning alerts in expandable section
@@ -1115,6 +1096,7 @@ def render_alerts_section(data, period_days):
                         alert["title"],
                         alert["description"],
                         alert.get("timestamp"),
+                        alert.get("new", False),
                     )
 
     # Render info alerts in expandable section
@@ -1131,52 +1113,54 @@ def render_alerts_section(data, period_days):
                         alert["title"],
                         alert["description"],
                         alert.get("timestamp"),
+                        alert.get("new", False),
                     )
 
 
-def get_previous_period_data(current_df):
-    """Get data from previous period for delta calculation"""
-    if len(current_df) == 0:
-        return pd.DataFrame()
-
-    min_date = current_df["date"].min()
-    max_date = current_df["date"].max()
-
-    # Calculate period length (add 1 day to include both start and end)
-    period_length = (max_date - min_date).days + 1
-
-    prev_end = min_date - timedelta(days=1)
-    prev_start = prev_end - timedelta(days=period_length - 1)
-
-    # Get full data from session state
-    if "data" not in st.session_state:
-        return pd.DataFrame()
+def get_statistical_anomalies():
+    """
+    Statistical anomalies of the latest day for the user's scope
 
-    all_metrics = st.session_state.data["daily_metrics"]
+    The detector runs over every hub of the shared daily_metrics and keeps
+    its state across dataset versions (see utils/anomaly_detector.py); the
+    scope only selects the alerts of its hubs.
+    """
+    scope = get_user_scope()
 
-    # Get current filters from session state
-    country = st.session_state.get("ceo_country", "Todos")
-    hub = st.session_state.get("ceo_hub", "Todos")
+    def evaluate(data, version):
+        alerts = get_anomaly_alerts(data["daily_metrics"])
+        hubs = scoped_dataset(version, data, scope)["daily_metrics"]["hub"]
+        return alerts[alerts["hub"].isin(hubs.unique())].reset_index(drop=True)
 
-    # Apply filters to previous period data
-    prev_df = all_metrics.copy()
+    return get_alerts(("ceo_anomalies", scope), evaluate)
 
-    if country != "Todos":
-        prev_df = prev_df[prev_df["country"] == country]
 
-    if hub != "Todos":
-        prev_df = prev_df[prev_df["hub"] == hub]
+def render_anomalies_section():
+    """Render the statistical anomalies of the latest day (z-score, EWMA, CUSUM)"""
+    st.subheader("Anomalías Estadísticas")
 
-    # Filter by previous date range
-    prev_df = prev_df[(prev_df["date"] >= prev_start) & (prev_df["date"] <= prev_end)]
+    result = get_statistical_anomalies()
+    alerts = result["alerts"]
+    render_freshness_caption(
+        result["evaluated_at"], result["refreshing"], error=result["error"]
+    )
 
-    return prev_df
+    if len(alerts) == 0:
+        st.success("✅ Sin anomalías en el último día")
+        return
 
+    day = alerts["timestamp"].iloc[0].strftime("%d/%m/%Y")
+    with st.expander(f"📈 **Anomalías del {day}** ({len(alerts)})", expanded=False):
+        col1, col2 = st.columns(2)
 
-def calculate_delta(current, previous):
-    """Calculate percentage delta"""
-    if previous == 0 or previous == current:
-        return None
+        for idx, alert in enumerate(alerts.to_dict("records")):
+            col = col1 if idx % 2 == 0 else col2
 
-    pct_change = ((current - previous) / previous) * 100
-    return f"{pct_change:+.1f}%"
+            with col:
+                render_alert_box(
+                    alert["type"],
+                    alert["title"],
+                    alert["description"],
+                    alert.get("timestamp"),
+                    alert.get("new", False),
+                )
@@ -3,8 +3,6 @@ City Manager Dashboard View
 Team performance, agent comparison, and fleet management
 """
 
-from datetime import datetime, timedelta
-
 import numpy as np
 import pandas as pd
 import streamlit as st
@@ -18,16 +16,31 @@ from config import (
     THRESHOLDS,
     VEHICLE_SEGMENTS,
 )
+from utils.agent_operations import get_operation_view
 from utils.alert_detector import detect_operational_alerts
+from utils.alert_service import get_alerts
 from utils.components import (
     render_agent_status_badge,
     render_alert_box,
     render_bar_chart,
+    render_freshness_caption,
     render_kpi_card,
     render_kpi_grid,
     render_metric_comparison,
     render_trend_chart,
 )
+from utils.auth import (
+    get_user_row_scope,
+    get_user_scope,
+    resolve_row_scope,
+    scope_filters,
+)
+from utils.data_store import get_data_period_start
+from utils.filter_cache import cached_filter
+from utils.filter_engine import filter_frame, snap_start
+from utils.metric_cube import window_mean
+from utils.rollup import LEVELS, add_ratios, rollup
+from utils.row_scope import scope_groups
 
 
 def render_city_manager_dashboard(data):
@@ -58,7 +71,7 @@ def render_city_manager_dashboard(data):
     period = st.session_state.get("global_period", "Últimos 30 días")
     operation_type = "all"
 
-    filtered_data = filter_data(data, country, region, hub, period, operation_type)
+    filtered_data = get_filtered_data(country, region, hub, period, operation_type)
     hub_label = f"{hub}" if hub != "Todos los Hubs" else f"{region}"
 
     # ═══════════════════════════════════════════════════════════════════
@@ -72,9 +85,9 @@ def render_city_manager_dashboard(data):
     # ═══════════════════════════════════════════════════════════════════
     st.markdown("---")
 
-    # Count alerts for badge
-    alerts = detect_operational_alerts(filtered_data, hub_label)
-    alert_count = len(alerts)
+    # Count alerts for badge (stored by the alert service, not re-detected)
+    alerts = get_operational_alerts(country, region, hub, period, hub_label)
+    alert_count = len(alerts["alerts"])
     alert_badge = f" ({alert_count})" if alert_count > 0 else ""
 
     # Navigation tabs
@@ -101,7 +114,7 @@ def render_city_manager_dashboard(data):
         render_leads_section(filtered_data)
 
     else:  # Alertas
-        render_alerts_section(filtered_data, hub_label)
+        render_alerts_section(alerts)
 
     # ═══════════════════════════════════════════════════════════════════
     # INVENTORY RISK ACTION MODULE (Propuesta 1)
@@ -140,21 +153,19 @@ def render_hero_zone(all_data, filtered_data, hub_label, country):
         financing_penetration = 0
         total_revenue = 0
 
-    # Country averages for comparison
-    country_df = all_data["daily_metrics"][
-        all_data["daily_metrics"]["country"] == country
-    ].copy()
+    # Country averages for comparison (per-hub sums of the rollup cube)
     days = PERIOD_OPTIONS[st.session_state.get("cm_period", "Últimos 30 días")]
-    cutoff_date = datetime.now() - timedelta(days=days)
-    country_df = country_df[country_df["date"] >= cutoff_date]
+    cutoff_date = get_data_period_start(days)
+    country_hubs = get_scoped_rollup("hub", start=cutoff_date, country=country)
+    country_totals = country_hubs.drop(columns=list(LEVELS["hub"])).sum()
 
-    country_sales = country_df["sales"].sum()
-    country_leads = country_df["leads"].sum()
+    country_sales = country_totals["sales"]
+    country_leads = country_totals["leads"]
     country_conversion = (
         (country_sales / country_leads * 100) if country_leads > 0 else 0
     )
-    country_nps = country_df["nps"].mean()
-    num_hubs = len(country_df["hub"].unique())
+    country_nps = window_mean(country_totals, "nps")
+    num_hubs = country_hubs["hub"].nunique()
     avg_sales_per_hub = country_sales / num_hubs if num_hubs > 0 else 0
 
     # Calculate deltas
@@ -204,7 +215,7 @@ def render_hero_zone(all_data, filtered_data, hub_label, country):
 def render_team_section(filtered_data, hub_label):
     """Render Team section with agent table and optimization"""
     # Quick stats
-    agents_df = filtered_data["agent_performance"].copy()
+    agents_df = filtered_data["agent_performance"]
 
     if len(agents_df) == 0:
         st.warning("No hay datos de agentes")
@@ -238,7 +249,7 @@ def render_team_section(filtered_data, hub_label):
 
 def render_agent_table_improved(filtered_data):
     """Render improved agent table with inline metrics"""
-    agents_df = filtered_data["agent_performance"].copy()
+    agents_df = filtered_data["agent_performance"]
 
     if len(agents_df) == 0:
         return
@@ -266,7 +277,7 @@ def render_agent_table_improved(filtered_data):
         )
 
     # Apply filters
-    filtered_agents = agents_df.copy()
+    filtered_agents = agents_df
 
     if quick_filter == "🔥 Top Performers":
         threshold = filtered_agents["conversion"].quantile(0.75)
@@ -388,9 +399,9 @@ def render_leads_section(filtered_data):
         render_recommendations_module(filtered_data)
 
 
-def render_alerts_section(filtered_data, hub_label):
+def render_alerts_section(alerts):
     """Render Alerts section"""
-    render_operational_alerts(filtered_data, hub_label)
+    render_operational_alerts(alerts)
 
 
 def get_country_for_region(region):
@@ -401,89 +412,111 @@ def get_country_for_region(region):
     return COUNTRIES[0]
 
 
-def filter_data(data, country, region, hub, period, operation_type="all"):
-    """Filter data for specific region, hub, period, and operation type"""
-    # Filter daily metrics
-    daily_metrics = data["daily_metrics"].copy()
-    daily_metrics = daily_metrics[
-        (daily_metrics["country"] == country) & (daily_metrics["region"] == region)
-    ]
-
-    # If specific hub is selected, filter by hub too
-    if hub != "Todos los Hubs":
-        daily_metrics = daily_metrics[daily_metrics["hub"] == hub]
-
-    days = PERIOD_OPTIONS[period]
-    cutoff_date = datetime.now() - timedelta(days=days)
-    daily_metrics = daily_metrics[daily_metrics["date"] >= cutoff_date]
-
-    # Filter agent performance
-    agent_perf = data["agent_performance"].copy()
-    agent_perf = agent_perf[
-        (agent_perf["country"] == country) & (agent_perf["region"] == region)
-    ]
-
-    # If specific hub is selected, filter by hub too
-    if hub != "Todos los Hubs":
-        agent_perf = agent_perf[agent_perf["hub"] == hub]
-
-    # Apply operation type filter to agent performance
-    if operation_type != "all":
-        agent_perf = apply_operation_filter(agent_perf, operation_type)
+def get_filtered_data(country, region, hub, period, operation_type="all"):
+    """
+    filter_data memoized across sessions
 
-    # Filter inventory
-    inventory = data["inventory"].copy()
-    inventory = inventory[
-        (inventory["country"] == country) & (inventory["region"] == region)
-    ]
+    Cut from the shared dataset within the user's row scope (the same rows
+    as filtering the user's own frames, without re-indexing them). Keyed by dataset version, user scope, selections, operation type and the
+    first date of the period (see utils/filter_cache.py).
+    """
+    cutoff_date = snap_start(
+        st.session_state.data["daily_metrics"],
+        get_data_period_start(PERIOD_OPTIONS[period]),
+    )
+    key = (
+        "city_manager",
+        get_user_scope(),
+        country,
+        region,
+        hub,
+        operation_type,
+        cutoff_date,
+    )
+    return cached_filter(
+        st.session_state.data_version,
+        key,
+        lambda: filter_data(
+            st.session_state.data,
+            country,
+            region,
+            hub,
+            period,
+            operation_type,
+            cutoff_date,
+            get_user_row_scope(),
+        ),
+    )
 
-    # If specific hub is selected, filter by hub too
-    if hub != "Todos los Hubs":
-        inventory = inventory[inventory["hub"] == hub]
 
-    # Filter funnel
-    funnel = data["funnel"].copy()
-    funnel = funnel[(funnel["country"] == country) & (funnel["region"] == region)]
+def filter_data(
+    data,
+    country,
+    region,
+    hub,
+    period,
+    operation_type="all",
+    cutoff_date=None,
+    scope=None,
+):
+    """
+    Filter data for specific region, hub, period, and operation type
 
-    # If specific hub is selected, filter by hub too
-    if hub != "Todos los Hubs":
-        funnel = funnel[funnel["hub"] == hub]
+    scope: Row scope of the user over data (see utils/row_scope.py), or
+           None when data holds only rows the user may see
+    """
+    # Country and region always filter; the hub only when one is selected
+    filters = {
+        "country": country,
+        "region": region,
+        "hub": None if hub == "Todos los Hubs" else hub,
+    }
+    if cutoff_date is None:
+        cutoff_date = get_data_period_start(PERIOD_OPTIONS[period])
+
+    # Agent metrics of the operation type (built once per dataset version)
+    agent_perf = filter_frame(
+        get_operation_view(data["agent_performance"], operation_type),
+        groups=scope_groups(scope, "agent_performance"),
+        **filters,
+    )
 
     return {
-        "daily_metrics": daily_metrics,
+        "daily_metrics": filter_frame(
+            data["daily_metrics"],
+            start=cutoff_date,
+            groups=scope_groups(scope, "daily_metrics"),
+            **filters,
+        ),
         "agent_performance": agent_perf,
-        "inventory": inventory,
-        "funnel": funnel,
+        "inventory": filter_frame(
+            data["inventory"], groups=scope_groups(scope, "inventory"), **filters
+        ),
+        "funnel": filter_frame(
+            data["funnel"], groups=scope_groups(scope, "funnel"), **filters
+        ),
         "operation_type": operation_type,  # Include in filtered data for reference
+        # Selections behind the frames, for aggregates read from the metric cube
+        "filters": dict(filters, start=cutoff_date),
     }
 
 
-def apply_operation_filter(agent_df, operation_type):
+def get_scoped_rollup(level, grain=None, start=None, **filters):
     """
-    Apply operation type filter to agent performance data
-    Adjusts metrics based on selected operation type
-    """
-    df = agent_df.copy()
-
-    if operation_type == "sales":
-        # Only count sales operations (sales_only + sales_tradein)
-        df["sales"] = df["sales_only"] + df["sales_tradein"]
-        df["conversion"] = df["sales"] / df["leads"]
-        df["revenue"] = df["sales"] * 20000  # Approximate revenue per sale
+    Rollup of the shared daily_metrics within the user's scope
 
-    elif operation_type == "purchases":
-        # Only count purchase operations
-        df["sales"] = df["purchases_total"]  # Rename for compatibility
-        df["conversion"] = df["purchases_total"] / df["leads"]
-        df["revenue"] = df["purchases_total"] * 18000  # Approximate cost per purchase
+    Args:
+        level, grain, start: See utils/rollup.py
+        **filters: country/region/hub selections (None = any)
 
-    elif operation_type == "tradein":
-        # Only count trade-in operations
-        df["sales"] = df["sales_tradein"]  # Rename for compatibility
-        df["conversion"] = df["sales_tradein"] / df["leads"]
-        df["revenue"] = df["sales_tradein"] * 20000
-
-    return df
+    Returns:
+        Rollup DataFrame (empty when the selections fall outside the scope)
+    """
+    daily_metrics = st.session_state.data["daily_metrics"]
+    filters = scope_filters(**filters)
+    if filters is None:
+        return rollup(daily_metrics, level, grain, start).iloc[:0]
+    return rollup(daily_metrics, level, grain, start, **filters)
 
 
 def render_region_overview(filtered_data, region, country):
@@ -496,15 +529,16 @@ def render_region_overview(filtered_data, region, country):
         st.warning("No hay datos para este hub")
         return
 
-    # Aggregate metrics
-    total_sales = df["sales"].sum()
-    total_purchases = df["purchases"].sum()  # NEW: Total purchases
-    total_leads = df["leads"].sum()
-    total_appointments = df["appointments"].sum()
-    total_reservations = df["reservations"].sum()
-    total_cancellations = df["cancellations"].sum()
-    avg_nps = df["nps"].mean()
-    avg_sla = df["sla_lead_to_sale"].mean()
+    # Aggregate metrics (window sums of the rollup cube)
+    totals = get_scoped_rollup("total", **filtered_data["filters"]).sum()
+    total_sales = totals["sales"]
+    total_purchases = totals["purchases"]  # NEW: Total purchases
+    total_leads = totals["leads"]
+    total_appointments = totals["appointments"]
+    total_reservations = totals["reservations"]
+    total_cancellations = totals["cancellations"]
+    avg_nps = window_mean(totals, "nps")
+    avg_sla = window_mean(totals, "sla_lead_to_sale")
 
     conversion = (total_sales / total_leads * 100) if total_leads > 0 else 0
 
@@ -565,32 +599,30 @@ def render_hub_comparison(all_data, filtered_data, hub_label, country):
     """Compare region/hub performance vs country average"""
     st.subheader(f"📊 Comparación vs Promedio {country}")
 
-    # Hub metrics
-    hub_df = filtered_data["daily_metrics"]
-    hub_sales = hub_df["sales"].sum()
-    hub_purchases = hub_df["purchases"].sum()
-    hub_leads = hub_df["leads"].sum()
+    # Hub metrics from the rollup cube (window sums of the selected hubs)
+    hub_totals = get_scoped_rollup("total", **filtered_data["filters"]).sum()
+    hub_sales = hub_totals["sales"]
+    hub_purchases = hub_totals["purchases"]
+    hub_leads = hub_totals["leads"]
     hub_conversion = (hub_sales / hub_leads * 100) if hub_leads > 0 else 0
-    hub_nps = hub_df["nps"].mean()
+    hub_nps = window_mean(hub_totals, "nps")
 
     # Country average
-    country_df = all_data["daily_metrics"][
-        all_data["daily_metrics"]["country"] == country
-    ].copy()
     days = PERIOD_OPTIONS[st.session_state.get("cm_period", "Últimos 30 días")]
-    cutoff_date = datetime.now() - timedelta(days=days)
-    country_df = country_df[country_df["date"] >= cutoff_date]
+    cutoff_date = get_data_period_start(days)
+    country_hubs = get_scoped_rollup("hub", start=cutoff_date, country=country)
+    country_totals = country_hubs.drop(columns=list(LEVELS["hub"])).sum()
 
-    country_sales = country_df["sales"].sum()
-    country_purchases = country_df["purchases"].sum()
-    country_leads = country_df["leads"].sum()
+    country_sales = country_totals["sales"]
+    country_purchases = country_totals["purchases"]
+    country_leads = country_totals["leads"]
     country_conversion = (
         (country_sales / country_leads * 100) if country_leads > 0 else 0
     )
-    country_nps = country_df["nps"].mean()
+    country_nps = window_mean(country_totals, "nps")
 
     # Calculate hub average for fair comparison
-    num_hubs = len(country_df["hub"].unique())
+    num_hubs = country_hubs["hub"].nunique()
     avg_sales_per_hub = country_sales / num_hubs if num_hubs > 0 else 0
     avg_purchases_per_hub = country_purchases / num_hubs if num_hubs > 0 else 0
 
@@ -630,10 +662,11 @@ def render_hub_comparison(all_data, filtered_data, hub_label, country):
         )
 
     # Ranking
-    hub_rankings = (
-        country_df.groupby("region")
-        .agg({"sales": "sum", "leads": "sum", "nps": "mean"})
-        .reset_index()
+    hub_rankings = add_ratios(
+        get_scoped_rollup("region", start=cutoff_date, country=country), "avg_nps"
+    )
+    hub_rankings = hub_rankings[["region", "sales", "leads", "avg_nps"]].rename(
+        columns={"avg_nps": "nps"}
     )
     hub_rankings["conversion"] = hub_rankings["sales"] / hub_rankings["leads"] * 100
     hub_rankings = hub_rankings.sort_values("sales", ascending=False).reset_index(
@@ -659,7 +692,7 @@ def render_agent_advanced_filter(filtered_data):
         "Segmenta y filtra agentes por múltiples dimensiones para identificar rápidamente top performers o agentes que necesitan apoyo"
     )
 
-    agents_df = filtered_data["agent_performance"].copy()
+    agents_df = filtered_data["agent_performance"]
 
     if len(agents_df) == 0:
         st.warning("No hay datos de agentes para este hub")
@@ -754,7 +787,7 @@ def render_agent_advanced_filter(filtered_data):
         & (agents_df["conversion"] * 100 <= cvr_range[1])
         & (agents_df["nps"] >= nps_range[0])
         & (agents_df["nps"] <= nps_range[1])
-    ].copy()
+    ]
 
     # === RESULTS ===
     st.markdown("---")
@@ -892,7 +925,7 @@ def render_agent_optimization(filtered_data):
     st.subheader("🎯 Optimización de Agentes")
     st.caption("Maximiza la eficiencia de cada agente")
 
-    agents_df = filtered_data["agent_performance"].copy()
+    agents_df = filtered_data["agent_performance"]
 
     if len(agents_df) == 0:
         st.warning("No hay datos de agentes para este hub")
@@ -914,11 +947,11 @@ def render_agent_optimization(filtered_data):
                 "utilization",
                 "backlog_cartera",
             ]
-        ].copy()
+        ]
 
         capacity_df = capacity_df.sort_values("utilization", ascending=False)
 
-        capacity_display = capacity_df.copy()
+        capacity_display = capacity_df
         capacity_display.columns = [
             "Agente",
             "Slots Semanales",
@@ -990,7 +1023,7 @@ def render_incentives_module(filtered_data):
         "Puntos compuestos basados en entregas, productos adicionales y ownership"
     )
 
-    agents_df = filtered_data["agent_performance"].copy()
+    agents_df = filtered_data["agent_performance"]
 
     if len(agents_df) == 0:
         st.info("No hay datos de agentes")
@@ -1124,7 +1157,7 @@ def render_recommendations_module(filtered_data):
     """Render intelligent recommendations grouped by action"""
     st.subheader("💡 Recomendaciones Estratégicas")
 
-    agents_df = filtered_data["agent_performance"].copy()
+    agents_df = filtered_data["agent_performance"]
     if len(agents_df) == 0:
         st.info("No hay datos de agentes")
         return
@@ -1204,12 +1237,42 @@ def render_recommendations_module(filtered_data):
             st.caption("Sin alertas de calidad")
 
 
-def render_operational_alerts(filtered_data, hub_label):
-    """Render operational alerts with dynamic detection - collapsible by type"""
-    st.subheader("Alertas Operativas")
+def get_operational_alerts(country, region, hub, period, hub_label):
+    """
+    Operational alerts of the selections from the alert service
 
-    # Detect alerts dynamically
-    alerts = detect_operational_alerts(filtered_data, hub_label)
+    Evaluated once per dataset version, user scope and selections by the
+    service's background worker (see utils/alert_service.py) over the same
+    rows as filter_data.
+    """
+    scope = get_user_scope()
+    return get_alerts(
+        ("city_manager", scope, country, region, hub, period),
+        lambda data, version: detect_operational_alerts(
+            filter_data(
+                data,
+                country,
+                region,
+                hub,
+                period,
+                scope=resolve_row_scope(version, data, scope),
+            ),
+            hub_label,
+        ),
+    )
+
+
+def render_operational_alerts(alerts):
+    """
+    Render operational alerts with dynamic detection - collapsible by type
+
+    alerts: Alert service result (see get_operational_alerts)
+    """
+    st.subheader("Alertas Operativas")
+    render_freshness_caption(
+        alerts["evaluated_at"], alerts["refreshing"], error=alerts["error"]
+    )
+    alerts = alerts["alerts"]
 
     if len(alerts) == 0:
         st.success(
@@ -1218,8 +1281,8 @@ def render_operational_alerts(filtered_data, hub_label):
         return
 
     # Separate alerts by type
-    critical_alerts = [a for a in alerts if a["type"] == "critical"]
-    warning_alerts = [a for a in alerts if a["type"] == "warning"]
+    critical_alerts = alerts[alerts["type"] == "critical"].to_dict("records")
+    warning_alerts = alerts[alerts["type"] == "warning"].to_dict("records")
 
     # Display alert summary
     col1, col2 = st.columns(2)
@@ -1239,6 +1302,7 @@ def render_operational_alerts(filtered_data, hub_label):
                     alert["title"],
                     alert["description"],
                     alert.get("timestamp"),
+                    alert.get("new", False),
                 )
 
     # Render warning alerts in expandable section
@@ -1250,6 +1314,7 @@ def render_operational_alerts(filtered_data, hub_label):
                     alert["title"],
                     alert["description"],
                     alert.get("timestamp"),
+                    alert.get("new", False),
                 )
 
 
@@ -1257,7 +1322,7 @@ def render_lead_assignment_simulator(filtered_data):
     """Render lead assignment simulator - IMPROVED UX"""
     st.subheader("🎯 Simulador de Asignación")
 
-    agents_df = filtered_data["agent_performance"].copy()
+    agents_df = filtered_data["agent_performance"]
     if len(agents_df) == 0:
         st.warning("No hay datos de agentes")
         return
@@ -1280,8 +1345,9 @@ def render_lead_assignment_simulator(filtered_data):
                 label_visibility="collapsed",
             )
 
-    # Calculate assignments
-    agents_df = agents_df.copy()
+    # Calculate assignments (on a shallow copy: the priority score column
+    # must not land on the filtered data)
+    agents_df = agents_df.copy(deep=False)
 
     if method == "🎯 Óptimo (Eficiencia)":
         # Prioritize by efficiency_composite, limited by capacity
@@ -1382,7 +1448,7 @@ def render_lead_assignment_simulator(filtered_data):
         if not assignments_df.empty:
             display_df = assignments_df[
                 ["agent", "leads", "efficiency", "expected_revenue"]
-            ].copy()
+            ]
             display_df.columns = ["Agente", "Asignar", "Eficiencia", "Revenue Est."]
 
             st.dataframe(
@@ -3,14 +3,14 @@ Customer Profile View
 Comprehensive customer view with transaction history, interests, and interactions
 """
 
-from datetime import datetime, timedelta
-
 import numpy as np
 import pandas as pd
 import streamlit as st
 from config import COLORS, VEHICLE_SEGMENTS
 from utils.celeste_copilot import render_celeste_insights_card
 from utils.components import render_alert_box, render_kpi_card
+from utils.customer_tables import get_customer_record, get_customer_rows
+from utils.data_store import get_data_now
 
 
 def render_customer_profile(data):
@@ -37,16 +37,14 @@ def render_customer_profile(data):
         st.error("No hay datos de clientes disponibles")
         return
 
-    customer = customers_df[customers_df["customer_id"] == customer_id]
+    customer_info = get_customer_record(data, customer_id, get_data_now())
 
-    if len(customer) == 0:
+    if customer_info is None:
         st.warning(f"Cliente {customer_id} no encontrado")
         st.session_state.selected_customer_id = None
         render_customer_search_improved(data)
         return
 
-    customer_info = customer.iloc[0].to_dict()
-
     # Store customer context for Celeste Copilot
     st.session_state.copilot_customer_context = customer_info
 
@@ -80,10 +78,10 @@ def render_customer_profile(data):
         render_vehicle_interests(customer_info)
 
     with tab3:
-        render_transaction_history(customer_info)
+        render_transaction_history(data, customer_info)
         st.markdown("---")
         st.markdown("#### 📞 Log de Interacciones")
-        render_interactions_log(customer_info)
+        render_interactions_log(data, customer_info)
 
 
 def render_hero_brief(customer_info):
@@ -220,7 +218,7 @@ def render_celeste_context_improved(customer_info):
 
     with col1:
         if last_interaction:
-            hours_ago = (datetime.now() - last_interaction).total_seconds() / 3600
+            hours_ago = (get_data_now() - last_interaction).total_seconds() / 3600
             time_str = (
                 f"Hace {int(hours_ago)}h"
                 if hours_ago < 24
@@ -362,7 +360,7 @@ def render_customer_search_improved(data):
     # ═══════════════════════════════════════════════════════════════════
     # APPLY FILTERS
     # ═══════════════════════════════════════════════════════════════════
-    filtered = customers_df.copy()
+    filtered = customers_df
 
     # Search term
     if search_term:
@@ -374,7 +372,7 @@ def render_customer_search_improved(data):
 
     # Quick filters
     if quick_filter == "📅 Contactar Hoy":
-        today = datetime.now()
+        today = get_data_now()
         filtered = filtered[(today - filtered["last_interaction_date"]).dt.days >= 7]
     elif quick_filter == "🔄 Retomar":
         filtered = filtered[filtered["status"] == "Inactivo"]
@@ -452,7 +450,7 @@ def render_customer_card(customer, idx):
     vip_badge = " ⭐" if customer["is_vip"] else ""
 
     # Days since last contact
-    days_since = (datetime.now() - customer["last_interaction_date"]).days
+    days_since = (get_data_now() - customer["last_interaction_date"]).days
     urgency = "🔴" if days_since > 14 else "🟡" if days_since > 7 else "🟢"
 
     # Use native Streamlit container
@@ -696,7 +694,7 @@ def render_celeste_context(customer_info):
 
     with col1:
         if last_interaction:
-            hours_ago = (datetime.now() - last_interaction).total_seconds() / 3600
+            hours_ago = (get_data_now() - last_interaction).total_seconds() / 3600
             if hours_ago < 1:
                 time_str = "Hace menos de 1 hora"
             elif hours_ago < 24:
@@ -856,7 +854,7 @@ def render_customer_summary(customer_info, data):
         st.write(f"**Registro:** {reg_date.strftime('%d/%m/%Y')}")
 
         last_interaction = customer_info["last_interaction_date"]
-        days_since = (datetime.now() - last_interaction).days
+        days_since = (get_data_now() - last_interaction).days
         st.write(
             f"**Última Interacción:** {last_interaction.strftime('%d/%m/%Y')} ({days_since} días)"
         )
@@ -865,7 +863,7 @@ def render_customer_summary(customer_info, data):
             customer_info["last_purchase_date"]
         ):
             last_purchase = customer_info["last_purchase_date"]
-            days_since_purchase = (datetime.now() - last_purchase).days
+            days_since_purchase = (get_data_now() - last_purchase).days
             st.write(
                 f"**Última Compra:** {last_purchase.strftime('%d/%m/%Y')} ({days_since_purchase} días)"
             )
@@ -888,7 +886,8 @@ def render_customer_summary(customer_info, data):
             f"**Marcas Preferidas:** {customer_info.get('preferred_brands', 'Sin preferencia')}"
         )
 
-        if customer_info["nps_rating"] is not None:
+        # Unrated customers come as None (generated) or NaN (snapshot)
+        if pd.notna(customer_info["nps_rating"]):
             nps_color = (
                 "🟢"
                 if customer_info["nps_rating"] >= 9
@@ -896,7 +895,9 @@ def render_customer_summary(customer_info, data):
                 if customer_info["nps_rating"] >= 7
                 else "🔴"
             )
-            st.write(f"**NPS Rating:** {nps_color} {customer_info['nps_rating']}/10")
+            st.write(
+                f"**NPS Rating:** {nps_color} {int(customer_info['nps_rating'])}/10"
+            )
         else:
             st.write("**NPS Rating:** Sin calificar")
 
@@ -995,26 +996,28 @@ def render_customer_summary(customer_info, data):
         st.info("✅ Cliente saludable - Sin indicadores especiales")
 
 
-def render_transaction_history(customer_info):
-    """Render transaction history tab with real transaction data"""
+def render_transaction_history(data, customer_info):
+    """Render transaction history tab from the customer_transactions side table"""
     st.subheader("🛒 Historial de Transacciones Completo")
 
-    transactions = customer_info.get("transactions", [])
+    customer_key = customer_info["customer_key"]
+    transactions = get_customer_rows(data.get("customer_transactions"), customer_key)
 
-    if not transactions or len(transactions) == 0:
+    if len(transactions) == 0:
         st.info("Este cliente no tiene transacciones registradas")
         return
 
-    # Summary metrics
-    total_sales = len([t for t in transactions if t["type"] == "Venta"])
-    total_cancellations = len([t for t in transactions if t["type"] == "Cancelación"])
-    total_revenue = sum(
-        [t.get("total_amount", 0) for t in transactions if t["type"] == "Venta"]
-    )
-    total_ancillaries_revenue = sum(
-        [t.get("ancillaries_total", 0) for t in transactions if t["type"] == "Venta"]
+    ancillaries_df = get_customer_rows(
+        data.get("transaction_ancillaries"), customer_key
     )
 
+    # Summary metrics
+    is_sale = transactions["type"] == "Venta"
+    total_sales = int(is_sale.sum())
+    total_cancellations = int((transactions["type"] == "Cancelación").sum())
+    total_revenue = transactions.loc[is_sale, "total_amount"].sum()
+    total_ancillaries_revenue = transactions.loc[is_sale, "ancillaries_total"].sum()
+
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
@@ -1070,9 +1073,8 @@ def render_transaction_history(customer_info):
     st.markdown("---")
     st.markdown("#### 📋 Detalle de Transacciones")
 
-    for idx, transaction in enumerate(
-        sorted(transactions, key=lambda x: x["date"], reverse=True)
-    ):
+    transactions = transactions.sort_values("date", ascending=False)
+    for idx, transaction in enumerate(transactions.to_dict("records")):
         transaction_date = transaction["date"]
         transaction_type = transaction["type"]
 
@@ -1111,7 +1113,10 @@ def render_transaction_history(customer_info):
                 with col_trans2:
                     st.markdown("#### 🎁 Ancillaries Vendidos")
 
-                    ancillaries = transaction.get("ancillaries", [])
+                    ancillaries = ancillaries_df[
+                        ancillaries_df["transaction_id"]
+                        == transaction["transaction_id"]
+                    ].to_dict("records")
 
                     if ancillaries:
                         for anc in ancillaries:
@@ -1255,81 +1260,28 @@ def render_vehicle_interests(customer_info):
         st.info(rec)
 
 
-def render_interactions_log(customer_info):
-    """Render interactions log tab"""
+def render_interactions_log(data, customer_info):
+    """Render interactions log tab from the customer_interactions side table"""
     st.subheader("📞 Registro de Interacciones")
 
-    # Generate sample interactions
-    interactions = []
-
-    num_interactions = np.random.randint(5, 15)
-
-    for i in range(num_interactions):
-        days_ago = np.random.randint(1, customer_info["days_since_registration"])
-        interaction_date = datetime.now() - timedelta(days=days_ago)
-
-        interaction_types = [
-            "Llamada",
-            "WhatsApp",
-            "Email",
-            "Visita Hub",
-            "Demo Vehículo",
-        ]
-        interaction_type = np.random.choice(interaction_types)
-
-        # Generate interaction note
-        notes_by_type = {
-            "Llamada": [
-                "Cliente interesado en ver vehículos este fin de semana",
-                "Seguimiento sobre cotización enviada",
-                "Respondió preguntas sobre financiamiento",
-                "No contestó - dejar mensaje",
-            ],
-            "WhatsApp": [
-                "Envió fotos de vehículos de interés",
-                "Preguntó sobre disponibilidad",
-                "Solicitó agendar cita",
-                "Compartió documentación para pre-aprobación",
-            ],
-            "Email": [
-                "Envió cotización formal",
-                "Compartió catálogo de vehículos",
-                "Seguimiento post-demo",
-                "Envió opciones de financiamiento",
-            ],
-            "Visita Hub": [
-                "Cliente visitó showroom - vio 3 vehículos",
-                "Realizó test drive de SUV",
-                "Dejó documentos para evaluación",
-                "Agendó segunda visita",
-            ],
-            "Demo Vehículo": [
-                "Demo de Sedán - muy interesado",
-                "Test drive de SUV - solicita cotización",
-                "Cliente probó vehículo - quiere pensarlo",
-                "Demo positiva - listo para reservar",
-            ],
-        }
-
-        note = np.random.choice(notes_by_type[interaction_type])
-
-        # Agent name
-        agent_names = ["Juan García", "María López", "Carlos Pérez", "Ana Martínez"]
-        agent = np.random.choice(agent_names)
+    interactions = get_customer_rows(
+        data.get("customer_interactions"), customer_info["customer_key"]
+    )
 
-        interactions.append(
+    if len(interactions) == 0:
+        st.info("Este cliente no tiene interacciones registradas")
+    else:
+        # Stored most recent first
+        interactions_df = pd.DataFrame(
             {
-                "Fecha": interaction_date.strftime("%d/%m/%Y %H:%M"),
-                "Tipo": interaction_type,
-                "Nota": note,
-                "Agente": agent,
+                "Fecha": interactions["timestamp"].dt.strftime("%d/%m/%Y %H:%M"),
+                "Tipo": interactions["interaction_type"],
+                "Nota": interactions["note"],
+                "Agente": interactions["agent_name"],
             }
         )
 
-    # Sort by date (most recent first)
-    interactions_df = pd.DataFrame(interactions)
-
-    st.dataframe(interactions_df, use_container_width=True, hide_index=True)
+        st.dataframe(interactions_df, use_container_width=True, hide_index=True)
 
     # Add new interaction form
     st.markdown("---")
@@ -3,12 +3,13 @@ Kavako Dashboard View
 Personal agent view with portfolio, appointments, score and performance metrics
 """
 
-from datetime import datetime, timedelta
+from datetime import timedelta
 
 import numpy as np
 import pandas as pd
 import streamlit as st
 from config import COLORS, INCENTIVE_GOALS, OPERATION_TYPES, THRESHOLDS
+from utils.agent_operations import operation_view
 from utils.components import (
     render_alert_box,
     render_funnel_chart,
@@ -16,6 +17,8 @@ from utils.components import (
     render_kpi_grid,
     render_trend_chart,
 )
+from utils.customer_tables import get_customer_record
+from utils.data_store import get_data_now
 
 
 def render_kavako_dashboard(data, from_city_manager=False):
@@ -185,7 +188,10 @@ def render_todays_focus(agent_data, data):
         return
 
     # Get next appointment (simulated - take highest score customer)
-    next_customer = agent_customers.nlargest(1, "customer_score").iloc[0]
+    top_customer_id = agent_customers.nlargest(1, "customer_score").iloc[0][
+        "customer_id"
+    ]
+    next_customer = get_customer_record(data, top_customer_id, get_data_now())
 
     # Get Celeste context
     celeste_summary = next_customer.get("celeste_summary", "")
@@ -353,79 +359,30 @@ def render_agent_selector(data):
                 if len(agent_customers) > 0:
                     # Use highest score customer as context
                     top_customer = agent_customers.nlargest(1, "customer_score").iloc[0]
-                    st.session_state.copilot_customer_context = top_customer.to_dict()
-
-
-def apply_agent_operation_filter(agent_dict, operation_type):
-    """
-    Apply operation type filter to a single agent's data
-    Returns modified agent_dict with adjusted metrics
-    """
-    if operation_type == "sales":
-        # Only count sales operations
-        agent_dict["sales"] = agent_dict.get("sales_only", 0) + agent_dict.get(
-            "sales_tradein", 0
-        )
-        agent_dict["conversion"] = (
-            agent_dict["sales"] / agent_dict["leads"]
-            if agent_dict.get("leads", 0) > 0
-            else 0
-        )
-        agent_dict["revenue"] = agent_dict["sales"] * 20000
-
-    elif operation_type == "purchases":
-        # Only count purchase operations
-        agent_dict["sales"] = agent_dict.get("purchases_total", 0)
-        agent_dict["conversion"] = (
-            agent_dict["sales"] / agent_dict["leads"]
-            if agent_dict.get("leads", 0) > 0
-            else 0
-        )
-        agent_dict["revenue"] = agent_dict["sales"] * 18000
-
-    elif operation_type == "tradein":
-        # Only count trade-in operations
-        agent_dict["sales"] = agent_dict.get("sales_tradein", 0)
-        agent_dict["conversion"] = (
-            agent_dict["sales"] / agent_dict["leads"]
-            if agent_dict.get("leads", 0) > 0
-            else 0
-        )
-        agent_dict["revenue"] = agent_dict["sales"] * 20000
-
-    return agent_dict
+                    st.session_state.copilot_customer_context = get_customer_record(
+                        data, top_customer["customer_id"], get_data_now()
+                    )
 
 
 def get_agent_data(data, agent_name, operation_type="all"):
     """Get all data for a specific agent, filtered by operation type"""
-    agents_df = data["agent_performance"].copy()
+    agents_df = data["agent_performance"]
 
     agent_row = agents_df[agents_df["agent_name"] == agent_name]
 
     if len(agent_row) == 0:
         return None
 
-    agent_info = agent_row.iloc[0].to_dict()
-
-    # Apply operation type filter
-    if operation_type != "all":
-        agent_info = apply_agent_operation_filter(agent_info, operation_type)
+    # Metrics of the operation type for the agent and the hub comparison
+    agent_info = operation_view(agent_row.iloc[:1], operation_type).iloc[0].to_dict()
 
     # Add hub data for comparison
     hub = agent_info["hub"]
     country = agent_info["country"]
-    hub_agents = agents_df[
-        (agents_df["hub"] == hub) & (agents_df["country"] == country)
-    ]
-
-    # Apply same filter to hub comparison
-    if operation_type != "all":
-        hub_agents = hub_agents.apply(
-            lambda row: pd.Series(
-                apply_agent_operation_filter(row.to_dict(), operation_type)
-            ),
-            axis=1,
-        )
+    hub_agents = operation_view(
+        agents_df[(agents_df["hub"] == hub) & (agents_df["country"] == country)],
+        operation_type,
+    )
 
     agent_info["hub_agents"] = hub_agents
     agent_info["hub_avg_conversion"] = hub_agents["conversion"].mean()
@@ -598,7 +555,7 @@ def render_active_portfolio(agent_data, data):
             for idx, (_, customer) in enumerate(top_customers.iterrows()):
                 days_registered = customer["days_since_registration"]
                 days_since_last = (
-                    datetime.now() - customer["last_interaction_date"]
+                    get_data_now() - customer["last_interaction_date"]
                 ).days
 
                 # Priority based on score and time since last contact
@@ -663,7 +620,7 @@ def render_upcoming_appointments(agent_data, data):
         return
 
     # Filter appointments for this agent's hub and future dates
-    today = datetime.now().date()
+    today = get_data_now().date()
     week_ahead = today + timedelta(days=7)
 
     hub_appointments = appointments_df[
@@ -671,7 +628,7 @@ def render_upcoming_appointments(agent_data, data):
         & (appointments_df["date"] >= today)
         & (appointments_df["date"] <= week_ahead)
         & (appointments_df["status"].isin(["Confirmada", "Pendiente", "Por Confirmar"]))
-    ].copy()
+    ]
 
     # Sort by datetime
     hub_appointments = hub_appointments.sort_values("datetime")
@@ -751,13 +708,12 @@ def render_upcoming_appointments(agent_data, data):
                 if appt.get("notes"):
                     st.info(f"📝 **Notas:** {appt['notes']}")
 
-                # Try to get customer context from customers_df
+                # Try to get customer context from the customer tables
                 if len(customers_df) > 0:
-                    customer_match = customers_df[
-                        customers_df["customer_id"] == appt["customer_id"]
-                    ]
-                    if len(customer_match) > 0:
-                        customer = customer_match.iloc[0]
+                    customer = get_customer_record(
+                        data, appt["customer_id"], get_data_now()
+                    )
+                    if customer is not None:
                         celeste_summary = customer.get("celeste_summary", "")
                         if celeste_summary:
                             st.markdown("---")